@@ -0,0 +1,311 @@
+# audio_analysis.py
+"""
+Offline analysis of the timeline's audio: a beat and bar grid, onset markers and per-band energy
+envelopes.
+
+Analysis runs once per audio file in a worker process, so neither decoding nor the STFT competes
+with the GUI or the output loop. Decoded audio is downsampled and fed through the STFT as it
+arrives, and each block of frames is reduced on the spot to band energies and spectral flux, so
+memory stays flat however long the file is. Results are cached beside the show (see
+analysis_cache_dir), keyed by a hash of the audio file's contents.
+
+At playback time everything is a lookup: band_level() indexes a precomputed envelope, so audio can
+modulate intensity or effect speed without any analysis on the output path.
+"""
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from PyQt6.QtCore import QCoreApplication, QObject, pyqtSignal
+
+from waveform_cache import DECODE_SAMPLE_RATE, decode_audio, file_digest
+
+ENVELOPE_BANDS = {'low': (20.0, 150.0), 'mid': (150.0, 2000.0), 'high': (2000.0, 11025.0)} # Hz
+BAND_LABELS = {'low': "Bass", 'mid': "Mids", 'high': "Highs"}
+MIN_BPM, MAX_BPM = 60.0, 200.0
+PREFERRED_BPM = 120.0 # Centre of the tempo prior; halves and doubles of the true tempo score lower
+BEATS_PER_BAR = 4
+ENVELOPE_RELEASE_S = 0.15 # Envelopes rise at once and fall back over this time, like a VU meter
+ONSET_MIN_GAP_S = 0.05
+ONSET_BANDS = 48
+BLOCK_FRAMES = 1024 # STFT frames transformed at once
+CACHE_VERSION = 1 # Bump when the analysis or the file layout changes; old cache files are then ignored
+
+
+class AudioAnalysis:
+    """Beat grid, onsets and band envelopes of one audio file. Times are in seconds."""
+
+    def __init__(self, tempo_bpm: float, beat_times: np.ndarray, bar_times: np.ndarray,
+                 onset_times: np.ndarray, frame_rate: float, bands: dict):
+        self.tempo_bpm = tempo_bpm
+        self.beat_times = beat_times
+        self.bar_times = bar_times
+        self.onset_times = onset_times
+        self.frame_rate = frame_rate # Envelope frames per second
+        self.bands = bands # Band name -> float32 envelope in 0..1
+
+    def band_level(self, band: str, time_s: float) -> float:
+        envelope = self.bands.get(band)
+        if envelope is None or not len(envelope):
+            return 0.0
+        return float(envelope[min(len(envelope) - 1, max(0, int(time_s * self.frame_rate)))])
+
+    def beats_between(self, start_s: float, end_s: float) -> np.ndarray:
+        return self.beat_times[np.searchsorted(self.beat_times, start_s):np.searchsorted(self.beat_times, end_s)]
+
+    def save(self, path: Path):
+        arrays = {f"band_{name}": envelope for name, envelope in self.bands.items()}
+        temp_path = path.with_suffix(".tmp")
+        with open(temp_path, 'wb') as handle:
+            np.savez(handle, tempo_bpm=self.tempo_bpm, beat_times=self.beat_times, bar_times=self.bar_times,
+                     onset_times=self.onset_times, frame_rate=self.frame_rate, **arrays)
+        temp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> 'AudioAnalysis':
+        with np.load(path) as data:
+            bands = {name[len("band_"):]: data[name] for name in data.files if name.startswith("band_")}
+            return cls(float(data['tempo_bpm']), data['beat_times'], data['bar_times'], data['onset_times'],
+                       float(data['frame_rate']), bands)
+
+
+def analysis_cache_dir(show_path: str) -> Path:
+    """Analyses are kept in a folder next to the show file, so they travel with it."""
+    show_path = Path(show_path)
+    return show_path.with_name(f"{show_path.stem}_analysis")
+
+
+class _SpectralFeatures:
+    """
+    Streams mono samples through the STFT and reduces each block of frames to (onset strength,
+    {band: RMS energy}) as soon as it is complete; frame i is centred on sample i * hop. Samples
+    are downsampled as they arrive and only the frames not yet transformed are held.
+    """
+
+    def __init__(self):
+        self.sample_rate = None # Analysis rate, set by the first feed()
+        self._factor = 1
+        self._carry = np.empty(0, np.float32) # Input samples not yet downsampled
+        self._pending = np.empty(0, np.float32) # Padded samples from the next frame on
+        self._padded_start = False
+        self._previous = None # Last frame's compressed onset bands, for the flux across blocks
+        self._flux = []
+        self._energies = {name: [] for name in ENVELOPE_BANDS}
+
+    def _setup(self, input_rate: int):
+        if input_rate > 1.5 * DECODE_SAMPLE_RATE: # Analysis needs nothing above ~11 kHz; halve the work
+            self._factor = int(input_rate // DECODE_SAMPLE_RATE)
+        self.sample_rate = input_rate // self._factor
+        self.n_fft = 1 << int(round(math.log2(self.sample_rate * 0.046))) # ~46 ms windows
+        self.hop = self.n_fft // 4 # ~12 ms between frames
+        self.frame_rate = self.sample_rate / self.hop
+        self._window = np.hanning(self.n_fft).astype(np.float32)
+        frequencies = np.fft.rfftfreq(self.n_fft, 1.0 / self.sample_rate)
+        self._band_bins = {name: (frequencies >= low) & (frequencies < high) for name, (low, high) in ENVELOPE_BANDS.items()}
+        # Onsets are measured on log-spaced bands rather than single bins, which averages out the
+        # frame-to-frame jitter of noisy material
+        edges = np.geomspace(30.0, self.sample_rate / 2, ONSET_BANDS + 1)
+        self._onset_groups = np.unique(np.searchsorted(frequencies, edges[:-1]))
+
+    def feed(self, samples: np.ndarray, sample_rate: int):
+        if self.sample_rate is None:
+            self._setup(sample_rate)
+        samples = samples.astype(np.float32, copy=False)
+        if self._factor > 1:
+            samples = np.concatenate((self._carry, samples))
+            whole = len(samples) - len(samples) % self._factor
+            self._carry = samples[whole:]
+            samples = samples[:whole].reshape(-1, self._factor).mean(axis=1)
+        self._pending = np.concatenate((self._pending, samples))
+        half = self.n_fft // 2
+        if not self._padded_start:
+            if len(self._pending) <= half:
+                return
+            self._pending = np.concatenate((self._pending[half:0:-1], self._pending)) # Reflected, like np.pad
+            self._padded_start = True
+        if len(self._pending) >= self.n_fft + (BLOCK_FRAMES - 1) * self.hop:
+            self._transform()
+
+    def finish(self) -> tuple[np.ndarray, dict]:
+        """(onset strength, {band: RMS energy}) of every frame."""
+        if self.sample_rate is None:
+            self._setup(DECODE_SAMPLE_RATE)
+        half = self.n_fft // 2
+        if self._padded_start:
+            self._pending = np.concatenate((self._pending, self._pending[-2:-half - 2:-1]))
+        else: # Shorter than half a window
+            self._pending = np.pad(self._pending, half)
+        self._transform()
+        flux = np.concatenate(self._flux) if self._flux else np.empty(0, np.float32)
+        return flux, {name: np.concatenate(parts) if parts else np.empty(0, np.float32) for name, parts in self._energies.items()}
+
+    def _transform(self):
+        """Transforms every complete frame in _pending, BLOCK_FRAMES at a time."""
+        count = (len(self._pending) - self.n_fft) // self.hop + 1 if len(self._pending) >= self.n_fft else 0
+        if not count:
+            return
+        frames = np.lib.stride_tricks.sliding_window_view(self._pending, self.n_fft)[::self.hop][:count]
+        for first in range(0, count, BLOCK_FRAMES):
+            magnitudes = np.abs(np.fft.rfft(frames[first:first + BLOCK_FRAMES] * self._window, axis=1)).astype(np.float32)
+            for name, bins in self._band_bins.items():
+                energy = np.sqrt(np.mean(magnitudes[:, bins] ** 2, axis=1)) if bins.any() else np.zeros(len(magnitudes))
+                self._energies[name].append(energy.astype(np.float32))
+            # Spectral flux of the log-compressed spectrum: how much energy each frame adds over the last
+            compressed = np.log1p(100.0 * np.sqrt(np.add.reduceat(magnitudes ** 2, self._onset_groups, axis=1)))
+            rises = np.diff(compressed, axis=0, prepend=compressed[:1] if self._previous is None else self._previous)
+            self._flux.append(np.maximum(rises, 0.0).sum(axis=1).astype(np.float32))
+            self._previous = compressed[-1:]
+        self._pending = self._pending[count * self.hop:].copy() # Drop the transformed frames' samples
+
+
+def _normalise_envelope(energy: np.ndarray, frame_rate: float) -> np.ndarray:
+    levels = np.log1p(energy / (np.median(energy[energy > 0]) if (energy > 0).any() else 1.0))
+    reference = np.percentile(levels, 98) if len(levels) else 0.0
+    levels = np.clip(levels / reference, 0.0, 1.0) if reference > 0 else np.zeros_like(levels)
+    decay = math.exp(-1.0 / (ENVELOPE_RELEASE_S * frame_rate))
+    held = levels.astype(np.float32)
+    for index in range(1, len(held)): # Instant attack, exponential release
+        held[index] = max(held[index], held[index - 1] * decay)
+    return held
+
+
+def _detect_onsets(strength: np.ndarray, frame_rate: float) -> np.ndarray:
+    """Frames that are local maxima of the onset strength and stand out from its running mean."""
+    peak_radius = max(1, int(round(0.03 * frame_rate)))
+    mean_radius = max(1, int(round(0.25 * frame_rate)))
+    local_max = np.lib.stride_tricks.sliding_window_view(np.pad(strength, peak_radius, mode='edge'), 2 * peak_radius + 1).max(axis=1)
+    local_mean = np.lib.stride_tricks.sliding_window_view(np.pad(strength, mean_radius, mode='edge'), 2 * mean_radius + 1).mean(axis=1)
+    candidates = np.flatnonzero((strength >= local_max) & (strength > local_mean + strength.std()))
+    onsets, min_gap, last = [], ONSET_MIN_GAP_S * frame_rate, -math.inf
+    for frame in candidates.tolist():
+        if frame - last >= min_gap:
+            onsets.append(frame)
+            last = frame
+    return np.asarray(onsets, np.int64)
+
+
+def _beat_period(strength: np.ndarray, frame_rate: float) -> float:
+    """Beat period in frames from the autocorrelation of the onset strength, weighted by a tempo prior."""
+    centred = strength - strength.mean()
+    spectrum = np.fft.rfft(centred, 2 * len(centred))
+    autocorrelation = np.fft.irfft(spectrum * np.conj(spectrum))[:len(centred)]
+    shortest = max(1, int(frame_rate * 60.0 / MAX_BPM))
+    longest = min(len(autocorrelation) - 2, int(math.ceil(frame_rate * 60.0 / MIN_BPM)))
+    if longest <= shortest:
+        return frame_rate * 60.0 / PREFERRED_BPM
+    lags = np.arange(shortest, longest + 1)
+    bpms = frame_rate * 60.0 / lags
+    weighted = autocorrelation[lags] * np.exp(-0.5 * np.log2(bpms / PREFERRED_BPM) ** 2)
+    best = int(np.argmax(weighted))
+    lag = float(lags[best])
+    if 0 < best < len(lags) - 1: # Parabolic interpolation between lags
+        left, centre, right = weighted[best - 1], weighted[best], weighted[best + 1]
+        denominator = left - 2 * centre + right
+        if denominator:
+            lag += 0.5 * (left - right) / denominator
+    return lag
+
+
+def _track_beats(strength: np.ndarray, period: float, tightness: float = 100.0) -> np.ndarray:
+    """
+    Dynamic-programming beat tracker: each frame's score is its onset strength plus the best
+    score of a predecessor roughly one period earlier, penalised by how far the gap strays from
+    the period. Backtracking from the best final frame yields the beat frames.
+    """
+    count = len(strength)
+    normalised = strength / (strength.std() or 1.0)
+    scores = normalised.astype(np.float64)
+    backlinks = np.full(count, -1, np.int64)
+    gaps = np.arange(int(round(period / 2)), int(round(2 * period)) + 1)
+    penalties = -tightness * np.log(gaps / period) ** 2
+    for frame in range(int(gaps[0]), count):
+        usable = gaps <= frame
+        candidates = frame - gaps[usable]
+        totals = scores[candidates] + penalties[usable]
+        best = int(np.argmax(totals))
+        if totals[best] > 0:
+            scores[frame] += totals[best]
+            backlinks[frame] = candidates[best]
+    tail = np.arange(max(0, count - int(round(period))), count)
+    frame = int(tail[np.argmax(scores[tail])]) if len(tail) else -1
+    beats = []
+    while frame >= 0:
+        beats.append(frame)
+        frame = int(backlinks[frame])
+    return np.asarray(beats[::-1], np.int64)
+
+
+def analyze_samples(samples: np.ndarray, sample_rate: int) -> AudioAnalysis:
+    """Analyses mono float samples in -1..1."""
+    features = _SpectralFeatures()
+    features.feed(samples, sample_rate)
+    return _analyze_features(features)
+
+
+def _analyze_features(features: _SpectralFeatures) -> AudioAnalysis:
+    flux, energies = features.finish()
+    frame_rate = features.frame_rate
+    bands = {name: _normalise_envelope(energy, frame_rate) for name, energy in energies.items()}
+    onset_frames = _detect_onsets(flux, frame_rate) if len(flux) else np.empty(0, np.int64)
+
+    beat_frames = np.empty(0, np.int64)
+    if len(flux) > 4 * frame_rate and flux.std() > 0:
+        beat_frames = _track_beats(flux, _beat_period(flux, frame_rate))
+    beat_times = beat_frames / frame_rate
+    tempo_bpm = 60.0 * (len(beat_times) - 1) / float(beat_times[-1] - beat_times[0]) if len(beat_times) > 1 else 0.0
+
+    # Downbeats are taken to be the beat phase that carries the most bass
+    bar_times = beat_times[:0]
+    if len(beat_frames) >= BEATS_PER_BAR:
+        low = bands['low'][beat_frames]
+        offset = int(np.argmax([low[phase::BEATS_PER_BAR].mean() for phase in range(BEATS_PER_BAR)]))
+        bar_times = beat_times[offset::BEATS_PER_BAR]
+    return AudioAnalysis(tempo_bpm, beat_times, bar_times, onset_frames / frame_rate, frame_rate, bands)
+
+
+def load_or_analyze(audio_path: str, cache_dir: str) -> AudioAnalysis:
+    """Worker process entry point: the cached analysis of audio_path, analysing it on a miss."""
+    cache_path = Path(cache_dir) / f"{file_digest(audio_path)}_v{CACHE_VERSION}.npz"
+    if cache_path.exists():
+        try:
+            return AudioAnalysis.load(cache_path)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Warning: Ignoring unreadable audio analysis {cache_path}: {e}")
+    _app = QCoreApplication.instance() or QCoreApplication([]) # The media backend decoder needs an event loop
+    features = _SpectralFeatures()
+    decode_audio(audio_path, features.feed) # Transformed as it is decoded; the samples are never held
+    analysis = _analyze_features(features)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    analysis.save(cache_path)
+    return analysis
+
+
+class AudioAnalyzer(QObject):
+    """Runs load_or_analyze in a worker process and reports each result on the GUI thread."""
+    analyzed = pyqtSignal(str, object) # Audio path, AudioAnalysis or None if the audio could not be analysed
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._executor = None
+
+    def analyze(self, audio_path: str, show_path: str):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn'))
+        future = self._executor.submit(load_or_analyze, audio_path, str(analysis_cache_dir(show_path)))
+        # Done callbacks run on an executor thread; the queued signal hands the result to the GUI thread
+        future.add_done_callback(lambda done: self._report(audio_path, done))
+
+    def _report(self, audio_path: str, future):
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            print(f"Could not analyse the audio in {audio_path}: {error}")
+        self.analyzed.emit(audio_path, None if error is not None else future.result())
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,301 @@
+# bridge_simulator.py
+"""
+Headless stand-in for the Roblox Lua client, for exercising the HTTP bridge without Studio.
+
+Each simulated client syncs its clock through /time, polls /get_updates at a fixed rate,
+decodes the payload and applies it to its own fixture table, holding scheduled frames until
+their apply time like the Lua jitter buffer does. One client can also post a synthetic
+/report_positions map. At the end a per-client report is printed: payload sizes, latency,
+lost updates and the CPU time spent decoding and applying.
+
+Against a running Lumenante (default), latency is the poll round trip. With --serve the
+simulator starts its own bridge on the loopback interface with a synthetic publisher, which
+stamps every update so end-to-end latency and lost updates can be measured exactly.
+
+    python bridge_simulator.py --serve --clients 4 --fixtures 2000 --duration 10
+    python bridge_simulator.py --clients 2 --rate 30 --legacy --report 5000
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import random
+import statistics
+import time
+
+import aiohttp
+from aiohttp import web
+
+from roblox_bridge import BridgeClock, BridgeHub, BridgeRoutes, ClockSyncEstimator
+
+
+class SimulatedClient:
+    """One polling Roblox server with its own fixture table."""
+
+    def __init__(self, index: int, base_url: str, args):
+        self.client_id = f"sim-{index}"
+        self.base_url = base_url
+        self.args = args
+        self.clock = BridgeClock()
+        self.sync = ClockSyncEstimator()
+        self.fid_range = None
+        self.fixtures = {} # {fid_str: params}
+        self.pending_frames = [] # [(apply_at_server_ms, updates)] awaiting their apply time
+        self.cursor = None
+
+        self.polls = 0
+        self.status_counts = {}
+        self.wire_bytes = []
+        self.decoded_bytes = []
+        self.latencies_ms = []
+        self.cpu_s = 0.0
+        self.errors = 0
+
+    async def sync_clock(self, session: aiohttp.ClientSession, samples: int = 8):
+        for _ in range(samples):
+            t0 = self.clock.now_ms()
+            async with session.get(f"{self.base_url}/time", params={'t0': f"{t0:.3f}"}) as resp:
+                data = await resp.json()
+            self.sync.add_sample(t0, data['t1'], data['t2'], self.clock.now_ms())
+
+    async def subscribe(self, session: aiohttp.ClientSession, fid_range: tuple[int, int]):
+        self.fid_range = fid_range
+        body = {'client_id': self.client_id, 'fid_range': list(fid_range)}
+        async with session.post(f"{self.base_url}/subscribe", json=body) as resp:
+            resp.raise_for_status()
+
+    async def report_positions(self, session: aiohttp.ClientSession, count: int):
+        payload = {str(fid): [random.uniform(-200, 200), random.uniform(0, 50), random.uniform(-200, 200)]
+                   for fid in range(1, count + 1)}
+        body = json.dumps(payload).encode()
+        start = time.perf_counter()
+        async with session.post(f"{self.base_url}/report_positions", data=body,
+                                headers={'Content-Type': 'application/json'}) as resp:
+            text = await resp.text()
+        print(f"{self.client_id}: reported {count} positions ({len(body) / 1024:.0f} KB) in "
+              f"{(time.perf_counter() - start) * 1000:.1f} ms -> {resp.status} {text}")
+
+    def server_now(self) -> float:
+        return self.sync.to_server_time(self.clock.now_ms())
+
+    def _apply(self, updates: dict, received_server_ms: float):
+        for key, params in updates.items():
+            self.fixtures.setdefault(key, {}).update(params)
+            sent = params.get('sim_sent')
+            if sent is not None:
+                self.latencies_ms.append(received_server_ms - sent)
+
+    def apply_due_frames(self, as_of: float | None = None):
+        now = self.server_now() if as_of is None else as_of
+        due = [frame for frame in self.pending_frames if frame[0] <= now]
+        if not due:
+            return
+        self.pending_frames = [frame for frame in self.pending_frames if frame[0] > now]
+        for _apply_at, updates in sorted(due, key=lambda frame: frame[0]):
+            self._apply(updates, now)
+
+    async def poll_once(self, session: aiohttp.ClientSession) -> bool:
+        """Polls once. Returns True if the response carried data."""
+        params = {'client_id': self.client_id}
+        if not self.args.legacy:
+            params['v'] = '2'
+        headers = {'Accept-Encoding': 'gzip'} if self.args.gzip else {}
+        started = self.clock.now_ms()
+        async with session.get(f"{self.base_url}/get_updates", params=params, headers=headers) as resp:
+            raw = await resp.read()
+            status = resp.status
+            encoding = resp.headers.get('Content-Encoding')
+            server_time = resp.headers.get('X-Lumenante-Server-Time')
+        received = self.clock.now_ms()
+        self.polls += 1
+        self.status_counts[status] = self.status_counts.get(status, 0) + 1
+        if status != 200:
+            if status not in (204, 304):
+                self.errors += 1
+            self.apply_due_frames()
+            if not self.args.serve:
+                self.latencies_ms.append(received - started)
+            return False
+
+        cpu_start = time.process_time()
+        self.wire_bytes.append(len(raw))
+        body = gzip.decompress(raw) if encoding == 'gzip' else raw
+        self.decoded_bytes.append(len(body))
+        data = json.loads(body)
+        received_server = self.sync.to_server_time(received)
+        # The immediate frame is the state as of the server's send time: held frames due by then
+        # land first, anything due later lands on top of it.
+        self.apply_due_frames(float(server_time) if server_time else None)
+        if self.args.legacy:
+            self._apply(data, received_server)
+            has_data = bool(data)
+        else:
+            self.cursor = data['cursor']
+            for frame in data['frames']:
+                if frame['apply_at'] is None:
+                    self._apply(frame['updates'], received_server)
+                else:
+                    self.pending_frames.append((frame['apply_at'], frame['updates']))
+            has_data = bool(data['frames']) or data.get('more', False)
+        self.apply_due_frames()
+        self.cpu_s += time.process_time() - cpu_start
+        if not self.args.serve:
+            self.latencies_ms.append(received - started)
+        return has_data
+
+    async def run(self, session: aiohttp.ClientSession, stop: asyncio.Event):
+        interval = 1.0 / self.args.rate
+        while not stop.is_set():
+            try:
+                await self.poll_once(session)
+            except (aiohttp.ClientError, json.JSONDecodeError, KeyError) as e:
+                self.errors += 1
+                print(f"{self.client_id}: poll failed: {e}")
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def drain(self, session: aiohttp.ClientSession, max_polls: int = 200):
+        """Polls until the server has nothing more and every held frame is due."""
+        for _ in range(max_polls):
+            has_data = await self.poll_once(session)
+            if not has_data and not self.pending_frames:
+                return
+            await asyncio.sleep(0.01)
+
+
+class SyntheticPublisher:
+    """Publishes stamped updates straight into a BridgeHub, standing in for the GUI."""
+
+    def __init__(self, hub: BridgeHub, fixtures: int, rate: float, scheduled_fraction: float, schedule_ms: float):
+        self.hub = hub
+        self.fixtures = fixtures
+        self.rate = rate
+        self.scheduled_fraction = scheduled_fraction
+        self.schedule_ms = schedule_ms
+        self.expected = {} # {fid_str: (effective_ms, sim_seq)} of the update that should end up applied
+        self.published = 0
+
+    def publish_one(self):
+        self.published += 1
+        key = str(random.randint(1, self.fixtures))
+        now = self.hub.clock.now_ms()
+        apply_at = None
+        if random.random() < self.scheduled_fraction:
+            apply_at = now + self.schedule_ms
+        params = {'brightness': random.randint(0, 100), 'sim_seq': self.published,
+                  'sim_sent': apply_at if apply_at is not None else now}
+        self.hub.publish(key, params, apply_at)
+        # Updates take effect in time order, so a scheduled update can outlive a later immediate one.
+        self.expected[key] = max(self.expected[key], (params['sim_sent'], self.published))
+
+    async def run(self, stop: asyncio.Event):
+        for fid in range(1, self.fixtures + 1):
+            now = self.hub.clock.now_ms()
+            self.hub.publish(str(fid), {'brightness': 0, 'sim_seq': 0, 'sim_sent': now})
+            self.expected[str(fid)] = (now, 0)
+        interval = 1.0 / 100.0
+        carry = 0.0
+        while not stop.is_set():
+            carry += self.rate * interval
+            while carry >= 1.0:
+                self.publish_one()
+                carry -= 1.0
+            await asyncio.sleep(interval)
+
+
+def _percentile(values: list, fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def print_report(clients: list, publisher: SyntheticPublisher | None, duration: float):
+    print()
+    latency_label = "e2e latency ms" if publisher else "poll rtt ms"
+    print(f"{'client':<8} {'polls':>6} {'200/204/304':>13} {'avg KB':>8} {'max KB':>8} "
+          f"{latency_label + ' (p50/p95/max)':>30} {'lost':>6} {'cpu ms':>8} {'errors':>6}")
+    for client in clients:
+        statuses = "/".join(str(client.status_counts.get(code, 0)) for code in (200, 204, 304))
+        avg_kb = statistics.fmean(client.wire_bytes) / 1024 if client.wire_bytes else 0.0
+        max_kb = max(client.wire_bytes, default=0) / 1024
+        latency = (f"{_percentile(client.latencies_ms, 0.5):.1f}/{_percentile(client.latencies_ms, 0.95):.1f}/"
+                   f"{max(client.latencies_ms, default=0.0):.1f}")
+        lost = "-"
+        if publisher:
+            lost = str(sum(1 for key, (_effective, seq) in publisher.expected.items()
+                           if _in_range(key, client.fid_range) and client.fixtures.get(key, {}).get('sim_seq') != seq))
+        print(f"{client.client_id:<8} {client.polls:>6} {statuses:>13} {avg_kb:>8.1f} {max_kb:>8.1f} "
+              f"{latency:>30} {lost:>6} {client.cpu_s * 1000:>8.1f} {client.errors:>6}")
+    if publisher:
+        print(f"\nPublished {publisher.published} updates over {duration:.1f} s to {publisher.fixtures} fixtures.")
+
+
+def _in_range(key: str, fid_range) -> bool:
+    return fid_range is None or fid_range[0] <= int(key) <= fid_range[1]
+
+
+async def main(args):
+    base_url = f"http://127.0.0.1:{args.port}"
+    runner = None
+    publisher = None
+    if args.serve:
+        hub = BridgeHub(BridgeClock())
+        runner = web.AppRunner(BridgeRoutes(hub).make_app())
+        await runner.setup()
+        await web.TCPSite(runner, '127.0.0.1', args.port).start()
+        publisher = SyntheticPublisher(hub, args.fixtures, args.publish_rate, args.scheduled, args.schedule_ms)
+
+    clients = [SimulatedClient(i + 1, base_url, args) for i in range(args.clients)]
+    stop = asyncio.Event()
+    try:
+        async with aiohttp.ClientSession(auto_decompress=False) as session:
+            for index, client in enumerate(clients):
+                await client.sync_clock(session)
+                if args.partition:
+                    span = max(1, args.fixtures // args.clients)
+                    upper = args.fixtures if index == args.clients - 1 else (index + 1) * span
+                    await client.subscribe(session, (index * span + 1, upper))
+            if args.report:
+                await clients[0].report_positions(session, args.report)
+
+            tasks = [asyncio.create_task(client.run(session, stop)) for client in clients]
+            if publisher:
+                tasks.append(asyncio.create_task(publisher.run(stop)))
+            await asyncio.sleep(args.duration)
+            stop.set()
+            await asyncio.gather(*tasks)
+            await asyncio.sleep(args.schedule_ms / 1000.0)
+            for client in clients:
+                await client.drain(session)
+    finally:
+        if runner:
+            await runner.cleanup()
+    print_report(clients, publisher, args.duration)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Headless Roblox client simulator for the Lumenante bridge.")
+    parser.add_argument('--port', type=int, default=25000)
+    parser.add_argument('--clients', type=int, default=1, help="Number of simulated Roblox servers.")
+    parser.add_argument('--rate', type=float, default=20.0, help="Polls per second per client.")
+    parser.add_argument('--duration', type=float, default=10.0, help="Seconds to run before draining.")
+    parser.add_argument('--legacy', action='store_true', help="Poll the flat FID map instead of v=2 frames.")
+    parser.add_argument('--gzip', action='store_true', help="Send Accept-Encoding: gzip.")
+    parser.add_argument('--partition', action='store_true', help="Subscribe each client to an equal slice of FIDs.")
+    parser.add_argument('--report', type=int, default=0, help="Post this many synthetic fixture positions.")
+    parser.add_argument('--serve', action='store_true', help="Start a local bridge with a synthetic publisher.")
+    parser.add_argument('--fixtures', type=int, default=500, help="Fixtures driven by the publisher (--serve).")
+    parser.add_argument('--publish-rate', type=float, default=2000.0, help="Updates per second (--serve).")
+    parser.add_argument('--scheduled', type=float, default=0.1, help="Fraction of updates sent ahead of time (--serve).")
+    parser.add_argument('--schedule-ms', type=float, default=200.0, help="How far ahead scheduled updates apply (--serve).")
+    args = parser.parse_args(argv)
+    if args.clients < 1 or args.rate <= 0:
+        parser.error("--clients must be at least 1 and --rate positive.")
+    return args
+
+
+if __name__ == '__main__':
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,195 @@
+# db_schema.py
+"""
+Versioned schema migrations for the show database.
+
+The schema version is kept in PRAGMA user_version. Each migration is a numbered step that
+brings the database from the previous version to its own, and runs in its own transaction
+together with the version bump, so an interrupted upgrade resumes from the last completed step.
+When the stored version is current, startup does nothing beyond reading the pragma.
+
+To change the schema, append a migration with the next number; never edit one that has shipped.
+"""
+import json
+import sqlite3
+
+import operation_journal
+import preset_store
+
+
+def _create_base_tables(cursor):
+    """The schema as it stood before versioning, including the ad-hoc column patches."""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS fixture_profiles (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE,
+            creator TEXT,
+            attributes_json TEXT NOT NULL
+        )
+    ''')
+
+    cursor.execute("SELECT COUNT(*) FROM fixture_profiles")
+    if cursor.fetchone()[0] == 0:
+        print("No fixture profiles found. Creating default profiles.")
+        default_moving_head = [
+            {"name": "Dimmer", "type": "continuous", "dmx_channel": 1},
+            {"name": "Pan", "type": "continuous", "dmx_channel": 2},
+            {"name": "Tilt", "type": "continuous", "dmx_channel": 3},
+            {"name": "Color_Red", "type": "continuous", "dmx_channel": 4},
+            {"name": "Color_Green", "type": "continuous", "dmx_channel": 5},
+            {"name": "Color_Blue", "type": "continuous", "dmx_channel": 6},
+            {"name": "Zoom", "type": "continuous", "dmx_channel": 7},
+            {"name": "Focus", "type": "continuous", "dmx_channel": 8},
+            {"name": "Gobo_Spin", "type": "continuous", "dmx_channel": 9},
+            {"name": "Strobe", "type": "continuous", "dmx_channel": 10}
+        ]
+        default_par = [
+            {"name": "Dimmer", "type": "continuous"},
+            {"name": "Color_Red", "type": "continuous"},
+            {"name": "Color_Green", "type": "continuous"},
+            {"name": "Color_Blue", "type": "continuous"},
+            {"name": "Zoom", "type": "continuous"}
+        ]
+        default_blinder = [
+            {"name": "Dimmer", "type": "continuous"},
+            {"name": "Strobe", "type": "continuous"}
+        ]
+        default_led_bar = [
+            {"name": "Dimmer", "type": "continuous"},
+            {"name": "Color_Red", "type": "continuous"},
+            {"name": "Color_Green", "type": "continuous"},
+            {"name": "Color_Blue", "type": "continuous"}
+        ]
+        default_profiles = [
+            ("Moving Head", "Lumenante", json.dumps(default_moving_head)),
+            ("PAR Can", "Lumenante", json.dumps(default_par)),
+            ("Blinder", "Lumenante", json.dumps(default_blinder)),
+            ("LED Bar", "Lumenante", json.dumps(default_led_bar)),
+        ]
+        cursor.executemany(
+            "INSERT INTO fixture_profiles (name, creator, attributes_json) VALUES (?, ?, ?)",
+            default_profiles
+        )
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS fixtures (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, fid INTEGER NOT NULL, sfi INTEGER NOT NULL,
+            profile_id INTEGER NOT NULL, name TEXT NOT NULL,
+            x_pos REAL DEFAULT 0, y_pos REAL DEFAULT 0, z_pos REAL DEFAULT 0,
+            rotation_x REAL DEFAULT 0, rotation_y REAL DEFAULT 0, rotation_z REAL DEFAULT 0,
+            red INTEGER DEFAULT 255, green INTEGER DEFAULT 255, blue INTEGER DEFAULT 255,
+            brightness INTEGER DEFAULT 100, gobo_spin REAL DEFAULT 128.0,
+            zoom REAL DEFAULT 15.0, focus REAL DEFAULT 50.0,
+            shutter_strobe_rate REAL DEFAULT 0.0,
+            speed REAL DEFAULT 50.0,
+            comment TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY(profile_id) REFERENCES fixture_profiles(id) ON DELETE CASCADE, UNIQUE(fid, sfi)
+        )
+    ''')
+    cursor.execute("PRAGMA table_info(fixtures)")
+    fixture_cols = {info[1] for info in cursor.fetchall()}
+    if 'speed' not in fixture_cols:
+        cursor.execute("ALTER TABLE fixtures ADD COLUMN speed REAL DEFAULT 50.0")
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS presets (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, preset_number TEXT NOT NULL UNIQUE, name TEXT,
+            data TEXT NOT NULL, type TEXT NOT NULL DEFAULT 'All', created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS cues (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, cue_number TEXT NOT NULL UNIQUE, name TEXT,
+            trigger_time_s REAL NOT NULL, comment TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS timeline_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, start_time REAL NOT NULL,
+            duration REAL DEFAULT 0, event_type TEXT NOT NULL, data TEXT NOT NULL,
+            target_type TEXT, target_id INTEGER, cue_id INTEGER, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY(cue_id) REFERENCES cues(id) ON DELETE SET NULL
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS fixture_groups (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL UNIQUE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS fixture_group_mappings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, group_id INTEGER NOT NULL, fixture_id INTEGER NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY(group_id) REFERENCES fixture_groups(id) ON DELETE CASCADE,
+            FOREIGN KEY(fixture_id) REFERENCES fixtures(id) ON DELETE CASCADE,
+            UNIQUE(group_id, fixture_id)
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS loop_palettes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL UNIQUE, config_json TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+def _normalize_preset_values(cursor):
+    preset_store.ensure_schema(cursor)
+    migrated_presets = preset_store.migrate_blob_presets(cursor)
+    if migrated_presets:
+        print(f"Migrated {migrated_presets} preset(s) to the preset_values table.")
+
+
+def _add_lookup_indexes(cursor):
+    # fixtures(fid) and fixture_group_mappings(group_id) are already covered by the
+    # UNIQUE(fid, sfi) and UNIQUE(group_id, fixture_id) autoindexes.
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_group_mappings_fixture ON fixture_group_mappings(fixture_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_timeline_events_cue ON timeline_events(cue_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_timeline_events_target ON timeline_events(target_type, target_id)")
+
+
+def _add_operation_journal(cursor):
+    operation_journal.ensure_schema(cursor)
+
+
+# (version, description, migration). Versions are consecutive, starting at 1.
+MIGRATIONS = [
+    (1, "base tables", _create_base_tables),
+    (2, "normalized preset values", _normalize_preset_values),
+    (3, "lookup indexes", _add_lookup_indexes),
+    (4, "operation journal", _add_operation_journal),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """
+    Applies every pending migration and returns the resulting schema version. A failing
+    migration is rolled back and its sqlite3.Error re-raised; earlier steps stay applied.
+    """
+    version = get_schema_version(conn)
+    if version > SCHEMA_VERSION:
+        print(f"Warning: Show database schema v{version} is newer than this version of Lumenante (v{SCHEMA_VERSION}).")
+        return version
+    for target_version, description, migration in MIGRATIONS:
+        if target_version <= version:
+            continue
+        if conn.in_transaction:
+            conn.commit()
+        cursor = conn.cursor()
+        cursor.execute("BEGIN")
+        try:
+            migration(cursor)
+            cursor.execute(f"PRAGMA user_version = {int(target_version)}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        print(f"Database schema migrated to v{target_version} ({description}).")
+        version = target_version
+    return version
@@ -0,0 +1,116 @@
+# fade_engine.py
+"""
+Vectorised fades for timeline events.
+
+A fading event drives one segment per (fixture, parameter) pair it targets. A segment fades in
+from its origin to its target, holds the target, then fades out to its release value, each fade
+shaped by its own curve. All active segments live in parallel arrays, so a frame evaluates every
+fade of every event in one NumPy pass; where several segments drive the same pair, the one added
+last wins. Only values that changed since the previous frame are returned, which keeps a held
+value from being re-sent every frame.
+"""
+import numpy as np
+
+FADE_CURVES = {'linear': 0, 'ease_in': 1, 'ease_out': 2, 's_curve': 3}
+FADE_CURVE_LABELS = {'linear': "Linear", 'ease_in': "Ease In", 'ease_out': "Ease Out", 's_curve': "S-Curve"}
+FADABLE_EVENT_TYPES = ('brightness', 'color', 'pan', 'tilt', 'zoom', 'focus', 'strobe', 'preset')
+MASTER_FIXTURE_ID = -1 # Segment fixture ID standing for the master fader
+
+_COLUMN_SPAN = 64 # Larger than any parameter column; packs (fixture, column) into one key
+
+
+def apply_curve(progress: np.ndarray, curves: np.ndarray) -> np.ndarray:
+    """Shapes 0..1 progress values by their per-segment curve codes."""
+    return np.select(
+        [curves == FADE_CURVES['ease_in'], curves == FADE_CURVES['ease_out'], curves == FADE_CURVES['s_curve']],
+        [progress * progress, progress * (2.0 - progress), progress * progress * (3.0 - 2.0 * progress)],
+        progress)
+
+
+def _progress(time_s: float, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    spans = ends - starts
+    return np.clip((time_s - starts) / np.where(spans > 0, spans, 1.0), 0.0, 1.0) * (spans > 0) + (spans <= 0)
+
+
+class FadeEngine:
+    _DTYPES = {
+        'event': np.int64, 'fixture': np.int64, 'column': np.int64,
+        'start': np.float64, 'fade_in_end': np.float64, 'hold_end': np.float64, 'end': np.float64,
+        'origin': np.float64, 'target': np.float64, 'release': np.float64,
+        'curve_in': np.int8, 'curve_out': np.int8, 'sent': np.float64,
+    }
+
+    def __init__(self, integer_columns=()):
+        self.integer_columns = np.asarray(sorted(integer_columns), dtype=np.int64) # Rounded to whole numbers
+        self.clear()
+
+    def clear(self):
+        self._segments = {name: np.empty(0, dtype) for name, dtype in self._DTYPES.items()}
+
+    def __len__(self):
+        return len(self._segments['event'])
+
+    def event_ids(self) -> set:
+        return set(self._segments['event'].tolist())
+
+    def add(self, event_id: int, fixture_ids, columns, origins, targets, releases,
+            start_s: float, fade_in_s: float, hold_s: float, fade_out_s: float,
+            curve_in: str = 'linear', curve_out: str = 'linear'):
+        """Adds one event's segments; fixture_ids, columns and the three value arrays run in parallel."""
+        count = len(fixture_ids)
+        if count == 0:
+            return
+        fade_in_end = start_s + max(0.0, fade_in_s)
+        hold_end = fade_in_end + max(0.0, hold_s)
+        new = {
+            'event': np.full(count, event_id), 'fixture': fixture_ids, 'column': columns,
+            'start': np.full(count, start_s), 'fade_in_end': np.full(count, fade_in_end),
+            'hold_end': np.full(count, hold_end), 'end': np.full(count, hold_end + max(0.0, fade_out_s)),
+            'origin': origins, 'target': targets, 'release': releases,
+            'curve_in': np.full(count, FADE_CURVES.get(curve_in, 0)),
+            'curve_out': np.full(count, FADE_CURVES.get(curve_out, 0)),
+            'sent': np.full(count, np.nan),
+        }
+        for name, dtype in self._DTYPES.items():
+            self._segments[name] = np.concatenate((self._segments[name], np.asarray(new[name], dtype=dtype)))
+
+    def remove(self, event_id: int):
+        self._keep(self._segments['event'] != event_id)
+
+    def evaluate(self, time_s: float):
+        """
+        Evaluates every segment at time_s. Returns (fixture_ids, columns, values, finished_event_ids)
+        with only the pairs whose value changed; segments that have run their course are dropped
+        after their release value is returned.
+        """
+        seg = self._segments
+        if len(self) == 0:
+            return np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0), set()
+
+        fade_in = apply_curve(_progress(time_s, seg['start'], seg['fade_in_end']), seg['curve_in'])
+        fade_out = apply_curve(_progress(time_s, seg['hold_end'], seg['end']), seg['curve_out'])
+        values = np.where(time_s < seg['hold_end'],
+                          seg['origin'] + (seg['target'] - seg['origin']) * fade_in,
+                          seg['target'] + (seg['release'] - seg['target']) * fade_out)
+        whole = np.isin(seg['column'], self.integer_columns)
+        values = np.where(whole, np.round(values), np.round(values, 4))
+
+        # The last segment added for each (fixture, column) pair drives it
+        keys = seg['fixture'] * _COLUMN_SPAN + seg['column']
+        _keys, last_from_end = np.unique(keys[::-1], return_index=True)
+        winners = len(keys) - 1 - last_from_end
+        winner_values = values[winners]
+        changed = winners[winner_values != seg['sent'][winners]]
+        seg['sent'][changed] = values[changed]
+        fixture_ids, columns, changed_values = seg['fixture'][changed], seg['column'][changed], values[changed]
+
+        finished = seg['end'] <= time_s
+        finished_event_ids = set()
+        if finished.any():
+            finished_event_ids = set(seg['event'][finished].tolist()) - set(seg['event'][~finished].tolist())
+            self._keep(~finished)
+        return fixture_ids, columns, changed_values, finished_event_ids
+
+    def _keep(self, mask: np.ndarray):
+        for name in self._segments:
+            self._segments[name] = self._segments[name][mask]
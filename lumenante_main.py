@@ -13,6 +13,7 @@ from aiohttp import web
 from collections import deque
 import uuid
 import importlib.util
+import multiprocessing
 import random
 
 # Helper to determine the application's root directory
@@ -53,10 +54,10 @@ except Exception as e:
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QTabWidget, QVBoxLayout, QHBoxLayout,
     QWidget, QPushButton, QLabel, QSlider, QFrame, QMessageBox, QFileDialog,
-    QLineEdit, QSplashScreen, QProgressBar, QComboBox
+    QLineEdit, QSplashScreen, QProgressBar, QComboBox, QProgressDialog, QMenu
 )
 
-from PyQt6.QtCore import Qt, QSize, QSettings, pyqtSignal, QTimer, QThread, QElapsedTimer, QStandardPaths
+from PyQt6.QtCore import Qt, QSize, QSettings, pyqtSignal, QTimer, QThread, QElapsedTimer, QStandardPaths, QSignalBlocker
 from PyQt6.QtGui import QColor, QIcon, QPixmap, QPainter, QFont, QShortcut, QKeySequence
 
 
@@ -77,6 +78,15 @@ from tabs.plugins_tab import PluginsTab # New Tab
 
 import sqlite3
 import theme_manager
+from persistence import PersistenceService, configure_connection, open_memory_database, memory_backup_job
+import db_schema
+from show_repository import ShowRepository
+from show_io import ShowExporter, ShowFileReader, ShowImporter, open_show_stream
+from roblox_bridge import BridgeClock, BridgeHub, BridgeRoutes
+
+DEFAULT_SHOW_FILE_NAME = "lumenante_v1_show.db"
+SHOW_FILE_FILTER = "Lumenante Shows (*.lumshow *.db);;All Files (*)"
+MAX_RECENT_SHOWS = 8
 
 def get_app_data_path(file_name: str) -> Path:
     """Returns the full path to a file in the application's persistent data directory."""
@@ -87,43 +97,30 @@ def get_app_data_path(file_name: str) -> Path:
 class RobloxHTTPManager(QThread):
     """Manages an asynchronous HTTP server to provide fixture updates to Roblox."""
     status_updated = pyqtSignal(str)
-    positions_reported = pyqtSignal(dict) # New signal for reporting positions
+    positions_reported = pyqtSignal(dict, int) # {fid: (x, y, z)}, number of rejected entries
+    clients_changed = pyqtSignal(int) # Number of polling client sessions
 
     def __init__(self, main_window, parent=None):
         super().__init__(parent)
         self.main_window = main_window
         self.settings = main_window.settings
         self.db_connection = main_window.db_connection
-        self.data_buffer = {}
+        self.clock = BridgeClock()
+        self.hub = BridgeHub(self.clock)
+        self.hub.on_clients_changed = self.clients_changed.emit
+        self.routes = BridgeRoutes(self.hub, on_positions_reported=self.positions_reported.emit)
+        self._live_mode_enabled = False
         self.loop = None
         self.shutdown_event = None
 
-    async def get_updates(self, request):
-        """Web handler for Roblox to poll for changes."""
-        updates_to_send = self.data_buffer.copy()
-        self.data_buffer.clear()
-        return web.json_response(updates_to_send)
-        
-    async def handle_report_positions(self, request):
-        """Web handler to receive position data from Roblox."""
-        try:
-            data = await request.json()
-            if isinstance(data, dict):
-                self.positions_reported.emit(data)
-                return web.Response(text="Positions received.", status=200)
-            else:
-                return web.Response(text="Invalid data format.", status=400)
-        except Exception as e:
-            print(f"Error handling reported positions: {e}")
-            return web.Response(text=f"Server error: {e}", status=500)
+    def server_time_ms(self) -> float:
+        """Current time on the clock shared with Roblox clients."""
+        return self.clock.now_ms()
 
     async def _server_main(self):
         """Initializes and runs the web server."""
         self.status_updated.emit("Server Starting...")
-        app = web.Application()
-        app.router.add_get("/get_updates", self.get_updates)
-        app.router.add_post("/report_positions", self.handle_report_positions) # New route
-        
+        app = self.routes.make_app()
         runner = web.AppRunner(app)
         await runner.setup()
         
@@ -164,22 +161,25 @@ class RobloxHTTPManager(QThread):
             self.loop.call_soon_threadsafe(self.shutdown_event.set)
         print("Roblox HTTP Server: Stop requested.")
 
-    def add_update(self, fixture_fid: int, params: dict):
+    def add_update(self, fixture_fid: int, params: dict, apply_at_ms: float | None = None):
         """
         Thread-safe way for the main GUI to add data to the buffer.
         Uses the Fixture ID (FID) as the key, which matches Roblox model names.
+        apply_at_ms schedules the update on the shared clock (see server_time_ms) instead of
+        applying it on receipt.
         """
         if self._live_mode_enabled:
             # Use string representation of FID as JSON keys must be strings
-            fid_str = str(fixture_fid)
-            if fid_str not in self.data_buffer:
-                self.data_buffer[fid_str] = {}
-            self.data_buffer[fid_str].update(params)
+            self.hub.publish(str(fixture_fid), params, apply_at_ms)
+
+    def set_fixture_directory(self, directory: dict):
+        """Updates the FID -> positions/groups map used to resolve group and zone subscriptions."""
+        self.hub.set_directory(directory)
 
     def set_live_mode(self, enabled: bool):
         self._live_mode_enabled = enabled
         if not enabled:
-            self.data_buffer.clear()
+            self.hub.clear()
             self.status_updated.emit("Live Mode OFF")
         else:
             # When enabling live mode, trigger an update for all fixtures.
@@ -487,8 +487,10 @@ class StaggerEffect(BaseEffect):
 
 class Lumenante(QMainWindow):
     fixture_data_globally_changed = pyqtSignal(int, dict)
+    fixture_patch_changed = pyqtSignal() # Bulk patch edits (e.g. Roblox position import); refresh fixture lists, timeline tracks and the 3D scene
     theme_change_requires_restart = pyqtSignal(str)
     active_effects_changed = pyqtSignal()
+    show_import_progress = pyqtSignal(str, int, int) # (section, rows imported in it, percent of the file read); emitted on the writer thread
 
     initialization_progress = pyqtSignal(str, int)
 
@@ -502,18 +504,33 @@ class Lumenante(QMainWindow):
         self.keybind_map = {} # New registry for keybinds
 
         self.db_connection = None
+        self.persistence = None
+        self.repository = None
+        self.stale_tab_loaders = {} # {tab: loader} for tabs not yet reloaded after a lazy show switch
+        self.in_memory_database = False
+        self.memory_backup_timer = None
+        self.memory_backup_pending = False
+        self.last_memory_backup = None # time.monotonic() of the last completed backup
         self.initialization_progress.emit("Initializing Database...", 10)
         self.init_database()
         self.initialization_progress.emit("Database Initialized.", 20)
 
         self.live_fixture_states = {}
         self.executor_fader_levels = {} 
+        self.audio_intensity_level = 1.0 # Audio-reactive intensity from the timeline; scales all output brightness
         self._initialize_live_fixture_states_from_db()
         self.initialization_progress.emit("Live State Initialized.", 25)
 
         self.http_manager = RobloxHTTPManager(self, self)
         self.http_manager.status_updated.connect(self._update_roblox_status_label)
         self.http_manager.positions_reported.connect(self._on_roblox_positions_reported)
+        self.http_manager.clients_changed.connect(self._on_roblox_clients_changed)
+        self._publish_fixture_directory()
+        # Position changes republish the directory at most this often, once for a whole batch
+        self.fixture_directory_timer = QTimer(self)
+        self.fixture_directory_timer.setSingleShot(True)
+        self.fixture_directory_timer.setInterval(100)
+        self.fixture_directory_timer.timeout.connect(self._publish_fixture_directory)
         self.http_manager.start()
         self.initialization_progress.emit("Network Server Started.", 30)
 
@@ -551,6 +568,10 @@ class Lumenante(QMainWindow):
         self.init_effect_engine()
         self.pre_blackout_brightness_states = {}
         self._load_and_register_keybinds()
+        # Standard undo/redo keys; text fields still take them first while they have focus
+        for standard_key, handler in ((QKeySequence.StandardKey.Undo, self.undo_last_operation),
+                                      (QKeySequence.StandardKey.Redo, self.redo_last_operation)):
+            QShortcut(QKeySequence(standard_key), self).activated.connect(handler)
         self.initialization_progress.emit("Keybinds Loaded.", 90)
 
         # --- Gamepad state ---
@@ -573,140 +594,20 @@ class Lumenante(QMainWindow):
     
     def init_database(self):
         try:
-            db_path = get_app_data_path("lumenante_v1_show.db")
-            print(f"Database path: {db_path}")
-            self.db_connection = sqlite3.connect(str(db_path))
-            cursor = self.db_connection.cursor()
-            cursor.execute("PRAGMA foreign_keys = ON;")
-            
-            # --- Fixture Profile Table (with default) ---
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='fixture_profiles'")
-            if cursor.fetchone() is None:
-                 cursor.execute('''
-                    CREATE TABLE fixture_profiles (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        name TEXT NOT NULL UNIQUE,
-                        creator TEXT,
-                        attributes_json TEXT NOT NULL
-                    )
-                ''')
-            
-            cursor.execute("SELECT COUNT(*) FROM fixture_profiles")
-            profile_count = cursor.fetchone()[0]
-            if profile_count == 0:
-                print("No fixture profiles found. Creating default profiles.")
-                default_moving_head = [
-                    {"name": "Dimmer", "type": "continuous", "dmx_channel": 1},
-                    {"name": "Pan", "type": "continuous", "dmx_channel": 2},
-                    {"name": "Tilt", "type": "continuous", "dmx_channel": 3},
-                    {"name": "Color_Red", "type": "continuous", "dmx_channel": 4},
-                    {"name": "Color_Green", "type": "continuous", "dmx_channel": 5},
-                    {"name": "Color_Blue", "type": "continuous", "dmx_channel": 6},
-                    {"name": "Zoom", "type": "continuous", "dmx_channel": 7},
-                    {"name": "Focus", "type": "continuous", "dmx_channel": 8},
-                    {"name": "Gobo_Spin", "type": "continuous", "dmx_channel": 9},
-                    {"name": "Strobe", "type": "continuous", "dmx_channel": 10}
-                ]
-                default_par = [
-                    {"name": "Dimmer", "type": "continuous"},
-                    {"name": "Color_Red", "type": "continuous"},
-                    {"name": "Color_Green", "type": "continuous"},
-                    {"name": "Color_Blue", "type": "continuous"},
-                    {"name": "Zoom", "type": "continuous"}
-                ]
-                default_blinder = [
-                    {"name": "Dimmer", "type": "continuous"},
-                    {"name": "Strobe", "type": "continuous"}
-                ]
-                default_led_bar = [
-                    {"name": "Dimmer", "type": "continuous"},
-                    {"name": "Color_Red", "type": "continuous"},
-                    {"name": "Color_Green", "type": "continuous"},
-                    {"name": "Color_Blue", "type": "continuous"}
-                ]
-                default_profiles = [
-                    ("Moving Head", "Lumenante", json.dumps(default_moving_head)),
-                    ("PAR Can", "Lumenante", json.dumps(default_par)),
-                    ("Blinder", "Lumenante", json.dumps(default_blinder)),
-                    ("LED Bar", "Lumenante", json.dumps(default_led_bar)),
-                ]
-                cursor.executemany(
-                    "INSERT INTO fixture_profiles (name, creator, attributes_json) VALUES (?, ?, ?)",
-                    default_profiles
-                )
-
-            # --- Fixture Table Migration ---
-            correct_fixture_schema = '''
-                CREATE TABLE fixtures (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT, fid INTEGER NOT NULL, sfi INTEGER NOT NULL,
-                    profile_id INTEGER NOT NULL, name TEXT NOT NULL,
-                    x_pos REAL DEFAULT 0, y_pos REAL DEFAULT 0, z_pos REAL DEFAULT 0,
-                    rotation_x REAL DEFAULT 0, rotation_y REAL DEFAULT 0, rotation_z REAL DEFAULT 0,
-                    red INTEGER DEFAULT 255, green INTEGER DEFAULT 255, blue INTEGER DEFAULT 255,
-                    brightness INTEGER DEFAULT 100, gobo_spin REAL DEFAULT 128.0,
-                    zoom REAL DEFAULT 15.0, focus REAL DEFAULT 50.0,
-                    shutter_strobe_rate REAL DEFAULT 0.0,
-                    speed REAL DEFAULT 50.0,
-                    comment TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY(profile_id) REFERENCES fixture_profiles(id) ON DELETE CASCADE, UNIQUE(fid, sfi)
-                )
-            '''
-            
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='fixtures'")
-            if cursor.fetchone() is None:
-                cursor.execute(correct_fixture_schema)
-            else:
-                cursor.execute("PRAGMA table_info(fixtures)")
-                fixture_cols = {info[1] for info in cursor.fetchall()}
-                if 'speed' not in fixture_cols:
-                    cursor.execute("ALTER TABLE fixtures ADD COLUMN speed REAL DEFAULT 50.0")
-
-            # --- Other tables ---
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS presets (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT, preset_number TEXT NOT NULL UNIQUE, name TEXT,
-                    data TEXT NOT NULL, type TEXT NOT NULL DEFAULT 'All', created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS cues (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT, cue_number TEXT NOT NULL UNIQUE, name TEXT,
-                    trigger_time_s REAL NOT NULL, comment TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS timeline_events (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, start_time REAL NOT NULL,
-                    duration REAL DEFAULT 0, event_type TEXT NOT NULL, data TEXT NOT NULL,
-                    target_type TEXT, target_id INTEGER, cue_id INTEGER, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY(cue_id) REFERENCES cues(id) ON DELETE SET NULL
-                )
-            ''')
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS fixture_groups (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL UNIQUE,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS fixture_group_mappings (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT, group_id INTEGER NOT NULL, fixture_id INTEGER NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY(group_id) REFERENCES fixture_groups(id) ON DELETE CASCADE,
-                    FOREIGN KEY(fixture_id) REFERENCES fixtures(id) ON DELETE CASCADE,
-                    UNIQUE(group_id, fixture_id)
-                )
-            ''')
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS loop_palettes (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL UNIQUE, config_json TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-
-            self.db_connection.commit()
-            print("Database initialized/updated successfully.")
+            # In-memory mode trades the writes since the last backup for never waiting on the disk.
+            self.in_memory_database = self.settings.value('database/in_memory', False, type=bool)
+            last_show = self.settings.value('shows/current', "", type=str)
+            self._open_show_database(last_show if last_show and Path(last_show).is_file() else str(get_app_data_path(DEFAULT_SHOW_FILE_NAME)))
+            # Keep the undo journal from growing past the history it can replay
+            self.journal_trim_timer = QTimer(self)
+            self.journal_trim_timer.setInterval(5 * 60 * 1000)
+            self.journal_trim_timer.timeout.connect(lambda: self.persistence.submit_write(self.repository.journal.trim))
+            self.journal_trim_timer.start()
+            if self.in_memory_database:
+                self.memory_backup_timer = QTimer(self)
+                self.memory_backup_timer.setInterval(max(5, self.settings.value('database/backup_interval_s', 30, type=int)) * 1000)
+                self.memory_backup_timer.timeout.connect(self.backup_memory_database)
+                self.memory_backup_timer.start()
         except sqlite3.Error as e:
             print(f"CRITICAL: Database initialization error: {e}")
             QMessageBox.critical(self, "Database Error", f"Could not initialize/update database: {e}\nThe application might not function correctly.")
@@ -715,17 +616,139 @@ class Lumenante(QMainWindow):
             print(f"CRITICAL: Unexpected error during database initialization: {e}")
             if self.db_connection: self.db_connection.rollback()
             
+    def _open_show_database(self, db_path: str):
+        """Connects to a show file, bringing its schema up to date, and builds the services on top of it."""
+        self.db_path = db_path
+        print(f"Database path: {db_path}")
+        if self.in_memory_database:
+            self.db_connection = open_memory_database(db_path)
+            print("Show database loaded into memory.")
+        else:
+            self.db_connection = sqlite3.connect(db_path)
+            configure_connection(self.db_connection)
+        schema_version = db_schema.migrate(self.db_connection)
+        print(f"Database initialized/updated successfully (schema v{schema_version}).")
+        self.persistence = PersistenceService(db_path, self, in_memory=self.in_memory_database)
+        self.persistence.write_failed.connect(self._on_persistence_write_failed)
+        self.repository = ShowRepository(self.db_connection, self.persistence, self)
+        self.persistence.submit_write(self.repository.journal.trim)
+
+    def _close_show_database(self):
+        """Lets queued writes land (and backs up an in-memory show), then closes every connection to the show."""
+        if self.persistence:
+            if self.in_memory_database:
+                try:
+                    self.persistence.flush()
+                    self.persistence.submit_read(memory_backup_job(self.db_path)).result(30)
+                    print("In-memory show database backed up to disk.")
+                except Exception as e:
+                    print(f"CRITICAL: Final backup of the in-memory show database failed: {e}")
+            self.persistence.close()
+        if self.repository:
+            self.repository.deleteLater()
+        if self.db_connection:
+            try: self.db_connection.close(); print("Database connection closed.")
+            except Exception as e: print(f"Error closing database: {e}")
+        self.persistence = self.repository = self.db_connection = None
+
+    def open_show(self, file_path: str) -> bool:
+        """
+        Switches to another show file (created if it does not exist). The patch and live state load
+        straight away; presets, loops and the timeline load when their tabs are first needed.
+        """
+        file_path = str(Path(file_path).resolve())
+        if file_path == self.db_path:
+            return True
+        started = time.perf_counter()
+        previous_path = self.db_path
+
+        # --- Stop everything that still refers to the current show ---
+        self.timeline_tab.stop_playback()
+        self.stop_effects_on_fixtures(list(self.live_fixture_states.keys()))
+        self.active_effects.clear()
+        self.clear_global_fixture_selection()
+        self._close_show_database()
+
+        try:
+            self._open_show_database(file_path)
+        except sqlite3.Error as e:
+            self._close_show_database()
+            self._open_show_database(previous_path)
+            QMessageBox.critical(self, "Open Show Failed", f"Could not open show '{file_path}': {e}")
+            file_path = previous_path
+        self.settings.setValue('shows/current', file_path)
+        self._remember_recent_show(file_path)
+        self._update_window_title()
+        self._refresh_all_tabs_after_show_change(lazy=True)
+        if file_path != previous_path:
+            self.status_bar.showMessage(f"Opened show '{Path(file_path).stem}' in {(time.perf_counter() - started) * 1000:.0f} ms", 5000)
+        return file_path != previous_path
+
+    def save_show_as(self, file_path: str):
+        """Copies the current show to file_path and continues working in the copy."""
+        try:
+            self.persistence.flush()
+            target = sqlite3.connect(file_path)
+            try:
+                self.db_connection.backup(target)
+            finally:
+                target.close()
+        except sqlite3.Error as e:
+            QMessageBox.critical(self, "Save Show Failed", f"Could not save show to '{file_path}': {e}")
+            return
+        self.open_show(file_path)
+
+    def recent_shows(self) -> list[str]:
+        recent = self.settings.value('shows/recent', [], type=list)
+        return [path for path in recent if Path(path).is_file()]
+
+    def _remember_recent_show(self, file_path: str):
+        recent = [path for path in self.recent_shows() if path != file_path]
+        self.settings.setValue('shows/recent', [file_path] + recent[:MAX_RECENT_SHOWS - 1])
+
+    def _update_window_title(self):
+        self.setWindowTitle(f"Lumenante V1.1 - {Path(self.db_path).stem}" if self.db_path else "Lumenante V1.1")
+
+    def _populate_show_menu(self):
+        menu = self.show_menu
+        menu.clear()
+        menu.addAction("New Show...", self._new_show_from_dialog)
+        menu.addAction("Open Show...", self._open_show_from_dialog)
+        menu.addAction("Save Show As...", self._save_show_as_from_dialog)
+        menu.addSeparator()
+        recent = self.recent_shows()
+        if not recent:
+            menu.addAction("No Recent Shows").setEnabled(False)
+        for index, path in enumerate(recent, start=1):
+            action = menu.addAction(f"&{index} {Path(path).stem}", lambda p=path: self.open_show(p))
+            action.setToolTip(path)
+            action.setCheckable(True)
+            action.setChecked(path == self.db_path)
+
+    def _new_show_from_dialog(self):
+        file_path, _ = QFileDialog.getSaveFileName(self, "New Show", str(Path(self.db_path).parent), SHOW_FILE_FILTER)
+        if not file_path: return
+        if Path(file_path).exists():
+            QMessageBox.warning(self, "New Show", "A show with that name already exists. Open it instead, or choose another name.")
+            return
+        self.open_show(file_path)
+
+    def _open_show_from_dialog(self):
+        file_path, _ = QFileDialog.getOpenFileName(self, "Open Show", str(Path(self.db_path).parent), SHOW_FILE_FILTER)
+        if file_path:
+            self.open_show(file_path)
+
+    def _save_show_as_from_dialog(self):
+        file_path, _ = QFileDialog.getSaveFileName(self, "Save Show As", str(Path(self.db_path).parent), SHOW_FILE_FILTER)
+        if file_path and str(Path(file_path).resolve()) != self.db_path:
+            self.save_show_as(file_path)
+
     def _initialize_live_fixture_states_from_db(self):
         """Initializes the live state tracker from the database at startup."""
         self.live_fixture_states.clear()
         if not self.db_connection: return
         try:
-            cursor = self.db_connection.cursor()
-            cursor.execute("SELECT * FROM fixtures")
-            all_fixtures_data = cursor.fetchall()
-            column_names = [desc[0] for desc in cursor.description]
-            for data_row in all_fixtures_data:
-                fixture_dict = dict(zip(column_names, data_row))
+            for fixture_dict in self.repository.fixtures():
                 fixture_id = fixture_dict.get('id')
                 if fixture_id is not None:
                     self.live_fixture_states[fixture_id] = fixture_dict
@@ -733,6 +756,24 @@ class Lumenante(QMainWindow):
         except Exception as e:
             QMessageBox.critical(self, "Live State Error", f"Could not initialize live fixture states from database: {e}")
             print(f"CRITICAL: Failed to init live fixture states: {e}")
+        self._publish_fixture_directory()
+
+    def _publish_fixture_directory(self):
+        """Sends FID positions and group membership to the HTTP bridge for subscription filtering."""
+        if not hasattr(self, 'http_manager') or not self.db_connection: return
+        directory = {}
+        for state in self.live_fixture_states.values():
+            fid = state.get('fid')
+            if fid is None: continue
+            entry = directory.setdefault(str(fid), {'positions': [], 'groups': set()})
+            entry['positions'].append((state.get('x_pos') or 0.0, state.get('y_pos') or 0.0, state.get('z_pos') or 0.0))
+        try:
+            for group_id, fid in self.repository.group_fids():
+                if str(fid) in directory:
+                    directory[str(fid)]['groups'].add(group_id)
+        except sqlite3.Error as e:
+            print(f"Warning: Could not read group mappings for the Roblox bridge: {e}")
+        self.http_manager.set_fixture_directory(directory)
 
 
     def init_effect_engine(self):
@@ -741,10 +782,17 @@ class Lumenante(QMainWindow):
         self.EFFECT_TICK_INTERVAL_MS = 16 # Approx 60 FPS
         self.effect_timer.timeout.connect(self.tick_effects)
         self.elapsed_timer = QElapsedTimer()
+        # Effects run on their own clock, which advances effect_speed_scale times as fast as real
+        # time; scaling the rate instead of the time keeps every effect's phase continuous.
+        self.effect_speed_scale = 1.0
+        self._effect_clock_msec = 0.0
+        self._effect_clock_last_real_msec = 0
 
     def start_effect_engine_if_needed(self):
         if self.active_effects and not (self.effect_timer and self.effect_timer.isActive()):
             self.elapsed_timer.start()
+            self._effect_clock_msec = 0.0
+            self._effect_clock_last_real_msec = 0
             self.effect_timer.start(self.EFFECT_TICK_INTERVAL_MS)
             print("Effect engine started.")
 
@@ -753,6 +801,21 @@ class Lumenante(QMainWindow):
             self.effect_timer.stop()
             print("Effect engine stopped (idle).")
 
+    def effect_clock_msec(self) -> float:
+        now = self.elapsed_timer.elapsed()
+        self._effect_clock_msec += (now - self._effect_clock_last_real_msec) * self.effect_speed_scale
+        self._effect_clock_last_real_msec = now
+        return self._effect_clock_msec
+
+    def set_audio_modulation(self, intensity_level: float = 1.0, effect_speed_scale: float = 1.0):
+        """Applies the levels the timeline reads from its audio analysis; 1.0 for both is unmodulated."""
+        self.effect_speed_scale = effect_speed_scale
+        intensity_level = round(intensity_level, 2)
+        if intensity_level == self.audio_intensity_level:
+            return
+        self.audio_intensity_level = intensity_level
+        self._publish_output_brightness()
+
     def is_live_mode_active(self) -> bool:
         if self.settings_tab and hasattr(self.settings_tab, 'roblox_live_mode_checkbox'):
             return self.settings_tab.roblox_live_mode_checkbox.isChecked()
@@ -769,13 +832,19 @@ class Lumenante(QMainWindow):
         else:
             self.roblox_status_label.setStyleSheet("color: #E57373;") # Red
 
+    def _on_roblox_clients_changed(self, count: int):
+        if count > 0:
+            self._update_roblox_status_label(f"Connected: {count} client(s)")
+        elif self.http_manager._live_mode_enabled:
+            self._update_roblox_status_label("Live Mode ON - Awaiting ROBLOX connection")
+
 
     def tick_effects(self):
         if not self.active_effects:
             self.stop_effect_engine_if_idle()
             return
 
-        current_time_msec = self.elapsed_timer.elapsed()
+        current_time_msec = self.effect_clock_msec()
         effects_to_remove_for_fixture = {}
 
         for fixture_id, param_effects in list(self.active_effects.items()):
@@ -831,9 +900,7 @@ class Lumenante(QMainWindow):
             return
 
         try:
-            cursor = self.db_connection.cursor()
-            cursor.execute("SELECT name, config_json FROM loop_palettes WHERE id = ?", (loop_palette_db_id,))
-            row = cursor.fetchone()
+            row = self.repository.loop_palette(loop_palette_db_id)
             if not row:
                 QMessageBox.warning(self, "Loop Error", f"Loop Palette ID {loop_palette_db_id} not found in database.")
                 return
@@ -845,7 +912,7 @@ class Lumenante(QMainWindow):
             QMessageBox.critical(self, "DB Error", f"Error loading loop palette {loop_palette_db_id} for application: {e}")
             return
 
-        current_time_msec = self.elapsed_timer.elapsed()
+        current_time_msec = self.effect_clock_msec()
         num_fixtures = len(fixture_ids)
 
         for i, fixture_id in enumerate(fixture_ids):
@@ -1099,6 +1166,7 @@ class Lumenante(QMainWindow):
 
     def init_ui(self):
         self.setWindowTitle("Lumenante V1.1"); self.setMinimumSize(1200, 720); self.resize(1500, 850)
+        self._update_window_title()
         script_dir = Path(__file__).resolve().parent
         app_icon_path = script_dir / "app_icon.ico"
         if app_icon_path.exists(): self.setWindowIcon(QIcon(str(app_icon_path)))
@@ -1149,6 +1217,7 @@ class Lumenante(QMainWindow):
         self.tab_widget.addTab(self.settings_tab, "Setup")
         self.tab_widget.addTab(self.plugins_tab, "Plugins")
         self.tab_widget.addTab(self.help_tab, "Help")
+        self.tab_widget.currentChanged.connect(lambda index: self.ensure_tab_loaded(self.tab_widget.widget(index)))
         
         root_layout.addWidget(content_body_widget, 1)
         
@@ -1165,6 +1234,14 @@ class Lumenante(QMainWindow):
         app_title_label.setObjectName("AppTitleLabel")
         header_layout.addWidget(app_title_label)
 
+        self.show_menu_button = QPushButton("Show")
+        self.show_menu_button.setToolTip("Create, open or switch show files")
+        self.show_menu = QMenu(self.show_menu_button)
+        self.show_menu.aboutToShow.connect(self._populate_show_menu)
+        self.show_menu_button.setMenu(self.show_menu)
+        self.show_menu_button.setFixedWidth(70)
+        header_layout.addWidget(self.show_menu_button)
+
         self.layout_lock_button = QPushButton("Lock Layout")
         self.layout_lock_button.setCheckable(True)
         self.layout_lock_button.setChecked(False)
@@ -1251,6 +1328,16 @@ class Lumenante(QMainWindow):
         self.status_bar.addPermanentWidget(self.gamepad_status_label)
         
         self.roblox_status_label = QLabel("ROBLOX: Disconnected"); self.roblox_status_label.setObjectName("StatusBarLabelRoblox"); self.status_bar.addWidget(self.roblox_status_label)
+
+        if self.in_memory_database:
+            self.memory_backup_label = QLabel()
+            self.memory_backup_label.setObjectName("StatusBarLabelBackup")
+            self.memory_backup_label.setToolTip("The show runs from memory and is copied to disk on this schedule and at exit.")
+            self.status_bar.addPermanentWidget(self.memory_backup_label)
+            self.memory_backup_age_timer = QTimer(self)
+            self.memory_backup_age_timer.timeout.connect(self._update_memory_backup_label)
+            self.memory_backup_age_timer.start(1000)
+            self._update_memory_backup_label()
     
     def _handle_command_line_input(self):
         if not hasattr(self, 'command_line_input') or not self.command_line_input: return
@@ -1359,13 +1446,7 @@ class Lumenante(QMainWindow):
                 start_sfi_val = start_sfi if start_sfi is not None else 1
                 end_sfi_val = end_sfi if end_sfi is not None else 9999 # A large number to get all
 
-                query = "SELECT id FROM fixtures WHERE fid = ? AND sfi >= ? AND sfi <= ?"
-                params = (start_fid, start_sfi_val, end_sfi_val)
-                
-                cursor = self.db_connection.cursor()
-                cursor.execute(query, params)
-                ids_in_range = {row[0] for row in cursor.fetchall()}
-                final_ids.update(ids_in_range)
+                final_ids.update(self.repository.fixture_ids_for_fid(start_fid, start_sfi_val, end_sfi_val))
                 
                 i += 3 # Move past 'start thru end'
                 continue
@@ -1373,17 +1454,9 @@ class Lumenante(QMainWindow):
             # Handle single fixture or sub-fixture
             if '.' in part:
                 fid, sfi = (int(p) for p in part.split('.'))
-                query = "SELECT id FROM fixtures WHERE fid = ? AND sfi = ?"
-                params = (fid, sfi)
+                final_ids.update(self.repository.fixture_ids_for_fid(fid, sfi, sfi))
             else:
-                fid = int(part)
-                query = "SELECT id FROM fixtures WHERE fid = ?"
-                params = (fid,)
-
-            cursor = self.db_connection.cursor()
-            cursor.execute(query, params)
-            ids_for_part = {row[0] for row in cursor.fetchall()}
-            final_ids.update(ids_for_part)
+                final_ids.update(self.repository.fixture_ids_for_fid(int(part)))
             
             i += 1
         
@@ -1414,27 +1487,16 @@ class Lumenante(QMainWindow):
                 QMessageBox.warning(self, "Preset Error", f"Could not determine parameters for preset type '{preset_type}'.")
                 return
 
-            cols_to_select_str = ", ".join(['id'] + params_to_store)
-            placeholders = ','.join(['?'] * len(fixture_ids))
-            
-            cursor = self.db_connection.cursor()
-            cursor.execute(f"SELECT {cols_to_select_str} FROM fixtures WHERE id IN ({placeholders})", tuple(fixture_ids))
-            fixtures_raw = cursor.fetchall()
-            fixture_columns = [desc[0] for desc in cursor.description]
-
             preset_data_for_json = {
-                str(row[fixture_columns.index('id')]): {
-                    col: val for col, val in zip(fixture_columns, row) if col != 'id'
-                } for row in fixtures_raw
+                str(fixture['id']): {param: fixture[param] for param in params_to_store}
+                for fixture in self.repository.fixtures_by_ids(fixture_ids)
             }
 
             if not preset_data_for_json:
                 QMessageBox.warning(self, "Command Error", "Could not gather data from selected fixtures.")
                 return
 
-            cursor.execute("INSERT OR REPLACE INTO presets (id, preset_number, name, data, type) VALUES ((SELECT id FROM presets WHERE preset_number = ?), ?, ?, ?, ?)",
-                           (preset_number, preset_number, preset_name, json.dumps(preset_data_for_json), preset_type))
-            self.db_connection.commit()
+            self.repository.save_preset(preset_number, preset_name, preset_type, preset_data_for_json)
             self.presets_tab.load_presets_from_db()
             print(f"CMD: Stored/Overwrote '{preset_type}' preset {preset_number} '{preset_name}' for {len(fixture_ids)} fixture(s).")
             return True # Indicate success
@@ -1449,9 +1511,7 @@ class Lumenante(QMainWindow):
             QMessageBox.warning(self, "Command Error", "Cannot store preset: No fixtures selected.")
             return
 
-        cursor = self.db_connection.cursor()
-        cursor.execute("SELECT id, name FROM presets WHERE preset_number = ?", (preset_number,))
-        existing_preset = cursor.fetchone()
+        existing_preset = self.repository.preset_header(preset_number)
 
         if existing_preset:
             msg_box = QMessageBox(self)
@@ -1487,14 +1547,12 @@ class Lumenante(QMainWindow):
             return
 
         try:
-            cursor = self.db_connection.cursor()
-            cursor.execute("SELECT name, type FROM presets WHERE preset_number = ?", (preset_number,))
-            existing_preset = cursor.fetchone()
+            existing_preset = self.repository.preset_header(preset_number)
             if not existing_preset:
                 QMessageBox.warning(self, "Error", f"Preset {preset_number} not found for updating.")
                 return
             
-            original_name, original_type = existing_preset
+            _preset_id, original_name, original_type = existing_preset
             
             if self._insert_or_overwrite_preset(preset_number, original_name, fixture_ids, original_type):
                 QMessageBox.information(self, "Preset Updated", f"Preset {preset_number} ('{original_name}') has been updated.")
@@ -1504,12 +1562,9 @@ class Lumenante(QMainWindow):
 
     def _label_preset_from_cmd(self, preset_number, new_name):
         try:
-            cursor = self.db_connection.cursor()
-            cursor.execute("UPDATE presets SET name = ? WHERE preset_number = ?", (new_name, preset_number))
-            if cursor.rowcount == 0:
+            if not self.repository.rename_preset(preset_number, new_name):
                 QMessageBox.warning(self, "Command Error", f"Preset with number '{preset_number}' not found.")
                 return
-            self.db_connection.commit()
             self.presets_tab.load_presets_from_db()
             print(f"CMD: Labeled preset {preset_number} as '{new_name}'.")
         except sqlite3.Error as e:
@@ -1517,13 +1572,10 @@ class Lumenante(QMainWindow):
     
     def _label_cue_from_cmd(self, cue_number, new_name):
         try:
-            cursor = self.db_connection.cursor()
-            cursor.execute("UPDATE cues SET name = ? WHERE cue_number = ?", (new_name, cue_number))
-            if cursor.rowcount == 0:
+            if not self.repository.rename_cue(cue_number, new_name):
                 QMessageBox.warning(self, "Command Error", f"Cue with number '{cue_number}' not found.")
                 return
-            self.db_connection.commit()
-            self.timeline_tab.refresh_event_list_and_timeline()
+            self.timeline_tab.timeline_model.refresh_cues(self.timeline_tab.timeline_model.cue_ids_for_number(cue_number))
             print(f"CMD: Labeled cue {cue_number} as '{new_name}'.")
         except sqlite3.Error as e:
             QMessageBox.critical(self, "DB Error", f"Failed to label cue {cue_number}: {e}")
@@ -1587,11 +1639,7 @@ class Lumenante(QMainWindow):
             return
 
         try:
-            cursor = self.db_connection.cursor()
-            placeholders = ','.join(['?'] * len(fixture_ids))
-            cursor.execute(f"SELECT id, name FROM fixtures WHERE id IN ({placeholders})", tuple(fixture_ids))
-            valid_fixtures = cursor.fetchall()
-            valid_ids = [row[0] for row in valid_fixtures]
+            valid_ids = [row[0] for row in self.repository.fixture_names(fixture_ids)]
 
             if not valid_ids:
                 QMessageBox.warning(self, "Command Error", f"No valid fixtures found in selection: {fixture_ids}")
@@ -1611,16 +1659,12 @@ class Lumenante(QMainWindow):
 
     def _select_group_by_id_from_cmd(self, group_id: int):
         try:
-            cursor = self.db_connection.cursor()
-            cursor.execute("SELECT name FROM fixture_groups WHERE id = ?", (group_id,))
-            group_row = cursor.fetchone()
-            if not group_row:
+            group_name = self.repository.group_name(group_id)
+            if group_name is None:
                 QMessageBox.warning(self, "Command Error", f"Group ID {group_id} not found.")
                 return
             
-            group_name = group_row[0]
-            cursor.execute("SELECT fixture_id FROM fixture_group_mappings WHERE group_id = ?", (group_id,))
-            fixture_ids_in_group = [row[0] for row in cursor.fetchall()]
+            fixture_ids_in_group = list(self.repository.group_fixture_ids(group_id))
 
             self.main_tab.clear_all_global_selections()
             self.main_tab.globally_selected_fixture_ids_for_controls = sorted(list(set(fixture_ids_in_group)))
@@ -1638,9 +1682,7 @@ class Lumenante(QMainWindow):
         self.group_selector_combo.clear()
         self.group_selector_combo.addItem("Select Group...", -1)
         try:
-            cursor = self.db_connection.cursor()
-            cursor.execute("SELECT id, name FROM fixture_groups ORDER BY name")
-            for gid, name in cursor.fetchall():
+            for gid, name in self.repository.groups():
                 self.group_selector_combo.addItem(f"{name}", gid)
         except Exception as e:
             print(f"Error populating header group selector: {e}")
@@ -1655,9 +1697,7 @@ class Lumenante(QMainWindow):
         self.fixture_selector_combo.clear()
         self.fixture_selector_combo.addItem("Select Fixture...", -1)
         try:
-            cursor = self.db_connection.cursor()
-            cursor.execute("SELECT id, name, fid, sfi FROM fixtures ORDER BY fid, sfi")
-            for pk_id, name, fid, sfi in cursor.fetchall():
+            for pk_id, name, fid, sfi in self.repository.fixture_list():
                 self.fixture_selector_combo.addItem(f"{name} ({fid}.{sfi})", pk_id)
         except Exception as e:
             print(f"Error populating header fixture selector: {e}")
@@ -1682,25 +1722,29 @@ class Lumenante(QMainWindow):
 
     def setup_signal_connections(self):
         self.fixtures_tab.fixture_updated.connect(self.on_fixture_updated_from_tab)
-        self.fixtures_tab.fixture_added.connect(self.on_fixture_added_from_tab)
+        self.fixtures_tab.fixtures_added.connect(self.on_fixtures_added_from_tab)
         self.fixtures_tab.fixture_deleted.connect(self.on_fixture_deleted_from_tab)
 
         self.fixtures_tab.fixture_updated.connect(self.populate_fixture_selector)
-        self.fixtures_tab.fixture_added.connect(self.populate_fixture_selector)
         self.fixtures_tab.fixture_deleted.connect(self.populate_fixture_selector)
 
         # Connect fixture changes to refresh layout lists immediately
-        self.fixtures_tab.fixture_added.connect(lambda data: self.main_tab.refresh_dynamic_content())
         self.fixtures_tab.fixture_deleted.connect(lambda ids: self.main_tab.refresh_dynamic_content())
 
 
         self.fixtures_tab.fixture_updated.connect(lambda fid, data: self.fixture_groups_tab.refresh_all_data_and_ui())
-        self.fixtures_tab.fixture_added.connect(lambda data: self.fixture_groups_tab.refresh_all_data_and_ui())
         self.fixtures_tab.fixture_deleted.connect(self.fixture_groups_tab.refresh_all_data_and_ui)
 
+        self.fixture_patch_changed.connect(self.fixtures_tab.refresh_fixtures)
+        self.fixture_patch_changed.connect(self.visualization_3d_tab.update_all_fixtures)
+        self.fixture_patch_changed.connect(self.populate_fixture_selector)
+        self.fixture_patch_changed.connect(self.main_tab.refresh_dynamic_content)
+        self.fixture_patch_changed.connect(self.timeline_tab.refresh_tracks) # New fixtures need their tracks
+
         self.fixture_groups_tab.fixture_groups_changed.connect(self.main_tab.refresh_dynamic_content)
-        self.fixture_groups_tab.fixture_groups_changed.connect(self.timeline_tab.refresh_event_list_and_timeline)
+        self.fixture_groups_tab.fixture_groups_changed.connect(self.timeline_tab.refresh_tracks)
         self.fixture_groups_tab.fixture_groups_changed.connect(self.populate_group_selector)
+        self.fixture_groups_tab.fixture_groups_changed.connect(self._publish_fixture_directory)
 
         self.loop_palettes_tab.loop_palettes_changed.connect(self.main_tab.refresh_dynamic_content)
         self.loop_palettes_tab.loop_palettes_changed.connect(lambda: self.settings_tab.populate_keybinds_table())
@@ -1708,7 +1752,6 @@ class Lumenante(QMainWindow):
 
         self.presets_tab.preset_applied.connect(lambda preset_num: self.on_preset_applied_from_tab(preset_num))
         self.presets_tab.presets_changed.connect(self.main_tab.refresh_dynamic_content)
-        self.presets_tab.presets_changed.connect(self.timeline_tab.refresh_event_list_and_timeline)
         self.presets_tab.presets_changed.connect(lambda: self.settings_tab.populate_keybinds_table())
 
         self.main_tab.preset_triggered.connect(lambda preset_num: self.on_preset_applied_from_tab(preset_num))
@@ -1756,10 +1799,7 @@ class Lumenante(QMainWindow):
         self.executor_fader_levels[group_id] = value
         
         try:
-            # Get all fixtures in this group
-            cursor = self.db_connection.cursor()
-            cursor.execute("SELECT id FROM fixtures WHERE id IN (SELECT fixture_id FROM fixture_group_mappings WHERE group_id = ?)", (group_id,))
-            for (fix_id,) in cursor.fetchall():
+            for fix_id in self.repository.group_fixture_ids(group_id):
                 self.update_fixture_data_and_notify(fix_id, {})
         
         except Exception as e:
@@ -1844,51 +1884,105 @@ class Lumenante(QMainWindow):
         if self.main_tab.isVisible():
             self.main_tab.update_master_intensity_areas(self.master_fader.value() if not checked else 0)
 
-    def update_fixture_data_and_notify(self, fixture_id: int, partial_update_data: dict):
-        if fixture_id not in self.live_fixture_states:
+    def _on_fixture_row_written(self, _result):
+        if self.fixtures_tab.isVisible():
+            self.fixtures_tab.refresh_fixtures()
+
+    def _on_persistence_write_failed(self, message: str):
+        self.status_bar.showMessage(f"Database write failed: {message}", 8000)
+
+    def backup_memory_database(self):
+        """Queues a copy of the in-memory show database to disk; skipped while one is still running."""
+        if not self.in_memory_database or self.memory_backup_pending:
+            return
+        self.memory_backup_pending = True
+        self.persistence.submit_read(memory_backup_job(self.db_path),
+                                      on_done=self._on_memory_backup_done, on_error=self._on_memory_backup_failed)
+
+    def _on_memory_backup_done(self, seconds_taken: float):
+        self.memory_backup_pending = False
+        self.last_memory_backup = time.monotonic()
+        self._update_memory_backup_label()
+        if seconds_taken > 0.5:
+            print(f"In-memory show backup took {seconds_taken:.2f}s.")
+
+    def _on_memory_backup_failed(self, error):
+        self.memory_backup_pending = False
+        print(f"In-memory show backup failed: {error}")
+        self.status_bar.showMessage(f"Backup of the in-memory show failed: {error}", 8000)
+        self._update_memory_backup_label()
+
+    def _update_memory_backup_label(self):
+        if not self.in_memory_database or not hasattr(self, 'memory_backup_label'):
             return
+        interval_s = self.memory_backup_timer.interval() // 1000 if self.memory_backup_timer else 0
+        if self.last_memory_backup is None:
+            age_text = "not yet backed up"
+        else:
+            age_text = f"last backup {int(time.monotonic() - self.last_memory_backup)}s ago"
+        self.memory_backup_label.setText(f"RAM show · backup every {interval_s}s · {age_text}")
+
+    def undo_last_operation(self):
+        self._replay_journal(self.repository.undo, "Undo")
+
+    def redo_last_operation(self):
+        self._replay_journal(self.repository.redo, "Redo")
 
+    def _replay_journal(self, replay, verb: str):
         try:
-            # STEP 1: Update the database with the raw, unmodulated values.
+            operation = replay()
+        except sqlite3.Error as e:
+            QMessageBox.critical(self, f"{verb} Failed", f"Could not {verb.lower()}: {e}")
+            return
+        if operation is None:
+            self.status_bar.showMessage(f"Nothing to {verb.lower()}.", 3000)
+            return
+        self._refresh_after_journal_replay(operation)
+        self.status_bar.showMessage(f"{verb}: {operation.label}", 4000)
+
+    def _refresh_after_journal_replay(self, operation):
+        """Brings live state and the affected tabs back in line after an undo or redo."""
+        repository = self.repository
+        if repository.FIXTURES in operation.kinds:
+            self._initialize_live_fixture_states_from_db()
+            self.fixture_patch_changed.emit()
+            for fixture_id in operation.touched_keys('fixtures'):
+                if fixture_id in self.live_fixture_states: # Fixtures the replay removed have nothing to push
+                    self.update_fixture_data_and_notify(fixture_id, {}) # Pushes the restored values to the outputs
+        if repository.GROUPS in operation.kinds:
+            self.fixture_groups_tab.refresh_all_data_and_ui()
+            self.fixture_groups_tab.fixture_groups_changed.emit()
+        if repository.PRESETS in operation.kinds:
+            self.presets_tab.load_presets_from_db()
+        if repository.CUES in operation.kinds or repository.EVENTS in operation.kinds:
+            self.timeline_tab.timeline_model.refresh(operation.touched_keys('timeline_events'), operation.touched_keys('cues'))
+
+    def update_fixture_data_and_notify(self, fixture_id: int, partial_update_data: dict):
+        if fixture_id not in self.live_fixture_states or self.repository.writes_blocked:
+            return # Unknown fixture, or the show is being replaced
+
+        try:
+            # STEP 1: Queue the raw, unmodulated values for the database writer thread.
             if partial_update_data:
-                cursor = self.db_connection.cursor()
-                set_clauses = [f"{key} = ?" for key in partial_update_data.keys()]
-                values = list(partial_update_data.values()) + [fixture_id]
-                sql = f"UPDATE fixtures SET {', '.join(set_clauses)} WHERE id = ?"
-                cursor.execute(sql, tuple(values))
-                self.db_connection.commit()
+                self.repository.queue_fixture_update(fixture_id, partial_update_data, on_done=self._on_fixture_row_written)
             
             # STEP 2: Update the internal "source of truth" state with raw values.
             self.live_fixture_states[fixture_id].update(partial_update_data)
             
-            # STEP 3: Create a fresh copy of the full state to calculate the final output.
-            final_output_state = self.live_fixture_states[fixture_id].copy()
-            
-            # STEP 4: Calculate the final, modulated brightness for output.
-            base_brightness = float(final_output_state.get('brightness', 0))
-            modulated_brightness = base_brightness * (self.master_fader.value() / 100.0)
-            
-            group_id = self.get_group_for_fixture(fixture_id)
-            if group_id and group_id in self.executor_fader_levels:
-                modulated_brightness *= (self.executor_fader_levels[group_id] / 100.0)
-
-            if self.blackout_button.isChecked():
-                modulated_brightness = 0
-                
-            final_brightness_int = int(round(modulated_brightness))
-            
-            # Update the brightness ONLY in our outgoing packet.
-            final_output_state['brightness'] = final_brightness_int
+            # STEP 3 & 4: Calculate the final, modulated output state.
+            final_output_state = self._compute_output_state(fixture_id)
 
             # STEP 5: Send the complete, modulated packet to the HTTP manager.
-            # Create a clean dict for Roblox, removing unnecessary keys.
-            roblox_packet = {k: v for k, v in final_output_state.items() if k not in ['id', 'created_at', 'comment', 'profile_id']}
             fixture_fid = final_output_state.get('fid')
             if fixture_fid is not None:
-                self.http_manager.add_update(fixture_fid, roblox_packet)
+                self.http_manager.add_update(fixture_fid, self._roblox_packet_from_output_state(final_output_state))
             
+            if not {'x_pos', 'y_pos', 'z_pos'}.isdisjoint(partial_update_data) and not self.fixture_directory_timer.isActive():
+                self.fixture_directory_timer.start()
+
             # STEP 6: Notify internal UI elements about the change, sending the final *output* state.
-            if self.fixtures_tab.isVisible():
+            # The fixtures list reads from the database, so it refreshes once the write lands.
+            if not partial_update_data and self.fixtures_tab.isVisible():
                 self.fixtures_tab.refresh_fixtures()
             
             self.visualization_3d_tab.update_fixture(fixture_id, final_output_state)
@@ -1901,13 +1995,49 @@ class Lumenante(QMainWindow):
         except Exception as e_gen:
             print(f"Generic Error in update_fixture_data_and_notify for fixture {fixture_id}: {e_gen}")
 
+    def _compute_output_state(self, fixture_id: int) -> dict:
+        """
+        Returns a fresh copy of the fixture's state with master, audio, executor and blackout
+        modulation applied to brightness.
+        """
+        final_output_state = self.live_fixture_states[fixture_id].copy()
+
+        # Update the brightness ONLY in our outgoing packet.
+        final_output_state['brightness'] = self._modulated_brightness(fixture_id, float(final_output_state.get('brightness', 0)))
+        return final_output_state
+
+    def _modulated_brightness(self, fixture_id: int, base_brightness: float) -> int:
+        """The output brightness for a raw brightness: scaled by master, audio and executor levels, 0 in blackout."""
+        if self.blackout_button.isChecked():
+            return 0
+        modulated_brightness = base_brightness * (self.master_fader.value() / 100.0) * self.audio_intensity_level
+        if self.executor_fader_levels:
+            group_id = self.get_group_for_fixture(fixture_id)
+            if group_id and group_id in self.executor_fader_levels:
+                modulated_brightness *= (self.executor_fader_levels[group_id] / 100.0)
+        return int(round(modulated_brightness))
+
+    def _publish_output_brightness(self):
+        """
+        Sends only the output brightness of each lit fixture to Roblox. Audio modulation changes
+        it nearly every frame, so it bypasses update_fixture_data_and_notify: live state, the 3D
+        view and the tabs stay as they are and pick the level up on the fixture's next update.
+        """
+        if self.blackout_button.isChecked() or not self.is_live_mode_active():
+            return
+        for fixture_id, state in self.live_fixture_states.items():
+            base_brightness = float(state.get('brightness', 0) or 0)
+            if base_brightness and state.get('fid') is not None: # Unlit fixtures stay dark at any level
+                self.http_manager.add_update(state['fid'], {'brightness': self._modulated_brightness(fixture_id, base_brightness)})
+
+    def _roblox_packet_from_output_state(self, output_state: dict) -> dict:
+        """Create a clean dict for Roblox, removing unnecessary keys."""
+        return {k: v for k, v in output_state.items() if k not in ['id', 'created_at', 'comment', 'profile_id']}
+
     def get_group_for_fixture(self, fixture_id: int) -> int | None:
         """Helper to get the first group a fixture belongs to. Returns None if not in any group."""
         try:
-            cursor = self.db_connection.cursor()
-            cursor.execute("SELECT group_id FROM fixture_group_mappings WHERE fixture_id = ? LIMIT 1", (fixture_id,))
-            result = cursor.fetchone()
-            return result[0] if result else None
+            return self.repository.first_group_of_fixture(fixture_id)
         except Exception as e:
             print(f"Error getting group for fixture {fixture_id}: {e}")
             return None
@@ -1915,16 +2045,13 @@ class Lumenante(QMainWindow):
     def on_fixture_updated_from_tab(self, fixture_id: int, data_from_dialog: dict): self.update_fixture_data_and_notify(fixture_id, data_from_dialog)
     def on_fixture_parameter_change_from_main_tab(self, fixture_id: int, params_to_update: dict): self.update_fixture_data_and_notify(fixture_id, params_to_update)
     
-    def on_fixture_added_from_tab(self, new_fixture_data_with_id: dict):
-        self._initialize_live_fixture_states_from_db() # Re-init to include the new fixture
-        self.visualization_3d_tab.update_all_fixtures()
-        self.main_tab.refresh_dynamic_content()
+    def on_fixtures_added_from_tab(self, new_fixture_ids: list):
+        """One structural refresh for a whole create or bulk patch, however many fixtures it added."""
+        for fixture_dict in self.repository.fixtures_by_ids(new_fixture_ids):
+            self.live_fixture_states[fixture_dict['id']] = fixture_dict
+        self._publish_fixture_directory()
+        self.fixture_patch_changed.emit()
         self.fixture_groups_tab.refresh_all_data_and_ui()
-        self.timeline_tab.refresh_event_list_and_timeline()
-
-        fixture_id = new_fixture_data_with_id.get('id');
-        if fixture_id: 
-            self.fixture_data_globally_changed.emit(fixture_id, self.live_fixture_states.get(fixture_id, {}))
 
 
     def on_fixture_deleted_from_tab(self, deleted_fixture_ids: list):
@@ -1934,7 +2061,7 @@ class Lumenante(QMainWindow):
 
         self.fixture_groups_tab.refresh_all_data_and_ui()
         self.visualization_3d_tab.update_all_fixtures()
-        self.timeline_tab.refresh_event_list_and_timeline()
+        self.timeline_tab.refresh_tracks()
         self.main_tab.refresh_dynamic_content()
 
         current_selection = self.main_tab.globally_selected_fixture_ids_for_controls
@@ -1946,46 +2073,47 @@ class Lumenante(QMainWindow):
                 self.main_tab.update_active_group_selection_display(None)
 
 
+    def _resolve_preset_application(self, preset_number: str, target_type: str = "master",
+                                    target_id: int | None = None) -> dict[int, dict] | None:
+        """
+        Works out which parameters a preset would apply to which fixtures for the given target.
+        Returns {fixture_id: params}, or None if the preset does not exist.
+        """
+        preset = self.repository.preset(preset_number)
+        if preset is None:
+            return None
+
+        params_to_apply_keys = self.get_params_for_preset_type(preset.preset_type)
+
+        fixture_ids_to_update_this_call = []
+
+        if target_type == "master":
+            fixture_ids_to_update_this_call = self.main_tab.globally_selected_fixture_ids_for_controls
+            if not fixture_ids_to_update_this_call:
+                fixture_ids_to_update_this_call = preset.fixture_ids.tolist()
+        elif target_type == "fixture" and target_id is not None:
+            fixture_ids_to_update_this_call = [target_id]
+        elif target_type == "group" and target_id is not None:
+            fixture_ids_to_update_this_call = list(self.repository.group_fixture_ids(target_id))
+
+        params_by_fixture = {}
+        for fixture_id_to_process in fixture_ids_to_update_this_call:
+            params_to_apply_now = preset.params_for(fixture_id_to_process, params_to_apply_keys)
+            if params_to_apply_now:
+                params_by_fixture[fixture_id_to_process] = params_to_apply_now
+        return params_by_fixture
+
     def on_preset_applied_from_tab(self, preset_number: str, target_type:str = "master", target_id: int | None = None):
         try:
-            cursor = self.db_connection.cursor()
-            cursor.execute("SELECT data, type FROM presets WHERE preset_number = ?", (preset_number,))
-            result = cursor.fetchone()
-            if not (result and result[0]):
+            params_by_fixture = self._resolve_preset_application(preset_number, target_type, target_id)
+            if params_by_fixture is None:
                 QMessageBox.warning(self, "Preset Not Found", f"Preset '{preset_number}' could not be loaded.")
                 return
 
-            preset_fixture_data_map = json.loads(result[0])
-            preset_type = result[1]
             updated_ids_count = 0
-            
-            params_to_apply_keys = self.get_params_for_preset_type(preset_type)
-            
-            fixture_ids_to_update_this_call = []
-            
-            if target_type == "master":
-                fixture_ids_to_update_this_call = self.main_tab.globally_selected_fixture_ids_for_controls
-                if not fixture_ids_to_update_this_call:
-                    fixture_ids_to_update_this_call = [int(fix_id_str) for fix_id_str in preset_fixture_data_map.keys()]
-            elif target_type == "fixture" and target_id is not None:
-                if str(target_id) in preset_fixture_data_map: fixture_ids_to_update_this_call = [target_id]
-            elif target_type == "group" and target_id is not None:
-                cursor.execute("SELECT fixture_id FROM fixture_group_mappings WHERE group_id = ?", (target_id,))
-                group_fixture_ids = {row[0] for row in cursor.fetchall()}
-                fixture_ids_to_update_this_call = [
-                    int(fix_id_str) for fix_id_str in preset_fixture_data_map.keys() if int(fix_id_str) in group_fixture_ids
-                ]
-
-            for fixture_id_to_process in fixture_ids_to_update_this_call:
-                fixture_id_str = str(fixture_id_to_process)
-                if fixture_id_str in preset_fixture_data_map:
-                    source_params = preset_fixture_data_map[fixture_id_str]
-                    params_to_apply_now = {key: source_params[key] for key in params_to_apply_keys if key in source_params}
-
-                    if not params_to_apply_now: continue
-                    
-                    self.update_fixture_data_and_notify(fixture_id_to_process, params_to_apply_now)
-                    updated_ids_count += 1
+            for fixture_id_to_process, params_to_apply_now in params_by_fixture.items():
+                self.update_fixture_data_and_notify(fixture_id_to_process, params_to_apply_now)
+                updated_ids_count += 1
             
             target_info_str = f"globally to {updated_ids_count} fixture(s)" if target_type == "master" else \
                               f"to fixture ID {target_id}" if target_type == "fixture" else \
@@ -1999,9 +2127,9 @@ class Lumenante(QMainWindow):
     def on_main_tab_master_intensity_set(self, value: int): self.master_fader.setValue(value)
     def on_main_tab_toggle_fixture_power(self, area_id: str, fixture_id: int, desired_state_is_on: bool = False):
         try:
-            cursor = self.db_connection.cursor(); cursor.execute("SELECT brightness, name FROM fixtures WHERE id = ?", (fixture_id,)); result = cursor.fetchone()
-            if not result: QMessageBox.warning(self, "Error", f"Fixture ID {fixture_id} not found for toggle."); return
-            current_brightness, fixture_name = result; new_brightness = 0; last_on_key = f"FixtureData/{fixture_id}/lastOnBrightness"
+            fixture = self.repository.fixture(fixture_id)
+            if not fixture: QMessageBox.warning(self, "Error", f"Fixture ID {fixture_id} not found for toggle."); return
+            current_brightness = fixture['brightness']; new_brightness = 0; last_on_key = f"FixtureData/{fixture_id}/lastOnBrightness"
             if current_brightness > 0: self.settings.setValue(last_on_key, current_brightness); new_brightness = 0
             else: new_brightness = self.settings.value(last_on_key, 100, type=int)
             self.update_fixture_data_and_notify(fixture_id, {'brightness': new_brightness})
@@ -2011,9 +2139,9 @@ class Lumenante(QMainWindow):
         flash_brightness_on = 100; original_brightness_key = f"FixtureData/{fixture_id}/flashOriginalBrightness"
         try:
             if is_pressed:
-                cursor = self.db_connection.cursor(); cursor.execute("SELECT brightness FROM fixtures WHERE id = ?", (fixture_id,)); current_brightness_tuple = cursor.fetchone()
-                if not current_brightness_tuple: print(f"Flash Error: Fixture ID {fixture_id} not found for press."); return
-                self.settings.setValue(original_brightness_key, current_brightness_tuple[0]); self.update_fixture_data_and_notify(fixture_id, {'brightness': flash_brightness_on})
+                fixture = self.repository.fixture(fixture_id)
+                if not fixture: print(f"Flash Error: Fixture ID {fixture_id} not found for press."); return
+                self.settings.setValue(original_brightness_key, fixture['brightness']); self.update_fixture_data_and_notify(fixture_id, {'brightness': flash_brightness_on})
             else: original_brightness = self.settings.value(original_brightness_key, 0, type=int); self.update_fixture_data_and_notify(fixture_id, {'brightness': original_brightness})
         except Exception as e: print(f"Error during flash for fixture {fixture_id}: {e}")
 
@@ -2102,10 +2230,8 @@ class Lumenante(QMainWindow):
         elif len(fixture_ids) == 1:
             fixture_id = fixture_ids[0]
             try:
-                cursor = self.db_connection.cursor()
-                cursor.execute("SELECT fid, sfi, name FROM fixtures WHERE id = ?", (fixture_id,))
-                result = cursor.fetchone()
-                fid, sfi, name = result if result else (fixture_id, '?', "N/A")
+                fixture = self.repository.fixture(fixture_id)
+                fid, sfi, name = (fixture['fid'], fixture['sfi'], fixture['name']) if fixture else (fixture_id, '?', "N/A")
                 display_name = f"{name} ({fid}.{sfi})"
                 self.globally_selected_fixture_label.setText(f"Sel Fix: {display_name}")
                 self.globally_selected_fixture_label.setToolTip(f"Fixture: {name} ({fid}.{sfi}) - ID: {fixture_id}")
@@ -2139,27 +2265,72 @@ class Lumenante(QMainWindow):
             elif action == 'toggle':
                 self.blackout_button.setChecked(not current_blackout_state)
         elif event_type != 'brightness': # Brightness is handled by TimelineTab's internal fade logic
-            params_to_update = {}
-            if event_type == 'color' and 'color_hex' in payload:
-                color = QColor(payload['color_hex'])
-                params_to_update = {'red': color.red(), 'green': color.green(), 'blue': color.blue()}
-            elif event_type == 'pan' and 'value' in payload:
-                params_to_update = {'rotation_y': payload['value']}
-            elif event_type == 'tilt' and 'value' in payload:
-                params_to_update = {'rotation_x': payload['value']}
-            elif event_type == 'zoom' and 'value' in payload:
-                params_to_update = {'zoom': payload['value']}
-            elif event_type == 'focus' and 'value' in payload:
-                params_to_update = {'focus': payload['value']}
-            elif event_type == 'gobo' and 'value' in payload:
-                params_to_update = {'gobo_spin': payload['value']}
-            # ... add other direct parameter events here ...
-            
+            params_to_update = self._get_direct_params_for_timeline_event(event_type, payload)
             if params_to_update:
                 target_fixture_ids = self.timeline_tab._get_fixture_ids_for_target(target_type, target_id)
                 for fid in target_fixture_ids:
                     self.update_fixture_data_and_notify(fid, params_to_update)
 
+    def _get_direct_params_for_timeline_event(self, event_type: str, payload: dict) -> dict:
+        """Maps a direct-parameter timeline event (color, pan, tilt...) to fixture parameters."""
+        params_to_update = {}
+        if event_type == 'color' and 'color_hex' in payload:
+            color = QColor(payload['color_hex'])
+            params_to_update = {'red': color.red(), 'green': color.green(), 'blue': color.blue()}
+        elif event_type == 'pan' and 'value' in payload:
+            params_to_update = {'rotation_y': payload['value']}
+        elif event_type == 'tilt' and 'value' in payload:
+            params_to_update = {'rotation_x': payload['value']}
+        elif event_type == 'zoom' and 'value' in payload:
+            params_to_update = {'zoom': payload['value']}
+        elif event_type == 'focus' and 'value' in payload:
+            params_to_update = {'focus': payload['value']}
+        elif event_type == 'gobo' and 'value' in payload:
+            params_to_update = {'gobo_spin': payload['value']}
+        # ... add other direct parameter events here ...
+        return params_to_update
+
+    def presend_timeline_event(self, event_data: dict, apply_at_ms: float) -> bool:
+        """
+        Sends the parameters an upcoming timeline event sets to Roblox ahead of time, stamped
+        with apply_at_ms on the bridge clock so clients can apply them exactly on the beat.
+        Local state is left untouched; the event still fires normally when the playhead reaches it.
+        Returns True if anything was scheduled.
+        """
+        event_type = event_data.get('type')
+        payload = event_data.get('data', {})
+        target_type = event_data.get('target_type', 'master')
+        target_id = event_data.get('target_id')
+
+        params_by_fixture = {}
+        try:
+            if event_type == 'preset':
+                preset_number = payload.get('preset_number')
+                if preset_number:
+                    params_by_fixture = self._resolve_preset_application(str(preset_number), target_type, target_id) or {}
+            elif event_type not in ('brightness', 'blackout'):
+                params_to_update = self._get_direct_params_for_timeline_event(event_type, payload)
+                if params_to_update:
+                    params_by_fixture = {fid: params_to_update for fid in self.timeline_tab._get_fixture_ids_for_target(target_type, target_id)}
+        except Exception as e:
+            print(f"Error resolving timeline event {event_data.get('id')} for pre-send: {e}")
+            return False
+
+        # Only the parameters the event sets are scheduled. Anything else, like the brightness a
+        # fader or a running fade sets before apply_at_ms, keeps flowing through the normal path.
+        scheduled_any = False
+        for fixture_id, params in params_by_fixture.items():
+            fixture_state = self.live_fixture_states.get(fixture_id)
+            if fixture_state is None or fixture_state.get('fid') is None:
+                continue
+            packet = self._roblox_packet_from_output_state(params)
+            if 'brightness' in packet:
+                packet['brightness'] = self._modulated_brightness(fixture_id, float(packet['brightness']))
+            if packet:
+                self.http_manager.add_update(fixture_state['fid'], packet, apply_at_ms=apply_at_ms)
+                scheduled_any = True
+        return scheduled_any
+
     def _on_joystick_moved(self, axis: str, value: float):
         """Handles joystick movements from the GamepadManager."""
         if not self.settings.value('gamepad/enabled', True, type=bool):
@@ -2285,10 +2456,7 @@ class Lumenante(QMainWindow):
         self.executor_fader_levels[group_id] = value
         
         try:
-            # Get all fixtures in this group
-            cursor = self.db_connection.cursor()
-            cursor.execute("SELECT id FROM fixtures WHERE id IN (SELECT fixture_id FROM fixture_group_mappings WHERE group_id = ?)", (group_id,))
-            for (fix_id,) in cursor.fetchall():
+            for fix_id in self.repository.group_fixture_ids(group_id):
                 self.update_fixture_data_and_notify(fix_id, {})
         
         except Exception as e:
@@ -2308,6 +2476,9 @@ class Lumenante(QMainWindow):
         
         if hasattr(self, 'video_sync_tab') and self.video_sync_tab:
             self.video_sync_tab.shutdown_player()
+
+        if hasattr(self, 'timeline_tab') and self.timeline_tab:
+            self.timeline_tab.shutdown_background_work()
         
         if self.selection_refresh_timer.isActive():
             self.selection_refresh_timer.stop()
@@ -2319,9 +2490,7 @@ class Lumenante(QMainWindow):
             print("HTTP manager stop signal sent.")
 
         self.save_app_settings();
-        if self.db_connection:
-            try: self.db_connection.close(); print("Database connection closed.")
-            except Exception as e: print(f"Error closing database: {e}")
+        self._close_show_database()
         super().closeEvent(event)
 
     def request_roblox_positions(self):
@@ -2331,67 +2500,65 @@ class Lumenante(QMainWindow):
                                 "Please ensure the game is unpaused. Positions will be updated shortly.")
         self.http_manager.add_update(-1, {"command": "get_positions"})
 
-    def _on_roblox_positions_reported(self, positions_data: dict):
-        """Slot to handle the position data received from Roblox."""
-        updated_count = 0
-        newly_patched_fids = []
-        not_found_count = 0
+    def _on_roblox_positions_reported(self, positions: dict, rejected_count: int):
+        """
+        Slot to handle the position data received from Roblox, already parsed into {fid: (x, y, z)}.
+        Everything is written in one transaction and the UI is refreshed once through fixture_patch_changed.
+        """
+        if self.repository.writes_blocked:
+            print(f"Ignored positions reported by Roblox: {self.repository.writes_blocked}")
+            return
+        if rejected_count:
+            print(f"Warning: {rejected_count} position entries reported by Roblox could not be parsed.")
         auto_patch_enabled = self.settings.value('roblox/auto_patch_enabled', True, type=bool)
         
         default_profile_id = None
         if auto_patch_enabled:
             try:
-                cursor = self.db_connection.cursor()
-                cursor.execute("SELECT id FROM fixture_profiles WHERE name = 'PAR Can'")
-                result = cursor.fetchone()
-                if result:
-                    default_profile_id = result[0]
-                else: # Fallback to first available profile
-                    cursor.execute("SELECT id FROM fixture_profiles LIMIT 1")
-                    result = cursor.fetchone()
-                    if result: default_profile_id = result[0]
+                default_profile_id = self.repository.default_profile_id() # 'PAR Can', else the first available profile
             except Exception as e:
                 print(f"Could not find a default profile for auto-patching: {e}")
 
         try:
-            cursor = self.db_connection.cursor()
-            for fid_str, pos_list in positions_data.items():
-                try:
-                    fixture_fid = int(fid_str)
-                    if isinstance(pos_list, list) and len(pos_list) == 3:
-                        x, y, z = float(pos_list[0]), float(pos_list[1]), float(pos_list[2])
-                        
-                        cursor.execute("SELECT id FROM fixtures WHERE fid = ?", (fixture_fid,))
-                        existing_fixture = cursor.fetchone()
-
-                        if existing_fixture:
-                            cursor.execute("UPDATE fixtures SET x_pos=?, y_pos=?, z_pos=? WHERE fid=?", (x, y, z, fixture_fid))
-                            updated_count += cursor.rowcount
-                        elif auto_patch_enabled and default_profile_id:
-                            cursor.execute("INSERT INTO fixtures (fid, sfi, profile_id, name, x_pos, y_pos, z_pos) VALUES (?, ?, ?, ?, ?, ?, ?)",
-                                           (fixture_fid, 1, default_profile_id, f"Roblox Fx {fixture_fid}", x, y, z))
-                            newly_patched_fids.append(fixture_fid)
-                        else:
-                            not_found_count += 1
-                except (ValueError, TypeError):
-                    print(f"Warning: Could not parse fixture ID '{fid_str}' or its position data.")
+            ids_by_fid = self.repository.fixture_ids_by_fid()
+
+            update_rows = []
+            insert_rows = []
+            not_found_count = 0
+            for fixture_fid, (x, y, z) in positions.items():
+                if fixture_fid in ids_by_fid:
+                    update_rows.append((x, y, z, fixture_fid))
+                elif auto_patch_enabled and default_profile_id:
+                    insert_rows.append((fixture_fid, 1, default_profile_id, f"Roblox Fx {fixture_fid}", x, y, z))
+                else:
+                    not_found_count += 1
+            updated_count = sum(len(ids_by_fid[row[3]]) for row in update_rows)
+            newly_patched_fids = [row[0] for row in insert_rows]
+
+            if update_rows or insert_rows:
+                self.repository.update_positions_and_patch(update_rows, insert_rows)
 
-            if updated_count > 0 or newly_patched_fids:
-                self.db_connection.commit()
+                if insert_rows:
+                    self._initialize_live_fixture_states_from_db()
+                else:
+                    # Positions only: patch the live state in place instead of reloading every fixture.
+                    for x, y, z, fixture_fid in update_rows:
+                        for fixture_id in ids_by_fid[fixture_fid]:
+                            if fixture_id in self.live_fixture_states:
+                                self.live_fixture_states[fixture_id].update({'x_pos': x, 'y_pos': y, 'z_pos': z})
+                    self._publish_fixture_directory()
+                self.fixture_patch_changed.emit()
                 
                 # Build summary message
                 summary_lines = []
                 if updated_count > 0: summary_lines.append(f"Successfully updated positions for {updated_count} fixture instance(s).")
-                if newly_patched_fids: summary_lines.append(f"Auto-patched {len(newly_patched_fids)} new fixture(s): {newly_patched_fids}")
+                if newly_patched_fids:
+                    shown_fids = newly_patched_fids[:20]
+                    more = f" and {len(newly_patched_fids) - len(shown_fids)} more" if len(newly_patched_fids) > len(shown_fids) else ""
+                    summary_lines.append(f"Auto-patched {len(newly_patched_fids)} new fixture(s): {shown_fids}{more}")
                 if not_found_count > 0: summary_lines.append(f"{not_found_count} fixture ID(s) reported by Roblox were not found in the patch.")
+                if rejected_count > 0: summary_lines.append(f"{rejected_count} entry(s) had invalid position data.")
                 QMessageBox.information(self, "Import Successful", "\n".join(summary_lines))
-                
-                # Refresh relevant UI
-                self._initialize_live_fixture_states_from_db()
-                self.fixtures_tab.refresh_fixtures()
-                self.visualization_3d_tab.update_all_fixtures()
-                self.populate_fixture_selector()
-                self.main_tab.refresh_dynamic_content()
             else:
                  QMessageBox.warning(self, "Import Failed",
                                      "No matching fixtures were found to update. "
@@ -2401,172 +2568,145 @@ class Lumenante(QMainWindow):
             self.db_connection.rollback()
             
     def export_show_data(self, file_path: str):
-        show_data = {}
+        """
+        Writes the show on the persistence reader thread, from one read snapshot of the database,
+        so large rigs don't stall the GUI. A .gz or .zst file name selects a compressed container.
+        """
         try:
-            cursor = self.db_connection.cursor()
-            
-            # Create a fixture ID-to-Name map for portability
-            cursor.execute("SELECT id, name FROM fixtures")
-            fixture_id_to_name_map = {row[0]: row[1] for row in cursor.fetchall()}
-            if not fixture_id_to_name_map:
-                print("No fixtures to build ID-to-name map for export.")
-
-            cursor.execute("SELECT name, creator, attributes_json FROM fixture_profiles")
-            show_data['fixture_profiles'] = [{'name': row[0], 'creator': row[1], 'attributes_json': json.loads(row[2])} for row in cursor.fetchall()]
-
-            cursor.execute("SELECT f.*, fp.name as profile_name FROM fixtures f JOIN fixture_profiles fp ON f.profile_id = fp.id")
-            fixture_cols = [desc[0] for desc in cursor.description]
-            show_data['fixtures'] = [dict(zip(fixture_cols, row)) for row in cursor.fetchall()]
-
-            # Export presets using fixture names instead of IDs
-            cursor.execute("SELECT preset_number, name, data, type FROM presets")
-            presets_export = []
-            for p_num, p_name, p_data_json, p_type in cursor.fetchall():
-                p_data_by_id = json.loads(p_data_json)
-                p_data_by_name = {fixture_id_to_name_map.get(int(fix_id), f"UNKNOWN_FIXTURE_ID_{fix_id}"): params 
-                                  for fix_id, params in p_data_by_id.items() if int(fix_id) in fixture_id_to_name_map}
-                presets_export.append({'preset_number': p_num, 'name': p_name, 'data': p_data_by_name, 'type': p_type})
-            show_data['presets'] = presets_export
-
-            cursor.execute("SELECT id, cue_number, name, trigger_time_s, comment FROM cues")
-            cue_cols = ['id', 'cue_number', 'name', 'trigger_time_s', 'comment']
-            show_data['cues'] = [dict(zip(cue_cols, row)) for row in cursor.fetchall()]
-
-            cursor.execute("SELECT name, start_time, duration, event_type, data, target_type, target_id, cue_id FROM timeline_events")
-            event_cols = ['name', 'start_time', 'duration', 'event_type', 'data', 'target_type', 'target_id', 'cue_id']
-            show_data['timeline_events'] = [dict(zip(event_cols, row)) for row in cursor.fetchall()]
-
             layout_json_str = self.settings.value("MainTab/Layout_v3.6_Panning", "{}")
-            show_data['main_tab_layout'] = json.loads(layout_json_str) if layout_json_str else {}
-            
-            # Export groups using fixture names instead of IDs
-            cursor.execute("SELECT id, name FROM fixture_groups")
-            fixture_groups_export = []
-            for group_id, group_name in cursor.fetchall():
-                cursor.execute("SELECT fixture_id FROM fixture_group_mappings WHERE group_id = ?", (group_id,))
-                fixture_names_in_group = [fixture_id_to_name_map.get(row[0], f"UNKNOWN_FIXTURE_ID_{row[0]}") 
-                                          for row in cursor.fetchall() if row[0] in fixture_id_to_name_map]
-                fixture_groups_export.append({'name': group_name, 'fixture_names': fixture_names_in_group})
-            show_data['fixture_groups'] = fixture_groups_export
-
-            cursor.execute("SELECT id, name, config_json FROM loop_palettes")
-            show_data['loop_palettes'] = [{'name': row[1], 'config_json': json.loads(row[2])} for row in cursor.fetchall()]
-
-            show_data['appearance_theme'] = theme_manager.get_saved_theme_name()
-            show_data['appearance_theme_tab_position'] = int(theme_manager.get_saved_theme_tab_position().value)
-
-            with open(file_path, 'w') as f:
-                json.dump(show_data, f, indent=2)
-            QMessageBox.information(self, "Export Successful", f"Show data exported to {file_path}")
-
+            extra_sections = {
+                'main_tab_layout': json.loads(layout_json_str) if layout_json_str else {},
+                'appearance_theme': theme_manager.get_saved_theme_name(),
+                'appearance_theme_tab_position': int(theme_manager.get_saved_theme_tab_position().value),
+            }
+            self.persistence.flush() # The snapshot has to include writes still queued
         except Exception as e:
             QMessageBox.critical(self, "Export Error", f"Failed to export show data: {e}")
             print(f"Export error: {e}")
+            return
+
+        exporter = ShowExporter(extra_sections)
+        started = time.perf_counter()
 
-    def import_show_data(self, file_path: str):
+        def on_exported(counts):
+            print(f"Show export: {counts} in {time.perf_counter() - started:.2f}s")
+            QMessageBox.information(self, "Export Successful", f"Show data exported to {file_path}")
+
+        def on_export_failed(error):
+            QMessageBox.critical(self, "Export Error", f"Failed to export show data: {error}")
+            print(f"Export error: {error}")
+
+        self.persistence.submit_snapshot_read(lambda conn: exporter.export(conn, file_path),
+                                              on_done=on_exported, on_error=on_export_failed)
+
+    def import_show_data(self, file_path: str, sections=None):
+        """
+        Replaces the show with a show file. The import runs as one write job on the persistence
+        writer thread, so the GUI keeps drawing its progress; until it finishes, repository writes
+        are refused, so nothing can land half way through the import or on rows it is replacing.
+        sections (e.g. show_io.PATCH_AND_PRESETS) replaces only those and keeps the rest of the show.
+        """
         try:
-            with open(file_path, 'r') as f:
-                show_data = json.load(f)
+            file_size = max(os.path.getsize(file_path), 1)
 
-            # --- Stop any current state before clearing DB ---
+            # --- Stop any current state before replacing the show ---
+            self.timeline_tab.stop_playback()
             self.stop_effects_on_fixtures(list(self.live_fixture_states.keys()))
             self.active_effects.clear()
             self.clear_global_fixture_selection()
-
-            cursor = self.db_connection.cursor()
-            
-            # --- Clear existing data ---
-            tables_to_clear = ["timeline_events", "cues", "fixture_group_mappings", "fixture_groups", 
-                               "presets", "loop_palettes", "fixtures", "fixture_profiles"]
-            for table in tables_to_clear:
-                cursor.execute(f"DELETE FROM {table}")
-            self.db_connection.commit()
-
-            # --- Import Fixture Profiles ---
-            profile_name_to_id_map = {}
-            if 'fixture_profiles' in show_data:
-                for profile in show_data['fixture_profiles']:
-                    creator_val = profile.get('creator') or profile.get('manufacturer')
-                    cursor.execute("INSERT INTO fixture_profiles (name, creator, attributes_json) VALUES (?, ?, ?)",
-                                   (profile['name'], creator_val, json.dumps(profile['attributes_json'])))
-                    profile_name_to_id_map[profile['name']] = cursor.lastrowid
-            
-            # --- Import Fixtures ---
-            fixture_name_to_id_map = {}
-            if 'fixtures' in show_data:
-                for fix_data in show_data['fixtures']:
-                    profile_name = fix_data.pop('profile_name', 'Generic')
-                    profile_id = profile_name_to_id_map.get(profile_name)
-                    if profile_id is None:
-                        generic_id_query = cursor.execute("SELECT id FROM fixture_profiles WHERE name = 'Generic'").fetchone()
-                        profile_id = generic_id_query[0] if generic_id_query else 1
-                    fix_data['profile_id'] = profile_id
-                    cursor.execute("PRAGMA table_info(fixtures)")
-                    db_cols = {info[1] for info in cursor.fetchall()}
-                    cols_for_insert = [col for col in fix_data.keys() if col in db_cols]
-                    values_for_insert = [fix_data[col] for col in cols_for_insert]
-                    placeholders = ', '.join(['?'] * len(cols_for_insert))
-                    insert_sql = f"INSERT INTO fixtures ({', '.join(cols_for_insert)}) VALUES ({placeholders})"
-                    cursor.execute(insert_sql, tuple(values_for_insert))
-                    fixture_name_to_id_map[fix_data['name']] = cursor.lastrowid
-            
-            # --- Import Groups (using name mapping) ---
-            if 'fixture_groups' in show_data:
-                for group_data in show_data['fixture_groups']:
-                    cursor.execute("INSERT INTO fixture_groups (name) VALUES (?)", (group_data['name'],))
-                    group_db_id = cursor.lastrowid
-                    if 'fixture_names' in group_data:
-                        for fix_name in group_data['fixture_names']:
-                            fix_id = fixture_name_to_id_map.get(fix_name)
-                            if fix_id:
-                                cursor.execute("INSERT INTO fixture_group_mappings (group_id, fixture_id) VALUES (?, ?)", (group_db_id, fix_id))
-            
-            # --- Import Presets (using name mapping) ---
-            if 'presets' in show_data:
-                for preset in show_data['presets']:
-                    p_data_by_name = preset.get('data', {})
-                    p_data_by_id = {str(fixture_name_to_id_map.get(fix_name)): params 
-                                    for fix_name, params in p_data_by_name.items() if fix_name in fixture_name_to_id_map}
-                    cursor.execute("INSERT INTO presets (preset_number, name, data, type) VALUES (?, ?, ?, ?)",
-                                   (preset['preset_number'], preset.get('name'), json.dumps(p_data_by_id), preset.get('type', 'All')))
-
-            # --- Import Cues, Events, Loops ---
-            if 'cues' in show_data:
-                for cue_data in show_data['cues']: cursor.execute("INSERT INTO cues (cue_number, name, trigger_time_s, comment) VALUES (?, ?, ?, ?)", (cue_data['cue_number'], cue_data.get('name'), cue_data['trigger_time_s'], cue_data.get('comment')))
-            if 'timeline_events' in show_data:
-                for event in show_data['timeline_events']: cursor.execute("INSERT INTO timeline_events (name, start_time, duration, event_type, data, target_type, target_id, cue_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", (event['name'], event['start_time'], event['duration'], event['event_type'], json.dumps(event.get('data', {})), event.get('target_type', 'master'), event.get('target_id'), event.get('cue_id')))
-            if 'loop_palettes' in show_data:
-                for lp_data in show_data['loop_palettes']: cursor.execute("INSERT INTO loop_palettes (name, config_json) VALUES (?, ?)",(lp_data['name'], json.dumps(lp_data.get('config_json', []))))
-
-            self.db_connection.commit()
-            
-            # --- Refresh Application State ---
-            self._initialize_live_fixture_states_from_db()
-            if 'main_tab_layout' in show_data and self.main_tab: self.main_tab.load_layout_from_data_dict(show_data['main_tab_layout'])
-            
-            QMessageBox.information(self, "Import Successful", f"Show data imported from {file_path}. Application UI is now refreshing.")
-            
-            # --- Refresh all UI tabs ---
-            self.fixtures_tab.refresh_fixtures()
-            self.presets_tab.load_presets_from_db()
-            self.loop_palettes_tab.loop_palettes_changed.emit()
-            self.timeline_tab.refresh_event_list_and_timeline()
-            self.fixture_groups_tab.refresh_all_data_and_ui()
-            self.visualization_3d_tab.update_all_fixtures()
-            self.main_tab.refresh_dynamic_content()
-            self.populate_group_selector()
-            self.populate_fixture_selector()
-            self.clear_global_fixture_selection()
-
-        except json.JSONDecodeError:
-            QMessageBox.critical(self, "Import Error", "Failed to decode JSON from the show file. The file may be corrupted.")
-            if self.db_connection: self.db_connection.rollback()
-        except sqlite3.Error as e_sql:
-            QMessageBox.critical(self, "DB Import Error", f"Error importing data into database: {e_sql}")
-            if self.db_connection: self.db_connection.rollback()
+            self.persistence.flush()
         except Exception as e:
             QMessageBox.critical(self, "Import Error", f"Failed to import show data: {e}")
             print(f"Show import error: {e}")
+            return
+
+        progress_dialog = QProgressDialog("Importing show...", None, 0, 100, self)
+        progress_dialog.setWindowTitle("Import Show")
+        progress_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        progress_dialog.setMinimumDuration(500)
+
+        def show_progress(section: str, rows_done: int, percent: int):
+            progress_dialog.setLabelText(f"Importing {section.replace('_', ' ')}... ({rows_done})")
+            progress_dialog.setValue(percent)
+        self.show_import_progress.connect(show_progress)
+
+        def import_job(conn):
+            with open(file_path, 'rb') as raw_file:
+                def report_progress(section: str, rows_done: int): # On the writer thread; the signal queues it to the GUI
+                    self.show_import_progress.emit(section, rows_done, min(99, int(raw_file.tell() * 100 / file_size))) # Compressed position for .gz/.zst
+                importer = ShowImporter(conn, progress=report_progress, sections=sections)
+                importer.run(ShowFileReader(open_show_stream(raw_file))) # Inside the writer's transaction: on failure the previous show is kept
+            return importer
+
+        def finish():
+            self.show_import_progress.disconnect(show_progress)
+            progress_dialog.close()
+            self.repository.block_writes(None)
+
+        def on_imported(importer):
+            finish()
+            print(f"Show import: {importer.counts}")
+            self.repository.invalidate()
+            self.repository.journal.load(self.db_connection) # The import cleared the undo history
+
+            # --- Refresh Application State, each tab once ---
+            show_layout = importer.other_sections.get('main_tab_layout') if not importer.partial else None
+            if show_layout is not None and self.main_tab: self.main_tab.load_layout_from_data_dict(show_layout)
+            self._refresh_all_tabs_after_show_change()
+
+            imported = "Show data" if not importer.partial else ", ".join(s.replace('_', ' ') for s in ShowImporter.SECTION_TABLES if s in importer.sections).capitalize()
+            QMessageBox.information(self, "Import Successful", f"{imported} imported from {file_path}.")
+
+        def on_import_failed(error):
+            finish()
+            if isinstance(error, json.JSONDecodeError):
+                QMessageBox.critical(self, "Import Error", "Failed to decode JSON from the show file. The file may be corrupted.")
+            elif isinstance(error, sqlite3.Error):
+                QMessageBox.critical(self, "DB Import Error", f"Error importing data into database: {error}")
+            else:
+                QMessageBox.critical(self, "Import Error", f"Failed to import show data: {error}")
+                print(f"Show import error: {error}")
+
+        self.repository.block_writes("A show import is in progress.")
+        self.persistence.submit_write(import_job, on_done=on_imported, on_error=on_import_failed)
+
+    def _refresh_all_tabs_after_show_change(self, lazy: bool = False):
+        """
+        Reloads every tab from the database after the whole show was replaced. The patch and live
+        state always load now; with lazy=True the other tabs load when they are first needed.
+        """
+        self._initialize_live_fixture_states_from_db()
+        self.fixtures_tab.refresh_fixtures()
+        self.visualization_3d_tab.update_all_fixtures()
+        self.fixture_groups_tab.refresh_all_data_and_ui()
+        self.main_tab.refresh_dynamic_content()
+        self.populate_group_selector()
+        self.populate_fixture_selector()
+        self.clear_global_fixture_selection()
+
+        self.stale_tab_loaders = {
+            self.presets_tab: self._load_presets_tab,
+            self.loop_palettes_tab: self.loop_palettes_tab.load_palettes_into_list,
+            self.timeline_tab: self.timeline_tab.refresh_event_list_and_timeline,
+            self.settings_tab: self.settings_tab.populate_keybinds_table,
+        }
+        if not lazy or self.main_tab.uses_timeline(): # Embedded timelines and cue lists show its data now
+            self.ensure_tab_loaded(self.timeline_tab)
+        if not lazy:
+            for tab in list(self.stale_tab_loaders):
+                self.ensure_tab_loaded(tab)
+        else:
+            self.ensure_tab_loaded(self.tab_widget.currentWidget())
+
+    def _load_presets_tab(self):
+        with QSignalBlocker(self.presets_tab): # Its presets_changed would refresh the tabs above a second time
+            self.presets_tab.load_presets_from_db()
+
+    def ensure_tab_loaded(self, tab):
+        """Loads a tab that was left stale by a lazy show switch; does nothing if it is current."""
+        loader = self.stale_tab_loaders.pop(tab, None)
+        if loader:
+            loader()
             
     def _load_and_register_keybinds(self):
         """Reads keybinds from settings and creates QShortcut objects."""
@@ -2602,10 +2742,15 @@ class Lumenante(QMainWindow):
         parts = action_id.split('.')
         action_type = parts[0]
         
+        if action_type in ('timeline', 'cue'):
+            self.ensure_tab_loaded(self.timeline_tab)
+
         try:
             if action_type == 'global':
                 if parts[1] == 'clear_selection': self.clear_global_fixture_selection()
                 elif parts[1] == 'toggle_blackout': self.blackout_button.toggle()
+                elif parts[1] == 'undo': self.undo_last_operation()
+                elif parts[1] == 'redo': self.redo_last_operation()
             elif action_type == 'timeline':
                 if parts[1] == 'go_next_cue': self.timeline_tab._go_to_next_cue()
                 elif parts[1] == 'go_prev_cue': self.timeline_tab._go_to_previous_cue()
@@ -2677,6 +2822,8 @@ class CustomSplashScreen(QSplashScreen):
         QApplication.processEvents()
 
 def main():
+    multiprocessing.freeze_support() # Lets the frozen build start audio analysis worker processes
+
     # Set AppUserModelID for Windows Taskbar icon
     if sys.platform == "win32":
         import ctypes
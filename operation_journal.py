@@ -0,0 +1,223 @@
+# operation_journal.py
+"""
+Undo/redo journal of programming operations.
+
+A journaled write records, next to the change itself and in the same transaction, only what it
+changed: the rows it inserted, the rows it deleted and the columns it updated, captured by
+reading the affected rows before and after the write. Undo and redo replay that difference in
+one direction or the other, so they cost as much as the original edit rather than a copy of the
+show, and an undo never touches columns the operation did not change (a later fader move on the
+same fixture survives undoing a rename).
+
+Records are appended to the operation_journal table. Because a record commits atomically with
+the rows it describes, the journal is always consistent with the show after a crash, and the
+undo history is rebuilt at startup by reading the last MAX_OPERATIONS records.
+"""
+import json
+from collections import deque
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+# Key columns of each journaled table; also the whitelist of tables and scope columns.
+TABLE_KEYS = {
+    'fixtures': ('id',),
+    'fixture_groups': ('id',),
+    'fixture_group_mappings': ('id',),
+    'presets': ('id',),
+    'preset_values': ('preset_id', 'fixture_id', 'param'),
+    'cues': ('id',),
+    'timeline_events': ('id',),
+}
+SCOPE_COLUMNS = {'id', 'fixture_id', 'group_id', 'preset_id', 'preset_number', 'cue_id', 'cue_number', 'fid'}
+
+SQL_APPEND = "INSERT INTO operation_journal (label, record) VALUES (?, ?)"
+SQL_DROP_REDO = "DELETE FROM operation_journal WHERE undone = 1"
+SQL_SET_UNDONE = "UPDATE operation_journal SET undone = ? WHERE seq = ?"
+SQL_TAIL = "SELECT seq, label, record, undone FROM operation_journal ORDER BY seq DESC LIMIT ?"
+SQL_TRIM = """
+    DELETE FROM operation_journal WHERE seq <= (
+        SELECT seq FROM operation_journal ORDER BY seq DESC LIMIT 1 OFFSET ?
+    )
+"""
+
+
+def ensure_schema(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS operation_journal (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT, label TEXT NOT NULL, record TEXT NOT NULL,
+            undone INTEGER NOT NULL DEFAULT 0, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+def _capture(conn, table: str, column: str, values) -> dict:
+    """{key tuple: row dict} for the rows of table whose column is in values."""
+    if table not in TABLE_KEYS or column not in SCOPE_COLUMNS:
+        raise ValueError(f"Cannot journal {table}.{column}")
+    cursor = conn.execute(f"SELECT * FROM {table} WHERE {column} IN (SELECT value FROM json_each(?))", (json.dumps(list(values)),))
+    columns = [desc[0] for desc in cursor.description]
+    key_columns = TABLE_KEYS[table]
+    rows = {}
+    for row in cursor.fetchall():
+        row_dict = dict(zip(columns, row))
+        rows[tuple(row_dict[key] for key in key_columns)] = row_dict
+    return rows
+
+
+class Operation:
+    """One undoable step: per table, the rows removed, the rows added and the column updates."""
+    __slots__ = ('seq', 'label', 'kinds', 'changes')
+
+    def __init__(self, label: str, kinds, changes: list, seq: int | None = None):
+        self.seq = seq
+        self.label = label
+        self.kinds = tuple(kinds)
+        # [[table, removed rows, added rows, [[key, {column: [old, new]}], ...]], ...], parents first
+        self.changes = changes
+
+    def to_record(self) -> str:
+        return json.dumps({'kinds': self.kinds, 'changes': self.changes}, separators=(',', ':'))
+
+    @classmethod
+    def from_record(cls, seq: int, label: str, record: str) -> 'Operation':
+        data = json.loads(record)
+        return cls(label, data['kinds'], data['changes'], seq)
+
+    def apply(self, conn, undo: bool):
+        """Replays the operation backwards (undo) or forwards (redo) on conn, inside the caller's transaction."""
+        for table, removed, added, updates in self.changes:
+            key_columns = TABLE_KEYS[table]
+            to_delete, to_insert = (added, removed) if undo else (removed, added)
+            where = " AND ".join(f"{key} = ?" for key in key_columns)
+            for row in to_delete:
+                conn.execute(f"DELETE FROM {table} WHERE {where}", tuple(row[key] for key in key_columns))
+            for row in to_insert:
+                columns = list(row)
+                conn.execute(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                             tuple(row[column] for column in columns))
+            for key, columns in updates:
+                assignments = ", ".join(f"{column} = ?" for column in columns)
+                values = tuple(old_new[0 if undo else 1] for old_new in columns.values())
+                conn.execute(f"UPDATE {table} SET {assignments} WHERE {where}", values + tuple(key))
+
+    def touched_keys(self, table: str) -> list:
+        """First key column of every row of table the operation inserted, deleted or updated."""
+        keys = []
+        for change_table, removed, added, updates in self.changes:
+            if change_table == table:
+                first_key = TABLE_KEYS[table][0]
+                keys.extend(row[first_key] for row in removed + added)
+                keys.extend(key[0] for key, _columns in updates)
+        return keys
+
+    def __bool__(self):
+        return bool(self.changes)
+
+
+class OperationRecorder:
+    """Captures the rows an operation touches; see ShowRepository._journaled."""
+
+    def __init__(self, conn, label: str, kinds):
+        self.conn = conn
+        self.label = label
+        self.kinds = kinds
+        self._scopes = [] # [(table, column, values, {key: row} before)]
+
+    def track(self, table: str, column: str, values, existed: bool = True):
+        """
+        Records the rows of table whose column is in values. Call it before the write for rows
+        that may change or go away, and after it with existed=False for rows the write created.
+        """
+        values = list(values)
+        self._scopes.append((table, column, values, _capture(self.conn, table, column, values) if existed else {}))
+
+    def finish(self) -> Operation:
+        changes = []
+        for table, column, values, before in self._scopes:
+            after = _capture(self.conn, table, column, values)
+            removed = [row for key, row in before.items() if key not in after]
+            added = [row for key, row in after.items() if key not in before]
+            updates = []
+            for key, old_row in before.items():
+                new_row = after.get(key)
+                if new_row is None:
+                    continue
+                changed = {column_name: [old_row[column_name], new_row[column_name]]
+                           for column_name in old_row if old_row[column_name] != new_row[column_name]}
+                if changed:
+                    updates.append([list(key), changed])
+            if removed or added or updates:
+                changes.append([table, removed, added, updates])
+        return Operation(self.label, self.kinds, changes)
+
+    def commit_record(self, operation: Operation):
+        """Appends the operation to the journal table inside the current transaction."""
+        self.conn.execute(SQL_DROP_REDO) # A new operation ends the redo history
+        operation.seq = self.conn.execute(SQL_APPEND, (operation.label, operation.to_record())).lastrowid
+
+
+class OperationJournal(QObject):
+    """The in-memory undo and redo stacks over the operation_journal table."""
+    changed = pyqtSignal() # Undo or redo availability (or labels) changed
+
+    MAX_OPERATIONS = 200
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._undo = deque(maxlen=self.MAX_OPERATIONS)
+        self._redo = []
+
+    def load(self, conn):
+        """Rebuilds both stacks from the tail of the journal, e.g. after a restart or a crash."""
+        self._undo.clear()
+        self._redo.clear()
+        rows = conn.execute(SQL_TAIL, (self.MAX_OPERATIONS,)).fetchall()
+        for seq, label, record, undone in reversed(rows): # Oldest first
+            try:
+                operation = Operation.from_record(seq, label, record)
+            except (TypeError, ValueError, KeyError):
+                print(f"Warning: Skipping unreadable journal record {seq}.")
+                continue
+            if undone:
+                self._redo.insert(0, operation) # The earliest undone operation is redone first
+            else:
+                self._undo.append(operation)
+        self.changed.emit()
+
+    def trim(self, conn):
+        """Drops records that have fallen off the undo history."""
+        conn.execute(SQL_TRIM, (self.MAX_OPERATIONS,))
+
+    def recorded(self, operation: Operation):
+        if not operation:
+            return
+        self._undo.append(operation)
+        self._redo.clear()
+        self.changed.emit()
+
+    def undo_label(self) -> str | None:
+        return self._undo[-1].label if self._undo else None
+
+    def redo_label(self) -> str | None:
+        return self._redo[-1].label if self._redo else None
+
+    def take_undo(self) -> Operation | None:
+        return self._undo.pop() if self._undo else None
+
+    def take_redo(self) -> Operation | None:
+        return self._redo.pop() if self._redo else None
+
+    def undone(self, operation: Operation):
+        self._redo.append(operation)
+        self.changed.emit()
+
+    def redone(self, operation: Operation):
+        self._undo.append(operation)
+        self.changed.emit()
+
+    def restore_undo(self, operation: Operation):
+        """Puts back an operation whose undo failed."""
+        self._undo.append(operation)
+
+    def restore_redo(self, operation: Operation):
+        self._redo.append(operation)
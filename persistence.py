@@ -0,0 +1,332 @@
+# persistence.py
+"""
+Background persistence for the show database.
+
+PersistenceService owns a write connection on a worker thread, so hot paths (fader moves,
+live recording, timeline drags) queue their writes instead of waiting for the disk. Queued
+writes are grouped into one transaction per batch, each write inside its own savepoint so a
+failing statement only discards itself. Reads can be queued as well and run on a second,
+read-only connection, which WAL lets proceed while a write is in progress.
+
+Results come back as concurrent.futures.Future objects; on_done/on_error callbacks are
+delivered on the GUI thread.
+
+Optionally the show runs from RAM: every connection opens one shared-cache in-memory database
+that is loaded from the show file at startup and copied back to it by backup jobs on the reader thread (see
+open_memory_database and memory_backup_job). Anything written after the last backup is lost if
+the process dies, in exchange for writes that never wait for the disk. Shared-cache connections
+lock whole tables and a conflicting statement fails at once instead of waiting, so those
+connections are LockRetryConnections, which retry such statements for up to LOCK_RETRY_SECONDS.
+"""
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+
+MEMORY_DATABASE_URI = "file:lumenante_show?mode=memory&cache=shared"
+LOCK_RETRY_SECONDS = 5.0
+
+
+def _retry_locked(run):
+    """Calls run() until it stops failing with "locked", for up to LOCK_RETRY_SECONDS."""
+    deadline = time.monotonic() + LOCK_RETRY_SECONDS
+    while True:
+        try:
+            return run()
+        except sqlite3.OperationalError as e:
+            if "locked" not in str(e) or time.monotonic() > deadline:
+                raise
+            time.sleep(0.002)
+
+
+class LockRetryCursor(sqlite3.Cursor):
+    """A cursor whose statements wait out shared-cache table locks instead of failing."""
+
+    def execute(self, sql, parameters=()):
+        return _retry_locked(lambda: super(LockRetryCursor, self).execute(sql, parameters))
+
+    def executemany(self, sql, seq_of_parameters):
+        rows = list(seq_of_parameters)
+        if not self.connection.in_transaction:
+            return _retry_locked(lambda: super(LockRetryCursor, self).executemany(sql, rows))
+        # A lock can fail a later row after earlier ones were written, so each attempt is undone as a whole
+        def attempt():
+            super(LockRetryCursor, self).execute("SAVEPOINT lock_retry")
+            try:
+                super(LockRetryCursor, self).executemany(sql, rows)
+            except sqlite3.Error:
+                super(LockRetryCursor, self).execute("ROLLBACK TO lock_retry")
+                raise
+            finally:
+                super(LockRetryCursor, self).execute("RELEASE lock_retry")
+            return self
+        return _retry_locked(attempt)
+
+
+class LockRetryConnection(sqlite3.Connection):
+    """Connection factory for shared-cache connections; every cursor is a LockRetryCursor."""
+
+    def cursor(self, factory=LockRetryCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def configure_connection(conn: sqlite3.Connection, read_only: bool = False, in_memory: bool = False):
+    """Applies the pragmas every connection to the show database should use."""
+    conn.execute("PRAGMA foreign_keys = ON;")
+    conn.execute("PRAGMA busy_timeout = 5000;")
+    conn.execute("PRAGMA cache_size = -16000;") # 16 MB page cache
+    conn.execute("PRAGMA temp_store = MEMORY;")
+    # In memory the pages are in RAM, so WAL and syncing don't apply
+    if not in_memory and not read_only:
+        conn.execute("PRAGMA journal_mode = WAL;")
+        # In WAL mode NORMAL only syncs at checkpoints; a power cut can lose the last few
+        # commits but never corrupts the file.
+        conn.execute("PRAGMA synchronous = NORMAL;")
+
+
+def begin_immediate(conn: sqlite3.Connection):
+    """
+    Starts a write transaction on conn. busy_timeout covers file locks; a shared-cache table lock
+    fails at once with "locked", so that is retried here for up to LOCK_RETRY_SECONDS.
+    """
+    _retry_locked(lambda: conn.execute("BEGIN IMMEDIATE"))
+
+
+def open_memory_database(disk_path: str) -> sqlite3.Connection:
+    """
+    Opens the shared in-memory show database and loads it from disk_path if that exists. The
+    in-memory database lives as long as this connection stays open.
+    """
+    conn = sqlite3.connect(MEMORY_DATABASE_URI, uri=True, factory=LockRetryConnection)
+    if Path(disk_path).exists():
+        disk = sqlite3.connect(disk_path)
+        try:
+            disk.backup(conn)
+        finally:
+            disk.close()
+    configure_connection(conn, in_memory=True)
+    return conn
+
+
+def memory_backup_job(disk_path: str):
+    """
+    A submit_read job that copies the in-memory database to disk_path and returns the seconds it
+    took. The copy goes through its own connection, whose backup waits out any write transaction
+    in progress on the shared cache, so no transaction is ever half applied in the file.
+    """
+    def backup(_conn):
+        started = time.perf_counter()
+        source = sqlite3.connect(MEMORY_DATABASE_URI, uri=True)
+        target = sqlite3.connect(disk_path)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+        return time.perf_counter() - started
+    return backup
+
+
+class _Job:
+    __slots__ = ('fn', 'future', 'on_done', 'on_error')
+
+    def __init__(self, fn, on_done, on_error):
+        self.fn = fn
+        self.future = Future()
+        self.on_done = on_done
+        self.on_error = on_error
+
+
+_STOP = object()
+
+
+class PersistenceService(QObject):
+    """Queues database work onto a writer thread and a read-only reader thread."""
+    write_failed = pyqtSignal(str) # Emitted for failed writes that have no on_error callback
+    _deliver = pyqtSignal(object, object) # (callback, argument), queued onto the GUI thread
+
+    MAX_BATCH = 256
+
+    def __init__(self, db_path: str, parent=None, in_memory: bool = False):
+        super().__init__(parent)
+        self.db_path = db_path
+        self.in_memory = in_memory # Connect to MEMORY_DATABASE_URI instead of db_path
+        self._deliver.connect(self._run_callback) # Bound slot, so delivery is queued onto this object's thread
+        self._write_queue = queue.Queue()
+        self._read_queue = queue.Queue()
+        self._writer = threading.Thread(target=self._writer_loop, name="LumenanteDBWriter", daemon=True)
+        self._reader = threading.Thread(target=self._reader_loop, name="LumenanteDBReader", daemon=True)
+        self._closed = False
+        self._writer.start()
+        self._reader.start()
+
+    # --- Public API (any thread) ---
+
+    def submit_write(self, fn, on_done=None, on_error=None) -> Future:
+        """
+        Queues fn(conn) to run inside a transaction on the writer thread. fn must not commit.
+        The future resolves once the batch containing it has been committed.
+        """
+        return self._enqueue(self._write_queue, fn, on_done, on_error)
+
+    def execute(self, sql: str, params=(), on_done=None, on_error=None) -> Future:
+        """Queues a single write statement. Resolves to the cursor's lastrowid."""
+        return self.submit_write(lambda conn: conn.execute(sql, params).lastrowid, on_done, on_error)
+
+    def executemany(self, sql: str, rows, on_done=None, on_error=None) -> Future:
+        rows = list(rows)
+        return self.submit_write(lambda conn: conn.executemany(sql, rows).rowcount, on_done, on_error)
+
+    def submit_read(self, fn, on_done=None, on_error=None) -> Future:
+        """Queues fn(conn) on the read-only connection; it sees every write committed before it runs."""
+        return self._enqueue(self._read_queue, fn, on_done, on_error)
+
+    def submit_snapshot_read(self, fn, on_done=None, on_error=None) -> Future:
+        """
+        submit_read for a fn that reads inside one transaction (an export) and must see a
+        consistent snapshot. On disk, WAL gives the read-only connection that snapshot. In memory a
+        transaction would hold table locks that stall every writer until it ends, so fn runs against
+        a private backup copy instead.
+        """
+        if not self.in_memory:
+            return self.submit_read(fn, on_done, on_error)
+
+        def on_copy(conn):
+            copy = sqlite3.connect(":memory:")
+            try:
+                conn.backup(copy) # Waits out any write transaction in progress
+                return fn(copy)
+            finally:
+                copy.close()
+        return self.submit_read(on_copy, on_done, on_error)
+
+    def fetchall(self, sql: str, params=(), on_done=None, on_error=None) -> Future:
+        return self.submit_read(lambda conn: conn.execute(sql, params).fetchall(), on_done, on_error)
+
+    def flush(self, timeout: float | None = 5.0):
+        """Blocks until every write queued so far has been committed."""
+        if self._closed:
+            return
+        self.submit_write(lambda conn: None).result(timeout)
+
+    def close(self, timeout: float = 5.0):
+        """Commits outstanding writes and stops both worker threads."""
+        if self._closed:
+            return
+        self._closed = True
+        self._write_queue.put(_STOP)
+        self._read_queue.put(_STOP)
+        self._writer.join(timeout)
+        self._reader.join(timeout)
+
+    # --- Internals ---
+
+    def _enqueue(self, target_queue: queue.Queue, fn, on_done, on_error) -> Future:
+        job = _Job(fn, on_done, on_error)
+        if self._closed:
+            job.future.set_exception(RuntimeError("Persistence service is closed."))
+            return job.future
+        target_queue.put(job)
+        return job.future
+
+    def _run_callback(self, callback, argument):
+        callback(argument)
+
+    def _finish(self, job: _Job, result=None, error: Exception | None = None, is_write: bool = True):
+        if error is None:
+            job.future.set_result(result)
+            if job.on_done:
+                self._deliver.emit(job.on_done, result)
+            return
+        job.future.set_exception(error)
+        if job.on_error:
+            self._deliver.emit(job.on_error, error)
+        elif is_write:
+            print(f"Database write failed: {error}")
+            self.write_failed.emit(str(error))
+
+    def _connect(self, read_only: bool) -> sqlite3.Connection:
+        if self.in_memory:
+            conn = sqlite3.connect(MEMORY_DATABASE_URI, uri=True, isolation_level=None, factory=LockRetryConnection)
+        elif read_only:
+            conn = sqlite3.connect(f"{Path(self.db_path).resolve().as_uri()}?mode=ro", uri=True)
+        else:
+            conn = sqlite3.connect(self.db_path, isolation_level=None) # Transactions are managed explicitly
+        configure_connection(conn, read_only=read_only, in_memory=self.in_memory)
+        return conn
+
+    def _writer_loop(self):
+        conn = self._connect(read_only=False)
+        stopping = False
+        while not stopping:
+            job = self._write_queue.get()
+            if job is _STOP:
+                break
+            batch = [job]
+            while len(batch) < self.MAX_BATCH:
+                try:
+                    queued = self._write_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if queued is _STOP:
+                    stopping = True
+                    break
+                batch.append(queued)
+            self._run_write_batch(conn, batch)
+        conn.close()
+
+    def _run_write_batch(self, conn: sqlite3.Connection, batch: list):
+        outcomes = []
+        try:
+            begin_immediate(conn)
+        except sqlite3.Error as e:
+            for job in batch:
+                self._finish(job, error=e)
+            return
+        for job in batch:
+            if not job.future.set_running_or_notify_cancel():
+                continue
+            conn.execute("SAVEPOINT job")
+            try:
+                result = job.fn(conn)
+                conn.execute("RELEASE job")
+                outcomes.append((job, result, None))
+            except Exception as e:
+                conn.execute("ROLLBACK TO job")
+                conn.execute("RELEASE job")
+                outcomes.append((job, None, e))
+        try:
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            conn.execute("ROLLBACK")
+            outcomes = [(job, None, error or e) for job, _result, error in outcomes]
+        for job, result, error in outcomes:
+            self._finish(job, result, error)
+
+    def _reader_loop(self):
+        conn = None
+        while True:
+            job = self._read_queue.get()
+            if job is _STOP:
+                break
+            if not job.future.set_running_or_notify_cancel():
+                continue
+            try:
+                if conn is None:
+                    conn = self._connect(read_only=True)
+                self._finish(job, job.fn(conn), is_write=False)
+            except Exception as e:
+                self._finish(job, error=e, is_write=False)
+        if conn is not None:
+            conn.close()
@@ -0,0 +1,83 @@
+# playback_clock.py
+"""
+High-resolution timeline playback clock.
+
+QMediaPlayer reports its position at a coarse, platform-dependent interval, so driving fades
+and cue triggering from positionChanged steps them visibly. PlaybackClock instead ticks at the
+output frame rate and computes the position from a monotonic timer. While audio plays, each
+reported media position is fed to sync(): small differences are slewed out a fraction at a
+time (the reports themselves jitter), large ones (a seek, a stall) snap the clock to the media.
+Without audio the clock simply free-runs. The position never runs backwards between ticks
+unless the clock is explicitly moved.
+"""
+from PyQt6.QtCore import QObject, QElapsedTimer, QTimer, Qt, pyqtSignal
+
+DEFAULT_FRAME_RATE = 60
+SNAP_THRESHOLD_S = 0.25 # Larger media/clock differences resynchronise immediately
+DRIFT_GAIN = 0.1 # Fraction of a smaller difference corrected per media report
+
+
+class PlaybackClock(QObject):
+    ticked = pyqtSignal(float) # Position in seconds, once per frame while running
+
+    def __init__(self, parent=None, frame_rate: int = DEFAULT_FRAME_RATE):
+        super().__init__(parent)
+        self._elapsed = QElapsedTimer()
+        self._elapsed.start()
+        self._anchor_position_s = 0.0 # Position at _anchor_ms on the monotonic timer
+        self._anchor_ms = 0
+        self._last_position_s = 0.0
+        self.rate = 1.0
+        self.running = False
+
+        self._timer = QTimer(self)
+        self._timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._timer.timeout.connect(self._tick)
+        self.set_frame_rate(frame_rate)
+
+    def set_frame_rate(self, frame_rate: int):
+        self._timer.setInterval(max(1, round(1000 / max(1, frame_rate))))
+
+    def position(self) -> float:
+        if not self.running:
+            return self._anchor_position_s
+        return self._anchor_position_s + (self._elapsed.elapsed() - self._anchor_ms) / 1000.0 * self.rate
+
+    def start(self, position_s: float | None = None):
+        self._set_anchor(self.position() if position_s is None else position_s)
+        self.running = True
+        self._timer.start()
+
+    def pause(self):
+        self._set_anchor(self.position())
+        self.running = False
+        self._timer.stop()
+
+    def stop(self):
+        self.running = False
+        self._timer.stop()
+        self._set_anchor(0.0)
+
+    def seek(self, position_s: float):
+        self._set_anchor(position_s)
+
+    def sync(self, media_position_s: float):
+        """Slaves the clock to a reported media position."""
+        if not self.running:
+            self._set_anchor(media_position_s)
+            return
+        error_s = media_position_s - self.position()
+        if abs(error_s) > SNAP_THRESHOLD_S:
+            self._set_anchor(media_position_s)
+        else:
+            self._anchor_position_s += error_s * DRIFT_GAIN
+
+    def _set_anchor(self, position_s: float):
+        self._anchor_position_s = position_s
+        self._anchor_ms = self._elapsed.elapsed()
+        self._last_position_s = position_s
+
+    def _tick(self):
+        position_s = max(self._last_position_s, self.position()) # Slewing back must not rewind a tick
+        self._last_position_s = position_s
+        self.ticked.emit(position_s)
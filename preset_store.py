@@ -0,0 +1,146 @@
+# preset_store.py
+"""
+Preset storage in the normalized preset_values table, with a per-preset dense cache.
+
+Presets used to keep every fixture's values as one JSON blob in presets.data, which had to be
+parsed in full for every apply and every timeline seek. Values now live in
+preset_values(preset_id, fixture_id, param, value), and PresetStore keeps each preset it has
+loaded as a DensePreset: a fixture x parameter array with a fixture index, so resolving a
+preset for one fixture, a group or a seek is a dictionary lookup plus a row read.
+"""
+import json
+import math
+
+import numpy as np
+
+
+def ensure_schema(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS preset_values (
+            preset_id INTEGER NOT NULL, fixture_id INTEGER NOT NULL, param TEXT NOT NULL, value,
+            PRIMARY KEY (preset_id, fixture_id, param),
+            FOREIGN KEY(preset_id) REFERENCES presets(id) ON DELETE CASCADE
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_preset_values_fixture ON preset_values(fixture_id)")
+
+
+def preset_value_rows(preset_id: int, data_map: dict) -> list[tuple]:
+    """preset_values rows for {fixture_id (str or int): {param: value}}."""
+    rows = []
+    for fixture_id_str, params in data_map.items():
+        try:
+            fixture_id = int(fixture_id_str)
+        except (TypeError, ValueError):
+            continue
+        for param, value in params.items():
+            rows.append((preset_id, fixture_id, param, value))
+    return rows
+
+
+def write_preset_values(cursor, preset_id: int, data_map: dict):
+    """Replaces a preset's values with {fixture_id (str or int): {param: value}}."""
+    cursor.execute("DELETE FROM preset_values WHERE preset_id = ?", (preset_id,))
+    cursor.executemany("INSERT INTO preset_values (preset_id, fixture_id, param, value) VALUES (?, ?, ?, ?)",
+                       preset_value_rows(preset_id, data_map))
+
+
+def migrate_blob_presets(cursor) -> int:
+    """
+    Moves values still stored in the legacy presets.data JSON blob into preset_values and
+    empties the blob. Returns the number of presets migrated; safe to run on every start.
+    """
+    cursor.execute("SELECT id, data FROM presets WHERE data IS NOT NULL AND data NOT IN ('', '{}')")
+    migrated = 0
+    for preset_id, data_str in cursor.fetchall():
+        try:
+            data_map = json.loads(data_str)
+        except (TypeError, json.JSONDecodeError):
+            print(f"Warning: Preset {preset_id} has unreadable data and was not migrated.")
+            continue
+        if isinstance(data_map, dict):
+            write_preset_values(cursor, preset_id, data_map)
+        cursor.execute("UPDATE presets SET data = '{}' WHERE id = ?", (preset_id,))
+        migrated += 1
+    return migrated
+
+
+class DensePreset:
+    """One preset's values as a fixture x parameter array; missing values are NaN."""
+
+    def __init__(self, preset_id: int, preset_number: str, preset_type: str, rows: list[tuple]):
+        self.preset_id = preset_id
+        self.preset_number = preset_number
+        self.preset_type = preset_type
+
+        fixture_ids = sorted({row[0] for row in rows})
+        self.params = tuple(sorted({row[1] for row in rows}))
+        self.fixture_ids = np.array(fixture_ids, dtype=np.int64)
+        self._row_of = {fixture_id: index for index, fixture_id in enumerate(fixture_ids)}
+        self._col_of = {param: index for index, param in enumerate(self.params)}
+        self.values = np.full((len(fixture_ids), len(self.params)), np.nan)
+        int_columns = [True] * len(self.params)
+        for fixture_id, param, value in rows:
+            try:
+                number = float(value)
+            except (TypeError, ValueError):
+                continue # Every preset parameter is numeric; anything else is ignored
+            col = self._col_of[param]
+            self.values[self._row_of[fixture_id], col] = number
+            if not isinstance(value, int):
+                int_columns[col] = False
+        # Integer parameters (colour, brightness) come back as ints, as they were stored.
+        self._int_columns = tuple(int_columns)
+
+    def __contains__(self, fixture_id: int) -> bool:
+        return fixture_id in self._row_of
+
+    def params_for(self, fixture_id: int, keys) -> dict:
+        """Returns the subset of keys this preset stores for the fixture."""
+        row = self._row_of.get(fixture_id)
+        if row is None:
+            return {}
+        result = {}
+        values_row = self.values[row]
+        for key in keys:
+            col = self._col_of.get(key)
+            if col is None:
+                continue
+            value = values_row[col]
+            if math.isnan(value):
+                continue
+            result[key] = int(value) if self._int_columns[col] else float(value)
+        return result
+
+    def to_data_map(self) -> dict:
+        """The legacy {fixture_id_str: {param: value}} form, for export and display."""
+        return {str(int(fixture_id)): self.params_for(int(fixture_id), self.params) for fixture_id in self.fixture_ids}
+
+
+class PresetStore:
+    """Loads presets by number from the database and caches them as DensePreset objects."""
+
+    def __init__(self, db_connection):
+        self.db_connection = db_connection
+        self._cache = {} # {preset_number: DensePreset | None}
+
+    def get(self, preset_number: str) -> DensePreset | None:
+        if preset_number in self._cache:
+            return self._cache[preset_number]
+        cursor = self.db_connection.cursor()
+        cursor.execute("SELECT id, type FROM presets WHERE preset_number = ?", (preset_number,))
+        preset_row = cursor.fetchone()
+        preset = None
+        if preset_row:
+            preset_id, preset_type = preset_row
+            cursor.execute("SELECT fixture_id, param, value FROM preset_values WHERE preset_id = ?", (preset_id,))
+            preset = DensePreset(preset_id, preset_number, preset_type, cursor.fetchall())
+        self._cache[preset_number] = preset
+        return preset
+
+    def invalidate(self, preset_number: str | None = None):
+        """Drops one cached preset, or all of them."""
+        if preset_number is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(preset_number, None)
@@ -0,0 +1,612 @@
+# roblox_bridge.py
+"""
+Protocol helpers for the Roblox HTTP bridge.
+
+Everything in here is free of Qt so it can be driven both by RobloxHTTPManager
+inside the application and by standalone tools.
+"""
+import bisect
+import gzip
+import itertools
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+
+from aiohttp import web
+
+
+class BridgeClock:
+    """Monotonic millisecond clock that Roblox clients synchronise against through /time."""
+
+    def __init__(self):
+        self._origin = time.monotonic()
+
+    def now_ms(self) -> float:
+        return (time.monotonic() - self._origin) * 1000.0
+
+
+def estimate_clock_offset(t0: float, t1: float, t2: float, t3: float) -> tuple[float, float]:
+    """
+    Classic NTP estimate from a single exchange.
+    t0/t3 are the client's send/receive times, t1/t2 the server's receive/send times.
+    Returns (offset_ms, round_trip_ms) where server_time = client_time + offset.
+    """
+    offset = ((t1 - t0) + (t2 - t3)) / 2.0
+    round_trip = (t3 - t0) - (t2 - t1)
+    return offset, round_trip
+
+
+class ClockSyncEstimator:
+    """
+    Client-side view of the bridge clock.
+    Keeps the last few /time exchanges and trusts the one with the lowest round trip,
+    since that sample had the least room for asymmetric network delay.
+    """
+
+    def __init__(self, window: int = 8):
+        self.samples = deque(maxlen=max(1, window))
+
+    def add_sample(self, t0: float, t1: float, t2: float, t3: float):
+        offset, round_trip = estimate_clock_offset(t0, t1, t2, t3)
+        self.samples.append((max(0.0, round_trip), offset))
+
+    @property
+    def is_synced(self) -> bool:
+        return bool(self.samples)
+
+    @property
+    def offset_ms(self) -> float:
+        return min(self.samples)[1] if self.samples else 0.0
+
+    @property
+    def round_trip_ms(self) -> float:
+        return min(self.samples)[0] if self.samples else 0.0
+
+    def to_server_time(self, local_ms: float) -> float:
+        return local_ms + self.offset_ms
+
+    def to_local_time(self, server_ms: float) -> float:
+        return server_ms - self.offset_ms
+
+
+def parse_position_report(data) -> tuple[dict[int, tuple[float, float, float]], int]:
+    """
+    Validates a /report_positions payload of {"<FID>": [x, y, z]}.
+    Returns ({fid: (x, y, z)}, number of rejected entries). Raises ValueError if data is not a map.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Expected a JSON object of FID -> [x, y, z].")
+    positions = {}
+    rejected = 0
+    for fid_str, pos_list in data.items():
+        try:
+            fid = int(fid_str)
+            if not isinstance(pos_list, list) or len(pos_list) != 3:
+                raise ValueError
+            positions[fid] = (float(pos_list[0]), float(pos_list[1]), float(pos_list[2]))
+        except (ValueError, TypeError):
+            rejected += 1
+    return positions, rejected
+
+
+def is_command_key(key: str) -> bool:
+    """Negative FIDs carry commands (-1 get_positions, -2 update_selection) and go to every client."""
+    return key.startswith('-')
+
+
+class Subscription:
+    """
+    Describes which fixtures a client renders. A fixture is included if it matches any of
+    the given criteria; a subscription with no criteria receives every fixture.
+    """
+
+    def __init__(self, fid_range: tuple[int, int] | None = None, fids=None, groups=None, zone=None):
+        self.fid_range = (int(fid_range[0]), int(fid_range[1])) if fid_range else None
+        self.fids = frozenset(int(f) for f in fids) if fids else frozenset()
+        self.groups = frozenset(int(g) for g in groups) if groups else frozenset()
+        self.zone = None
+        if zone:
+            lo = [float(v) for v in zone['min']]
+            hi = [float(v) for v in zone['max']]
+            if len(lo) != 3 or len(hi) != 3:
+                raise ValueError("zone min/max must be [x, y, z]")
+            self.zone = (tuple(min(a, b) for a, b in zip(lo, hi)), tuple(max(a, b) for a, b in zip(lo, hi)))
+
+    @classmethod
+    def from_json(cls, data: dict) -> 'Subscription':
+        """Builds a subscription from a /subscribe body. Raises ValueError on malformed filters."""
+        try:
+            return cls(fid_range=data.get('fid_range'), fids=data.get('fids'),
+                       groups=data.get('groups'), zone=data.get('zone'))
+        except (TypeError, KeyError, IndexError) as e:
+            raise ValueError(f"Invalid subscription: {e}") from e
+
+    @property
+    def is_everything(self) -> bool:
+        return not (self.fid_range or self.fids or self.groups or self.zone)
+
+    @property
+    def key(self) -> str:
+        """Canonical form; clients with equal keys share resolution and encoded responses."""
+        return json.dumps([self.fid_range, sorted(self.fids), sorted(self.groups), self.zone])
+
+    def _in_zone(self, position) -> bool:
+        lo, hi = self.zone
+        return all(lo[i] <= position[i] <= hi[i] for i in range(3))
+
+    def matches_fid(self, key: str) -> bool:
+        """FID criteria need no directory, so they also cover fixtures not yet patched."""
+        if not (self.fids or self.fid_range):
+            return False
+        try:
+            fid = int(key)
+        except ValueError:
+            return False
+        return fid in self.fids or bool(self.fid_range and self.fid_range[0] <= fid <= self.fid_range[1])
+
+    def resolve(self, directory: dict) -> 'ResolvedSubscription | None':
+        """
+        Resolves group and zone criteria against a fixture directory
+        {fid_str: {'positions': [(x, y, z), ...], 'groups': set}}.
+        Returns a container of FID keys to deliver, or None for everything.
+        """
+        if self.is_everything:
+            return None
+        matched = set()
+        if self.groups or self.zone:
+            for fid_str, info in directory.items():
+                if self.groups and not self.groups.isdisjoint(info.get('groups', ())):
+                    matched.add(fid_str)
+                elif self.zone and any(self._in_zone(pos) for pos in info.get('positions', ())):
+                    matched.add(fid_str)
+        return ResolvedSubscription(self, frozenset(matched))
+
+
+class ResolvedSubscription:
+    """Supports `key in resolved` for a subscription whose group and zone criteria have been resolved."""
+
+    def __init__(self, subscription: Subscription, matched: frozenset):
+        self.subscription = subscription
+        self.matched = matched
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.matched or self.subscription.matches_fid(key)
+
+    def count(self, directory: dict) -> int:
+        return sum(1 for key in directory if key in self)
+
+
+class ClientSession:
+    """Per-client delivery state: a cursor into the update log and an optional subscription."""
+
+    def __init__(self, client_id: str, now_ms: float):
+        self.client_id = client_id
+        self.cursor = 0
+        self.subscription = Subscription()
+        self.needs_snapshot = True
+        self.last_seen_ms = now_ms
+        self.held_frames = {} # Legacy clients only: {apply_at_ms: {key: params}} not yet due
+        self.snapshot_keys = None # Keys still to send while a snapshot is being paged out
+        self.snapshot_offset = 0
+        self.snapshot_marker = None # (cursor, due counter) identifying the state the snapshot was taken from
+
+
+class BridgeHub:
+    """
+    Fans fixture updates out to any number of polling clients.
+
+    Every update is appended to a sequence-numbered log. Each client session keeps its own
+    cursor, so one poller no longer drains updates meant for another. Clients that are new,
+    re-subscribed or have fallen behind the retained log receive a snapshot of the latest
+    state instead. Scheduled updates (apply_at_ms on the BridgeClock) stay in the log as
+    future frames until they are due, at which point they are folded into the latest state.
+
+    No single response carries more than max_frame_updates fixtures; larger snapshots and
+    backlogs are paged out over consecutive polls with "more": true.
+    """
+
+    def __init__(self, clock: BridgeClock, max_log_entries: int = 20000,
+                 session_timeout_ms: float = 60000.0, encoded_cache_size: int = 64,
+                 max_frame_updates: int = 2000, gzip_min_bytes: int = 1024):
+        self.clock = clock
+        self.max_frame_updates = max(1, max_frame_updates)
+        self.gzip_min_bytes = gzip_min_bytes
+        self.max_log_entries = max_log_entries
+        self.session_timeout_ms = session_timeout_ms
+        self.encoded_cache_size = encoded_cache_size
+        self.on_clients_changed = None # Optional callback(int), called outside the lock
+
+        self._lock = threading.Lock()
+        self._entries = [] # [(seq, effective_ms, key, params)], contiguous seq
+        self._head_seq = 0
+        self._latest_state = {} # {key: params} of every update that has taken effect
+        self._future = [] # sorted [(apply_at_ms, seq, key, params)] not yet taken effect
+        self._future_seqs = set()
+        self._due_counter = 0 # Bumped whenever a scheduled update takes effect
+        self._sessions = {}
+        self._directory = {}
+        self._directory_version = 0
+        self._resolved = {} # {subscription key: (directory_version, ResolvedSubscription | None)}
+        self._encoded_cache = OrderedDict()
+
+    # --- Publishing (GUI thread) ---
+
+    def publish(self, key: str, params: dict, apply_at_ms: float | None = None):
+        with self._lock:
+            now = self.clock.now_ms()
+            self._promote_due_locked(now)
+            self._head_seq += 1
+            seq = self._head_seq
+            params = dict(params)
+            if apply_at_ms is not None and apply_at_ms > now:
+                self._entries.append((seq, float(apply_at_ms), key, params))
+                bisect.insort(self._future, (float(apply_at_ms), seq, key, params))
+                self._future_seqs.add(seq)
+            else:
+                self._entries.append((seq, now, key, params))
+                if not is_command_key(key):
+                    self._latest_state.setdefault(key, {}).update(params)
+            if len(self._entries) > self.max_log_entries:
+                self._trim_locked()
+
+    def clear(self):
+        """Drops all buffered state; every client resynchronises with a snapshot."""
+        with self._lock:
+            self._entries.clear()
+            self._latest_state.clear()
+            self._future.clear()
+            self._future_seqs.clear()
+            self._encoded_cache.clear()
+            for session in self._sessions.values():
+                session.needs_snapshot = True
+                session.held_frames.clear()
+                session.snapshot_keys = None
+
+    def has_pending(self) -> bool:
+        with self._lock:
+            return any(session.cursor < self._head_seq for session in self._sessions.values())
+
+    def set_directory(self, directory: dict):
+        """Replaces the fixture directory used to resolve group and zone subscriptions."""
+        with self._lock:
+            self._directory = directory
+            self._directory_version += 1
+            self._resolved.clear()
+            self._encoded_cache.clear()
+
+    # --- Client side (server thread) ---
+
+    def subscribe(self, client_id: str, subscription: Subscription) -> int | None:
+        """Sets a client's subscription. Returns the number of fixtures it resolves to, or None for all."""
+        with self._lock:
+            session, created = self._get_session_locked(client_id, self.clock.now_ms())
+            session.subscription = subscription
+            session.needs_snapshot = True
+            session.held_frames.clear()
+            session.snapshot_keys = None
+            allowed = self._resolve_locked(subscription)
+            matched = None if allowed is None else allowed.count(self._directory)
+        if created:
+            self._notify_clients_changed()
+        return matched
+
+    def client_count(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def poll(self, client_id: str, frames_format: bool, cursor: int | None = None,
+             accept_gzip: bool = False) -> tuple[bytes | None, int, bool]:
+        """
+        Builds the response for one poll and advances the client's cursor.
+        frames_format selects the versioned {cursor, snapshot, more, frames} body; otherwise the
+        legacy flat {FID: params} map is returned with future frames held back until due.
+        A client-supplied cursor (its last acknowledged one) overrides the stored cursor.
+
+        Returns (body, cursor, gzipped). body is None when a versioned client has nothing new,
+        so the caller can answer without a payload; legacy clients always get a JSON map.
+        """
+        clients_changed = False
+        with self._lock:
+            now = self.clock.now_ms()
+            clients_changed = self._expire_sessions_locked(now)
+            self._promote_due_locked(now)
+            session, created = self._get_session_locked(client_id, now)
+            clients_changed = clients_changed or created
+            session.last_seen_ms = now
+            if cursor is not None and session.snapshot_keys is None:
+                session.cursor = cursor
+
+            if session.snapshot_keys is None:
+                first_retained_seq = self._entries[0][0] if self._entries else self._head_seq + 1
+                if (session.needs_snapshot or session.cursor < first_retained_seq - 1
+                        or session.cursor > self._head_seq):
+                    self._begin_snapshot_locked(session)
+
+            legacy_due = not frames_format and any(at <= now for at in session.held_frames)
+            if session.snapshot_keys is None and session.cursor == self._head_seq and not legacy_due:
+                # Idle poll: nothing new for this cursor, skip collection and encoding entirely.
+                result = (None if frames_format else b'{}', session.cursor, False)
+            else:
+                result = self._build_response_locked(session, frames_format, accept_gzip, now)
+            self._trim_locked()
+        if clients_changed:
+            self._notify_clients_changed()
+        return result
+
+    def _begin_snapshot_locked(self, session: ClientSession):
+        allowed = self._resolve_locked(session.subscription)
+        session.snapshot_keys = sorted(key for key in self._latest_state if allowed is None or key in allowed)
+        session.snapshot_offset = 0
+        session.snapshot_marker = (self._head_seq, self._due_counter)
+        session.cursor = self._head_seq
+        session.needs_snapshot = False
+        session.held_frames.clear()
+
+    def _build_response_locked(self, session: ClientSession, frames_format: bool,
+                               accept_gzip: bool, now: float) -> tuple[bytes | None, int, bool]:
+        subscription = session.subscription
+        paging_snapshot = session.snapshot_keys is not None
+        marker = ('snapshot', session.snapshot_marker, session.snapshot_offset) if paging_snapshot else session.cursor
+        cache_key = (frames_format, accept_gzip, subscription.key, self._directory_version,
+                     marker, self._head_seq, self._due_counter)
+        cacheable = frames_format or not session.held_frames
+
+        cached = self._encoded_cache.get(cache_key) if cacheable else None
+        if cached is None:
+            allowed = self._resolve_locked(subscription)
+            if paging_snapshot:
+                immediate, future, next_cursor, next_offset = self._collect_snapshot_page_locked(session, allowed)
+            else:
+                immediate, future, next_cursor = self._collect_incremental_locked(session, allowed)
+                next_offset = None
+            more = next_offset is not None or next_cursor < self._head_seq
+
+            if frames_format:
+                if paging_snapshot or immediate or future:
+                    frames = [{'apply_at': None, 'updates': immediate}] if immediate else []
+                    frames += [{'apply_at': at, 'updates': future[at]} for at in sorted(future)]
+                    body = json.dumps({'cursor': next_cursor, 'snapshot': paging_snapshot,
+                                       'more': more, 'frames': frames}).encode()
+                else:
+                    body = None
+            else:
+                cacheable = cacheable and not future
+                for apply_at, updates in future.items():
+                    held = session.held_frames.setdefault(apply_at, {})
+                    for key, params in updates.items():
+                        held.setdefault(key, {}).update(params)
+                flat = {}
+                for apply_at in sorted(at for at in session.held_frames if at <= now):
+                    for key, params in session.held_frames.pop(apply_at).items():
+                        flat.setdefault(key, {}).update(params)
+                for key, params in immediate.items():
+                    flat.setdefault(key, {}).update(params)
+                body = json.dumps(flat).encode()
+
+            gzipped = False
+            if body is not None and accept_gzip and len(body) >= self.gzip_min_bytes:
+                body = gzip.compress(body, compresslevel=5)
+                gzipped = True
+            cached = (body, gzipped, next_cursor, next_offset)
+            if cacheable:
+                self._store_encoded_locked(cache_key, cached)
+
+        body, gzipped, next_cursor, next_offset = cached
+        session.cursor = next_cursor
+        if next_offset is None:
+            session.snapshot_keys = None
+            session.snapshot_offset = 0
+        else:
+            session.snapshot_offset = next_offset
+        return body, next_cursor, gzipped
+
+    # --- Internals (lock held) ---
+
+    def _get_session_locked(self, client_id: str, now: float) -> tuple[ClientSession, bool]:
+        session = self._sessions.get(client_id)
+        if session is not None:
+            return session, False
+        session = ClientSession(client_id, now)
+        self._sessions[client_id] = session
+        return session, True
+
+    def _expire_sessions_locked(self, now: float) -> bool:
+        expired = [cid for cid, s in self._sessions.items() if now - s.last_seen_ms > self.session_timeout_ms]
+        for cid in expired:
+            del self._sessions[cid]
+        return bool(expired)
+
+    def _notify_clients_changed(self):
+        if self.on_clients_changed:
+            self.on_clients_changed(self.client_count())
+
+    def _promote_due_locked(self, now: float):
+        """Folds scheduled updates whose time has come into the latest state, in time order."""
+        while self._future and self._future[0][0] <= now:
+            _apply_at, seq, key, params = self._future.pop(0)
+            self._future_seqs.discard(seq)
+            self._due_counter += 1
+            if not is_command_key(key):
+                self._latest_state.setdefault(key, {}).update(params)
+
+    def _resolve_locked(self, subscription: Subscription) -> ResolvedSubscription | None:
+        cached = self._resolved.get(subscription.key)
+        if cached and cached[0] == self._directory_version:
+            return cached[1]
+        allowed = subscription.resolve(self._directory)
+        self._resolved[subscription.key] = (self._directory_version, allowed)
+        return allowed
+
+    def _collect_snapshot_page_locked(self, session: ClientSession, allowed) -> tuple[dict, dict, int, int | None]:
+        """
+        Returns (immediate, {apply_at: updates}, cursor, next offset or None when done) for the
+        next page of a snapshot. Pages read the current state, which is never older than the
+        snapshot's cursor; the log replayed after the last page brings the client fully up to date.
+        """
+        start = session.snapshot_offset
+        keys = session.snapshot_keys[start:start + self.max_frame_updates]
+        immediate = {key: dict(self._latest_state[key]) for key in keys if key in self._latest_state}
+        next_offset = start + len(keys)
+        future = {}
+        if next_offset < len(session.snapshot_keys):
+            return immediate, future, session.cursor, next_offset
+        for apply_at, _seq, key, params in self._future:
+            if allowed is None or key in allowed or is_command_key(key):
+                future.setdefault(apply_at, {}).setdefault(key, {}).update(params)
+        return immediate, future, session.cursor, None
+
+    def _collect_incremental_locked(self, session: ClientSession, allowed) -> tuple[dict, dict, int]:
+        """
+        Returns (immediate updates, {apply_at: updates}, new cursor) for the client's range of the
+        log, stopping once max_frame_updates matching entries have been collected.
+        """
+        immediate = {}
+        future = {}
+        first_seq = self._entries[0][0] if self._entries else self._head_seq + 1
+        start_index = max(0, session.cursor + 1 - first_seq)
+        next_cursor = self._head_seq
+        due = []
+        collected = 0
+        for seq, effective_ms, key, params in itertools.islice(self._entries, start_index, None):
+            if collected >= self.max_frame_updates:
+                next_cursor = seq - 1
+                break
+            if not (allowed is None or key in allowed or is_command_key(key)):
+                continue
+            collected += 1
+            if seq in self._future_seqs:
+                future.setdefault(effective_ms, {}).setdefault(key, {}).update(params)
+            else:
+                due.append((effective_ms, seq, key, params))
+        # Fixtures that changed get their current state rather than a replay of the partial
+        # updates, so a scheduled update that took effect between polls can't be overtaken by an
+        # older one the client only hears about now.
+        due.sort(key=lambda item: (item[0], item[1]))
+        for _effective, _seq, key, params in due:
+            if key in self._latest_state:
+                immediate[key] = dict(self._latest_state[key])
+            else:
+                immediate.setdefault(key, {}).update(params)
+        return immediate, future, next_cursor
+
+    def _store_encoded_locked(self, cache_key, response: tuple):
+        self._encoded_cache[cache_key] = response
+        while len(self._encoded_cache) > self.encoded_cache_size:
+            self._encoded_cache.popitem(last=False)
+
+    def _trim_locked(self):
+        """Drops log entries every session has consumed, and caps the log length."""
+        floor = min((s.cursor for s in self._sessions.values()), default=self._head_seq)
+        drop = 0
+        for seq, *_rest in self._entries:
+            if seq > floor or seq in self._future_seqs:
+                break
+            drop += 1
+        drop = max(drop, len(self._entries) - self.max_log_entries)
+        if drop > 0:
+            del self._entries[:drop]
+
+
+class BridgeRoutes:
+    """
+    aiohttp handlers for the bridge endpoints, shared by RobloxHTTPManager and the headless
+    bridge simulator. on_positions_reported(positions, rejected_count) receives parsed reports.
+    """
+
+    def __init__(self, hub: BridgeHub, on_positions_reported=None):
+        self.hub = hub
+        self.on_positions_reported = on_positions_reported
+
+    def make_app(self) -> web.Application:
+        app = web.Application(client_max_size=16 * 1024 * 1024) # Position reports from large maps exceed the 1 MB default
+        app.router.add_get("/get_updates", self.get_updates)
+        app.router.add_get("/time", self.handle_time_sync)
+        app.router.add_post("/subscribe", self.handle_subscribe)
+        app.router.add_post("/report_positions", self.handle_report_positions)
+        return app
+
+    @staticmethod
+    def _client_id(request) -> str:
+        # Servers that don't identify themselves share one session, matching the old single-buffer behaviour.
+        return request.query.get('client_id') or 'default'
+
+    async def get_updates(self, request):
+        """
+        Web handler for Roblox to poll for changes.
+        Each ?client_id=<id> gets its own cursor into the update log, so several Roblox servers
+        can poll side by side. Clients that pass ?v=2 receive {cursor, snapshot, more, frames},
+        or an empty 204/304 when nothing changed; older clients get the flat FID map.
+        ?cursor=<n> resumes from a client-held cursor. Large bodies are gzipped when accepted.
+        """
+        cursor = None
+        if 'cursor' in request.query:
+            try:
+                cursor = int(request.query['cursor'])
+            except ValueError:
+                return web.Response(text="Invalid cursor.", status=400)
+        accept_gzip = 'gzip' in request.headers.get('Accept-Encoding', '')
+        # Read before polling: every scheduled frame due by this time is part of the response,
+        # so clients apply held frames up to it before the immediate frame.
+        server_time = self.hub.clock.now_ms()
+        body, cursor, gzipped = self.hub.poll(self._client_id(request), request.query.get('v') == '2', cursor, accept_gzip)
+        headers = {'X-Lumenante-Server-Time': f"{server_time:.3f}", 'ETag': f'"{cursor}"'}
+        if body is None:
+            # Nothing new since the client's cursor; 304 for clients that revalidate with If-None-Match.
+            status = 304 if request.headers.get('If-None-Match') == headers['ETag'] else 204
+            return web.Response(status=status, headers=headers)
+        if gzipped:
+            headers['Content-Encoding'] = 'gzip'
+        return web.Response(body=body, content_type='application/json', headers=headers)
+
+    async def handle_subscribe(self, request):
+        """
+        Web handler for a client to restrict which fixtures it receives.
+        Body: {"client_id", "fid_range": [a, b], "fids": [...], "groups": [...], "zone": {"min": [x, y, z], "max": [x, y, z]}}.
+        Criteria are combined as a union; an empty subscription receives everything.
+        """
+        try:
+            data = await request.json()
+        except Exception:
+            return web.Response(text="Invalid JSON.", status=400)
+        if not isinstance(data, dict):
+            return web.Response(text="Invalid data format.", status=400)
+        try:
+            subscription = Subscription.from_json(data)
+        except ValueError as e:
+            return web.Response(text=str(e), status=400)
+        client_id = str(data.get('client_id') or self._client_id(request))
+        matched = self.hub.subscribe(client_id, subscription)
+        return web.json_response({'client_id': client_id, 'fixtures': matched})
+
+    async def handle_time_sync(self, request):
+        """
+        NTP-style clock exchange. The client sends its local send time as ?t0=<ms> and
+        combines the echoed t0 with the server's receive (t1) and send (t2) times and its own
+        receive time to estimate clock offset and round trip.
+        """
+        t1 = self.hub.clock.now_ms()
+        try:
+            t0 = float(request.query.get('t0', 0.0))
+        except ValueError:
+            return web.Response(text="Invalid t0.", status=400)
+        return web.json_response({'t0': t0, 't1': t1, 't2': self.hub.clock.now_ms()})
+        
+    async def handle_report_positions(self, request):
+        """
+        Web handler to receive position data from Roblox.
+        The payload is parsed and validated here, on the server thread, so large maps only hand
+        the application a ready {fid: (x, y, z)} dict.
+        """
+        try:
+            data = await request.json()
+            try:
+                positions, rejected = parse_position_report(data)
+            except ValueError:
+                return web.Response(text="Invalid data format.", status=400)
+            if self.on_positions_reported:
+                self.on_positions_reported(positions, rejected)
+            return web.Response(text=f"Positions received: {len(positions)}.", status=200)
+        except Exception as e:
+            print(f"Error handling reported positions: {e}")
+            return web.Response(text=f"Server error: {e}", status=500)
@@ -0,0 +1,574 @@
+# show_io.py
+"""
+Show file import and export.
+
+ShowExporter writes the show straight from the database to disk, one section at a time and one
+compact element per line, led by a manifest that lists the sections and their sizes. Files
+ending in .gz are gzip-compressed, and files ending in .zst use zstd when the zstandard package
+is installed; either container is recognised on import by its magic bytes.
+
+ShowFileReader walks a show file section by section without loading it whole: array sections
+(fixtures, presets, timeline events, ...) are yielded one element at a time, so memory use is
+bounded by the largest single element rather than by the file. ShowImporter writes those
+elements into the database in a single transaction, in executemany batches, with ids assigned
+in memory so no row has to be read back. If anything fails, the transaction is rolled back and
+the show that was loaded before is left untouched. The importer can also run as a
+PersistenceService write job, inside the writer thread's transaction.
+
+An import can replace only some sections (e.g. PATCH_AND_PRESETS) and keep the rest of the show;
+it stops reading the file once those are in, and the manifest tells up front whether the file
+has them at all.
+"""
+import codecs
+import gzip
+import itertools
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+from preset_store import preset_value_rows
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+SHOW_FORMAT = "lumenante-show"
+SHOW_FORMAT_VERSION = 2 # 1: plain JSON without a manifest
+
+_WHITESPACE = ' \t\n\r'
+_GZIP_MAGIC = b'\x1f\x8b'
+_ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+PATCH_AND_PRESETS = ('fixture_profiles', 'fixtures', 'fixture_groups', 'presets')
+
+
+def compression_for_path(file_path: str) -> str | None:
+    """'gzip', 'zstd' or None, from the file name."""
+    lowered = str(file_path).lower()
+    if lowered.endswith('.gz'):
+        return 'gzip'
+    if lowered.endswith('.zst'):
+        return 'zstd'
+    return None
+
+
+def _require_zstandard():
+    if zstandard is None:
+        raise ValueError("zstd show files need the 'zstandard' package (pip install zstandard).")
+
+
+def open_show_stream(raw_fp):
+    """Wraps a binary file opened for reading, decompressing it if needed. raw_fp stays owned by the caller."""
+    magic = raw_fp.peek(4)[:4] if hasattr(raw_fp, 'peek') else b''
+    if magic.startswith(_GZIP_MAGIC):
+        return gzip.GzipFile(fileobj=raw_fp, mode='rb')
+    if magic == _ZSTD_MAGIC:
+        _require_zstandard()
+        return zstandard.ZstdDecompressor().stream_reader(raw_fp, closefd=False)
+    return raw_fp
+
+
+def create_show_stream(raw_fp, compression: str | None):
+    """Wraps a binary file opened for writing; see ShowExporter.write for finishing the container."""
+    if compression == 'gzip':
+        return gzip.GzipFile(fileobj=raw_fp, mode='wb', compresslevel=6)
+    if compression == 'zstd':
+        _require_zstandard()
+        return zstandard.ZstdCompressor(level=3).stream_writer(raw_fp, closefd=False)
+    return raw_fp
+
+
+class ShowFileReader:
+    """Incremental reader for a JSON object whose values are mostly arrays."""
+
+    def __init__(self, fp, chunk_size: int = 1 << 16):
+        self._fp = fp # Opened in binary mode
+        self._chunk_size = chunk_size
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self, min_chars: int = 1) -> bool:
+        """Appends at least min_chars more text to the buffer; False at end of file."""
+        self._buffer = self._buffer[self._pos:]
+        self._pos = 0
+        wanted = len(self._buffer) + min_chars
+        added = False
+        while len(self._buffer) < wanted and not self._eof:
+            chunk = self._fp.read(max(self._chunk_size, min_chars))
+            if not chunk:
+                self._eof = True
+                self._buffer += self._utf8.decode(b'', final=True)
+                break
+            self._buffer += self._utf8.decode(chunk)
+            added = True
+        return added
+
+    def _peek(self) -> str:
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ''
+
+    def _expect(self, char: str):
+        if self._peek() != char:
+            raise json.JSONDecodeError(f"Expecting '{char}'", self._buffer, self._pos)
+        self._pos += 1
+
+    def _decode_value(self):
+        self._peek()
+        need = self._chunk_size
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+                # A number running into the end of the buffer may continue in the next chunk.
+                if end < len(self._buffer) or self._eof:
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            self._fill(need)
+            need *= 2 # Large values are re-parsed O(log n) times, not once per chunk
+
+    def _iter_array(self):
+        if self._peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            yield self._decode_value()
+            char = self._peek()
+            self._pos += 1
+            if char == ']':
+                return
+            if char != ',':
+                raise json.JSONDecodeError("Expecting ',' delimiter", self._buffer, self._pos - 1)
+
+    def sections(self):
+        """
+        Yields (key, value) for each top-level entry. Array values are yielded as iterators over
+        their elements, which must be consumed before the next section is read.
+        """
+        self._expect('{')
+        if self._peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            key = self._decode_value()
+            self._expect(':')
+            if self._peek() == '[':
+                self._pos += 1
+                items = self._iter_array()
+                yield key, items
+                for _ in items: # Skip whatever the consumer left unread
+                    pass
+            else:
+                yield key, self._decode_value()
+            char = self._peek()
+            self._pos += 1
+            if char == '}':
+                return
+            if char != ',':
+                raise json.JSONDecodeError("Expecting ',' delimiter", self._buffer, self._pos - 1)
+
+
+def _take_id(wanted, used_ids: set) -> int:
+    """Keeps an id from the file when it is usable, otherwise picks the lowest free one."""
+    if not isinstance(wanted, int) or wanted in used_ids:
+        wanted = 1
+        while wanted in used_ids:
+            wanted += 1
+    used_ids.add(wanted)
+    return wanted
+
+
+def _batched(rows, size: int):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class ShowImporter:
+    """Replaces the show in the database with the contents of a show file."""
+
+    BATCH_SIZE = 500
+    TABLES_TO_CLEAR = ("preset_values", "timeline_events", "cues", "fixture_group_mappings", "fixture_groups",
+                       "presets", "loop_palettes", "fixtures", "fixture_profiles",
+                       "operation_journal") # Undo history refers to the rows being replaced
+    # Sections that resolve names or ids from another section wait until it has been imported.
+    DEPENDENCIES = {
+        'fixtures': ('fixture_profiles',),
+        'fixture_groups': ('fixtures',),
+        'presets': ('fixtures',),
+        'timeline_events': ('cues',),
+    }
+    # Sections whose rows clearing this one deletes, unlinks or leaves pointing at replaced ids.
+    CLEARED_WITH = {
+        'fixture_profiles': ('fixtures',),
+        'fixtures': ('fixture_groups', 'presets'),
+        'cues': ('timeline_events',),
+    }
+    SECTION_TABLES = {
+        'fixture_profiles': ('fixture_profiles',),
+        'fixtures': ('fixtures',),
+        'fixture_groups': ('fixture_groups', 'fixture_group_mappings'),
+        'presets': ('presets', 'preset_values'),
+        'cues': ('cues',),
+        'timeline_events': ('timeline_events',),
+        'loop_palettes': ('loop_palettes',),
+    }
+
+    def __init__(self, db_connection: sqlite3.Connection, progress=None, sections=None):
+        """
+        sections limits the import to those sections (plus any they cannot be replaced without,
+        see DEPENDENCIES and CLEARED_WITH); the rest of the show is kept. None replaces everything.
+        """
+        self.db_connection = db_connection
+        self.progress = progress # progress(section, rows_imported_in_section)
+        self.partial = sections is not None
+        self.sections = self._with_required(sections) if self.partial else set(self.SECTION_TABLES)
+        self.counts = {}
+        self.manifest = None # Absent from files written before the manifest was added
+        self.other_sections = {} # Non-table sections such as main_tab_layout
+        self._profile_ids = {}
+        self._fixture_ids = {}
+        self._cue_ids = set()
+        self._handlers = {
+            'fixture_profiles': self._import_profiles,
+            'fixtures': self._import_fixtures,
+            'fixture_groups': self._import_groups,
+            'presets': self._import_presets,
+            'cues': self._import_cues,
+            'timeline_events': self._import_events,
+            'loop_palettes': self._import_loop_palettes,
+        }
+
+    def _with_required(self, sections) -> set:
+        unknown = set(sections) - set(self.SECTION_TABLES)
+        if unknown:
+            raise ValueError(f"Unknown show sections: {', '.join(sorted(unknown))}")
+        required, pending = set(), list(sections)
+        while pending:
+            section = pending.pop()
+            if section not in required:
+                required.add(section)
+                pending.extend(self.DEPENDENCIES.get(section, ()) + self.CLEARED_WITH.get(section, ()))
+        return required
+
+    def run(self, reader: ShowFileReader):
+        """
+        Imports in a transaction of its own, or inside the one already open on the connection (a
+        PersistenceService write job), which the caller then commits or rolls back.
+        """
+        conn = self.db_connection
+        owns_transaction = not conn.in_transaction
+        cursor = conn.cursor()
+        if owns_transaction:
+            cursor.execute("BEGIN")
+        try:
+            cursor.execute("PRAGMA defer_foreign_keys = ON") # Checked once, at the end
+            cleared = {table for section in self.sections for table in self.SECTION_TABLES[section]}
+            for table in self.TABLES_TO_CLEAR:
+                if table in cleared or table == 'operation_journal':
+                    cursor.execute(f"DELETE FROM {table}")
+
+            done, waiting = set(), {}
+            for key, value in reader.sections():
+                if key == 'manifest':
+                    self._check_manifest(value)
+                elif key not in self._handlers:
+                    self.other_sections[key] = value if not hasattr(value, '__next__') else list(value)
+                elif key not in self.sections:
+                    continue # Skipped unread
+                elif all(dependency in done for dependency in self.DEPENDENCIES.get(key, ())):
+                    self._handlers[key](cursor, value)
+                    done.add(key)
+                else:
+                    waiting[key] = list(value) # Out of the usual order; hold it until its dependency arrives
+                for waiting_key in list(waiting):
+                    if all(dependency in done for dependency in self.DEPENDENCIES.get(waiting_key, ())):
+                        self._handlers[waiting_key](cursor, waiting.pop(waiting_key))
+                        done.add(waiting_key)
+                if self.partial and done >= self.sections:
+                    break # The rest of the file is not needed
+            for waiting_key, items in waiting.items(): # Dependency missing from the file altogether
+                self._handlers[waiting_key](cursor, items)
+                done.add(waiting_key)
+            if self.partial and not done >= self.sections: # Older files have no manifest to check up front
+                raise ValueError(f"The show file has no {', '.join(sorted(self.sections - done)).replace('_', ' ')} section.")
+            if not owns_transaction and cursor.execute("PRAGMA foreign_key_check").fetchone():
+                raise sqlite3.IntegrityError("FOREIGN KEY constraint failed") # What our own commit would report
+        except BaseException:
+            if owns_transaction:
+                conn.rollback()
+            raise
+        finally:
+            if not owns_transaction:
+                cursor.execute("PRAGMA defer_foreign_keys = OFF") # Not for the caller's other writes
+        if owns_transaction:
+            conn.commit()
+
+    def _check_manifest(self, manifest):
+        if not isinstance(manifest, dict) or manifest.get('format') != SHOW_FORMAT:
+            raise ValueError("The file is not a Lumenante show file.")
+        if manifest.get('version', 0) > SHOW_FORMAT_VERSION:
+            print(f"Warning: Show file format v{manifest.get('version')} is newer than this version of Lumenante supports; unknown sections are ignored.")
+        self.manifest = manifest
+        listed = {section.get('name') for section in manifest.get('sections', ()) if isinstance(section, dict)}
+        missing = self.sections - listed if self.partial else ()
+        if missing:
+            raise ValueError(f"The show file has no {', '.join(sorted(missing)).replace('_', ' ')} section.")
+
+    def _insert(self, cursor, section: str, sql: str, rows):
+        count = self.counts.get(section, 0)
+        for batch in _batched(rows, self.BATCH_SIZE):
+            cursor.executemany(sql, batch)
+            count += len(batch)
+            self.counts[section] = count
+            if self.progress:
+                self.progress(section, count)
+        self.counts[section] = count
+
+    def _import_profiles(self, cursor, profiles):
+        def rows():
+            for profile_id, profile in enumerate(profiles, start=1):
+                self._profile_ids[profile['name']] = profile_id
+                creator_val = profile.get('creator') or profile.get('manufacturer')
+                yield (profile_id, profile['name'], creator_val, json.dumps(profile['attributes_json']))
+        self._insert(cursor, 'fixture_profiles',
+                     "INSERT INTO fixture_profiles (id, name, creator, attributes_json) VALUES (?, ?, ?, ?)", rows())
+
+    def _import_fixtures(self, cursor, fixtures):
+        db_cols = {info[1] for info in cursor.execute("PRAGMA table_info(fixtures)").fetchall()}
+        fallback_profile_id = self._profile_ids.get('Generic') or next(iter(self._profile_ids.values()), 1)
+        used_ids = set()
+        statements = {} # {column tuple: INSERT statement}
+        pending = {} # {column tuple: [row, ...]}
+
+        def flush(columns):
+            self._insert(cursor, 'fixtures', statements[columns], pending.pop(columns))
+
+        for fix_data in fixtures:
+            fix_data['profile_id'] = self._profile_ids.get(fix_data.pop('profile_name', 'Generic'), fallback_profile_id)
+            fixture_id = fix_data['id'] = _take_id(fix_data.get('id'), used_ids) # Layouts and events refer to these ids
+            self._fixture_ids[fix_data['name']] = fixture_id
+
+            columns = tuple(col for col in fix_data if col in db_cols)
+            if columns not in statements:
+                statements[columns] = f"INSERT INTO fixtures ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+            rows = pending.setdefault(columns, [])
+            rows.append(tuple(fix_data[col] for col in columns))
+            if len(rows) >= self.BATCH_SIZE:
+                flush(columns)
+        for columns in list(pending):
+            flush(columns)
+        self.counts.setdefault('fixtures', 0)
+
+    def _import_groups(self, cursor, groups):
+        mappings = []
+        def rows():
+            for group_id, group_data in enumerate(groups, start=1):
+                for fix_name in group_data.get('fixture_names', []):
+                    fix_id = self._fixture_ids.get(fix_name)
+                    if fix_id:
+                        mappings.append((group_id, fix_id))
+                yield (group_id, group_data['name'])
+        self._insert(cursor, 'fixture_groups', "INSERT INTO fixture_groups (id, name) VALUES (?, ?)", rows())
+        cursor.executemany("INSERT OR IGNORE INTO fixture_group_mappings (group_id, fixture_id) VALUES (?, ?)", mappings)
+
+    def _import_presets(self, cursor, presets):
+        value_rows = []
+        def rows():
+            for preset_id, preset in enumerate(presets, start=1):
+                p_data_by_id = {self._fixture_ids[fix_name]: params
+                                for fix_name, params in preset.get('data', {}).items() if fix_name in self._fixture_ids}
+                value_rows.extend(preset_value_rows(preset_id, p_data_by_id))
+                yield (preset_id, preset['preset_number'], preset.get('name'), preset.get('type', 'All'))
+                if len(value_rows) >= self.BATCH_SIZE:
+                    cursor.executemany("INSERT INTO preset_values (preset_id, fixture_id, param, value) VALUES (?, ?, ?, ?)", value_rows)
+                    value_rows.clear()
+        self._insert(cursor, 'presets', "INSERT INTO presets (id, preset_number, name, data, type) VALUES (?, ?, ?, '{}', ?)", rows())
+        cursor.executemany("INSERT INTO preset_values (preset_id, fixture_id, param, value) VALUES (?, ?, ?, ?)", value_rows)
+
+    def _import_cues(self, cursor, cues):
+        def rows():
+            for cue_data in cues:
+                cue_id = _take_id(cue_data.get('id'), self._cue_ids) # Kept, so timeline events stay linked to their cues
+                yield (cue_id, cue_data['cue_number'], cue_data.get('name'), cue_data['trigger_time_s'], cue_data.get('comment'))
+        self._insert(cursor, 'cues', "INSERT INTO cues (id, cue_number, name, trigger_time_s, comment) VALUES (?, ?, ?, ?, ?)", rows())
+
+    def _import_events(self, cursor, events):
+        def rows():
+            for event in events:
+                cue_id = event.get('cue_id')
+                data = event.get('data', {})
+                yield (event['name'], event['start_time'], event['duration'], event['event_type'],
+                       data if isinstance(data, str) else json.dumps(data), # Exports carry the stored JSON text
+                       event.get('target_type', 'master'), event.get('target_id'),
+                       cue_id if cue_id in self._cue_ids else None)
+        self._insert(cursor, 'timeline_events',
+                     "INSERT INTO timeline_events (name, start_time, duration, event_type, data, target_type, target_id, cue_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                     rows())
+
+    def _import_loop_palettes(self, cursor, palettes):
+        rows = ((lp_data['name'], json.dumps(lp_data.get('config_json', []))) for lp_data in palettes)
+        self._insert(cursor, 'loop_palettes', "INSERT INTO loop_palettes (name, config_json) VALUES (?, ?)", rows)
+
+
+def _compact(value) -> str:
+    return json.dumps(value, separators=(',', ':'))
+
+
+def _json_or_text(text):
+    try:
+        return json.loads(text)
+    except (TypeError, ValueError):
+        return text
+
+
+class ShowExporter:
+    """Streams the show in the database to a show file."""
+
+    FLUSH_BYTES = 1 << 16
+    # (section, query counting its elements); the order is the order the importer needs them in.
+    SECTIONS = (
+        ('fixture_profiles', "SELECT COUNT(*) FROM fixture_profiles"),
+        ('fixtures', "SELECT COUNT(*) FROM fixtures"),
+        ('fixture_groups', "SELECT COUNT(*) FROM fixture_groups"),
+        ('presets', "SELECT COUNT(*) FROM presets"),
+        ('cues', "SELECT COUNT(*) FROM cues"),
+        ('timeline_events', "SELECT COUNT(*) FROM timeline_events"),
+        ('loop_palettes', "SELECT COUNT(*) FROM loop_palettes"),
+    )
+
+    def __init__(self, extra_sections: dict | None = None):
+        self.extra_sections = extra_sections or {} # Non-table sections such as main_tab_layout, written last
+        self.counts = {}
+
+    def write(self, db_connection: sqlite3.Connection, raw_fp, compression: str | None = None) -> dict:
+        """
+        Writes every section from one read transaction, so the file is a consistent snapshot even
+        while other connections keep writing. Returns {section: elements written}.
+        """
+        stream = create_show_stream(raw_fp, compression)
+        cursor = db_connection.cursor()
+        if db_connection.in_transaction:
+            db_connection.commit()
+        cursor.execute("BEGIN")
+        try:
+            sizes = {section: cursor.execute(count_sql).fetchone()[0] for section, count_sql in self.SECTIONS}
+            manifest = {
+                'format': SHOW_FORMAT,
+                'version': SHOW_FORMAT_VERSION,
+                'created_at': datetime.now().isoformat(timespec='seconds'),
+                'sections': [{'name': section, 'count': sizes[section]} for section, _ in self.SECTIONS]
+                            + [{'name': section} for section in self.extra_sections],
+            }
+            stream.write(f'{{"manifest":{_compact(manifest)}'.encode('utf-8'))
+            writers = {
+                'fixture_profiles': self._profiles,
+                'fixtures': self._fixtures,
+                'fixture_groups': self._groups,
+                'presets': self._presets,
+                'cues': self._cues,
+                'timeline_events': self._events,
+                'loop_palettes': self._loop_palettes,
+            }
+            for section, _ in self.SECTIONS:
+                self._write_array(stream, section, writers[section](cursor))
+            for section, value in self.extra_sections.items():
+                stream.write(f',\n{_compact(section)}:{_compact(value)}'.encode('utf-8'))
+            stream.write(b'}\n')
+        finally:
+            db_connection.rollback() # Read-only; ends the snapshot
+            if stream is not raw_fp:
+                stream.close() # Writes the container trailer; raw_fp stays open
+        return self.counts
+
+    def export(self, db_connection: sqlite3.Connection, file_path: str) -> dict:
+        """Writes to file_path via a temporary file, so a failed export never leaves a truncated show behind."""
+        temp_path = f"{file_path}.part"
+        try:
+            with open(temp_path, 'wb') as raw_fp:
+                self.write(db_connection, raw_fp, compression_for_path(file_path))
+            os.replace(temp_path, file_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return self.counts
+
+    def _write_array(self, stream, section: str, items):
+        stream.write(f',\n{_compact(section)}:['.encode('utf-8'))
+        parts, pending, count = [], 0, 0
+        for item in items:
+            text = ('\n' if count == 0 else ',\n') + _compact(item)
+            parts.append(text)
+            pending += len(text)
+            count += 1
+            if pending >= self.FLUSH_BYTES:
+                stream.write(''.join(parts).encode('utf-8'))
+                parts, pending = [], 0
+        parts.append('\n]' if count else ']')
+        stream.write(''.join(parts).encode('utf-8'))
+        self.counts[section] = count
+
+    def _profiles(self, cursor):
+        for name, creator, attributes_json in cursor.execute("SELECT name, creator, attributes_json FROM fixture_profiles ORDER BY id"):
+            yield {'name': name, 'creator': creator, 'attributes_json': json.loads(attributes_json)}
+
+    def _fixtures(self, cursor):
+        rows = cursor.execute("SELECT f.*, fp.name AS profile_name FROM fixtures f JOIN fixture_profiles fp ON f.profile_id = fp.id ORDER BY f.id")
+        columns = [desc[0] for desc in rows.description]
+        for row in rows:
+            yield dict(zip(columns, row))
+
+    def _groups(self, cursor):
+        # Members are written by fixture name, which is what the importer resolves them by.
+        rows = cursor.execute("""
+            SELECT g.id, g.name, f.name FROM fixture_groups g
+            LEFT JOIN (fixture_group_mappings m JOIN fixtures f ON f.id = m.fixture_id) ON m.group_id = g.id
+            ORDER BY g.id, m.id
+        """)
+        for (_group_id, group_name), members in itertools.groupby(rows, key=lambda row: row[:2]):
+            yield {'name': group_name, 'fixture_names': [row[2] for row in members if row[2] is not None]}
+
+    def _presets(self, cursor):
+        rows = cursor.execute("""
+            SELECT p.id, p.preset_number, p.name, p.type, f.name, v.param, v.value FROM presets p
+            LEFT JOIN (preset_values v JOIN fixtures f ON f.id = v.fixture_id) ON v.preset_id = p.id
+            ORDER BY p.id, v.fixture_id
+        """)
+        for (_preset_id, preset_number, preset_name, preset_type), values in itertools.groupby(rows, key=lambda row: row[:4]):
+            data_by_name = {}
+            for row in values:
+                if row[4] is not None:
+                    data_by_name.setdefault(row[4], {})[row[5]] = row[6]
+            yield {'preset_number': preset_number, 'name': preset_name, 'data': data_by_name, 'type': preset_type}
+
+    def _cues(self, cursor):
+        for cue_id, cue_number, name, trigger_time_s, comment in cursor.execute(
+                "SELECT id, cue_number, name, trigger_time_s, comment FROM cues ORDER BY trigger_time_s, id"):
+            yield {'id': cue_id, 'cue_number': cue_number, 'name': name, 'trigger_time_s': trigger_time_s, 'comment': comment}
+
+    def _events(self, cursor):
+        rows = cursor.execute("SELECT name, start_time, duration, event_type, data, target_type, target_id, cue_id FROM timeline_events ORDER BY start_time, id")
+        for name, start_time, duration, event_type, data, target_type, target_id, cue_id in rows:
+            yield {'name': name, 'start_time': start_time, 'duration': duration, 'event_type': event_type,
+                   'data': _json_or_text(data), 'target_type': target_type, 'target_id': target_id, 'cue_id': cue_id}
+
+    def _loop_palettes(self, cursor):
+        for name, config_json in cursor.execute("SELECT name, config_json FROM loop_palettes ORDER BY id"):
+            yield {'name': name, 'config_json': json.loads(config_json)}
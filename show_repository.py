@@ -0,0 +1,769 @@
+# show_repository.py
+"""
+Typed access to the fixture, profile, group, preset, loop palette, cue and timeline event tables.
+
+Every statement is a fixed string, so sqlite3's per-connection statement cache compiles each one
+once; id lists are passed as one JSON array parameter through json_each() instead of building
+"IN (?, ?, ...)" per call. Partial fixture updates set only the columns they pass; each set of
+columns builds its statement once, so live updates of one parameter group reuse one statement and
+never rewrite the fid/sfi/profile_id keys. Timeline events are updated the same way.
+
+Synchronous writes commit immediately and let queued background writes land first. Writes that
+only need to be durable eventually (live fixture values) go through the PersistenceService queue.
+The repository also owns the caches built on these tables (group membership, dense presets) and
+announces every change through the invalidated signal.
+
+Programming edits are journaled (see operation_journal) so they can be undone and redone, whether
+they commit here or on the writer thread (queue_journaled_write, queue_journaled_insert).
+While the whole show is being replaced (a show import), block_writes makes every write raise.
+"""
+import json
+import sqlite3
+from contextlib import contextmanager
+from functools import lru_cache
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from operation_journal import OperationJournal, OperationRecorder, SQL_SET_UNDONE
+from persistence import begin_immediate
+from preset_store import PresetStore, write_preset_values
+from timeline_model import SQL_EVENTS, event_from_row
+
+# Columns a fixture update may set; id and created_at are never written.
+FIXTURE_COLUMNS = (
+    'fid', 'sfi', 'profile_id', 'name',
+    'x_pos', 'y_pos', 'z_pos', 'rotation_x', 'rotation_y', 'rotation_z',
+    'red', 'green', 'blue', 'brightness', 'gobo_spin', 'zoom', 'focus',
+    'shutter_strobe_rate', 'speed', 'comment',
+)
+# Columns a timeline event update may set.
+EVENT_COLUMNS = ('name', 'start_time', 'duration', 'event_type', 'data', 'target_type', 'target_id', 'cue_id')
+
+# --- Statements ---
+_IDS = "SELECT value FROM json_each(?)"
+
+SQL_ALL_FIXTURES = "SELECT * FROM fixtures"
+SQL_FIXTURE = "SELECT * FROM fixtures WHERE id = ?"
+SQL_FIXTURES_BY_IDS = f"SELECT * FROM fixtures WHERE id IN ({_IDS})"
+SQL_FIXTURE_LIST = "SELECT id, name, fid, sfi FROM fixtures ORDER BY fid, sfi"
+SQL_FIXTURE_NAMES = "SELECT id, name FROM fixtures ORDER BY name"
+SQL_FIXTURE_NAMES_BY_IDS = f"SELECT id, name FROM fixtures WHERE id IN ({_IDS})"
+SQL_FIXTURE_LIST_WITH_PROFILE = """
+    SELECT f.id, f.fid, f.sfi, f.name, p.name
+    FROM fixtures f
+    JOIN fixture_profiles p ON f.profile_id = p.id
+    ORDER BY f.fid, f.sfi
+"""
+SQL_FIXTURES_WITH_PROFILE_NAME = "SELECT f.*, p.name AS profile_name FROM fixtures f JOIN fixture_profiles p ON f.profile_id = p.id"
+SQL_FIXTURE_IDS_BY_FID = "SELECT id FROM fixtures WHERE fid = ?"
+SQL_FIXTURE_IDS_BY_FID_SFI_RANGE = "SELECT id FROM fixtures WHERE fid = ? AND sfi >= ? AND sfi <= ?"
+SQL_FIXTURE_IDS_AND_FIDS = "SELECT id, fid FROM fixtures"
+SQL_MAX_FID = "SELECT MAX(fid) FROM fixtures"
+SQL_FIXTURE_KEYS = "SELECT fid, sfi FROM fixtures"
+SQL_MAX_FIXTURE_ID = "SELECT COALESCE(MAX(id), 0) FROM fixtures"
+SQL_FIXTURE_IDS_AFTER = "SELECT id FROM fixtures WHERE id > ? ORDER BY id"
+SQL_INSERT_FIXTURE = "INSERT INTO fixtures (fid, sfi, profile_id, name) VALUES (?, ?, ?, ?)"
+SQL_UPDATE_POSITION_BY_FID = "UPDATE fixtures SET x_pos = ?, y_pos = ?, z_pos = ? WHERE fid = ?"
+SQL_INSERT_POSITIONED_FIXTURE = "INSERT INTO fixtures (fid, sfi, profile_id, name, x_pos, y_pos, z_pos) VALUES (?, ?, ?, ?, ?, ?, ?)"
+SQL_DELETE_FIXTURE = "DELETE FROM fixtures WHERE id = ?"
+
+SQL_PROFILES = "SELECT id, name, creator, attributes_json FROM fixture_profiles ORDER BY name"
+SQL_PROFILE_NAMES = "SELECT id, name FROM fixture_profiles ORDER BY name"
+SQL_PROFILE_NAME = "SELECT name FROM fixture_profiles WHERE id = ?"
+SQL_PROFILE_ID_BY_NAME = "SELECT id FROM fixture_profiles WHERE name = ?"
+SQL_FIRST_PROFILE_ID = "SELECT id FROM fixture_profiles ORDER BY id LIMIT 1"
+SQL_INSERT_PROFILE = "INSERT INTO fixture_profiles (name, creator, attributes_json) VALUES (?, ?, ?)"
+SQL_UPDATE_PROFILE = "UPDATE fixture_profiles SET name = ?, creator = ?, attributes_json = ? WHERE id = ?"
+SQL_DELETE_PROFILE = "DELETE FROM fixture_profiles WHERE id = ?"
+
+SQL_GROUPS = "SELECT id, name FROM fixture_groups ORDER BY name"
+SQL_GROUP_NAME = "SELECT name FROM fixture_groups WHERE id = ?"
+SQL_ALL_GROUP_MEMBERS = "SELECT group_id, fixture_id FROM fixture_group_mappings"
+SQL_GROUP_FIDS = "SELECT m.group_id, f.fid FROM fixture_group_mappings m JOIN fixtures f ON f.id = m.fixture_id"
+SQL_GROUP_MEMBER_NAMES = """
+    SELECT f.id, f.name FROM fixtures f
+    JOIN fixture_group_mappings fgm ON f.id = fgm.fixture_id
+    WHERE fgm.group_id = ? ORDER BY f.name
+"""
+SQL_GROUP_NON_MEMBER_NAMES = """
+    SELECT id, name FROM fixtures
+    WHERE id NOT IN (SELECT fixture_id FROM fixture_group_mappings WHERE group_id = ?)
+    ORDER BY name
+"""
+SQL_FIRST_GROUP_OF_FIXTURE = "SELECT group_id FROM fixture_group_mappings WHERE fixture_id = ? LIMIT 1"
+SQL_INSERT_GROUP = "INSERT INTO fixture_groups (name) VALUES (?)"
+SQL_RENAME_GROUP = "UPDATE fixture_groups SET name = ? WHERE id = ?"
+SQL_DELETE_GROUP = "DELETE FROM fixture_groups WHERE id = ?"
+SQL_ADD_GROUP_MEMBER = "INSERT OR IGNORE INTO fixture_group_mappings (group_id, fixture_id) VALUES (?, ?)"
+SQL_REMOVE_GROUP_MEMBER = "DELETE FROM fixture_group_mappings WHERE group_id = ? AND fixture_id = ?"
+
+SQL_PRESETS = "SELECT preset_number, name, type FROM presets ORDER BY type, preset_number"
+SQL_PRESET_NAMES = "SELECT preset_number, name FROM presets ORDER BY preset_number"
+SQL_PRESET = "SELECT id, name, type FROM presets WHERE preset_number = ?"
+SQL_UPSERT_PRESET = "INSERT OR REPLACE INTO presets (id, preset_number, name, data, type) VALUES ((SELECT id FROM presets WHERE preset_number = ?), ?, ?, '{}', ?)"
+SQL_RENAME_PRESET = "UPDATE presets SET name = ? WHERE preset_number = ?"
+SQL_DELETE_PRESET = "DELETE FROM presets WHERE preset_number = ?"
+
+SQL_LOOP_PALETTES = "SELECT id, name, config_json FROM loop_palettes ORDER BY name"
+SQL_LOOP_PALETTE = "SELECT name, config_json FROM loop_palettes WHERE id = ?"
+SQL_LOOP_PALETTE_ID_BY_NAME = "SELECT id FROM loop_palettes WHERE name = ? AND id != ?"
+SQL_INSERT_LOOP_PALETTE = "INSERT INTO loop_palettes (name, config_json) VALUES (?, ?)"
+SQL_UPDATE_LOOP_PALETTE = "UPDATE loop_palettes SET name = ?, config_json = ? WHERE id = ?"
+SQL_DELETE_LOOP_PALETTE = "DELETE FROM loop_palettes WHERE id = ?"
+
+SQL_CUES = "SELECT id, cue_number, name, trigger_time_s, comment FROM cues ORDER BY trigger_time_s, cue_number"
+SQL_CUE = "SELECT id, cue_number, name, trigger_time_s, comment FROM cues WHERE id = ?"
+SQL_CUES_BY_IDS = f"SELECT id, cue_number, name, trigger_time_s, comment FROM cues WHERE id IN ({_IDS})"
+SQL_CUE_NAMES = "SELECT cue_number, name FROM cues ORDER BY cue_number"
+SQL_CUE_ID_BY_NUMBER = "SELECT id FROM cues WHERE cue_number = ? AND id != ?"
+SQL_INSERT_CUE = "INSERT INTO cues (cue_number, name, trigger_time_s, comment) VALUES (?, ?, ?, ?)"
+SQL_UPDATE_CUE = "UPDATE cues SET cue_number = ?, name = ?, trigger_time_s = ?, comment = ? WHERE id = ?"
+SQL_MOVE_CUE = "UPDATE cues SET trigger_time_s = ? WHERE id = ?"
+SQL_RENAME_CUE = "UPDATE cues SET name = ? WHERE cue_number = ?"
+SQL_DELETE_CUE = "DELETE FROM cues WHERE id = ?"
+SQL_ALL_CUE_IDS = "SELECT id FROM cues"
+SQL_DELETE_ALL_CUES = "DELETE FROM cues"
+
+SQL_EVENT = SQL_EVENTS + " WHERE id = ?"
+SQL_EVENT_IDS_BY_CUE = "SELECT id FROM timeline_events WHERE cue_id = ?"
+SQL_EVENT_NAMES_IN_CUE = "SELECT id, name FROM timeline_events WHERE cue_id = ? AND id != ? ORDER BY start_time, name"
+SQL_ALL_EVENT_IDS = "SELECT id FROM timeline_events"
+SQL_INSERT_EVENT = f"INSERT INTO timeline_events ({', '.join(EVENT_COLUMNS)}) VALUES ({', '.join('?' * len(EVENT_COLUMNS))})"
+SQL_SET_EVENT_DATA = "UPDATE timeline_events SET data = ? WHERE id = ?"
+SQL_DELETE_EVENT = "DELETE FROM timeline_events WHERE id = ?"
+SQL_DELETE_ALL_EVENTS = "DELETE FROM timeline_events"
+# Events (other than the given ones) following any of the given ones; CASE skips rows whose data isn't JSON.
+SQL_EVENT_FOLLOWERS = f"""
+    SELECT id, data FROM timeline_events
+    WHERE id NOT IN ({_IDS})
+    AND CASE WHEN json_valid(data) THEN json_extract(data, '$.followed_event_id') END IN ({_IDS})
+"""
+
+
+@lru_cache(maxsize=128)
+def _update_sql(table: str, columns: tuple) -> str:
+    return f"UPDATE {table} SET {', '.join(f'{column} = ?' for column in columns)} WHERE id = ?"
+
+
+def _update_statement(table: str, allowed_columns: tuple, row_id: int, values: dict) -> tuple[str, tuple] | None:
+    columns = tuple(column for column in allowed_columns if column in values)
+    if not columns:
+        return None
+    return _update_sql(table, columns), tuple(values[column] for column in columns) + (row_id,)
+
+
+def fixture_update_statement(fixture_id: int, values: dict) -> tuple[str, tuple] | None:
+    """
+    (sql, params) setting the FIXTURE_COLUMNS present in values, None included; other keys are
+    ignored. Returns None if values sets none of them.
+    """
+    return _update_statement('fixtures', FIXTURE_COLUMNS, fixture_id, values)
+
+
+def _execute_updates(cursor, table: str, allowed_columns: tuple, updates):
+    """Runs _update_statement for [(row_id, values)], one executemany per column set."""
+    rows_by_sql = {}
+    for row_id, values in updates:
+        statement = _update_statement(table, allowed_columns, row_id, values)
+        if statement:
+            rows_by_sql.setdefault(statement[0], []).append(statement[1])
+    for sql, rows in rows_by_sql.items():
+        cursor.executemany(sql, rows)
+
+
+def _event_columns(event: dict) -> dict:
+    """
+    Column values for the keys an event dict sets (the timeline_model.event_from_row format):
+    'type' is stored as event_type and data as JSON text.
+    """
+    values = {}
+    for key, value in event.items():
+        if key == 'type':
+            values['event_type'] = value
+        elif key == 'data':
+            values['data'] = value if isinstance(value, str) else json.dumps(value)
+        elif key in EVENT_COLUMNS:
+            values[key] = value
+    return values
+
+
+def _cue_dict(row) -> dict:
+    return {'id': row[0], 'cue_number': row[1], 'name': row[2], 'trigger_time_s': float(row[3]), 'comment': row[4]}
+
+
+class ShowRepository(QObject):
+    """The queries of the show database's programming tables, with their caches."""
+    invalidated = pyqtSignal(str, object) # (kind, key or None for everything of that kind)
+
+    FIXTURES = 'fixtures'
+    GROUPS = 'groups'
+    PRESETS = 'presets'
+    CUES = 'cues'
+    EVENTS = 'timeline_events'
+    PROFILES = 'fixture_profiles'
+    LOOPS = 'loop_palettes'
+
+    def __init__(self, db_connection: sqlite3.Connection, persistence, parent=None):
+        super().__init__(parent)
+        self.db_connection = db_connection
+        self.persistence = persistence
+        self.presets = PresetStore(db_connection)
+        self._group_members = None # {group_id: tuple(fixture_ids)}, loaded on first use
+        self.writes_blocked = None # Why writes are refused right now, or None
+        self.journal = OperationJournal(self)
+        self.journal.load(db_connection)
+
+    # --- Helpers ---
+
+    def _rows(self, sql: str, params=()) -> list:
+        return self.db_connection.execute(sql, params).fetchall()
+
+    def _dicts(self, sql: str, params=()) -> list[dict]:
+        cursor = self.db_connection.execute(sql, params)
+        columns = [desc[0] for desc in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def block_writes(self, reason: str | None):
+        """Makes every write raise sqlite3.OperationalError(reason) until called again with None."""
+        self.writes_blocked = reason
+
+    def _check_writable(self):
+        if self.writes_blocked:
+            raise sqlite3.OperationalError(self.writes_blocked)
+
+    def _begin(self):
+        """Lets queued writes land first, then starts a write transaction on the GUI connection."""
+        self._check_writable()
+        if self.db_connection.in_transaction:
+            # Committing here would commit somebody else's half-done work along with ours
+            raise sqlite3.OperationalError("The show connection already has a transaction open.")
+        if self.persistence is not None:
+            self.persistence.flush() # Queued writes to the same rows land first
+        begin_immediate(self.db_connection) # Waits out the writer thread or a backup, like the writer does
+
+    @contextmanager
+    def _writing(self, kind: str, key=None):
+        """Yields a cursor for one transaction; commits and invalidates kind, or rolls back."""
+        self._begin()
+        cursor = self.db_connection.cursor()
+        try:
+            yield cursor
+        except Exception:
+            self.db_connection.rollback()
+            raise
+        self.db_connection.commit()
+        self.invalidate(kind, key)
+
+    @contextmanager
+    def _journaled(self, label: str, kind: str, key=None, also_changes=()):
+        """_writing that also journals the change; yields (cursor, recorder) and the body tracks the rows it touches."""
+        recorder = OperationRecorder(self.db_connection, label, (kind,) + tuple(also_changes))
+        with self._writing(kind, key) as cursor:
+            yield cursor, recorder
+            operation = self._record(recorder)
+        for other_kind in also_changes:
+            self.invalidate(other_kind)
+        self.journal.recorded(operation)
+
+    def queue_journaled_write(self, label: str, kinds, scopes, write, on_done=None, on_error=None):
+        """
+        Queues write(conn) on the persistence writer thread and journals it there, in the same
+        transaction. scopes are the (table, column, values) it may change; on_done receives the Operation.
+        """
+        self._check_writable()
+        def job(conn):
+            recorder = OperationRecorder(conn, label, kinds)
+            for table, column, values in scopes:
+                recorder.track(table, column, values)
+            write(conn)
+            return self._record(recorder)
+
+        def done(operation):
+            self.journal.recorded(operation)
+            if on_done:
+                on_done(operation)
+        return self.persistence.submit_write(job, done, on_error)
+
+    def queue_journaled_insert(self, label: str, kinds, table: str, insert, on_done=None, on_error=None):
+        """
+        Queues insert(conn), which creates rows of table and returns their ids, and journals it in
+        the same transaction. on_done receives the new ids.
+        """
+        self._check_writable()
+        def job(conn):
+            recorder = OperationRecorder(conn, label, kinds)
+            new_ids = insert(conn)
+            recorder.track(table, 'id', new_ids, existed=False)
+            return self._record(recorder), new_ids
+
+        def done(outcome):
+            operation, new_ids = outcome
+            self.journal.recorded(operation)
+            if on_done:
+                on_done(new_ids)
+        return self.persistence.submit_write(job, done, on_error)
+
+    @staticmethod
+    def _record(recorder: OperationRecorder):
+        """Finishes recording and appends the operation to the journal table, if it changed anything."""
+        operation = recorder.finish()
+        if operation:
+            recorder.commit_record(operation)
+        return operation
+
+    # --- Undo / redo ---
+
+    def undo(self):
+        """Reverts the most recent journaled operation and returns it, or None if there was nothing to undo."""
+        operation = self.journal.take_undo()
+        if operation is None:
+            return None
+        try:
+            self._replay(operation, undo=True)
+        except Exception:
+            self.journal.restore_undo(operation)
+            raise
+        self.journal.undone(operation)
+        return operation
+
+    def redo(self):
+        operation = self.journal.take_redo()
+        if operation is None:
+            return None
+        try:
+            self._replay(operation, undo=False)
+        except Exception:
+            self.journal.restore_redo(operation)
+            raise
+        self.journal.redone(operation)
+        return operation
+
+    def _replay(self, operation, undo: bool):
+        self._begin()
+        try:
+            operation.apply(self.db_connection, undo)
+            self.db_connection.execute(SQL_SET_UNDONE, (1 if undo else 0, operation.seq))
+        except Exception:
+            self.db_connection.rollback()
+            raise
+        self.db_connection.commit()
+        for kind in operation.kinds:
+            self.invalidate(kind)
+
+    def invalidate(self, kind: str | None = None, key=None):
+        """Drops cached data for kind (all kinds if None) and announces it."""
+        if kind in (None, self.FIXTURES, self.GROUPS):
+            self._group_members = None
+        if kind in (None, self.PRESETS):
+            self.presets.invalidate(key if kind == self.PRESETS else None)
+        for each_kind in ((kind,) if kind else (self.FIXTURES, self.GROUPS, self.PRESETS, self.CUES, self.EVENTS, self.PROFILES, self.LOOPS)):
+            self.invalidated.emit(each_kind, key)
+
+    # --- Fixtures ---
+
+    def fixtures(self) -> list[dict]:
+        return self._dicts(SQL_ALL_FIXTURES)
+
+    def fixture(self, fixture_id: int) -> dict | None:
+        rows = self._dicts(SQL_FIXTURE, (fixture_id,))
+        return rows[0] if rows else None
+
+    def fixtures_by_ids(self, fixture_ids) -> list[dict]:
+        return self._dicts(SQL_FIXTURES_BY_IDS, (json.dumps(list(fixture_ids)),))
+
+    def fixture_list(self) -> list[tuple]:
+        """[(id, name, fid, sfi)] ordered by FID and SFI."""
+        return self._rows(SQL_FIXTURE_LIST)
+
+    def fixture_names(self, fixture_ids=None) -> list[tuple]:
+        """[(id, name)] ordered by name, optionally limited to fixture_ids."""
+        if fixture_ids is None:
+            return self._rows(SQL_FIXTURE_NAMES)
+        return self._rows(SQL_FIXTURE_NAMES_BY_IDS, (json.dumps(list(fixture_ids)),))
+
+    def fixture_list_with_profiles(self) -> list[tuple]:
+        """[(id, fid, sfi, name, profile_name)] ordered by FID and SFI."""
+        return self._rows(SQL_FIXTURE_LIST_WITH_PROFILE)
+
+    def fixtures_with_profile_names(self) -> list[dict]:
+        """Every fixture row with its profile's name as 'profile_name'."""
+        return self._dicts(SQL_FIXTURES_WITH_PROFILE_NAME)
+
+    def fixture_ids_for_fid(self, fid: int, sfi_min: int | None = None, sfi_max: int | None = None) -> list[int]:
+        if sfi_min is None and sfi_max is None:
+            return [row[0] for row in self._rows(SQL_FIXTURE_IDS_BY_FID, (fid,))]
+        sfi_min = sfi_min if sfi_min is not None else sfi_max
+        sfi_max = sfi_max if sfi_max is not None else sfi_min
+        return [row[0] for row in self._rows(SQL_FIXTURE_IDS_BY_FID_SFI_RANGE, (fid, sfi_min, sfi_max))]
+
+    def fixture_ids_by_fid(self) -> dict[int, list[int]]:
+        ids_by_fid = {}
+        for fixture_id, fid in self._rows(SQL_FIXTURE_IDS_AND_FIDS):
+            ids_by_fid.setdefault(fid, []).append(fixture_id)
+        return ids_by_fid
+
+    def max_fid(self) -> int | None:
+        return self._rows(SQL_MAX_FID)[0][0]
+
+    def patch_collisions(self, fixtures: list[dict]) -> list[tuple]:
+        """(fid, sfi) pairs of fixtures that are already patched or repeat within fixtures."""
+        taken = set(self._rows(SQL_FIXTURE_KEYS))
+        collisions = []
+        for values in fixtures:
+            key = (values['fid'], values['sfi'])
+            if key in taken:
+                collisions.append(key)
+            taken.add(key)
+        return collisions
+
+    def insert_fixtures(self, fixtures: list[dict]) -> list[int]:
+        """
+        Creates fixtures in one transaction; returns their new ids in order. Raises ValueError,
+        without writing anything, if any (fid, sfi) is already patched or repeats in the batch.
+        """
+        collisions = self.patch_collisions(fixtures)
+        if collisions:
+            listed = ", ".join(f"{fid}.{sfi}" for fid, sfi in collisions[:10])
+            more = f" and {len(collisions) - 10} more" if len(collisions) > 10 else ""
+            raise ValueError(f"Fixture ID(s) {listed}{more} are already patched.")
+        with self._journaled("Add Fixtures", self.FIXTURES) as (cursor, recorder):
+            last_id = cursor.execute(SQL_MAX_FIXTURE_ID).fetchone()[0]
+            cursor.executemany(SQL_INSERT_FIXTURE, [(values['fid'], values['sfi'], values['profile_id'], values['name'])
+                                                    for values in fixtures])
+            # AUTOINCREMENT hands out ids above every existing one, in insertion order.
+            new_ids = [row[0] for row in cursor.execute(SQL_FIXTURE_IDS_AFTER, (last_id,))]
+            inserted_columns = ('fid', 'sfi', 'profile_id', 'name')
+            _execute_updates(cursor, 'fixtures', FIXTURE_COLUMNS, [
+                (new_id, {column: value for column, value in values.items() if column not in inserted_columns})
+                for new_id, values in zip(new_ids, fixtures)])
+            recorder.track('fixtures', 'id', new_ids, existed=False)
+        return new_ids
+
+    def update_fixture(self, fixture_id: int, values: dict):
+        """Sets the given columns, None clearing one; missing columns are left unchanged."""
+        self.update_fixtures([(fixture_id, values)])
+
+    def update_fixtures(self, updates):
+        """Batch form of update_fixture for [(fixture_id, values)]."""
+        updates = list(updates)
+        with self._journaled("Edit Fixtures", self.FIXTURES) as (cursor, recorder):
+            recorder.track('fixtures', 'id', [fixture_id for fixture_id, _values in updates])
+            _execute_updates(cursor, 'fixtures', FIXTURE_COLUMNS, updates)
+
+    def queue_fixture_update(self, fixture_id: int, values: dict, on_done=None, on_error=None):
+        """Queues update_fixture on the persistence writer thread. Does not announce a change."""
+        self._check_writable()
+        statement = fixture_update_statement(fixture_id, values)
+        if statement is None:
+            return None
+        return self.persistence.execute(*statement, on_done, on_error)
+
+    def update_positions_and_patch(self, position_rows: list[tuple], new_fixture_rows: list[tuple]):
+        """
+        Applies reported positions as [(x, y, z, fid)] to every instance of each FID and creates
+        [(fid, sfi, profile_id, name, x, y, z)] fixtures, in one transaction.
+        """
+        with self._journaled("Import Positions", self.FIXTURES) as (cursor, recorder):
+            recorder.track('fixtures', 'fid', {row[3] for row in position_rows} | {row[0] for row in new_fixture_rows})
+            cursor.executemany(SQL_UPDATE_POSITION_BY_FID, position_rows)
+            cursor.executemany(SQL_INSERT_POSITIONED_FIXTURE, new_fixture_rows)
+
+    def delete_fixtures(self, fixture_ids):
+        fixture_ids = list(fixture_ids)
+        with self._journaled("Delete Fixtures", self.FIXTURES, also_changes=(self.GROUPS,)) as (cursor, recorder):
+            recorder.track('fixtures', 'id', fixture_ids)
+            recorder.track('fixture_group_mappings', 'fixture_id', fixture_ids) # Removed by the cascade
+            cursor.executemany(SQL_DELETE_FIXTURE, [(fixture_id,) for fixture_id in fixture_ids])
+
+    # --- Fixture profiles ---
+
+    def profiles(self) -> list[tuple]:
+        """[(id, name, creator, attributes_json)] ordered by name."""
+        return self._rows(SQL_PROFILES)
+
+    def profile_names(self) -> list[tuple]:
+        """[(id, name)] ordered by name."""
+        return self._rows(SQL_PROFILE_NAMES)
+
+    def profile_name(self, profile_id: int) -> str | None:
+        rows = self._rows(SQL_PROFILE_NAME, (profile_id,))
+        return rows[0][0] if rows else None
+
+    def default_profile_id(self, preferred_name: str = 'PAR Can') -> int | None:
+        """The profile named preferred_name, else the oldest profile, else None."""
+        rows = self._rows(SQL_PROFILE_ID_BY_NAME, (preferred_name,)) or self._rows(SQL_FIRST_PROFILE_ID)
+        return rows[0][0] if rows else None
+
+    def save_profile(self, profile_id: int | None, name: str, creator: str, attributes_json: str) -> int:
+        """Creates the profile if profile_id is None, else overwrites it; returns its id. Raises IntegrityError for a taken name."""
+        with self._writing(self.PROFILES, profile_id) as cursor:
+            if profile_id is None:
+                cursor.execute(SQL_INSERT_PROFILE, (name, creator, attributes_json))
+                profile_id = cursor.lastrowid
+            else:
+                cursor.execute(SQL_UPDATE_PROFILE, (name, creator, attributes_json, profile_id))
+        return profile_id
+
+    def delete_profile(self, profile_id: int):
+        """Deletes a profile; its fixtures cascade with it. Profiles are not journaled."""
+        with self._writing(self.PROFILES, profile_id) as cursor:
+            cursor.execute(SQL_DELETE_PROFILE, (profile_id,))
+        self.invalidate(self.FIXTURES)
+
+    # --- Groups ---
+
+    def groups(self) -> list[tuple]:
+        """[(id, name)] ordered by name."""
+        return self._rows(SQL_GROUPS)
+
+    def group_name(self, group_id: int) -> str | None:
+        rows = self._rows(SQL_GROUP_NAME, (group_id,))
+        return rows[0][0] if rows else None
+
+    def group_fixture_ids(self, group_id: int) -> tuple:
+        """Fixture ids in a group, served from the cached membership table."""
+        if self._group_members is None:
+            members = {}
+            for each_group_id, fixture_id in self._rows(SQL_ALL_GROUP_MEMBERS):
+                members.setdefault(each_group_id, []).append(fixture_id)
+            self._group_members = {each_group_id: tuple(ids) for each_group_id, ids in members.items()}
+        return self._group_members.get(group_id, ())
+
+    def groups_fixture_ids(self, group_ids) -> set:
+        fixture_ids = set()
+        for group_id in group_ids:
+            fixture_ids.update(self.group_fixture_ids(group_id))
+        return fixture_ids
+
+    def group_fids(self) -> list[tuple]:
+        """[(group_id, fid)] for every mapping."""
+        return self._rows(SQL_GROUP_FIDS)
+
+    def group_member_names(self, group_id: int) -> list[tuple]:
+        return self._rows(SQL_GROUP_MEMBER_NAMES, (group_id,))
+
+    def group_non_member_names(self, group_id: int) -> list[tuple]:
+        return self._rows(SQL_GROUP_NON_MEMBER_NAMES, (group_id,))
+
+    def first_group_of_fixture(self, fixture_id: int) -> int | None:
+        rows = self._rows(SQL_FIRST_GROUP_OF_FIXTURE, (fixture_id,))
+        return rows[0][0] if rows else None
+
+    def create_group(self, name: str) -> int:
+        with self._journaled("Create Group", self.GROUPS) as (cursor, recorder):
+            cursor.execute(SQL_INSERT_GROUP, (name,))
+            group_id = cursor.lastrowid
+            recorder.track('fixture_groups', 'id', [group_id], existed=False)
+        return group_id
+
+    def rename_group(self, group_id: int, name: str):
+        with self._journaled("Rename Group", self.GROUPS, group_id) as (cursor, recorder):
+            recorder.track('fixture_groups', 'id', [group_id])
+            cursor.execute(SQL_RENAME_GROUP, (name, group_id))
+
+    def delete_group(self, group_id: int):
+        with self._journaled("Delete Group", self.GROUPS, group_id) as (cursor, recorder):
+            recorder.track('fixture_groups', 'id', [group_id])
+            recorder.track('fixture_group_mappings', 'group_id', [group_id])
+            cursor.execute(SQL_DELETE_GROUP, (group_id,))
+
+    def add_to_group(self, group_id: int, fixture_ids):
+        with self._journaled("Add to Group", self.GROUPS, group_id) as (cursor, recorder):
+            recorder.track('fixture_group_mappings', 'group_id', [group_id])
+            cursor.executemany(SQL_ADD_GROUP_MEMBER, [(group_id, fixture_id) for fixture_id in fixture_ids])
+
+    def remove_from_group(self, group_id: int, fixture_ids):
+        with self._journaled("Remove from Group", self.GROUPS, group_id) as (cursor, recorder):
+            recorder.track('fixture_group_mappings', 'group_id', [group_id])
+            cursor.executemany(SQL_REMOVE_GROUP_MEMBER, [(group_id, fixture_id) for fixture_id in fixture_ids])
+
+    # --- Presets ---
+
+    def presets_list(self) -> list[tuple]:
+        """[(preset_number, name, type)] ordered by type, then number."""
+        return self._rows(SQL_PRESETS)
+
+    def preset_names(self) -> list[tuple]:
+        """[(preset_number, name)] ordered by number."""
+        return self._rows(SQL_PRESET_NAMES)
+
+    def preset_header(self, preset_number: str) -> tuple | None:
+        """(id, name, type) of a preset, or None."""
+        rows = self._rows(SQL_PRESET, (preset_number,))
+        return rows[0] if rows else None
+
+    def preset(self, preset_number: str):
+        """The cached DensePreset for a preset number, or None."""
+        return self.presets.get(preset_number)
+
+    def save_preset(self, preset_number: str, name: str, preset_type: str, data_map: dict):
+        """Creates or overwrites a preset with {fixture_id: {param: value}}."""
+        existing = self.preset_header(preset_number)
+        with self._journaled(f"Store Preset {preset_number}", self.PRESETS, preset_number) as (cursor, recorder):
+            recorder.track('presets', 'preset_number', [preset_number])
+            if existing:
+                recorder.track('preset_values', 'preset_id', [existing[0]])
+            cursor.execute(SQL_UPSERT_PRESET, (preset_number, preset_number, name, preset_type))
+            preset_id = cursor.execute(SQL_PRESET, (preset_number,)).fetchone()[0]
+            write_preset_values(cursor, preset_id, data_map)
+            if not existing:
+                recorder.track('preset_values', 'preset_id', [preset_id], existed=False)
+
+    def rename_preset(self, preset_number: str, name: str) -> bool:
+        """Returns False if there is no such preset."""
+        with self._journaled(f"Label Preset {preset_number}", self.PRESETS, preset_number) as (cursor, recorder):
+            recorder.track('presets', 'preset_number', [preset_number])
+            cursor.execute(SQL_RENAME_PRESET, (name, preset_number))
+        return cursor.rowcount > 0
+
+    def delete_preset(self, preset_number: str):
+        header = self.preset_header(preset_number)
+        with self._journaled(f"Delete Preset {preset_number}", self.PRESETS, preset_number) as (cursor, recorder):
+            recorder.track('presets', 'preset_number', [preset_number])
+            if header:
+                recorder.track('preset_values', 'preset_id', [header[0]])
+            cursor.execute(SQL_DELETE_PRESET, (preset_number,))
+
+    # --- Loop palettes ---
+
+    def loop_palettes(self) -> list[tuple]:
+        """[(id, name, config_json)] ordered by name."""
+        return self._rows(SQL_LOOP_PALETTES)
+
+    def loop_palette(self, palette_id: int) -> tuple | None:
+        """(name, config_json), or None if there is no such palette."""
+        rows = self._rows(SQL_LOOP_PALETTE, (palette_id,))
+        return rows[0] if rows else None
+
+    def loop_palette_name_taken(self, name: str, except_palette_id: int = -1) -> bool:
+        return bool(self._rows(SQL_LOOP_PALETTE_ID_BY_NAME, (name, except_palette_id)))
+
+    def save_loop_palette(self, palette_id: int | None, name: str, config_json: str) -> int:
+        """Creates the palette if palette_id is None, else overwrites it; returns its id."""
+        with self._writing(self.LOOPS, palette_id) as cursor:
+            if palette_id is None:
+                cursor.execute(SQL_INSERT_LOOP_PALETTE, (name, config_json))
+                palette_id = cursor.lastrowid
+            else:
+                cursor.execute(SQL_UPDATE_LOOP_PALETTE, (name, config_json, palette_id))
+        return palette_id
+
+    def delete_loop_palette(self, palette_id: int):
+        with self._writing(self.LOOPS, palette_id) as cursor:
+            cursor.execute(SQL_DELETE_LOOP_PALETTE, (palette_id,))
+
+    # --- Cues ---
+
+    def cues(self) -> list[dict]:
+        """Every cue as {'id', 'cue_number', 'name', 'trigger_time_s', 'comment'}, in trigger order."""
+        return [_cue_dict(row) for row in self._rows(SQL_CUES)]
+
+    def cue(self, cue_id: int) -> dict | None:
+        rows = self._rows(SQL_CUE, (cue_id,))
+        return _cue_dict(rows[0]) if rows else None
+
+    def cues_by_ids(self, cue_ids) -> list[dict]:
+        """The cues of cue_ids that still exist, in no particular order."""
+        return [_cue_dict(row) for row in self._rows(SQL_CUES_BY_IDS, (json.dumps(list(cue_ids)),))]
+
+    def cue_names(self) -> list[tuple]:
+        """[(cue_number, name)] ordered by cue number."""
+        return self._rows(SQL_CUE_NAMES)
+
+    def cue_number_taken(self, cue_number: str, except_cue_id: int = -1) -> bool:
+        return bool(self._rows(SQL_CUE_ID_BY_NUMBER, (cue_number, except_cue_id)))
+
+    def create_cue(self, cue_number: str, name: str, trigger_time_s: float, comment: str | None) -> int:
+        with self._journaled(f"Add Cue {cue_number}", self.CUES) as (cursor, recorder):
+            cursor.execute(SQL_INSERT_CUE, (cue_number, name, trigger_time_s, comment))
+            cue_id = cursor.lastrowid
+            recorder.track('cues', 'id', [cue_id], existed=False)
+        return cue_id
+
+    def update_cue(self, cue_id: int, cue_number: str, name: str, trigger_time_s: float, comment: str | None):
+        with self._journaled(f"Edit Cue {cue_number}", self.CUES, cue_id) as (cursor, recorder):
+            recorder.track('cues', 'id', [cue_id])
+            cursor.execute(SQL_UPDATE_CUE, (cue_number, name, trigger_time_s, comment, cue_id))
+
+    def queue_cue_move(self, cue_id: int, trigger_time_s: float, on_done=None, on_error=None):
+        """Queues a trigger time change on the persistence writer thread."""
+        def done(operation):
+            self.invalidated.emit(self.CUES, cue_id)
+            if on_done:
+                on_done(operation)
+        return self.queue_journaled_write("Move Cue", (self.CUES,), [('cues', 'id', [cue_id])],
+                                          lambda conn: conn.execute(SQL_MOVE_CUE, (trigger_time_s, cue_id)), done, on_error)
+
+    def rename_cue(self, cue_number: str, name: str) -> bool:
+        """Returns False if there is no such cue."""
+        with self._journaled(f"Label Cue {cue_number}", self.CUES) as (cursor, recorder):
+            recorder.track('cues', 'cue_number', [cue_number])
+            cursor.execute(SQL_RENAME_CUE, (name, cue_number))
+        return cursor.rowcount > 0
+
+    def delete_cue(self, cue_id: int):
+        with self._journaled("Delete Cue", self.CUES, cue_id, also_changes=(self.EVENTS,)) as (cursor, recorder):
+            recorder.track('cues', 'id', [cue_id])
+            linked_event_ids = [row[0] for row in cursor.execute(SQL_EVENT_IDS_BY_CUE, (cue_id,)).fetchall()]
+            recorder.track('timeline_events', 'id', linked_event_ids) # Unlinked by ON DELETE SET NULL
+            cursor.execute(SQL_DELETE_CUE, (cue_id,))
+
+    def clear_timeline(self):
+        """Deletes every cue and timeline event in one operation."""
+        with self._journaled("Clear Timeline", self.EVENTS, also_changes=(self.CUES,)) as (cursor, recorder):
+            # Cues first, so undo puts them back before the events that refer to them
+            recorder.track('cues', 'id', [row[0] for row in cursor.execute(SQL_ALL_CUE_IDS).fetchall()])
+            recorder.track('timeline_events', 'id', [row[0] for row in cursor.execute(SQL_ALL_EVENT_IDS).fetchall()])
+            cursor.execute(SQL_DELETE_ALL_EVENTS)
+            cursor.execute(SQL_DELETE_ALL_CUES)
+
+    # --- Timeline events ---
+
+    def timeline_event(self, event_id: int) -> dict | None:
+        """The event as a timeline_model.event_from_row dict, or None if there is no such event."""
+        rows = self._rows(SQL_EVENT, (event_id,))
+        return event_from_row(rows[0]) if rows else None
+
+    def event_names_in_cue(self, cue_id: int, except_event_id: int = -1) -> list[tuple]:
+        """[(id, name)] of the events of a cue, in start order."""
+        return self._rows(SQL_EVENT_NAMES_IN_CUE, (cue_id, except_event_id))
+
+    def queue_add_events(self, label: str, events: list[dict], on_done=None, on_error=None):
+        """
+        Queues creating events from event dicts (the timeline_model.event_from_row format, without
+        ids) as one operation. on_done receives the new ids, in order.
+        """
+        rows = [tuple(values.get(column) for column in EVENT_COLUMNS) for values in map(_event_columns, events)]
+        return self.queue_journaled_insert(label, (self.EVENTS,), 'timeline_events',
+                                           lambda conn: [conn.execute(SQL_INSERT_EVENT, row).lastrowid for row in rows],
+                                           on_done, on_error)
+
+    def queue_event_updates(self, label: str, updates, on_done=None, on_error=None):
+        """
+        Queues setting the given keys of events, as [(event_id, {key: value})] in the event dict
+        format, as one operation. Keys that are not event columns are ignored.
+        """
+        rows = [(event_id, _event_columns(values)) for event_id, values in updates]
+        return self.queue_journaled_write(label, (self.EVENTS,), [('timeline_events', 'id', [event_id for event_id, _values in rows])],
+                                          lambda conn: _execute_updates(conn, 'timeline_events', EVENT_COLUMNS, rows),
+                                          on_done, on_error)
+
+    def delete_events(self, event_ids) -> list[int]:
+        """
+        Deletes events in one operation. Events that followed one of them fall back to timing
+        relative to their cue; returns the ids of those events.
+        """
+        event_ids = list(event_ids)
+        ids_param = json.dumps(event_ids)
+        with self._journaled("Delete Events", self.EVENTS) as (cursor, recorder):
+            switched = []
+            for follower_id, data_json in cursor.execute(SQL_EVENT_FOLLOWERS, (ids_param, ids_param)).fetchall():
+                data = json.loads(data_json)
+                if data.get('trigger_mode') == 'follow_event_in_cue':
+                    data['trigger_mode'] = 'relative_to_cue'
+                    del data['followed_event_id']
+                    switched.append((follower_id, json.dumps(data)))
+            recorder.track('timeline_events', 'id', event_ids + [follower_id for follower_id, _data in switched])
+            cursor.executemany(SQL_SET_EVENT_DATA, [(data, follower_id) for follower_id, data in switched])
+            cursor.executemany(SQL_DELETE_EVENT, [(event_id,) for event_id in event_ids])
+        return [follower_id for follower_id, _data in switched]
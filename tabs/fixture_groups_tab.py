@@ -160,10 +160,7 @@ class FixtureGroupsTab(QWidget):
         self.groups_list_widget.clear()
         self.current_selected_group_id = None
         try:
-            cursor = self.main_window.db_connection.cursor()
-            cursor.execute("SELECT id, name FROM fixture_groups ORDER BY name")
-            groups = cursor.fetchall()
-            for group_id, name in groups:
+            for group_id, name in self.main_window.repository.groups():
                 item = QListWidgetItem(name)
                 item.setData(Qt.ItemDataRole.UserRole, group_id)
                 self.groups_list_widget.addItem(item)
@@ -174,9 +171,7 @@ class FixtureGroupsTab(QWidget):
     def get_all_group_names(self):
         names = []
         try:
-            cursor = self.main_window.db_connection.cursor()
-            cursor.execute("SELECT name FROM fixture_groups")
-            names = [row[0] for row in cursor.fetchall()]
+            names = [name for _group_id, name in self.main_window.repository.groups()]
         except Exception as e:
             print(f"Error fetching all group names: {e}")
         return names
@@ -188,9 +183,7 @@ class FixtureGroupsTab(QWidget):
             name = dialog.get_group_name()
             if name:
                 try:
-                    cursor = self.main_window.db_connection.cursor()
-                    cursor.execute("INSERT INTO fixture_groups (name) VALUES (?)", (name,))
-                    self.main_window.db_connection.commit()
+                    self.main_window.repository.create_group(name)
                     self.load_groups()
                     self.fixture_groups_changed.emit()
                 except sqlite3.IntegrityError: 
@@ -213,9 +206,7 @@ class FixtureGroupsTab(QWidget):
             new_name = dialog.get_group_name()
             if new_name and new_name != old_name:
                 try:
-                    cursor = self.main_window.db_connection.cursor()
-                    cursor.execute("UPDATE fixture_groups SET name = ? WHERE id = ?", (new_name, group_id))
-                    self.main_window.db_connection.commit()
+                    self.main_window.repository.rename_group(group_id, new_name)
                     self.load_groups()
                     self.fixture_groups_changed.emit()
                 except sqlite3.IntegrityError:
@@ -238,9 +229,7 @@ class FixtureGroupsTab(QWidget):
                                      QMessageBox.StandardButton.No)
         if reply == QMessageBox.StandardButton.Yes:
             try:
-                cursor = self.main_window.db_connection.cursor()
-                cursor.execute("DELETE FROM fixture_groups WHERE id = ?", (group_id,))
-                self.main_window.db_connection.commit()
+                self.main_window.repository.delete_group(group_id)
                 self.load_groups() 
                 self.fixture_groups_changed.emit()
             except Exception as e:
@@ -260,26 +249,13 @@ class FixtureGroupsTab(QWidget):
         self.update_fixture_related_widgets_enabled_state()
 
         try:
-            cursor = self.main_window.db_connection.cursor()
-            
-            cursor.execute("""
-                SELECT f.id, f.name FROM fixtures f
-                JOIN fixture_group_mappings fgm ON f.id = fgm.fixture_id
-                WHERE fgm.group_id = ? ORDER BY f.name
-            """, (self.current_selected_group_id,))
-            fixtures_in_group = cursor.fetchall()
-            for fix_id, name in fixtures_in_group:
+            repository = self.main_window.repository
+            for fix_id, name in repository.group_member_names(self.current_selected_group_id):
                 item = QListWidgetItem(f"{name} (ID: {fix_id})")
                 item.setData(Qt.ItemDataRole.UserRole, fix_id)
                 self.fixtures_in_group_list.addItem(item)
             
-            cursor.execute("""
-                SELECT id, name FROM fixtures 
-                WHERE id NOT IN (SELECT fixture_id FROM fixture_group_mappings WHERE group_id = ?)
-                ORDER BY name
-            """, (self.current_selected_group_id,))
-            available_fixtures = cursor.fetchall()
-            for fix_id, name in available_fixtures:
+            for fix_id, name in repository.group_non_member_names(self.current_selected_group_id):
                 item = QListWidgetItem(f"{name} (ID: {fix_id})")
                 item.setData(Qt.ItemDataRole.UserRole, fix_id)
                 self.available_fixtures_list.addItem(item)
@@ -302,11 +278,7 @@ class FixtureGroupsTab(QWidget):
         fixture_ids_to_add = [item.data(Qt.ItemDataRole.UserRole) for item in selected_items]
         
         try:
-            cursor = self.main_window.db_connection.cursor()
-            for fix_id in fixture_ids_to_add:
-                cursor.execute("INSERT OR IGNORE INTO fixture_group_mappings (group_id, fixture_id) VALUES (?, ?)",
-                               (self.current_selected_group_id, fix_id))
-            self.main_window.db_connection.commit()
+            self.main_window.repository.add_to_group(self.current_selected_group_id, fixture_ids_to_add)
             self.on_group_selected() 
             self.fixture_groups_changed.emit()
         except Exception as e:
@@ -325,11 +297,7 @@ class FixtureGroupsTab(QWidget):
         fixture_ids_to_remove = [item.data(Qt.ItemDataRole.UserRole) for item in selected_items]
 
         try:
-            cursor = self.main_window.db_connection.cursor()
-            for fix_id in fixture_ids_to_remove:
-                cursor.execute("DELETE FROM fixture_group_mappings WHERE group_id = ? AND fixture_id = ?",
-                               (self.current_selected_group_id, fix_id))
-            self.main_window.db_connection.commit()
+            self.main_window.repository.remove_from_group(self.current_selected_group_id, fixture_ids_to_remove)
             self.on_group_selected() 
             self.fixture_groups_changed.emit()
         except Exception as e:
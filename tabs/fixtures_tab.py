@@ -4,7 +4,7 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QLabel, QListWidget, QListWid
                              QSpinBox, QDoubleSpinBox, QMessageBox, QDialogButtonBox,
                              QFileDialog, QSplitter, QSizePolicy, QComboBox, QTextEdit,
                              QGroupBox, QTreeWidget, QTreeWidgetItem, QHeaderView)
-from PyQt6.QtCore import pyqtSignal, Qt
+from PyQt6.QtCore import pyqtSignal, Qt, QSignalBlocker
 import sqlite3
 import json
 
@@ -126,9 +126,7 @@ class ProfileManagementDialog(QDialog):
 
         self.profiles_list.clear()
         try:
-            cursor = self.main_window.db_connection.cursor()
-            cursor.execute("SELECT id, name, creator, attributes_json FROM fixture_profiles ORDER BY name")
-            profiles = cursor.fetchall()
+            profiles = self.main_window.repository.profiles()
             new_selection_item = None
             for profile_id, name, creator, attrs in profiles:
                 item = QListWidgetItem(name)
@@ -181,9 +179,7 @@ class ProfileManagementDialog(QDialog):
         
         if reply == QMessageBox.StandardButton.Yes:
             try:
-                cursor = self.main_window.db_connection.cursor()
-                cursor.execute("DELETE FROM fixture_profiles WHERE id = ?", (profile_id,))
-                self.main_window.db_connection.commit()
+                self.main_window.repository.delete_profile(profile_id) # Fixtures cascade with their profile
                 self.profiles_changed.emit()
                 self.load_profiles()
             except sqlite3.IntegrityError:
@@ -211,16 +207,8 @@ class ProfileManagementDialog(QDialog):
         attributes = self.edit_attrs_button.property("current_attrs")
 
         try:
-            cursor = self.main_window.db_connection.cursor()
-            if is_new:
-                cursor.execute("INSERT INTO fixture_profiles (name, creator, attributes_json) VALUES (?, ?, ?)",
-                               (name, creator, attributes))
-            else:
-                profile_id, _, _, _ = item.data(Qt.ItemDataRole.UserRole)
-                cursor.execute("UPDATE fixture_profiles SET name = ?, creator = ?, attributes_json = ? WHERE id = ?",
-                               (name, creator, attributes, profile_id))
-            
-            self.main_window.db_connection.commit()
+            profile_id = None if is_new else item.data(Qt.ItemDataRole.UserRole)[0]
+            self.main_window.repository.save_profile(profile_id, name, creator, attributes)
             self.profiles_changed.emit()
             self.load_profiles()
             QMessageBox.information(self, "Success", f"Profile '{name}' saved.")
@@ -230,6 +218,88 @@ class ProfileManagementDialog(QDialog):
             QMessageBox.critical(self, "DB Error", f"Failed to save profile: {e}")
 
 
+def bulk_patch_fixtures(profile_id: int, name: str, count: int, start_fid: int, sfi_count: int,
+                        columns: int, spacing_x: float, spacing_z: float, origin: tuple) -> list[dict]:
+    """
+    Fixture rows for count fixtures with consecutive FIDs from start_fid, each with SFIs
+    1..sfi_count, laid out row by row on a grid of the given columns and spacing from origin.
+    """
+    origin_x, origin_y, origin_z = origin
+    fixtures = []
+    for index in range(count):
+        row, column = divmod(index, max(1, columns))
+        fid = start_fid + index
+        position = {'x_pos': origin_x + column * spacing_x, 'y_pos': origin_y, 'z_pos': origin_z + row * spacing_z}
+        for sfi in range(1, sfi_count + 1):
+            fixtures.append(dict(position, name=f"{name} {index + 1}", profile_id=profile_id, fid=fid, sfi=sfi))
+    return fixtures
+
+
+class BulkPatchDialog(QDialog):
+    """Patches a block of identical fixtures with consecutive FIDs on a position grid."""
+
+    def __init__(self, main_window, parent=None):
+        super().__init__(parent)
+        self.main_window = main_window
+        self.setWindowTitle("Bulk Patch Fixtures")
+
+        layout = QFormLayout(self)
+        self.profile_combo = QComboBox()
+        for profile_id, profile_name in main_window.repository.profile_names():
+            self.profile_combo.addItem(profile_name, userData=profile_id)
+        self.profile_combo.currentTextChanged.connect(self.name_edit_default)
+        self.name_edit = QLineEdit(self.profile_combo.currentText())
+        self.count_edit = QSpinBox(); self.count_edit.setRange(1, 10000); self.count_edit.setValue(10)
+        self.start_fid_edit = QSpinBox(); self.start_fid_edit.setRange(1, 100000)
+        self.start_fid_edit.setValue((main_window.repository.max_fid() or 0) + 1)
+        self.sfi_count_edit = QSpinBox(); self.sfi_count_edit.setRange(1, 256); self.sfi_count_edit.setValue(1)
+        self.columns_edit = QSpinBox(); self.columns_edit.setRange(1, 10000); self.columns_edit.setValue(10)
+        self.spacing_x_edit = QDoubleSpinBox(); self.spacing_x_edit.setRange(0, 1000); self.spacing_x_edit.setDecimals(2); self.spacing_x_edit.setValue(2.0)
+        self.spacing_z_edit = QDoubleSpinBox(); self.spacing_z_edit.setRange(0, 1000); self.spacing_z_edit.setDecimals(2); self.spacing_z_edit.setValue(2.0)
+        self.origin_edits = []
+        for _axis in "XYZ":
+            origin_edit = QDoubleSpinBox(); origin_edit.setRange(-10000, 10000); origin_edit.setDecimals(3)
+            self.origin_edits.append(origin_edit)
+        self.summary_label = QLabel()
+
+        layout.addRow("Fixture Profile:", self.profile_combo)
+        layout.addRow("Name:", self.name_edit)
+        layout.addRow("Number of Fixtures:", self.count_edit)
+        layout.addRow("Starting FID:", self.start_fid_edit)
+        layout.addRow("SFIs per Fixture:", self.sfi_count_edit)
+        layout.addRow("Grid Columns:", self.columns_edit)
+        layout.addRow("Spacing X:", self.spacing_x_edit)
+        layout.addRow("Spacing Z:", self.spacing_z_edit)
+        for axis, origin_edit in zip("XYZ", self.origin_edits):
+            layout.addRow(f"Origin {axis}:", origin_edit)
+        layout.addRow(self.summary_label)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+        buttons.button(QDialogButtonBox.StandardButton.Ok).setText("Patch")
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addRow(buttons)
+
+        for spin_box in (self.count_edit, self.start_fid_edit, self.sfi_count_edit):
+            spin_box.valueChanged.connect(self.update_summary)
+        self.update_summary()
+
+    def name_edit_default(self, profile_name: str):
+        self.name_edit.setText(profile_name)
+
+    def update_summary(self):
+        count, sfi_count = self.count_edit.value(), self.sfi_count_edit.value()
+        start_fid = self.start_fid_edit.value()
+        self.summary_label.setText(f"{count * sfi_count} instance(s), FID {start_fid}–{start_fid + count - 1}")
+
+    def fixtures(self) -> list[dict]:
+        return bulk_patch_fixtures(
+            self.profile_combo.currentData(), self.name_edit.text().strip() or self.profile_combo.currentText(),
+            self.count_edit.value(), self.start_fid_edit.value(), self.sfi_count_edit.value(),
+            self.columns_edit.value(), self.spacing_x_edit.value(), self.spacing_z_edit.value(),
+            tuple(origin_edit.value() for origin_edit in self.origin_edits))
+
+
 class FixtureEditFormWidget(QWidget):
     """
     A form widget to edit the properties of a single fixture.
@@ -292,10 +362,7 @@ class FixtureEditFormWidget(QWidget):
         current_id = self.profile_combo.currentData()
         self.profile_combo.clear()
         try:
-            cursor = self.main_window.db_connection.cursor()
-            cursor.execute("SELECT id, name FROM fixture_profiles ORDER BY name")
-            profiles = cursor.fetchall()
-            for profile_id, name in profiles:
+            for profile_id, name in self.main_window.repository.profile_names():
                 self.profile_combo.addItem(name, userData=profile_id)
             
             if current_id is not None:
@@ -368,9 +435,7 @@ class FixtureEditFormWidget(QWidget):
 
             # Suggest the next available FID
             try:
-                cursor = self.main_window.db_connection.cursor()
-                cursor.execute("SELECT MAX(fid) FROM fixtures")
-                max_fid = cursor.fetchone()[0]
+                max_fid = self.main_window.repository.max_fid()
                 self.fid_edit.setValue( (max_fid or 0) + 1 )
             except Exception as e:
                 self.fid_edit.setValue(1)
@@ -423,7 +488,7 @@ class FixtureEditFormWidget(QWidget):
 
 class FixturesTab(QWidget):
     fixture_updated = pyqtSignal(int, dict) 
-    fixture_added = pyqtSignal(dict)       
+    fixtures_added = pyqtSignal(list) # New fixture ids, once per create or bulk patch
     fixture_deleted = pyqtSignal(list)     
 
     def __init__(self, main_window):
@@ -442,6 +507,10 @@ class FixturesTab(QWidget):
         self.add_new_button.clicked.connect(self._prepare_new_fixture)
         controls_layout.addWidget(self.add_new_button)
 
+        self.bulk_patch_button = QPushButton("Bulk Patch...")
+        self.bulk_patch_button.clicked.connect(self._bulk_patch)
+        controls_layout.addWidget(self.bulk_patch_button)
+
         self.delete_button = QPushButton("Delete Selected")
         self.delete_button.setObjectName("DestructiveButton")
         self.delete_button.clicked.connect(self._delete_selected_fixture)
@@ -489,16 +558,10 @@ class FixturesTab(QWidget):
         if self.fixtures_tree_widget.currentItem():
             selected_id = self.fixtures_tree_widget.currentItem().data(3, Qt.ItemDataRole.UserRole)
         
-        self.fixtures_tree_widget.clear()
+        with QSignalBlocker(self.fixtures_tree_widget): # Clearing moves the selection through fixtures that may be gone
+            self.fixtures_tree_widget.clear()
         try:
-            cursor = self.db_connection.cursor()
-            cursor.execute("""
-                SELECT f.id, f.fid, f.sfi, f.name, p.name 
-                FROM fixtures f 
-                JOIN fixture_profiles p ON f.profile_id = p.id 
-                ORDER BY f.fid, f.sfi
-            """)
-            fixtures = cursor.fetchall()
+            fixtures = self.main_window.repository.fixture_list_with_profiles()
             
             parent_items = {}
             item_to_reselect = None
@@ -534,12 +597,8 @@ class FixturesTab(QWidget):
         if current_item and current_item.childCount() == 0: # It's a sub-item
             fixture_id = current_item.data(3, Qt.ItemDataRole.UserRole)
             try:
-                cursor = self.db_connection.cursor()
-                cursor.execute("SELECT * FROM fixtures WHERE id = ?", (fixture_id,))
-                fixture_row = cursor.fetchone()
-                if fixture_row:
-                    db_cols = [desc[0] for desc in cursor.description]
-                    fixture_data_dict = dict(zip(db_cols, fixture_row))
+                fixture_data_dict = self.main_window.repository.fixture(fixture_id)
+                if fixture_data_dict:
                     self.edit_form_widget.load_data(fixture_data_dict)
                     self.save_button.setText("Save Changes")
                 else:
@@ -569,52 +628,52 @@ class FixturesTab(QWidget):
         is_new = self.edit_form_widget.current_fixture_pk_id is None
         
         try:
-            cursor = self.db_connection.cursor()
+            repository = self.main_window.repository
             
             if is_new:
                 instance_count = fixture_data.pop('instance_count')
                 start_sfi = fixture_data['sfi']
-                fid = fixture_data['fid']
-                
-                # Check for FID/SFI collisions before creating any instances
-                for i in range(instance_count):
-                    sfi_to_check = start_sfi + i
-                    cursor.execute("SELECT id FROM fixtures WHERE fid = ? AND sfi = ?", (fid, sfi_to_check))
-                    if cursor.fetchone():
-                        QMessageBox.warning(self, "ID Collision", f"Fixture ID {fid}.{sfi_to_check} already exists. Please choose a different starting FID or SFI.")
-                        return
-                
-                # Create the instances
-                for i in range(instance_count):
-                    fixture_data['sfi'] = start_sfi + i
-                    columns = [col for col in fixture_data.keys() if col != 'id']
-                    placeholders = ', '.join(['?'] * len(columns))
-                    values = tuple(fixture_data[col] for col in columns)
-                    cursor.execute(f"INSERT INTO fixtures ({', '.join(columns)}) VALUES ({placeholders})", values)
-                    new_id = cursor.lastrowid
-                    created_fixture_data = fixture_data.copy()
-                    created_fixture_data['id'] = new_id
-                    self.fixture_added.emit(created_fixture_data)
+
+                # Create the instances in one transaction; FID/SFI collisions are rejected before any is written
+                instances = [dict(fixture_data, sfi=start_sfi + i) for i in range(instance_count)]
+                try:
+                    new_ids = repository.insert_fixtures(instances)
+                except ValueError as e:
+                    QMessageBox.warning(self, "ID Collision", f"{e}\nPlease choose a different starting FID or SFI.")
+                    return
+                self.fixtures_added.emit(new_ids)
                 
                 QMessageBox.information(self, "Success", f"{instance_count} fixture instance(s) created.")
 
             else: # Update existing
                 fixture_id = fixture_data.pop('id')
                 # In edit mode, FID and SFI are not changed
-                columns_to_update = [col for col in fixture_data.keys() if col not in ['id', 'fid', 'sfi', 'instance_count']]
-                set_clauses = [f"{col} = ?" for col in columns_to_update]
-                values = [fixture_data[col] for col in columns_to_update] + [fixture_id]
-                cursor.execute(f"UPDATE fixtures SET {', '.join(set_clauses)} WHERE id = ?", tuple(values))
+                repository.update_fixture(fixture_id, {col: val for col, val in fixture_data.items() if col not in ['fid', 'sfi']})
 
                 self.fixture_updated.emit(fixture_id, fixture_data)
                 QMessageBox.information(self, "Success", f"Fixture '{fixture_data['name']}' updated.")
             
-            self.db_connection.commit()
             self.load_fixtures_into_list()
 
         except Exception as e:
             QMessageBox.critical(self, "Database Error", f"Could not save fixture changes: {e}")
 
+    def _bulk_patch(self):
+        dialog = BulkPatchDialog(self.main_window, self)
+        if not dialog.exec():
+            return
+        fixtures = dialog.fixtures()
+        try:
+            new_ids = self.main_window.repository.insert_fixtures(fixtures)
+        except ValueError as e:
+            QMessageBox.warning(self, "ID Collision", f"{e}\nNothing was patched.")
+            return
+        except sqlite3.Error as e:
+            QMessageBox.critical(self, "Database Error", f"Could not patch fixtures: {e}")
+            return
+        self.fixtures_added.emit(new_ids)
+        self.main_window.status_bar.showMessage(f"Patched {len(new_ids)} fixture instance(s).", 4000)
+
     def _delete_selected_fixture(self):
         selected_items = self.fixtures_tree_widget.selectedItems()
         if not selected_items:
@@ -647,10 +706,7 @@ class FixturesTab(QWidget):
             return
 
         try:
-            cursor = self.db_connection.cursor()
-            placeholders = ','.join(['?'] * len(ids_to_delete))
-            cursor.execute(f"DELETE FROM fixtures WHERE id IN ({placeholders})", tuple(ids_to_delete))
-            self.db_connection.commit()
+            self.main_window.repository.delete_fixtures(ids_to_delete)
             
             self.fixture_deleted.emit(ids_to_delete)
             self.load_fixtures_into_list()
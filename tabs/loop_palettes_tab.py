@@ -504,9 +504,7 @@ class LoopPalettesTab(QWidget):
 
         self.palettes_list_widget.clear()
         try:
-            cursor = self.main_window.db_connection.cursor()
-            cursor.execute("SELECT id, name, config_json FROM loop_palettes ORDER BY name")
-            palettes = cursor.fetchall()
+            palettes = self.main_window.repository.loop_palettes()
             selected_item_to_restore = None
             for p_id, name, cfg_json_str in palettes:
                 display_name = name
@@ -568,18 +566,11 @@ class LoopPalettesTab(QWidget):
 
         if is_new_entry: 
             try:
-                cursor = self.main_window.db_connection.cursor()
-                cursor.execute("SELECT id FROM loop_palettes WHERE name = ?", (data_to_save['name'],))
-                if cursor.fetchone():
+                if self.main_window.repository.loop_palette_name_taken(data_to_save['name']):
                     QMessageBox.warning(self, "Name Exists", f"A loop palette named '{data_to_save['name']}' already exists.")
                     return
                 
-                cursor.execute(
-                    "INSERT INTO loop_palettes (name, config_json) VALUES (?, ?)",
-                    (data_to_save['name'], data_to_save['config_json'])
-                )
-                new_id = cursor.lastrowid
-                self.main_window.db_connection.commit()
+                new_id = self.main_window.repository.save_loop_palette(None, data_to_save['name'], data_to_save['config_json'])
                 self.edit_form_widget.current_palette_id = new_id 
                 QMessageBox.information(self, "Success", "Loop Palette created.")
             except Exception as e:
@@ -594,22 +585,14 @@ class LoopPalettesTab(QWidget):
             
             if data_to_save['name'] != original_name_from_list_item_data: 
                 try:
-                    cursor = self.main_window.db_connection.cursor()
-                    cursor.execute("SELECT id FROM loop_palettes WHERE name = ? AND id != ?", (data_to_save['name'], original_id))
-                    if cursor.fetchone():
+                    if self.main_window.repository.loop_palette_name_taken(data_to_save['name'], original_id):
                         QMessageBox.warning(self, "Name Exists", f"Another loop palette named '{data_to_save['name']}' already exists.")
                         return
                 except Exception as e:
                     QMessageBox.critical(self, "DB Error", f"Error checking name uniqueness on update: {e}")
                     return
             try:
-                cursor = self.main_window.db_connection.cursor()
-                cursor.execute(
-                    """UPDATE loop_palettes SET name = ?, config_json = ?
-                       WHERE id = ?""",
-                    (data_to_save['name'], data_to_save['config_json'], original_id)
-                )
-                self.main_window.db_connection.commit()
+                self.main_window.repository.save_loop_palette(original_id, data_to_save['name'], data_to_save['config_json'])
                 QMessageBox.information(self, "Success", "Loop Palette updated.")
             except Exception as e:
                 QMessageBox.critical(self, "DB Error", f"Could not update loop palette: {e}")
@@ -633,9 +616,7 @@ class LoopPalettesTab(QWidget):
                                      QMessageBox.StandardButton.No)
         if reply == QMessageBox.StandardButton.Yes:
             try:
-                cursor = self.main_window.db_connection.cursor()
-                cursor.execute("DELETE FROM loop_palettes WHERE id = ?", (palette_id,))
-                self.main_window.db_connection.commit()
+                self.main_window.repository.delete_loop_palette(palette_id)
                 self.load_palettes_into_list()
                 if self.palettes_list_widget.count() == 0:
                     self.prepare_new_palette_entry()
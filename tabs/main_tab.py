@@ -54,9 +54,7 @@ class SelectFixtureDialog(QDialog):
                 self.fixture_list_widget.addItem("DB not connected.")
                 self.fixture_list_widget.setEnabled(False)
                 return
-            cursor=self.main_window.db_connection.cursor()
-            cursor.execute("SELECT id, name, fid, sfi FROM fixtures ORDER BY fid, sfi")
-            fixtures=cursor.fetchall()
+            fixtures=self.main_window.repository.fixture_list()
             if not fixtures:
                 self.fixture_list_widget.addItem("No fixtures.")
                 self.fixture_list_widget.setEnabled(False)
@@ -106,9 +104,7 @@ class SelectLoopsDialog(QDialog):
         pre_selected_ids = {conf.get('id') for conf in pre_selected_configs if conf.get('id') is not None}
         
         try:
-            cursor = self.main_window.db_connection.cursor()
-            cursor.execute("SELECT id, name, config_json FROM loop_palettes ORDER BY name")
-            all_loops = cursor.fetchall()
+            all_loops = self.main_window.repository.loop_palettes()
 
             if not all_loops:
                 self.loop_list_widget.addItem("No loop palettes created yet.")
@@ -479,10 +475,6 @@ class DefinedArea:
                      except (TypeError, RuntimeError): pass
                      try: main_window.fixture_data_globally_changed.disconnect(self.embedded_widget.handle_single_fixture_update)
                      except (TypeError, RuntimeError): pass
-            elif isinstance(self.embedded_widget, CueListWidget):
-                 if hasattr(self.embedded_widget, 'timeline_tab') and self.embedded_widget.timeline_tab:
-                    try: self.embedded_widget.timeline_tab.cues_changed.disconnect(self.embedded_widget.refresh_cues)
-                    except (TypeError, RuntimeError): pass
             
             self.embedded_widget.deleteLater()
             self.embedded_widget=None
@@ -648,9 +640,7 @@ class MainTab(QWidget):
         combo = QComboBox()
         combo.setObjectName(object_name)
         try:
-            cursor = self.main_window.db_connection.cursor()
-            cursor.execute("SELECT id, name, fid, sfi FROM fixtures ORDER BY fid, sfi")
-            fixtures = cursor.fetchall()
+            fixtures = self.main_window.repository.fixture_list()
             combo.addItem("Select a fixture...", -1)
             for pk_id, name, fid, sfi in fixtures:
                 combo.addItem(f"{name} ({fid}.{sfi})", pk_id)
@@ -668,9 +658,7 @@ class MainTab(QWidget):
         combo = QComboBox()
         combo.setObjectName("AssignmentPresetCombo")
         try:
-            cursor = self.main_window.db_connection.cursor()
-            cursor.execute("SELECT preset_number, name FROM presets ORDER BY preset_number")
-            presets = cursor.fetchall()
+            presets = self.main_window.repository.preset_names()
             combo.addItem("Select a preset...", None)
             for num, name in presets:
                 display_name = f"P {num}"
@@ -745,9 +733,7 @@ class MainTab(QWidget):
             group_combo.setObjectName("AssignmentGroupCombo")
             form_layout.addRow("Target Group:", group_combo)
             try:
-                cursor = self.main_window.db_connection.cursor()
-                cursor.execute("SELECT id, name FROM fixture_groups ORDER BY name")
-                groups = cursor.fetchall()
+                groups = self.main_window.repository.groups()
                 group_combo.addItem("Select a group...", -1)
                 for gid, name in groups:
                     group_combo.addItem(name, gid)
@@ -934,10 +920,7 @@ class MainTab(QWidget):
         fixture_ids = []
         if selected_group_ids:
             try:
-                cursor = self.main_window.db_connection.cursor()
-                placeholders = ','.join('?' for _ in selected_group_ids)
-                cursor.execute(f"SELECT fixture_id FROM fixture_group_mappings WHERE group_id IN ({placeholders})", tuple(selected_group_ids))
-                fixture_ids = [row[0] for row in cursor.fetchall()]
+                fixture_ids = list(self.main_window.repository.groups_fixture_ids(selected_group_ids))
             except Exception as e:
                 QMessageBox.critical(self, "DB Error", f"Error fetching fixtures for groups: {e}")
         
@@ -1007,6 +990,11 @@ class MainTab(QWidget):
         for area in self.interactive_canvas.defined_areas:
             self.interactive_canvas.update_area_widget(area)
 
+    def uses_timeline(self) -> bool:
+        """True if the layout embeds a view of the timeline or its cue list."""
+        return any(area.function_type in ("Embedded Timeline", "Master Cue List")
+                   for area in self.interactive_canvas.defined_areas)
+
     def on_global_fixture_data_changed(self, fixture_id: int, new_data: Dict[str, Any]):
         # Sync controls (sliders, color pickers, etc.) if the changed fixture is part of the current selection
         if fixture_id in self.globally_selected_fixture_ids_for_controls:
@@ -1033,13 +1021,8 @@ class MainTab(QWidget):
     def _handle_group_selector_button_clicked(self, group_id: int):
         if group_id is None: return
         try:
-            cursor = self.main_window.db_connection.cursor()
-            cursor.execute("SELECT name FROM fixture_groups WHERE id = ?", (group_id,))
-            group_name_tuple = cursor.fetchone()
-            group_name = group_name_tuple[0] if group_name_tuple else "Unknown Group"
-            
-            cursor.execute("SELECT fixture_id FROM fixture_group_mappings WHERE group_id = ?", (group_id,))
-            fixture_ids = [row[0] for row in cursor.fetchall()]
+            group_name = self.main_window.repository.group_name(group_id) or "Unknown Group"
+            fixture_ids = list(self.main_window.repository.group_fixture_ids(group_id))
             
             self.clear_all_global_selections()
             self.globally_selected_fixture_ids_for_controls = fixture_ids
@@ -1944,23 +1927,18 @@ class InteractiveGridCanvas(QWidget):
         palette_kind = target_area.data.get('palette_kind', 'Color')
         
         try:
-            cursor = self.main_window.db_connection.cursor()
+            fixture = self.main_window.repository.fixture(first_fid)
             data_to_store = {}
             default_name_prefix = "Item"
 
             if palette_kind == "Color":
-                cursor.execute("SELECT red, green, blue FROM fixtures WHERE id=?", (first_fid,))
-                row = cursor.fetchone()
-                if not row: QMessageBox.warning(self, "Error", f"Could not fetch color for fixture ID {first_fid}."); return
-                current_color = QColor(row[0], row[1], row[2])
+                if not fixture: QMessageBox.warning(self, "Error", f"Could not fetch color for fixture ID {first_fid}."); return
+                current_color = QColor(fixture['red'], fixture['green'], fixture['blue'])
                 data_to_store = {'color_hex': current_color.name()}
                 default_name_prefix = "C"
             elif palette_kind == "Position":
-                cursor.execute("SELECT x_pos, y_pos, z_pos, rotation_x, rotation_y, rotation_z FROM fixtures WHERE id=?", (first_fid,))
-                row = cursor.fetchone()
-                if not row: QMessageBox.warning(self, "Error", f"Could not fetch position for fixture ID {first_fid}."); return
-                pos_params = {'x_pos': row[0], 'y_pos': row[1], 'z_pos': row[2],
-                              'rotation_x': row[3], 'rotation_y': row[4], 'rotation_z': row[5]}
+                if not fixture: QMessageBox.warning(self, "Error", f"Could not fetch position for fixture ID {first_fid}."); return
+                pos_params = {key: fixture[key] for key in ('x_pos', 'y_pos', 'z_pos', 'rotation_x', 'rotation_y', 'rotation_z')}
                 data_to_store = {'params': pos_params}
                 default_name_prefix = "P"
             else:
@@ -2034,9 +2012,7 @@ class InteractiveGridCanvas(QWidget):
         list_widget.blockSignals(True)
         list_widget.clear()
         try:
-            cursor = self.main_window.db_connection.cursor()
-            cursor.execute("SELECT id, name, fid, sfi FROM fixtures ORDER BY fid, sfi")
-            fixtures = cursor.fetchall()
+            fixtures = self.main_window.repository.fixture_list()
             if not fixtures: list_widget.addItem("No fixtures available."); list_widget.setEnabled(False)
             else:
                 list_widget.setEnabled(True)
@@ -2066,9 +2042,7 @@ class InteractiveGridCanvas(QWidget):
         list_widget.blockSignals(True)
         list_widget.clear()
         try:
-            cursor = self.main_window.db_connection.cursor()
-            cursor.execute("SELECT id, name FROM fixture_groups ORDER BY name")
-            groups = cursor.fetchall()
+            groups = self.main_window.repository.groups()
             if not groups:
                 list_widget.addItem("No groups available.")
                 list_widget.setEnabled(False)
@@ -2513,6 +2487,7 @@ class InteractiveGridCanvas(QWidget):
                     timeline_tab.playback_state_changed_for_embedded.connect(widget.update_playback_state)
                 if hasattr(timeline_tab, 'content_or_playhead_changed_for_embedded'):
                     timeline_tab.content_or_playhead_changed_for_embedded.connect(widget.update_view)
+                timeline_tab.timeline_model.changed.connect(widget.update_view)
                 area_item.embedded_widget = widget
             else:
                 area_item.set_function("None", {}, "Timeline Unavailable")
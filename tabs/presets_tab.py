@@ -130,9 +130,7 @@ class PresetsTab(QWidget):
 
         self.presets_list_widget.clear()
         try:
-            cursor = self.main_window.db_connection.cursor()
-            cursor.execute("SELECT preset_number, name, type FROM presets ORDER BY type, preset_number")
-            presets = cursor.fetchall()
+            presets = self.main_window.repository.presets_list()
             new_selection_item = None
             for preset_number, name, preset_type in presets:
                 type_str = f"[{preset_type.capitalize()}] " if preset_type.lower() != 'all' else ""
@@ -223,10 +221,8 @@ class PresetsTab(QWidget):
         preset_number, preset_type = preset_info
         
         try:
-            cursor = self.main_window.db_connection.cursor()
-            cursor.execute("SELECT name FROM presets WHERE preset_number = ?", (preset_number,))
-            result = cursor.fetchone()
-            current_name = result[0] if result else ""
+            preset_header = self.main_window.repository.preset_header(preset_number)
+            current_name = preset_header[1] if preset_header else ""
 
             dialog = PresetDialog(current_number=preset_number, current_name=current_name, current_type=preset_type, parent=self, is_new=False)
             dialog.number_edit.setReadOnly(True)
@@ -235,8 +231,7 @@ class PresetsTab(QWidget):
             if dialog.exec():
                 new_number, new_name, _ = dialog.get_preset_info()
                 if new_name != current_name:
-                    cursor.execute("UPDATE presets SET name = ? WHERE preset_number = ?", (new_name, new_number))
-                    self.main_window.db_connection.commit()
+                    self.main_window.repository.rename_preset(new_number, new_name)
                     self.load_presets_from_db()
                     QMessageBox.information(self, "Preset Labeled", f"Preset {new_number} label updated.")
         except Exception as e:
@@ -253,12 +248,11 @@ class PresetsTab(QWidget):
         preset_number, _ = preset_info
         
         try:
-            cursor = self.main_window.db_connection.cursor()
-            cursor.execute("SELECT name, data FROM presets WHERE preset_number = ?", (preset_number,))
-            result = cursor.fetchone()
-            if result:
-                name, data_str = result
-                dialog = PresetViewDialog(preset_number, name, data_str, self)
+            preset_header = self.main_window.repository.preset_header(preset_number)
+            preset = self.main_window.repository.preset(preset_number)
+            if preset_header and preset is not None:
+                name = preset_header[1]
+                dialog = PresetViewDialog(preset_number, name, json.dumps(preset.to_data_map()), self)
                 dialog.exec()
             else:
                 QMessageBox.critical(self, "Error", f"Preset data for '{preset_number}' not found.")
@@ -278,9 +272,7 @@ class PresetsTab(QWidget):
                                          QMessageBox.StandardButton.No)
             if reply == QMessageBox.StandardButton.Yes:
                 try:
-                    cursor = self.main_window.db_connection.cursor()
-                    cursor.execute("DELETE FROM presets WHERE preset_number = ?", (preset_number,))
-                    self.main_window.db_connection.commit()
+                    self.main_window.repository.delete_preset(preset_number)
                     self.load_presets_from_db()
                     QMessageBox.information(self, "Preset Deleted", f"Preset {preset_number} deleted.")
                 except Exception as e:
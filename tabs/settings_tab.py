@@ -2,13 +2,14 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QCheckBox, QGroupBox,
                              QFormLayout, QPushButton, QFileDialog, QMessageBox,
                              QLineEdit, QScrollArea, QSpacerItem, QSizePolicy,
-                             QComboBox, QApplication, QTabWidget, QDoubleSpinBox,
+                             QComboBox, QApplication, QTabWidget, QDoubleSpinBox, QSpinBox,
                              QTableWidget, QTableWidgetItem, QAbstractItemView, QHeaderView,
                              QDialog)
 from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtGui import QKeySequence
 import json
 import theme_manager 
+from show_io import PATCH_AND_PRESETS
 
 class KeybindCaptureDialog(QDialog):
     """A simple dialog to capture a key sequence from the user."""
@@ -85,6 +86,12 @@ class SettingsTab(QWidget):
         self.always_on_top_checkbox = QCheckBox("Window Always on Top")
         self.always_on_top_checkbox.toggled.connect(self.toggle_always_on_top_setting) 
         general_form_layout.addRow(self.always_on_top_checkbox)
+
+        self.timeline_clock_fps_spinbox = QSpinBox()
+        self.timeline_clock_fps_spinbox.setRange(10, 240)
+        self.timeline_clock_fps_spinbox.setSuffix(" fps")
+        self.timeline_clock_fps_spinbox.setToolTip("How often timeline playback updates the playhead, triggers events and steps fades.")
+        general_form_layout.addRow("Timeline Playback Rate:", self.timeline_clock_fps_spinbox)
         
         general_group.setLayout(general_form_layout)
         content_layout.addWidget(general_group)
@@ -132,6 +139,12 @@ class SettingsTab(QWidget):
         self.roblox_auto_patch_checkbox.setToolTip("If a fixture is found in the Roblox game but not in the patch,\nautomatically add it using a default profile.")
         roblox_form_layout.addRow(self.roblox_auto_patch_checkbox)
 
+        self.roblox_presend_spinbox = QSpinBox()
+        self.roblox_presend_spinbox.setRange(0, 2000)
+        self.roblox_presend_spinbox.setSingleStep(50)
+        self.roblox_presend_spinbox.setSuffix(" ms")
+        self.roblox_presend_spinbox.setToolTip("How far ahead timeline cues are sent to Roblox, time-stamped so clients apply them exactly on time.\n0 disables pre-sending.")
+        roblox_form_layout.addRow("Cue Pre-send Window:", self.roblox_presend_spinbox)
 
         roblox_group.setLayout(roblox_form_layout)
         content_layout.addWidget(roblox_group)
@@ -178,6 +191,21 @@ class SettingsTab(QWidget):
         data_group.setStyleSheet("QGroupBox { font-weight: bold; }")
         data_v_layout = QVBoxLayout() 
 
+        self.in_memory_database_checkbox = QCheckBox("Run Show Database in Memory (applies after restart)")
+        self.in_memory_database_checkbox.setToolTip("Keeps the show in RAM so edits never wait for the disk.\nThe show is backed up to disk on a timer and at exit; changes since the last backup are lost if the application crashes.")
+        data_v_layout.addWidget(self.in_memory_database_checkbox)
+
+        backup_interval_layout = QHBoxLayout()
+        backup_interval_layout.addWidget(QLabel("Backup to Disk Every:"))
+        self.backup_interval_spinbox = QSpinBox()
+        self.backup_interval_spinbox.setRange(5, 3600)
+        self.backup_interval_spinbox.setSuffix(" s")
+        self.backup_interval_spinbox.setToolTip("How often the in-memory show is copied to disk; also the most work a crash can lose.")
+        backup_interval_layout.addWidget(self.backup_interval_spinbox)
+        backup_interval_layout.addStretch()
+        data_v_layout.addLayout(backup_interval_layout)
+        data_v_layout.addSpacing(10)
+
         export_show_button = QPushButton("Export Complete Show Data (to JSON)")
         export_show_button.clicked.connect(self.handle_export_show_data)
         data_v_layout.addWidget(export_show_button)
@@ -186,6 +214,11 @@ class SettingsTab(QWidget):
         import_show_button.clicked.connect(self.handle_import_show_data)
         data_v_layout.addWidget(import_show_button)
 
+        import_patch_button = QPushButton("Import Patch && Presets Only (from JSON)")
+        import_patch_button.setToolTip("Replaces fixture profiles, fixtures, groups and presets; keeps cues, timeline and palettes.")
+        import_patch_button.clicked.connect(self.handle_import_patch_and_presets)
+        data_v_layout.addWidget(import_patch_button)
+
 
         data_v_layout.addSpacing(10) 
 
@@ -256,8 +289,12 @@ class SettingsTab(QWidget):
         always_on_top = settings.value('window/always_on_top', False, type=bool)
         self.always_on_top_checkbox.setChecked(always_on_top)
         
+        self.timeline_clock_fps_spinbox.setValue(settings.value('timeline/clock_fps', 60, type=int))
         self.roblox_live_mode_checkbox.setChecked(settings.value('roblox/live_mode_enabled', False, type=bool))
         self.roblox_auto_patch_checkbox.setChecked(settings.value('roblox/auto_patch_enabled', True, type=bool))
+        self.roblox_presend_spinbox.setValue(settings.value('roblox/presend_lookahead_ms', 300, type=int))
+        self.in_memory_database_checkbox.setChecked(settings.value('database/in_memory', False, type=bool))
+        self.backup_interval_spinbox.setValue(settings.value('database/backup_interval_s', 30, type=int))
 
         # Load Gamepad settings
         self.gamepad_enabled_checkbox.setChecked(settings.value('gamepad/enabled', True, type=bool))
@@ -282,8 +319,16 @@ class SettingsTab(QWidget):
 
 
         settings.setValue('window/always_on_top', self.always_on_top_checkbox.isChecked())
+        settings.setValue('timeline/clock_fps', self.timeline_clock_fps_spinbox.value())
+        if getattr(self.main_window, 'timeline_tab', None):
+            self.main_window.timeline_tab.playback_clock.set_frame_rate(self.timeline_clock_fps_spinbox.value())
         settings.setValue('roblox/live_mode_enabled', self.roblox_live_mode_checkbox.isChecked())
         settings.setValue('roblox/auto_patch_enabled', self.roblox_auto_patch_checkbox.isChecked())
+        settings.setValue('roblox/presend_lookahead_ms', self.roblox_presend_spinbox.value())
+        settings.setValue('database/in_memory', self.in_memory_database_checkbox.isChecked())
+        settings.setValue('database/backup_interval_s', self.backup_interval_spinbox.value())
+        if getattr(self.main_window, 'memory_backup_timer', None):
+            self.main_window.memory_backup_timer.setInterval(self.backup_interval_spinbox.value() * 1000)
 
         # Save Gamepad settings
         settings.setValue('gamepad/enabled', self.gamepad_enabled_checkbox.isChecked())
@@ -322,6 +367,8 @@ class SettingsTab(QWidget):
         actions.extend([
             {'id': 'global.clear_selection', 'name': 'Global: Clear Selection', 'group': 'Global'},
             {'id': 'global.toggle_blackout', 'name': 'Global: Toggle Blackout', 'group': 'Global'},
+            {'id': 'global.undo', 'name': 'Global: Undo', 'group': 'Global'},
+            {'id': 'global.redo', 'name': 'Global: Redo', 'group': 'Global'},
             {'id': 'timeline.go_next_cue', 'name': 'Timeline: Go to Next Cue', 'group': 'Timeline'},
             {'id': 'timeline.go_prev_cue', 'name': 'Timeline: Go to Previous Cue', 'group': 'Timeline'},
             {'id': 'timeline.toggle_playback', 'name': 'Timeline: Toggle Play/Pause', 'group': 'Timeline'},
@@ -330,19 +377,16 @@ class SettingsTab(QWidget):
 
         # Dynamic Actions from DB
         try:
-            cursor = self.main_window.db_connection.cursor()
+            repository = self.main_window.repository
             # Presets
-            cursor.execute("SELECT preset_number, name FROM presets ORDER BY preset_number")
-            for p_num, p_name in cursor.fetchall():
+            for p_num, p_name in repository.preset_names():
                 name = f"Apply Preset {p_num}" + (f" ({p_name})" if p_name else "")
                 actions.append({'id': f'preset.apply.{p_num}', 'name': name, 'group': 'Presets'})
             # Loop Palettes
-            cursor.execute("SELECT id, name FROM loop_palettes ORDER BY name")
-            for l_id, l_name in cursor.fetchall():
+            for l_id, l_name, _config_json in repository.loop_palettes():
                 actions.append({'id': f'loop.toggle.{l_id}', 'name': f"Toggle Loop '{l_name}'", 'group': 'Loops'})
             # Cues
-            cursor.execute("SELECT cue_number, name FROM cues ORDER BY cue_number")
-            for c_num, c_name in cursor.fetchall():
+            for c_num, c_name in repository.cue_names():
                 name = f"Go to Cue {c_num}" + (f" ({c_name})" if c_name else "")
                 actions.append({'id': f'cue.go.{c_num}', 'name': name, 'group': 'Cues'})
         except Exception as e:
@@ -410,7 +454,7 @@ class SettingsTab(QWidget):
         self.keybinds_changed.emit()
 
     def handle_export_show_data(self):
-        file_path, _ = QFileDialog.getSaveFileName(self.main_window, "Export Complete Show Data", "", "JSON Files (*.json);;All Files (*)")
+        file_path, _ = QFileDialog.getSaveFileName(self.main_window, "Export Complete Show Data", "", "JSON Files (*.json);;Compressed Show Files (*.json.gz *.json.zst);;All Files (*)")
         if file_path:
             if hasattr(self.main_window, 'export_show_data'):
                  self.main_window.export_show_data(file_path)
@@ -418,10 +462,16 @@ class SettingsTab(QWidget):
                  QMessageBox.critical(self, "Error", "Export functionality not fully implemented in main window.")
 
     def handle_import_show_data(self): 
-        file_path, _ = QFileDialog.getOpenFileName(self.main_window, "Import Complete Show Data", "", "JSON Files (*.json);;All Files (*)")
+        self._import_show_file("Import Complete Show Data")
+
+    def handle_import_patch_and_presets(self):
+        self._import_show_file("Import Patch & Presets", PATCH_AND_PRESETS)
+
+    def _import_show_file(self, title: str, sections=None):
+        file_path, _ = QFileDialog.getOpenFileName(self.main_window, title, "", "Show Files (*.json *.json.gz *.json.zst);;All Files (*)")
         if file_path:
             if hasattr(self.main_window, 'import_show_data'):
-                self.main_window.import_show_data(file_path)
+                self.main_window.import_show_data(file_path, sections)
             else:
                 QMessageBox.critical(self, "Error", "Import show functionality not implemented in main window.")
 
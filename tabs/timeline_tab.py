@@ -4,15 +4,25 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QLabel, QPushButton, QScrollA
                              QDialog, QFormLayout, QDoubleSpinBox, QComboBox, QDialogButtonBox,
                              QMessageBox, QSplitter, QSizePolicy, QMenu, QSpinBox, QAbstractItemView,
                              QFrame, QTableWidget, QTableWidgetItem, QHeaderView, QApplication, QColorDialog)
-from PyQt6.QtCore import pyqtSignal, Qt, QTimer, QElapsedTimer, QRectF, QPointF, QMargins, QPoint, QSize, QUrl, QSizeF
-from PyQt6.QtGui import (QPainter, QColor, QPen, QBrush, QCursor, QMouseEvent, QWheelEvent, QAction, QFontMetrics, QFont, QPainterPath, QLinearGradient)
+from PyQt6.QtCore import pyqtSignal, Qt, QTimer, QElapsedTimer, QRect, QRectF, QPointF, QMargins, QPoint, QSize, QUrl, QSizeF
+from PyQt6.QtGui import (QPainter, QColor, QPen, QBrush, QCursor, QMouseEvent, QWheelEvent, QAction, QFontMetrics, QFont, QPainterPath, QLinearGradient, QPixmap)
 from PyQt6.QtMultimedia import QMediaPlayer, QAudioOutput
-import json
-import random
 import math
 import copy
 import time
-import sqlite3
+from bisect import bisect_left
+from collections import OrderedDict
+
+import numpy as np
+
+from audio_analysis import BAND_LABELS, BEATS_PER_BAR, AudioAnalysis, AudioAnalyzer
+from fade_engine import FADABLE_EVENT_TYPES, FADE_CURVE_LABELS, MASTER_FIXTURE_ID, FadeEngine
+from playback_clock import PlaybackClock
+from timeline_model import TimelineModel
+from timeline_schedule import EventTiming, StateCheckpoints, TimelineSchedule, TrackIndex, TRACKED_PARAMS, TRACKED_PARAM_COLUMN
+from waveform_cache import WaveformLoader, WaveformPeaks, paint_waveform
+
+FADE_INTEGER_COLUMNS = tuple(TRACKED_PARAM_COLUMN[param] for param in ('brightness', 'red', 'green', 'blue', 'gobo_index'))
 
 class CueDialog(QDialog):
     # ... (CueDialog code remains unchanged) ...
@@ -137,6 +147,14 @@ class TimelineEventDialog(QDialog):
         self.fade_out_label = QLabel("Fade Out Time:")
         self.fade_out_spin = QDoubleSpinBox()
         self.fade_out_spin.setRange(0, 600); self.fade_out_spin.setSuffix(" s"); self.fade_out_spin.setDecimals(2)
+
+        self.fade_in_curve_label = QLabel("Fade In Curve:")
+        self.fade_in_curve_combo = QComboBox()
+        self.fade_out_curve_label = QLabel("Fade Out Curve:")
+        self.fade_out_curve_combo = QComboBox()
+        for curve_key, curve_label in FADE_CURVE_LABELS.items():
+            self.fade_in_curve_combo.addItem(curve_label, curve_key)
+            self.fade_out_curve_combo.addItem(curve_label, curve_key)
         
         self.blackout_label = QLabel("Action: Toggle Blackout State")
 
@@ -167,6 +185,7 @@ class TimelineEventDialog(QDialog):
         for widget in [self.preset_select_label, self.preset_select_combo, 
                        self.brightness_value_label, self.brightness_value_spin,
                        self.fade_in_label, self.fade_in_spin, self.fade_out_label, self.fade_out_spin,
+                       self.fade_in_curve_label, self.fade_in_curve_combo, self.fade_out_curve_label, self.fade_out_curve_combo,
                        self.blackout_label, self.color_label, self.color_button,
                        self.pan_label, self.pan_spin, self.tilt_label, self.tilt_spin,
                        self.zoom_label, self.zoom_spin, self.focus_label, self.focus_spin,
@@ -186,8 +205,6 @@ class TimelineEventDialog(QDialog):
         
         self.layout.addRow(self.preset_select_label, self.preset_select_combo)
         self.layout.addRow(self.brightness_value_label, self.brightness_value_spin) 
-        self.layout.addRow(self.fade_in_label, self.fade_in_spin)
-        self.layout.addRow(self.fade_out_label, self.fade_out_spin)
         self.layout.addRow(self.blackout_label)
         self.layout.addRow(self.color_label, self.color_button)
         self.layout.addRow(self.pan_label, self.pan_spin)
@@ -196,6 +213,10 @@ class TimelineEventDialog(QDialog):
         self.layout.addRow(self.focus_label, self.focus_spin)
         self.layout.addRow(self.gobo_label, self.gobo_spin)
         self.layout.addRow(self.strobe_label, self.strobe_spin)
+        self.layout.addRow(self.fade_in_label, self.fade_in_spin)
+        self.layout.addRow(self.fade_in_curve_label, self.fade_in_curve_combo)
+        self.layout.addRow(self.fade_out_label, self.fade_out_spin)
+        self.layout.addRow(self.fade_out_curve_label, self.fade_out_curve_combo)
 
         self.event_type_combo.currentTextChanged.connect(self._update_event_specific_options)
         self.load_presets_for_combo() 
@@ -216,6 +237,10 @@ class TimelineEventDialog(QDialog):
         self.focus_spin.setValue(float(data_payload.get('value', 50.0)))
         self.gobo_spin.setValue(int(data_payload.get('value', 0)))
         self.strobe_spin.setValue(float(data_payload.get('value', 0.0)))
+        self.fade_in_spin.setValue(float(data_payload.get('fade_in', 0.0)))
+        self.fade_out_spin.setValue(float(data_payload.get('fade_out', 0.0)))
+        self.fade_in_curve_combo.setCurrentIndex(max(0, self.fade_in_curve_combo.findData(data_payload.get('fade_in_curve', 'linear'))))
+        self.fade_out_curve_combo.setCurrentIndex(max(0, self.fade_out_curve_combo.findData(data_payload.get('fade_out_curve', 'linear'))))
 
         trigger_mode = data_payload.get('trigger_mode', 'absolute')
         if trigger_mode == 'relative_to_cue':
@@ -342,16 +367,8 @@ class TimelineEventDialog(QDialog):
             return
 
         try:
-            cursor = self.main_window.db_connection.cursor()
-            query = "SELECT id, name FROM timeline_events WHERE cue_id = ?"
-            params = [selected_cue_id]
-            if self.currently_edited_event_id is not None:
-                query += " AND id != ?"
-                params.append(self.currently_edited_event_id)
-            query += " ORDER BY start_time, name" 
-            
-            cursor.execute(query, tuple(params))
-            events_in_cue = cursor.fetchall()
+            events_in_cue = self.main_window.repository.event_names_in_cue(
+                selected_cue_id, -1 if self.currently_edited_event_id is None else self.currently_edited_event_id)
 
             if not events_in_cue:
                 self.followed_event_combo.addItem("No other events in this cue", None)
@@ -383,14 +400,11 @@ class TimelineEventDialog(QDialog):
         self.cue_select_combo.clear()
         self.cue_select_combo.addItem("None", None)
         try:
-            cursor = self.main_window.db_connection.cursor()
-            cursor.execute("SELECT id, cue_number, name FROM cues ORDER BY trigger_time_s, cue_number")
-            cues = cursor.fetchall()
-            for cue_id, cue_num, cue_name in cues:
-                display_name = f"Cue {cue_num}"
-                if cue_name:
-                    display_name += f": {cue_name}"
-                self.cue_select_combo.addItem(display_name, cue_id)
+            for cue in self.main_window.repository.cues():
+                display_name = f"Cue {cue['cue_number']}"
+                if cue['name']:
+                    display_name += f": {cue['name']}"
+                self.cue_select_combo.addItem(display_name, cue['id'])
             
             if current_data is not None: 
                 idx = self.cue_select_combo.findData(current_data)
@@ -404,9 +418,7 @@ class TimelineEventDialog(QDialog):
         self.target_id_combo.clear()
         self.target_id_label.setText("Target Fixture:")
         try:
-            cursor = self.main_window.db_connection.cursor()
-            cursor.execute("SELECT id, name FROM fixtures ORDER BY name")
-            items = cursor.fetchall()
+            items = self.main_window.repository.fixture_names()
             if not items:
                 self.target_id_combo.addItem("No Fixtures Available", -1)
                 self.target_id_combo.setEnabled(False)
@@ -423,9 +435,7 @@ class TimelineEventDialog(QDialog):
         self.target_id_combo.clear()
         self.target_id_label.setText("Target Group:")
         try:
-            cursor = self.main_window.db_connection.cursor()
-            cursor.execute("SELECT id, name FROM fixture_groups ORDER BY name")
-            items = cursor.fetchall()
+            items = self.main_window.repository.groups()
             if not items:
                 self.target_id_combo.addItem("No Groups Available", -1)
                 self.target_id_combo.setEnabled(False)
@@ -470,6 +480,7 @@ class TimelineEventDialog(QDialog):
         for widget in [self.preset_select_label, self.preset_select_combo, 
                        self.brightness_value_label, self.brightness_value_spin,
                        self.fade_in_label, self.fade_in_spin, self.fade_out_label, self.fade_out_spin,
+                       self.fade_in_curve_label, self.fade_in_curve_combo, self.fade_out_curve_label, self.fade_out_curve_combo,
                        self.blackout_label, self.color_label, self.color_button,
                        self.pan_label, self.pan_spin, self.tilt_label, self.tilt_spin,
                        self.zoom_label, self.zoom_spin, self.focus_label, self.focus_spin,
@@ -480,8 +491,6 @@ class TimelineEventDialog(QDialog):
         if is_preset: self.preset_select_label.setVisible(True); self.preset_select_combo.setVisible(True)
         elif is_brightness:
             self.brightness_value_label.setVisible(True); self.brightness_value_spin.setVisible(True)
-            self.fade_in_label.setVisible(True); self.fade_in_spin.setVisible(True)
-            self.fade_out_label.setVisible(True); self.fade_out_spin.setVisible(True)
         elif is_blackout: self.blackout_label.setVisible(True)
         elif is_color: self.color_label.setVisible(True); self.color_button.setVisible(True)
         elif is_pan: self.pan_label.setVisible(True); self.pan_spin.setVisible(True)
@@ -491,6 +500,11 @@ class TimelineEventDialog(QDialog):
         elif is_gobo: self.gobo_label.setVisible(True); self.gobo_spin.setVisible(True)
         elif is_strobe: self.strobe_label.setVisible(True); self.strobe_spin.setVisible(True)
 
+        if event_type in FADABLE_EVENT_TYPES:
+            for widget in [self.fade_in_label, self.fade_in_spin, self.fade_in_curve_label, self.fade_in_curve_combo,
+                           self.fade_out_label, self.fade_out_spin, self.fade_out_curve_label, self.fade_out_curve_combo]:
+                widget.setVisible(True)
+
     
     def _show_color_dialog(self):
         current_color = self.color_button.palette().color(self.color_button.backgroundRole())
@@ -506,9 +520,7 @@ class TimelineEventDialog(QDialog):
         current_data = self.preset_select_combo.currentData()
         self.preset_select_combo.clear()
         try:
-            cursor = self.main_window.db_connection.cursor()
-            cursor.execute("SELECT preset_number, name, type FROM presets ORDER BY type, preset_number")
-            presets = cursor.fetchall()
+            presets = self.main_window.repository.presets_list()
             if not presets:
                 self.preset_select_combo.addItem("No Presets Available")
                 self.preset_select_combo.setEnabled(False)
@@ -556,14 +568,9 @@ class TimelineEventDialog(QDialog):
             
             valid_followed_event_ids_in_cue = []
             try:
-                cursor = self.main_window.db_connection.cursor()
-                query = "SELECT id FROM timeline_events WHERE cue_id = ?"
-                params = [cue_id_value]
-                if self.currently_edited_event_id is not None:
-                    query += " AND id != ?"
-                    params.append(self.currently_edited_event_id)
-                cursor.execute(query, tuple(params))
-                valid_followed_event_ids_in_cue = [row[0] for row in cursor.fetchall()]
+                events_in_cue = self.main_window.repository.event_names_in_cue(
+                    cue_id_value, -1 if self.currently_edited_event_id is None else self.currently_edited_event_id)
+                valid_followed_event_ids_in_cue = [event_id for event_id, _name in events_in_cue]
             except Exception as e:
                 print(f"DB error re-validating followed event: {e}") 
 
@@ -590,8 +597,6 @@ class TimelineEventDialog(QDialog):
             data_obj['preset_number'] = self.preset_select_combo.currentData()
         elif event_type == "brightness":
             data_obj['value'] = self.brightness_value_spin.value()
-            data_obj['fade_in'] = self.fade_in_spin.value()
-            data_obj['fade_out'] = self.fade_out_spin.value()
         elif event_type == "color":
             data_obj['color_hex'] = self.color_button.property("color_hex")
         elif event_type == "pan":
@@ -609,6 +614,12 @@ class TimelineEventDialog(QDialog):
         elif event_type == "blackout": 
             data_obj['action'] = 'toggle' 
 
+        if event_type in FADABLE_EVENT_TYPES:
+            data_obj['fade_in'] = self.fade_in_spin.value()
+            data_obj['fade_out'] = self.fade_out_spin.value()
+            data_obj['fade_in_curve'] = self.fade_in_curve_combo.currentData()
+            data_obj['fade_out_curve'] = self.fade_out_curve_combo.currentData()
+
         target_type = self.target_type_combo.currentData()
         target_id_val = None
         if target_type in ["fixture", "group"]:
@@ -676,10 +687,8 @@ class AssignEventToCueDialog(QDialog):
 
         selected_item_to_restore = None
         try:
-            cursor = self.main_window.db_connection.cursor()
-            cursor.execute("SELECT id, cue_number, name, trigger_time_s FROM cues ORDER BY trigger_time_s, cue_number")
-            cues = cursor.fetchall()
-            for cue_id, cue_num, name, time_s in cues:
+            for cue in self.main_window.repository.cues():
+                cue_id, cue_num, name, time_s = cue['id'], cue['cue_number'], cue['name'], cue['trigger_time_s']
                 display_name = f"Cue {cue_num}"
                 if name: display_name += f": {name}"
                 display_name += f" (@ {time_s:.2f}s)"
@@ -717,6 +726,7 @@ class TimelineWidget(QWidget):
     add_cue_requested_at_time = pyqtSignal(float)
     cue_modified_on_timeline = pyqtSignal(int, float) 
     assign_event_to_cue_requested = pyqtSignal(int) 
+    event_timing_changed = pyqtSignal(list) # Ids of events the model changed or re-timed; see _timing_changed
 
     MIN_PIXELS_PER_SECOND = 5
     MAX_PIXELS_PER_SECOND = 300
@@ -731,18 +741,25 @@ class TimelineWidget(QWidget):
     EVENT_BASE_HEIGHT = 22
     TRACK_SPACING = 4
     TRACK_INTERNAL_PADDING = 2 
+    STATIC_TILE_WIDTH = 512 # Ruler and audio track are cached as pixmap tiles this wide
+    STATIC_TILE_CACHE_SIZE = 96
+    RULER_LABEL_OVERHANG_PIXELS = 60 
 
     def __init__(self, main_window, parent_tab_ref, parent=None): 
         super().__init__(parent)
         self.main_window = main_window
         self.parent_tab = parent_tab_ref 
-        self.events = [] 
-        self.cues = [] 
+        self.model: TimelineModel = parent_tab_ref.timeline_model
+        self.events = [] # The model's event dicts, in no particular order
+        self.cues = [] # The model's cue dicts, in trigger order
+        self._schedule: TimelineSchedule | None = None # Compiled lazily from events and cues; see schedule
+        self.event_timing = EventTiming(self._get_event_visual_duration_s)
         self.audio_duration = 0.0 
         self.pixels_per_second = 30
         self.current_playhead_position = 0.0 
         self.is_playing = False 
-        self.simulated_waveform_data = [] 
+        self.waveform: WaveformPeaks | None = None # Peaks of the loaded audio, once decoded
+        self.audio_analysis: AudioAnalysis | None = None # Beat grid, onsets and envelopes, once analysed
         
         self.is_dragging_playhead = False
         self.playhead_drag_offset = 0.0 
@@ -769,9 +786,13 @@ class TimelineWidget(QWidget):
         self.drag_start_event_original_target_type: str | None = None
         self.drag_start_event_original_target_id: int | None = None
         
-        self._painted_event_rects_map: dict[int, QRectF] = {} 
         self._painted_cue_marker_rects_map: dict[int, QRectF] = {} 
         self.tracks: list[dict] = [] 
+        self._track_of: dict[tuple, int] = {} # (target type, target ID) -> track index
+        self._layout = None # (TrackIndex, event rects by ID); see _event_layout
+        self._layout_key = None
+        self._static_tiles = OrderedDict() # Ruler and audio track pixmaps; see _static_tile
+        self._drawn_event_states: dict[int, str | None] = {} # Active state each event was last drawn with
 
         self.setMouseTracking(True) 
         self.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
@@ -781,55 +802,67 @@ class TimelineWidget(QWidget):
         self.setMinimumHeight(200) 
         self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Preferred)
         self._build_track_list() 
-        self.load_events_from_db()
-        self.load_cues_from_db() 
+        self.model.modelReset.connect(self._model_reset)
+        self.model.events_inserted.connect(self._model_events_inserted)
+        self.model.events_updated.connect(self._model_events_updated)
+        self.model.events_removed.connect(self._model_events_removed)
+        self.model.cues_inserted.connect(self._model_cues_changed)
+        self.model.cues_updated.connect(self._model_cues_changed)
+        self.model.cues_removed.connect(self._model_cues_removed)
+        self._model_reset()
 
     def _build_track_list(self):
         self.tracks = [{'type': 'master', 'id': None, 'name': 'Master'}]
         try:
-            cursor = self.main_window.db_connection.cursor()
-            cursor.execute("SELECT id, name FROM fixture_groups ORDER BY name") 
-            groups = cursor.fetchall()
-            for gid, name in groups:
+            repository = self.main_window.repository
+            for gid, name in repository.groups():
                 self.tracks.append({'type': 'group', 'id': gid, 'name': f"{name} (Grp {gid})"})
 
-            cursor.execute("SELECT id, name FROM fixtures ORDER BY id") 
-            fixtures = cursor.fetchall()
-            for fid, name in fixtures:
+            for fid, name in sorted(repository.fixture_names()):
                 self.tracks.append({'type': 'fixture', 'id': fid, 'name': f"{name} (Fx {fid})"})
         except Exception as e:
             print(f"Error building track list: {e}")
+        self._track_of = {}
+        for index, track in enumerate(self.tracks):
+            self._track_of.setdefault((track['type'], track['id']), index)
         self.update()
 
 
-    def _generate_simulated_waveform(self): 
-        self.simulated_waveform_data = []
-        if self.audio_duration <= 0: 
-            self.update()
-            return
-        points_per_second_of_audio = 50 
-        num_points = int(self.audio_duration * points_per_second_of_audio)
-        num_points = max(50, min(num_points, 20000)) 
-        if num_points == 0:
-            self.update()
-            return
-        last_amp = 0.5
-        for i in range(num_points):
-            rand_factor = (random.random() - 0.5) * 0.4 
-            target_amp = last_amp + rand_factor
-            if random.random() < 0.1 or target_amp < 0.05 or target_amp > 0.95:
-                target_amp = 0.5 + (random.random() - 0.5) * 0.3
-            target_amp = max(0.05, min(0.95, target_amp)) 
-            current_amp = last_amp * 0.6 + target_amp * 0.4
-            self.simulated_waveform_data.append(current_amp)
-            last_amp = current_amp
-        self.update()
+    def set_waveform(self, peaks: WaveformPeaks | None):
+        self.waveform = peaks
+        self.invalidate_static_layers()
+
+    def set_audio_analysis(self, analysis: AudioAnalysis | None):
+        self.audio_analysis = analysis
+        self.invalidate_static_layers()
+
+    def _paint_beat_grid(self, painter: QPainter, first_px: int, last_px: int, audio_area_y_start: float):
+        """Bar and beat lines across the audio track, with onsets ticked along its bottom edge."""
+        analysis = self.audio_analysis
+        start_s, end_s = first_px / self.pixels_per_second, last_px / self.pixels_per_second
+        bottom_y = audio_area_y_start + self.AUDIO_TRACK_HEIGHT
+        painter.save()
+        if analysis.tempo_bpm > 0 and 60.0 / analysis.tempo_bpm * self.pixels_per_second >= 4: # Skip beats that would merge
+            painter.setPen(QPen(QColor(255, 255, 255, 40), 1))
+            for beat_s in analysis.beats_between(start_s, end_s).tolist():
+                x = beat_s * self.pixels_per_second
+                painter.drawLine(QPointF(x, audio_area_y_start), QPointF(x, bottom_y))
+        bars = analysis.bar_times
+        painter.setPen(QPen(QColor(255, 255, 255, 110), 1))
+        for bar_s in bars[np.searchsorted(bars, start_s):np.searchsorted(bars, end_s)].tolist():
+            x = bar_s * self.pixels_per_second
+            painter.drawLine(QPointF(x, audio_area_y_start), QPointF(x, bottom_y))
+        onsets = analysis.onset_times
+        painter.setPen(QPen(QColor(255, 193, 7, 160), 1))
+        for onset_s in onsets[np.searchsorted(onsets, start_s):np.searchsorted(onsets, end_s)].tolist():
+            x = onset_s * self.pixels_per_second
+            painter.drawLine(QPointF(x, bottom_y - 6), QPointF(x, bottom_y))
+        painter.restore()
 
     def _update_minimum_widget_width(self):
         max_time_for_width = self.audio_duration
         if self.events:
-             event_end_time = max((self._get_effective_event_start_time(ev) + self._get_event_visual_duration_s(ev) for ev in self.events), default=0) 
-             max_time_for_width = max(max_time_for_width, event_end_time)
+             max_time_for_width = max(max_time_for_width, self.event_timing.end_time) # Not schedule: that would compile it per edit
         if self.cues: 
             cue_max_time = max((c['trigger_time_s'] for c in self.cues), default=0)
             max_time_for_width = max(max_time_for_width, cue_max_time)
@@ -837,132 +870,101 @@ class TimelineWidget(QWidget):
         self.setMinimumWidth(int(max_time_for_width * self.pixels_per_second) + 100)
 
 
-    def load_events_from_db(self, regenerate_waveform=True): 
-        self._build_track_list() 
-        try:
-            cursor = self.main_window.db_connection.cursor()
-            cursor.execute("SELECT id, name, start_time, duration, event_type, data, target_type, target_id, cue_id FROM timeline_events") 
-            db_events = cursor.fetchall()
-            self.events = []
-            for ev_tuple in db_events:
-                start_time_or_delay = float(ev_tuple[2]) 
-                
-                event_data_json = json.loads(ev_tuple[5]) if isinstance(ev_tuple[5], str) else ev_tuple[5]
-                if not isinstance(event_data_json, dict): event_data_json = {} 
-                trigger_mode = event_data_json.get('trigger_mode', 'absolute')
-
-                if trigger_mode == 'absolute':
-                    if start_time_or_delay < 0 : start_time_or_delay = 0.0
-                else: 
-                     if start_time_or_delay < -3600 : start_time_or_delay = -3600.0
-
-
-                event_item = {
-                    'id': ev_tuple[0], 'name': ev_tuple[1], 'start_time': start_time_or_delay,
-                    'duration': float(ev_tuple[3]), 'type': ev_tuple[4],
-                    'data': event_data_json,
-                    'target_type': ev_tuple[6] if ev_tuple[6] else 'master', 
-                    'target_id': ev_tuple[7],
-                    'cue_id': ev_tuple[8] 
-                }
-                self.events.append(event_item)
-            
-            self.events.sort(key=lambda ev: self._get_effective_event_start_time(ev))
-
-
-            self._update_minimum_widget_width()
-            if regenerate_waveform and self.audio_duration > 0 : 
-                self._generate_simulated_waveform() 
-            self.update() 
-        except Exception as e:
-            print(f"Error loading timeline events from DB: {e}")
-
-    def _get_effective_event_start_time(self, event_data: dict, recursion_depth=0, visited_ids=None) -> float:
-        MAX_RECURSION_DEPTH = 10 
-        if visited_ids is None: visited_ids = set()
-        
-        event_id = event_data.get('id')
-        if event_id is not None and event_id in visited_ids:
-            print(f"Warning: Circular dependency detected for event ID {event_id} at depth {recursion_depth}. Defaulting to fallback timing.")
-            if event_data.get('cue_id') is not None:
-                cue = next((c for c in self.cues if c['id'] == event_data['cue_id']), None)
-                if cue: return cue['trigger_time_s'] + event_data.get('start_time', 0.0) 
-            return event_data.get('start_time', 0.0) 
-        
-        if recursion_depth > MAX_RECURSION_DEPTH:
-            print(f"Warning: Max recursion depth ({MAX_RECURSION_DEPTH}) reached for event ID {event_id}. Defaulting to fallback timing.")
-            if event_data.get('cue_id') is not None:
-                cue = next((c for c in self.cues if c['id'] == event_data['cue_id']), None)
-                if cue: return cue['trigger_time_s'] + event_data.get('start_time', 0.0)
-            return event_data.get('start_time', 0.0)
-
-        current_visited_ids = visited_ids.copy()
-        if event_id is not None: current_visited_ids.add(event_id)
-
-        trigger_mode = event_data.get('data', {}).get('trigger_mode', 'absolute')
-        delay_or_absolute_start = event_data.get('start_time', 0.0)
-        
-        if trigger_mode == 'relative_to_cue' and event_data.get('cue_id') is not None:
-            cue = next((c for c in self.cues if c['id'] == event_data['cue_id']), None)
-            if cue:
-                return cue['trigger_time_s'] + delay_or_absolute_start
-        
-        elif trigger_mode == 'follow_event_in_cue' and event_data.get('cue_id') is not None:
-            followed_event_id = event_data.get('data', {}).get('followed_event_id')
-            current_event_cue_id = event_data.get('cue_id')
-
-            if followed_event_id is not None:
-                followed_event = next((ev for ev in self.events if ev['id'] == followed_event_id), None)
-                if followed_event:
-                    if followed_event.get('cue_id') == current_event_cue_id:
-                        followed_event_effective_start = self._get_effective_event_start_time(followed_event, recursion_depth + 1, current_visited_ids)
-                        
-                        followed_event_visual_duration = self._get_event_visual_duration_s(followed_event)
-                        
-                        followed_event_end_time = followed_event_effective_start + followed_event_visual_duration
-                        return followed_event_end_time + delay_or_absolute_start
-                    else:
-                        print(f"Warning: Event ID {event_id} follows event ID {followed_event_id} which is not in the same cue ({current_event_cue_id}). Fallback to relative to cue.")
-                        cue = next((c for c in self.cues if c['id'] == current_event_cue_id), None)
-                        if cue: return cue['trigger_time_s'] + delay_or_absolute_start
-            
-            cue = next((c for c in self.cues if c['id'] == current_event_cue_id), None)
-            if cue: return cue['trigger_time_s'] + delay_or_absolute_start 
-            
-        return delay_or_absolute_start 
-
-    def load_cues_from_db(self):
-        try:
-            cursor = self.main_window.db_connection.cursor()
-            cursor.execute("SELECT id, cue_number, name, trigger_time_s, comment FROM cues ORDER BY trigger_time_s")
-            fetched_cues = cursor.fetchall()
-            self.cues = []
-            for cue_tuple in fetched_cues:
-                self.cues.append({
-                    'id': cue_tuple[0], 'cue_number': cue_tuple[1], 'name': cue_tuple[2],
-                    'trigger_time_s': float(cue_tuple[3]), 'comment': cue_tuple[4]
-                })
-            self._update_minimum_widget_width() 
-            self.update()
-        except Exception as e:
-            print(f"Error loading cues from DB: {e}")
-
+    def _model_reset(self):
+        self._build_track_list()
+        self.events = self.model.events()
+        self.cues = self.model.cues()
+        self.event_timing.rebuild(self.events, self.cues)
+        self.selected_event_ids = [event_id for event_id in self.selected_event_ids if self.model.event(event_id)]
+        if self.selected_cue_id is not None and self.model.cue(self.selected_cue_id) is None:
+            self.selected_cue_id = None
+        self._timing_changed(()) # Observers rebuild from the reset itself
+
+    def _model_events_inserted(self, event_ids: list):
+        events = [self.model.event(event_id) for event_id in event_ids]
+        self.events.extend(events)
+        self._timing_changed(self.event_timing.apply_changes(events))
+
+    def _model_events_updated(self, event_ids: list):
+        self._timing_changed(self.event_timing.apply_changes([self.model.event(event_id) for event_id in event_ids]))
+
+    def _model_events_removed(self, event_ids: list):
+        removed = set(event_ids)
+        self.events = [event for event in self.events if event['id'] not in removed]
+        if removed.intersection(self.selected_event_ids):
+            self.selected_event_ids = [event_id for event_id in self.selected_event_ids if event_id not in removed]
+        self._timing_changed(self.event_timing.apply_changes(removed_event_ids=event_ids))
+
+    def _model_cues_changed(self, cue_ids: list):
+        self.cues = self.model.cues()
+        self._timing_changed(self.event_timing.apply_changes(cues=[self.model.cue(cue_id) for cue_id in cue_ids]))
+
+    def _model_cues_removed(self, cue_ids: list):
+        self.cues = self.model.cues()
+        if self.selected_cue_id in cue_ids:
+            self.selected_cue_id = None
+        self._timing_changed(self.event_timing.apply_changes(removed_cue_ids=cue_ids))
+
+    def _timing_changed(self, event_ids):
+        """After the model changed: recompile lazily, resize and tell the list which events to redraw."""
+        self.invalidate_schedule()
+        self._update_minimum_widget_width()
+        self.update()
+        self.event_timing_changed.emit(list(event_ids))
+
+    def _get_effective_event_start_time(self, event_data: dict) -> float:
+        """Absolute start of an event, resolving cue-relative and follow timing; see EventTiming."""
+        return self.event_timing.start_of(event_data)
+
+    @property
+    def schedule(self) -> TimelineSchedule:
+        """Every event's resolved [start, end) interval; compiled on first use after an edit."""
+        if self._schedule is None:
+            entries = []
+            for event_data in self.events:
+                start_s = self._get_effective_event_start_time(event_data)
+                entries.append((event_data, start_s, start_s + self._get_event_visual_duration_s(event_data)))
+            self._schedule = TimelineSchedule(entries)
+        return self._schedule
+
+    def invalidate_schedule(self):
+        """Call after changing any event or cue timing in place."""
+        self._schedule = None
 
     def set_audio_duration(self, duration_seconds):
         self.audio_duration = duration_seconds
         self._update_minimum_widget_width()
-        if self.audio_duration > 0 : self._generate_simulated_waveform()
-        else: self.simulated_waveform_data.clear()
-        self.update()
+        self.invalidate_static_layers()
 
     def set_playhead_position(self, position_seconds, from_user_seek=False):
         old_pos = self.current_playhead_position
         self.current_playhead_position = position_seconds
         if abs(old_pos - position_seconds) > 0.001 : 
-            self.update() 
+            # Only the strips under the old and new playhead need repainting
+            self.update(self._playhead_strip(old_pos))
+            self.update(self._playhead_strip(position_seconds))
+        self.update_changed_event_states()
         if from_user_seek: 
             self.playhead_moved_by_user.emit(self.current_playhead_position)
 
+    def _playhead_strip(self, position_seconds: float) -> QRect:
+        return QRect(int(position_seconds * self.pixels_per_second) - 3, 0, 7, self.height())
+
+    def update_changed_event_states(self):
+        """Repaints the events whose active state (started, fading, ended) changed since they were last drawn."""
+        active_states = self.parent_tab.active_event_states
+        current = {event_id: state.get('status') for event_id, state in active_states.items()}
+        if current == self._drawn_event_states:
+            return
+        changed_ids = {event_id for event_id in current.keys() | self._drawn_event_states.keys()
+                       if current.get(event_id, False) != self._drawn_event_states.get(event_id, False)}
+        self._drawn_event_states = current
+        _track_index, event_rects = self._event_layout()
+        for event_id in changed_ids:
+            event_rect = event_rects.get(event_id)
+            if event_rect is not None:
+                self.update(event_rect.adjusted(-2, -2, 2, 2).toAlignedRect())
+
     def get_current_playhead_time(self) -> float:
         return self.current_playhead_position
 
@@ -975,7 +977,7 @@ class TimelineWidget(QWidget):
     def _get_event_visual_duration_s(self, event_data: dict) -> float:
         """Helper to get the full visual duration of an event, including fades."""
         visual_duration_s = event_data.get('duration', 0.0) 
-        if event_data.get('type') == 'brightness':
+        if event_data.get('type') in FADABLE_EVENT_TYPES:
             data_payload = event_data.get('data', {})
             visual_duration_s += data_payload.get('fade_in', 0.0) 
             visual_duration_s += data_payload.get('fade_out', 0.0)
@@ -985,24 +987,35 @@ class TimelineWidget(QWidget):
              visual_duration_s = self.MIN_EVENT_DURATION_S
         return visual_duration_s
 
-    def _get_event_rect_on_track(self, event_data, track_y_pos, event_base_height) -> QRectF:
-        effective_start_time_s = self._get_effective_event_start_time(event_data)
-        start_x = effective_start_time_s * self.pixels_per_second
-        
-        visual_duration_s = self._get_event_visual_duration_s(event_data)
-        event_visual_duration_pixels = max(3, visual_duration_s * self.pixels_per_second)
-        
-        display_start_x = start_x 
-
-        return QRectF(display_start_x, track_y_pos + self.TRACK_INTERNAL_PADDING, event_visual_duration_pixels, event_base_height)
-
+    def _event_layout(self) -> tuple[TrackIndex, dict[int, QRectF]]:
+        """The per-track event index and every event's rect, rebuilt when timing, tracks or zoom change."""
+        schedule = self.schedule
+        if self._layout is None or self._layout_key[0] is not schedule or self._layout_key[1] is not self.tracks or \
+           self._layout_key[2] != self.pixels_per_second:
+            y_pos_for_first_event_track = self.RULER_HEIGHT + self.TRACK_SPACING
+            event_rects = {}
+            for event_data, start_s, end_s in zip(schedule.events, schedule.starts, schedule.ends):
+                track_y, event_height = self._get_track_y_start_and_height(self._get_track_index_for_event(event_data))
+                event_rects[event_data['id']] = QRectF(start_s * self.pixels_per_second,
+                                                       y_pos_for_first_event_track + track_y + self.TRACK_INTERNAL_PADDING,
+                                                       max(3, (end_s - start_s) * self.pixels_per_second), event_height)
+            self._layout = (TrackIndex(schedule, self._get_track_index_for_event), event_rects)
+            self._layout_key = (schedule, self.tracks, self.pixels_per_second)
+        return self._layout
 
     def _get_event_at_pixel_pos(self, pos: QPointF) -> tuple[int | None, str | None]: 
         y_event_tracks_start_abs = self.RULER_HEIGHT + self.TRACK_SPACING
-
-        for event_data in self.events: 
-            event_id = event_data['id']
-            event_rect_on_content_area = self._painted_event_rects_map.get(event_id) 
+        track_full_height = self.EVENT_BASE_HEIGHT + self.TRACK_SPACING + (2 * self.TRACK_INTERNAL_PADDING)
+        if pos.y() < y_event_tracks_start_abs or self.pixels_per_second <= 0:
+            return None, None
+        track_index, event_rects = self._event_layout()
+        schedule = self.schedule
+        candidates = track_index.overlapping(int((pos.y() - y_event_tracks_start_abs) // track_full_height),
+                                             (pos.x() - 3) / self.pixels_per_second, (pos.x() + 1) / self.pixels_per_second)
+
+        for schedule_index in candidates: 
+            event_id = schedule.events[schedule_index]['id']
+            event_rect_on_content_area = event_rects.get(event_id) 
             
             if event_rect_on_content_area:
                 if event_rect_on_content_area.contains(pos):
@@ -1180,6 +1193,14 @@ class TimelineWidget(QWidget):
         
         for cue in self.cues:
             snap_targets_s.append(cue['trigger_time_s'])
+
+        if self.audio_analysis and self.audio_analysis.tempo_bpm > 0:
+            # Zoomed out until beats sit closer than the snap distance, only bars remain snappable
+            beat_px = 60.0 / self.audio_analysis.tempo_bpm * self.pixels_per_second
+            if beat_px >= 2 * self.SNAP_THRESHOLD_PIXELS:
+                snap_targets_s.extend(self.audio_analysis.beat_times.tolist())
+            elif beat_px * BEATS_PER_BAR >= 2 * self.SNAP_THRESHOLD_PIXELS:
+                snap_targets_s.extend(self.audio_analysis.bar_times.tolist())
             
         return sorted(list(set(snap_targets_s)))
 
@@ -1220,6 +1241,8 @@ class TimelineWidget(QWidget):
                 
                 cue_to_modify['trigger_time_s'] = max(0.0, final_new_cue_time)
                 self.cues.sort(key=lambda c: (c['trigger_time_s'], c['cue_number'])) 
+                self.event_timing.cues_changed([self.dragging_cue_id])
+                self.invalidate_schedule()
                 self.update() 
                 event_mouse.accept(); return
 
@@ -1350,7 +1373,9 @@ class TimelineWidget(QWidget):
                         anchor_event['start_time'] = new_start_val
                         anchor_event['duration'] = new_duration_val
 
+            self.event_timing.events_changed(self.selected_event_ids if self.drag_mode == "move_multi" else [self.dragging_event_id])
             self.events.sort(key=lambda ev: (self._get_track_index_for_event(ev), self._get_effective_event_start_time(ev))) 
+            self.invalidate_schedule()
             self._update_minimum_widget_width(); self.update()
             event_mouse.accept(); return
         
@@ -1370,7 +1395,7 @@ class TimelineWidget(QWidget):
                 self.marquee_current_rect = QRectF(self.marquee_start_pos, click_pos).normalized()
                 
                 newly_selected_ids = set()
-                for event_id, event_rect in self._painted_event_rects_map.items():
+                for event_id, event_rect in self._event_layout()[1].items():
                     if self.marquee_current_rect.intersects(event_rect):
                         newly_selected_ids.add(event_id)
                 
@@ -1394,13 +1419,7 @@ class TimelineWidget(QWidget):
         super().mouseMoveEvent(event_mouse)
 
     def _get_track_index_for_event(self, event_data: dict) -> int:
-        target_type = event_data.get('target_type', 'master')
-        target_id = event_data.get('target_id')
-        try: 
-            return next(i for i, t in enumerate(self.tracks) 
-                        if t['type'] == target_type and t['id'] == target_id)
-        except StopIteration: 
-            return 0 
+        return self._track_of.get((event_data.get('target_type', 'master'), event_data.get('target_id')), 0)
             
 
     def mouseReleaseEvent(self, event_mouse: QMouseEvent): 
@@ -1556,40 +1575,37 @@ class TimelineWidget(QWidget):
     def paintEvent(self, event_paint):
         painter = QPainter(self)
         painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        self._painted_event_rects_map.clear() 
         self._painted_cue_marker_rects_map.clear() 
-        
+        # Everything outside the exposed rect is culled; a playhead move exposes only its own strip
+        exposed_region = event_paint.region()
+        exposed_rect = event_paint.rect()
         font_before_ruler = painter.font()
-        ruler_font = QFont(font_before_ruler); ruler_font.setPointSize(10) 
-        painter.setFont(ruler_font)
-        painter.setPen(QColor(Qt.GlobalColor.lightGray))
-        painter.drawLine(0, self.RULER_HEIGHT, self.width(), self.RULER_HEIGHT) 
         
         if self.pixels_per_second <= 0: 
-            painter.setFont(font_before_ruler); painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, "Timeline scale error."); return
+            painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, "Timeline scale error."); return
 
-        max_seconds_on_ruler = int(self.width() / self.pixels_per_second)
-        for i in range(max_seconds_on_ruler + 2): 
-            x = i * self.pixels_per_second
-            is_major = (i % 5 == 0); tick_len = 10 if is_major else 5
-            painter.drawLine(int(x), self.RULER_HEIGHT - tick_len, int(x), self.RULER_HEIGHT)
-            if is_major: painter.drawText(int(x) + 2, self.RULER_HEIGHT - tick_len - 2, f"{i}s")
+        if exposed_rect.top() <= self.RULER_HEIGHT:
+            self._draw_static_tiles(painter, 'ruler', exposed_rect, 0)
         
         y_pos_for_first_event_track = self.RULER_HEIGHT + self.TRACK_SPACING
         
-        current_font = painter.font() 
-        font_for_events = QFont(current_font); font_for_events.setPointSize(8)
+        font_for_events = QFont(font_before_ruler); font_for_events.setPointSize(8)
         painter.setFont(font_for_events) 
         
-        current_y_offset_for_tracks = y_pos_for_first_event_track 
-        for track_idx, track_info in enumerate(self.tracks):
-            track_y_within_event_area, event_render_height_on_track = self._get_track_y_start_and_height(track_idx)
-            absolute_track_y_for_this_event_set = y_pos_for_first_event_track + track_y_within_event_area
-
-            events_on_this_track_data = [ev for ev in self.events if self._get_track_index_for_event(ev) == track_idx]
-            for ev_data in events_on_this_track_data:
-                event_rect_in_timeline_content = self._get_event_rect_on_track(ev_data, absolute_track_y_for_this_event_set, event_render_height_on_track)
-                self._painted_event_rects_map[ev_data['id']] = event_rect_in_timeline_content 
+        track_index, event_rects = self._event_layout()
+        schedule = self.schedule
+        track_full_height = self.EVENT_BASE_HEIGHT + self.TRACK_SPACING + (2 * self.TRACK_INTERNAL_PADDING)
+        first_track = max(0, int((exposed_rect.top() - y_pos_for_first_event_track) // track_full_height))
+        last_track = min(len(self.tracks) - 1, int((exposed_rect.bottom() - y_pos_for_first_event_track) // track_full_height))
+        # Events are at least 3 px wide however short they are, so look that far left of the exposed rect
+        exposed_start_s = (exposed_rect.left() - 3) / self.pixels_per_second
+        exposed_end_s = (exposed_rect.right() + 1) / self.pixels_per_second
+        for track_idx in range(first_track, last_track + 1):
+            for schedule_index in track_index.overlapping(track_idx, exposed_start_s, exposed_end_s):
+                ev_data = schedule.events[schedule_index]
+                event_rect_in_timeline_content = event_rects[ev_data['id']]
+                if not exposed_region.intersects(event_rect_in_timeline_content.toAlignedRect()):
+                    continue # Between the strips of a partial update, e.g. the old and new playhead
                 
                 base_event_color = QColor("#2196f3"); text_color = Qt.GlobalColor.white
                 target_type = ev_data.get('target_type', 'master'); is_orphaned = False
@@ -1604,8 +1620,7 @@ class TimelineWidget(QWidget):
                 elif event_type in ['pan', 'tilt', 'zoom', 'focus', 'gobo', 'strobe']: base_event_color = QColor("#4dd0e1")
 
                 if target_type != 'master' and ev_data.get('target_id') is not None:
-                    target_found_in_current_tracks = any(t['type'] == target_type and t['id'] == ev_data['target_id'] for t in self.tracks)
-                    if not target_found_in_current_tracks: is_orphaned = True; base_event_color = QColor("#B00020"); text_color = QColor(Qt.GlobalColor.white)
+                    if (target_type, ev_data['target_id']) not in self._track_of: is_orphaned = True; base_event_color = QColor("#B00020"); text_color = QColor(Qt.GlobalColor.white)
                 
                 active_event_state = self.parent_tab.active_event_states.get(ev_data['id'])
                 is_selected = (ev_data['id'] in self.selected_event_ids) 
@@ -1639,7 +1654,7 @@ class TimelineWidget(QWidget):
                 if is_selected and len(self.selected_event_ids) == 1 and ev_data.get('data', {}).get('trigger_mode') == 'follow_event_in_cue': 
                     followed_event_id = ev_data['data'].get('followed_event_id')
                     if followed_event_id:
-                        followed_event_rect = self._painted_event_rects_map.get(followed_event_id)
+                        followed_event_rect = event_rects.get(followed_event_id)
                         if followed_event_rect:
                             line_pen = QPen(QColor(100, 180, 255, 180), 1.5, Qt.PenStyle.DashLine)
                             painter.setPen(line_pen)
@@ -1653,7 +1668,7 @@ class TimelineWidget(QWidget):
                             painter.drawLine(QPointF(end_point.x() - arrow_size * math.cos(angle + math.pi / 6),
                                                      end_point.y() - arrow_size * math.sin(angle + math.pi / 6)), end_point)
 
-                if event_type == 'brightness': 
+                if event_type in FADABLE_EVENT_TYPES: 
                     fade_in_s = ev_data['data'].get('fade_in', 0.0); fade_out_s = ev_data['data'].get('fade_out', 0.0)
                     if fade_in_s > 0: 
                         fade_in_px = fade_in_s * self.pixels_per_second
@@ -1690,7 +1705,7 @@ class TimelineWidget(QWidget):
                 final_display_text = " ".join(display_text_parts)
                 painter.drawText(text_clip_rect, Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft, final_display_text)
         
-        total_event_tracks_height = len(self.tracks) * (self.EVENT_BASE_HEIGHT + self.TRACK_SPACING + (2 * self.TRACK_INTERNAL_PADDING)) if self.tracks else 0
+        total_event_tracks_height = len(self.tracks) * track_full_height if self.tracks else 0
         y_after_event_tracks = y_pos_for_first_event_track + total_event_tracks_height
 
         cue_area_y_start = y_after_event_tracks 
@@ -1699,11 +1714,19 @@ class TimelineWidget(QWidget):
         
         cue_font = QFont(font_before_ruler); cue_font.setPointSize(7) 
         painter.setFont(cue_font)
+        fm = QFontMetrics(cue_font)
 
         for cue_data in self.cues:
             cue_x = cue_data['trigger_time_s'] * self.pixels_per_second
             marker_top_y = cue_area_y_start + 2
             marker_bottom_y = cue_area_y_start + self.CUE_MARKER_AREA_HEIGHT - 2
+            text_to_draw = f"Q {cue_data['cue_number']}"
+            if cue_data.get('name'): text_to_draw += f": {cue_data['name'][:15]}" 
+            text_width = fm.horizontalAdvance(text_to_draw)
+            cue_marker_rect = QRectF(cue_x - 5, marker_top_y - 5, 10 + text_width + 10, self.CUE_MARKER_AREA_HEIGHT + 10)
+            self._painted_cue_marker_rects_map[cue_data['id']] = cue_marker_rect # Kept for every cue; used for hit-testing
+            if not cue_marker_rect.intersects(QRectF(exposed_rect)):
+                continue
             is_selected_cue = (self.selected_cue_id == cue_data['id'])
             cue_color = QColor(255, 223, 0) if is_selected_cue else QColor(255, 165, 0) 
             cue_pen_width = 2.0 if is_selected_cue else 1.5
@@ -1711,32 +1734,16 @@ class TimelineWidget(QWidget):
             painter.drawLine(int(cue_x), int(marker_top_y), int(cue_x), int(marker_bottom_y))
             path = QPainterPath(); path.moveTo(QPointF(cue_x, marker_top_y - 4)); path.lineTo(QPointF(cue_x - 4, marker_top_y)); path.lineTo(QPointF(cue_x, marker_top_y + 4)); path.lineTo(QPointF(cue_x + 4, marker_top_y)); path.closeSubpath()
             painter.fillPath(path, QBrush(cue_color))
-            text_to_draw = f"Q {cue_data['cue_number']}"
-            if cue_data.get('name'): text_to_draw += f": {cue_data['name'][:15]}" 
-            fm = QFontMetrics(cue_font); text_width = fm.horizontalAdvance(text_to_draw)
             text_rect = QRectF(cue_x + 6, marker_top_y, text_width + 4, self.CUE_MARKER_AREA_HEIGHT - 4)
             painter.setPen(QColor(220,220,220)); painter.drawText(text_rect, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter, text_to_draw)
-            self._painted_cue_marker_rects_map[cue_data['id']] = QRectF(cue_x - 5, marker_top_y - 5, 10 + text_width + 10, self.CUE_MARKER_AREA_HEIGHT + 10)
         
         y_after_cue_area = cue_area_y_start + self.CUE_MARKER_AREA_HEIGHT + self.TRACK_SPACING
 
         y_after_audio_area = y_after_cue_area 
         if self.audio_duration > 0:
             audio_area_y_start = y_after_cue_area
-            audio_rect_width = int(self.audio_duration * self.pixels_per_second)
-            audio_track_content_rect = QRectF(0, audio_area_y_start, audio_rect_width, self.AUDIO_TRACK_HEIGHT)
-            if self.simulated_waveform_data: 
-                waveform_pen_color = QColor(70, 90, 120); painter.setPen(QPen(waveform_pen_color, 1))
-                y_center = audio_track_content_rect.top() + audio_track_content_rect.height() / 2; max_amplitude_pixels = audio_track_content_rect.height() / 2 * 0.9
-                points_per_second_in_data = len(self.simulated_waveform_data) / self.audio_duration if self.audio_duration > 0 else 0
-                if points_per_second_in_data > 0:
-                    for px_on_timeline in range(int(audio_track_content_rect.width())):
-                        time_at_px = px_on_timeline / self.pixels_per_second; data_idx = int(time_at_px * points_per_second_in_data)
-                        if 0 <= data_idx < len(self.simulated_waveform_data):
-                            amplitude = self.simulated_waveform_data[data_idx]; line_height = amplitude * max_amplitude_pixels
-                            painter.drawLine(px_on_timeline, int(y_center - line_height), px_on_timeline, int(y_center + line_height))
-            else: 
-                painter.setBrush(QColor("#404040")); painter.setPen(Qt.PenStyle.NoPen); painter.drawRect(audio_track_content_rect)
+            if exposed_rect.bottom() >= audio_area_y_start and exposed_rect.top() < audio_area_y_start + self.AUDIO_TRACK_HEIGHT:
+                self._draw_static_tiles(painter, 'audio', exposed_rect, audio_area_y_start)
             y_after_audio_area = audio_area_y_start + self.AUDIO_TRACK_HEIGHT + self.TRACK_SPACING
         
         painter.setFont(font_before_ruler) 
@@ -1761,6 +1768,76 @@ class TimelineWidget(QWidget):
         playhead_x_on_timeline = self.current_playhead_position * self.pixels_per_second
         painter.setPen(QPen(QColor(Qt.GlobalColor.red), 2))
         painter.drawLine(int(playhead_x_on_timeline), 0, int(playhead_x_on_timeline), self.height()) 
+
+    def _draw_static_tiles(self, painter: QPainter, layer: str, exposed_rect, y: float):
+        first_tile = max(0, exposed_rect.left() // self.STATIC_TILE_WIDTH)
+        last_tile = exposed_rect.right() // self.STATIC_TILE_WIDTH
+        for tile_index in range(first_tile, last_tile + 1):
+            tile = self._static_tile(layer, tile_index)
+            if tile is not None:
+                painter.drawPixmap(QPointF(tile_index * self.STATIC_TILE_WIDTH, y), tile)
+
+    def _static_tile(self, layer: str, tile_index: int) -> QPixmap | None:
+        """
+        One STATIC_TILE_WIDTH-wide piece of the ruler or audio track layer, which only change with
+        the zoom level, the audio and its analysis. Tiles are cached per zoom level, least
+        recently used first out.
+        """
+        ratio = self.devicePixelRatioF()
+        key = (layer, self.pixels_per_second, ratio, tile_index)
+        tile = self._static_tiles.get(key)
+        if tile is not None:
+            self._static_tiles.move_to_end(key)
+            return tile
+        first_px = tile_index * self.STATIC_TILE_WIDTH
+        last_px = first_px + self.STATIC_TILE_WIDTH
+        if layer == 'audio':
+            last_px = min(last_px, int(self.audio_duration * self.pixels_per_second))
+            if last_px <= first_px:
+                return None
+        height = self.RULER_HEIGHT + 1 if layer == 'ruler' else self.AUDIO_TRACK_HEIGHT
+        tile = QPixmap(int(self.STATIC_TILE_WIDTH * ratio), int(math.ceil(height * ratio)))
+        tile.setDevicePixelRatio(ratio)
+        tile.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(tile)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setFont(self.font())
+        painter.translate(-first_px, 0)
+        if layer == 'ruler':
+            self._paint_ruler(painter, first_px, last_px)
+        else:
+            if self.waveform:
+                paint_waveform(painter, self.waveform, QRectF(first_px, 0, last_px - first_px, self.AUDIO_TRACK_HEIGHT),
+                               first_px / self.pixels_per_second, last_px / self.pixels_per_second, QColor(70, 90, 120))
+            else:
+                painter.setBrush(QColor("#404040")); painter.setPen(Qt.PenStyle.NoPen)
+                painter.drawRect(QRectF(first_px, 0, last_px - first_px, self.AUDIO_TRACK_HEIGHT))
+            if self.audio_analysis:
+                self._paint_beat_grid(painter, first_px, last_px, 0)
+        painter.end()
+        self._static_tiles[key] = tile
+        if len(self._static_tiles) > self.STATIC_TILE_CACHE_SIZE:
+            self._static_tiles.popitem(last=False)
+        return tile
+
+    def _paint_ruler(self, painter: QPainter, first_px: int, last_px: int):
+        ruler_font = QFont(painter.font()); ruler_font.setPointSize(10) 
+        painter.setFont(ruler_font)
+        painter.setPen(QColor(Qt.GlobalColor.lightGray))
+        painter.drawLine(first_px, self.RULER_HEIGHT, last_px, self.RULER_HEIGHT) 
+        # Labels of ticks just left of this stretch run into it
+        first_second = max(0, int((first_px - self.RULER_LABEL_OVERHANG_PIXELS) // self.pixels_per_second))
+        last_second = int(last_px // self.pixels_per_second) + 1
+        for i in range(first_second, last_second + 1): 
+            x = i * self.pixels_per_second
+            is_major = (i % 5 == 0); tick_len = 10 if is_major else 5
+            painter.drawLine(int(x), self.RULER_HEIGHT - tick_len, int(x), self.RULER_HEIGHT)
+            if is_major: painter.drawText(int(x) + 2, self.RULER_HEIGHT - tick_len - 2, f"{i}s")
+
+    def invalidate_static_layers(self):
+        """Call when the ruler or audio track would draw differently at the same zoom level."""
+        self._static_tiles.clear()
+        self.update()
             
     def _get_effective_total_duration(self) -> float: 
         if not self: return 0.0
@@ -1782,6 +1859,78 @@ class TimelineWidget(QWidget):
             return 60.0 
         return effective_duration
 
+
+class _EventListSection:
+    """
+    A bold header row of the event list and the rows below it, kept sorted by key. Rows are
+    placed, moved and removed one at a time, so an edit touches only the rows it changed.
+    """
+
+    def __init__(self, list_widget: QListWidget, title: str, preceding: '_EventListSection | None' = None):
+        self.list_widget = list_widget
+        self.title = title
+        self.preceding = preceding # The section listed above this one
+        self.keys = [] # Sorted; the rows below the header
+        self.items: dict = {} # {item id: QListWidgetItem}
+        self._key_of = {}
+        self.header: QListWidgetItem | None = None
+
+    def header_row(self) -> int:
+        return 0 if self.preceding is None else self.preceding.header_row() + 1 + len(self.preceding.keys)
+
+    def fill(self, entries):
+        """Appends the header and every (key, item id, text, user data) entry; the list holds only earlier sections."""
+        self.header = QListWidgetItem(f"--- {self.title} ---")
+        font = self.header.font(); font.setBold(True); self.header.setFont(font)
+        self.header.setFlags(self.header.flags() & ~Qt.ItemFlag.ItemIsSelectable)
+        self.list_widget.addItem(self.header)
+        self.keys, self.items, self._key_of = [], {}, {}
+        for key, item_id, text, user_data in sorted(entries, key=lambda entry: entry[0]):
+            item = QListWidgetItem(text)
+            item.setData(Qt.ItemDataRole.UserRole, user_data)
+            self.list_widget.addItem(item)
+            self.keys.append(key)
+            self.items[item_id] = item
+            self._key_of[item_id] = key
+        self.header.setHidden(not self.keys)
+
+    def place(self, key, item_id, text: str, user_data) -> QListWidgetItem:
+        """Adds the row for item_id, or moves and relabels it; returns its item."""
+        first_row = self.header_row() + 1
+        item = self.items.get(item_id)
+        if item is None:
+            item = QListWidgetItem(text)
+            item.setData(Qt.ItemDataRole.UserRole, user_data)
+            index = bisect_left(self.keys, key)
+            self.keys.insert(index, key)
+            self.list_widget.insertItem(first_row + index, item)
+            self.items[item_id] = item
+        elif key != self._key_of[item_id]:
+            old_index = bisect_left(self.keys, self._key_of[item_id])
+            del self.keys[old_index]
+            index = bisect_left(self.keys, key)
+            self.keys.insert(index, key)
+            if index != old_index:
+                was_selected = item.isSelected()
+                self.list_widget.takeItem(first_row + old_index)
+                self.list_widget.insertItem(first_row + index, item)
+                item.setSelected(was_selected)
+        if item.text() != text:
+            item.setText(text)
+        self._key_of[item_id] = key
+        self.header.setHidden(False)
+        return item
+
+    def remove(self, item_id):
+        item = self.items.pop(item_id, None)
+        if item is None:
+            return
+        index = bisect_left(self.keys, self._key_of.pop(item_id))
+        del self.keys[index]
+        self.list_widget.takeItem(self.header_row() + 1 + index)
+        self.header.setHidden(not self.keys)
+
+
 class TimelineTab(QWidget):
     event_triggered = pyqtSignal(dict)
     cues_changed = pyqtSignal()
@@ -1801,10 +1950,28 @@ class TimelineTab(QWidget):
         self.media_player.durationChanged.connect(self._media_duration_changed)
         self.media_player.playbackStateChanged.connect(self._media_playback_state_changed)
         self.media_player.errorOccurred.connect(self._media_error_occurred)
+
+        # Drives the playhead, event triggering and fades at the output frame rate; slaved to the
+        # audio position while audio plays, free-running otherwise.
+        self.playback_clock = PlaybackClock(self, self.main_window.settings.value('timeline/clock_fps', 60, type=int))
+        self.playback_clock.ticked.connect(self._playback_clock_ticked)
         
         self.current_audio_file = None
+        self.waveform_loaders = set() # Background decodes still running; waited for on close
+        self.audio_analyzer = AudioAnalyzer(self)
+        self.audio_analyzer.analyzed.connect(self._audio_analyzed)
         self.active_event_states = {} 
         self.pre_playback_states = {}
+        self.presend_event_ids = set() # Events already sent ahead of time to Roblox
+        self.fade_engine = FadeEngine(FADE_INTEGER_COLUMNS)
+        self.last_checked_time_s: float | None = None # Playhead time of the previous trigger check; None re-scans
+        self._last_checked_schedule: TimelineSchedule | None = None
+        self.timeline_model = TimelineModel(main_window, self) # Events and cues; the list and timeline follow its changes
+        self._cue_list_section: _EventListSection | None = None
+        self._event_list_section: _EventListSection | None = None
+        self._list_item_styles: dict[int, tuple] = {} # {event_id: (selected, active, next)} of non-default items
+        self.state_checkpoints = StateCheckpoints(self._apply_event_to_tracked_values)
+        self._watched_repository = None
         
         self.timeline_widget: TimelineWidget | None = None 
         self.event_list_widget: QListWidget | None = None 
@@ -1890,6 +2057,27 @@ class TimelineTab(QWidget):
         self.delete_event_button.setStyleSheet("background-color: #c62828;")
         self.delete_event_button.clicked.connect(self.delete_selected_event_from_list_widget) 
         management_buttons_layout.addWidget(self.delete_event_button)
+        management_buttons_layout.addSpacing(20)
+        settings = self.main_window.settings
+        management_buttons_layout.addWidget(QLabel("Audio Intensity:"))
+        self.modulation_intensity_combo = QComboBox()
+        management_buttons_layout.addWidget(self.modulation_intensity_combo)
+        management_buttons_layout.addWidget(QLabel("Effect Speed:"))
+        self.modulation_speed_combo = QComboBox()
+        management_buttons_layout.addWidget(self.modulation_speed_combo)
+        for combo, key in ((self.modulation_intensity_combo, 'timeline/modulation_intensity_band'),
+                           (self.modulation_speed_combo, 'timeline/modulation_speed_band')):
+            combo.setToolTip("Audio band that modulates this during playback, once the audio has been analysed.")
+            combo.addItem("Off", "")
+            for band, label in BAND_LABELS.items():
+                combo.addItem(label, band)
+            combo.setCurrentIndex(max(0, combo.findData(settings.value(key, "", type=str))))
+            combo.currentIndexChanged.connect(lambda _index, c=combo, k=key: settings.setValue(k, c.currentData()))
+        self.modulation_depth_spinbox = QSpinBox()
+        self.modulation_depth_spinbox.setRange(0, 100); self.modulation_depth_spinbox.setSuffix(" % depth")
+        self.modulation_depth_spinbox.setValue(settings.value('timeline/modulation_depth', 50, type=int))
+        self.modulation_depth_spinbox.valueChanged.connect(lambda value: settings.setValue('timeline/modulation_depth', value))
+        management_buttons_layout.addWidget(self.modulation_depth_spinbox)
         management_buttons_layout.addStretch()
         layout.addLayout(management_buttons_layout)
         
@@ -1949,6 +2137,16 @@ class TimelineTab(QWidget):
         self.event_list_widget.itemDoubleClicked.connect(lambda item: self.show_edit_event_dialog()) 
         self.event_list_widget.itemSelectionChanged.connect(self._on_event_list_selection_changed)
         event_list_layout.addWidget(self.event_list_widget)
+        self._cue_list_section = _EventListSection(self.event_list_widget, "Cues")
+        self._event_list_section = _EventListSection(self.event_list_widget, "Events", self._cue_list_section)
+        self.timeline_model.modelReset.connect(self._timeline_model_reset)
+        self.timeline_model.events_inserted.connect(self._event_list_events_inserted)
+        self.timeline_model.events_removed.connect(self._event_list_events_removed)
+        self.timeline_model.cues_inserted.connect(self._event_list_cues_changed)
+        self.timeline_model.cues_updated.connect(self._event_list_cues_changed)
+        self.timeline_model.cues_removed.connect(self._event_list_cues_removed)
+        self.timeline_model.changed.connect(self._timeline_content_changed)
+        self.timeline_widget.event_timing_changed.connect(self._event_timing_changed)
         main_v_splitter.addWidget(event_list_container) 
 
         main_v_splitter.setSizes([500, 100]) 
@@ -2035,17 +2233,11 @@ class TimelineTab(QWidget):
         # Determine the full current value that would be recorded
         current_value_to_record = None
         if event_type == 'color':
-            try:
-                cursor = self.main_window.db_connection.cursor()
-                cursor.execute("SELECT red, green, blue FROM fixtures WHERE id = ?", (fixture_id,))
-                color_tuple = cursor.fetchone()
-                if color_tuple:
-                    current_value_to_record = {'red': color_tuple[0], 'green': color_tuple[1], 'blue': color_tuple[2]}
-                else:
-                    return # Can't get current state, so can't record
-            except Exception as e:
-                print(f"DB Error getting current color for recording check: {e}")
-                return
+            # Live state is the source of truth; the database row may still be queued for writing.
+            live_state = self.main_window.live_fixture_states.get(fixture_id)
+            if not live_state:
+                return # Can't get current state, so can't record
+            current_value_to_record = {'red': live_state.get('red', 0), 'green': live_state.get('green', 0), 'blue': live_state.get('blue', 0)}
         else:
             current_value_to_record = value_or_dict
 
@@ -2075,23 +2267,25 @@ class TimelineTab(QWidget):
             else:
                 data_payload['value'] = current_value_to_record
 
-            cursor = self.main_window.db_connection.cursor()
-            cursor.execute(
-                """INSERT INTO timeline_events (name, start_time, duration, event_type, data, target_type, target_id, cue_id)
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-                (event_name, current_time_s, 0.1, event_type, json.dumps(data_payload), 'fixture', fixture_id, None)
-            )
-            self.main_window.db_connection.commit()
-            
-            # Update the last recorded state only after successful DB insert
-            if fixture_id not in self.last_recorded_fixture_states:
-                self.last_recorded_fixture_states[fixture_id] = {}
-            self.last_recorded_fixture_states[fixture_id][event_type] = current_value_to_record
+            # Mark as recorded now so a quick repeat isn't queued twice; rolled back if the write fails.
+            previous_recorded_state = last_recorded_state
+            self.last_recorded_fixture_states.setdefault(fixture_id, {})[event_type] = current_value_to_record
 
-            self.refresh_event_list_and_timeline(regenerate_waveform=False)
+            def on_error(error, fid=fixture_id, et=event_type, previous=previous_recorded_state):
+                print(f"Database error during live recording for fixture {fid}, event {et}: {error}")
+                if previous is None:
+                    self.last_recorded_fixture_states.get(fid, {}).pop(et, None)
+                else:
+                    self.last_recorded_fixture_states.setdefault(fid, {})[et] = previous
+
+            self.main_window.repository.queue_add_events(
+                "Record Event",
+                [{'name': event_name, 'start_time': current_time_s, 'duration': 0.1, 'type': event_type,
+                  'data': data_payload, 'target_type': 'fixture', 'target_id': fixture_id, 'cue_id': None}],
+                on_done=self.timeline_model.refresh_events,
+                on_error=on_error
+            )
             
-        except sqlite3.Error as e:
-            print(f"Database error during live recording for fixture {fixture_id}, event {event_type}: {e}")
         except Exception as e:
             print(f"Generic error during live recording for fixture {fixture_id}, event {event_type}: {e}")
             
@@ -2129,13 +2323,32 @@ class TimelineTab(QWidget):
     def _media_position_changed(self, position_ms: int):
         if not self.timeline_widget: return
         position_s = position_ms / 1000.0
-        
-        if self.media_player.playbackState() == QMediaPlayer.PlaybackState.PlayingState and \
-           not self.timeline_widget.is_dragging_playhead:
-            self.timeline_widget.set_playhead_position(position_s) 
-            self._check_and_trigger_events(position_s) 
-        
+        if self.playback_clock.running:
+            self.playback_clock.sync(position_s) # The clock ticks update the playhead and label
+            return
+        effective_total_duration_s = self._get_effective_timeline_duration()
+        self.update_time_label(position_s, effective_total_duration_s)
+
+    def _has_audio(self) -> bool:
+        return not self.media_player.source().isEmpty()
+
+    def _playback_clock_ticked(self, position_s: float):
+        if not self.timeline_widget: return
         effective_total_duration_s = self._get_effective_timeline_duration()
+        if not self._has_audio() and position_s >= effective_total_duration_s:
+            # Without audio nothing else ends playback; mirror the end-of-media reset
+            self.playback_clock.stop()
+            self._on_playback_state_changed(False)
+            self.timeline_widget.set_playhead_position(0)
+            self.active_event_states.clear()
+            self.fade_engine.clear()
+            self.last_checked_time_s = None
+            self.update_time_label(0, effective_total_duration_s)
+            return
+        if not self.timeline_widget.is_dragging_playhead:
+            self.timeline_widget.set_playhead_position(position_s)
+            self._check_and_trigger_events(position_s)
+            self._apply_audio_modulation(position_s)
         self.update_time_label(position_s, effective_total_duration_s)
 
     def _media_duration_changed(self, duration_ms: int):
@@ -2148,21 +2361,36 @@ class TimelineTab(QWidget):
     def _media_playback_state_changed(self, state: QMediaPlayer.PlaybackState):
         if not self.timeline_widget: return
         is_playing = state == QMediaPlayer.PlaybackState.PlayingState
-        self.timeline_widget.is_playing = is_playing
-        self.play_button.setText("Pause" if is_playing else "Play")
-        self.record_button.setEnabled(not is_playing)
-        self.playback_state_changed_for_embedded.emit(is_playing)
-
-        if not is_playing and self.is_recording:
-            self.record_button.setChecked(False) # Stop recording if playback stops
+        if is_playing:
+            self.playback_clock.rate = self.media_player.playbackRate() or 1.0
+            self.playback_clock.start(self.media_player.position() / 1000.0)
+        elif state == QMediaPlayer.PlaybackState.PausedState:
+            self.playback_clock.pause()
+            self.playback_clock.seek(self.media_player.position() / 1000.0)
+        else:
+            self.playback_clock.stop()
+        self._on_playback_state_changed(is_playing)
 
         if state == QMediaPlayer.PlaybackState.StoppedState:
             if self.media_player.duration() > 0 and \
                abs(self.media_player.position() - self.media_player.duration()) < 100: 
                 self.timeline_widget.set_playhead_position(0) 
                 self.active_event_states.clear()
+                self.fade_engine.clear()
+                self.last_checked_time_s = None
                 self.update_time_label(0, self.timeline_widget.audio_duration)
 
+    def _on_playback_state_changed(self, is_playing: bool):
+        self.timeline_widget.is_playing = is_playing
+        self.play_button.setText("Pause" if is_playing else "Play")
+        self.record_button.setEnabled(not is_playing)
+        self.playback_state_changed_for_embedded.emit(is_playing)
+        if not is_playing:
+            self._apply_audio_modulation(None)
+
+        if not is_playing and self.is_recording:
+            self.record_button.setChecked(False) # Stop recording if playback stops
+
 
     def _media_error_occurred(self, error: QMediaPlayer.Error, error_string: str = ""): 
         error_code = self.media_player.error()
@@ -2197,23 +2425,23 @@ class TimelineTab(QWidget):
 
     def reset_timeline_data_action(self):
         reply = QMessageBox.question(self, "Confirm Reset",
-                                     "Are you sure you want to delete ALL timeline events, cues, and clear loaded audio?\nThis action cannot be undone.",
+                                     "Are you sure you want to delete ALL timeline events, cues, and clear loaded audio?\nUndo brings back the events and cues, but not the audio.",
                                      QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
                                      QMessageBox.StandardButton.No)
         if reply == QMessageBox.StandardButton.Yes:
             try:
-                cursor = self.main_window.db_connection.cursor()
-                cursor.execute("DELETE FROM timeline_events")
-                cursor.execute("DELETE FROM cues") 
-                self.main_window.db_connection.commit()
+                self.main_window.repository.clear_timeline()
                 self.stop_playback() 
                 self.current_audio_file = None
                 self.media_player.setSource(QUrl()) 
+                self._load_waveform(None)
+                self._analyze_audio(None)
                 if self.timeline_widget:
                     self.timeline_widget.set_audio_duration(0.0) 
                     self.timeline_widget.selected_event_ids.clear() 
                     self.timeline_widget.selected_cue_id = None 
                 self.active_event_states.clear() 
+                self.fade_engine.clear()
                 self.refresh_event_list_and_timeline() 
                 QMessageBox.information(self, "Timeline Reset", "All timeline events, cues, and audio have been cleared.")
             except Exception as e:
@@ -2285,46 +2513,95 @@ class TimelineTab(QWidget):
                 self.timeline_widget.set_playhead_position(selected_cue_data['trigger_time_s'], from_user_seek=True)
 
     def _handle_timeline_widget_modified(self, event_id: int, modified_data: dict):
-        try:
-            cursor = self.main_window.db_connection.cursor()
-            data_to_store_json = json.dumps(modified_data.get('data', {})) 
-            cursor.execute(
-                """UPDATE timeline_events SET 
-                   start_time = ?, duration = ?, target_type = ?, target_id = ?, data = ?, cue_id = ?
-                   WHERE id = ?""",
-                (modified_data['start_time'], modified_data['duration'], 
-                 modified_data['target_type'], modified_data['target_id'],
-                 data_to_store_json, modified_data.get('cue_id'), 
-                 event_id)
-            )
-            self.main_window.db_connection.commit()
-            self.refresh_event_list_and_timeline(regenerate_waveform=False) 
-        except Exception as e:
-            QMessageBox.critical(self, "DB Error", f"Could not update modified event (ID: {event_id}): {e}")
+        # The widget already shows the new position, so the write is queued and the list catches up when it lands.
+        self.main_window.repository.queue_event_updates(
+            "Move Event",
+            [(event_id, {'start_time': modified_data['start_time'], 'duration': modified_data['duration'],
+                         'target_type': modified_data['target_type'], 'target_id': modified_data['target_id'],
+                         'data': modified_data.get('data', {}), 'cue_id': modified_data.get('cue_id')})],
+            on_done=lambda _operation: self.timeline_model.refresh_events([event_id]),
+            on_error=lambda e: self._on_queued_write_failed(f"Could not update modified event (ID: {event_id}): {e}", event_ids=[event_id])
+        )
 
     def _handle_timeline_widget_multi_modified(self, modified_events_data: list[dict]):
-        try:
-            cursor = self.main_window.db_connection.cursor()
-            for event_update in modified_events_data:
-                cursor.execute(
-                    "UPDATE timeline_events SET start_time = ?, target_type = ?, target_id = ? WHERE id = ?",
-                    (event_update['start_time'], event_update['target_type'], event_update['target_id'], event_update['id'])
-                )
-            self.main_window.db_connection.commit()
-            self.refresh_event_list_and_timeline(regenerate_waveform=False)
-        except Exception as e:
-            QMessageBox.critical(self, "DB Error", f"Could not update multiple modified events: {e}")
+        updates = [(event_update['id'], {'start_time': event_update['start_time'], 'target_type': event_update['target_type'],
+                                         'target_id': event_update['target_id']})
+                   for event_update in modified_events_data]
+        event_ids = [event_id for event_id, _values in updates]
+        self.main_window.repository.queue_event_updates(
+            "Move Events", updates,
+            on_done=lambda _operation: self.timeline_model.refresh_events(event_ids),
+            on_error=lambda e: self._on_queued_write_failed(f"Could not update multiple modified events: {e}", event_ids=event_ids)
+        )
 
     def _handle_timeline_widget_cue_modified(self, cue_id: int, new_trigger_time_s: float):
-        try:
-            cursor = self.main_window.db_connection.cursor()
-            cursor.execute("UPDATE cues SET trigger_time_s = ? WHERE id = ?", (new_trigger_time_s, cue_id))
-            self.main_window.db_connection.commit()
-            self.refresh_event_list_and_timeline(regenerate_waveform=False)
-        except Exception as e:
-            QMessageBox.critical(self, "DB Error", f"Could not update modified cue (ID: {cue_id}): {e}")
+        self.main_window.repository.queue_cue_move(
+            cue_id, new_trigger_time_s,
+            on_done=lambda _operation: self.timeline_model.refresh_cues([cue_id]),
+            on_error=lambda e: self._on_queued_write_failed(f"Could not update modified cue (ID: {cue_id}): {e}", cue_ids=[cue_id])
+        )
+
+    def _on_event_written(self, event_ids: list, message: str):
+        """Confirms a queued event write once it has committed; the status bar doesn't interrupt chained dialogs."""
+        self.timeline_model.refresh_events(event_ids)
+        self.main_window.status_bar.showMessage(message, 4000)
+
+    def _on_queued_write_failed(self, message: str, event_ids=(), cue_ids=()):
+        QMessageBox.critical(self, "DB Error", message)
+        self.timeline_model.refresh(event_ids, cue_ids) # Put the rows the widget already changed back in line with the database
 
 
+    def _load_waveform(self, file_path: str | None):
+        """Shows the waveform of file_path once it has been decoded or read from the cache."""
+        if self.timeline_widget:
+            self.timeline_widget.set_waveform(None)
+        if not file_path:
+            return
+        loader = WaveformLoader(file_path, self)
+        loader.loaded.connect(self._waveform_loaded)
+        loader.finished.connect(loader.deleteLater)
+        self.waveform_loaders.add(loader)
+        loader.finished.connect(lambda: self.waveform_loaders.discard(loader))
+        loader.start()
+
+    def _analyze_audio(self, file_path: str | None):
+        """Starts the beat, onset and envelope analysis of file_path, cached beside the show."""
+        if self.timeline_widget:
+            self.timeline_widget.set_audio_analysis(None)
+        if file_path and self.main_window.db_path:
+            self.audio_analyzer.analyze(file_path, self.main_window.db_path)
+
+    def _audio_analyzed(self, file_path: str, analysis):
+        if file_path != self.current_audio_file or not self.timeline_widget:
+            return
+        self.timeline_widget.set_audio_analysis(analysis)
+        if analysis is not None and analysis.tempo_bpm > 0:
+            self.main_window.status_bar.showMessage(
+                f"Audio analysed: {analysis.tempo_bpm:.1f} BPM, {len(analysis.beat_times)} beats, {len(analysis.onset_times)} onsets", 5000)
+
+    def _apply_audio_modulation(self, time_s: float | None):
+        """
+        Drives output intensity and effect speed from the precomputed band envelopes; time_s None
+        returns both to normal. At depth d a silent band dims intensity to 1 - d of its level and
+        effect speed swings between 1 - d/2 and 1 + d/2 times normal.
+        """
+        analysis = self.timeline_widget.audio_analysis if self.timeline_widget else None
+        intensity_band = self.modulation_intensity_combo.currentData()
+        speed_band = self.modulation_speed_combo.currentData()
+        if time_s is None or analysis is None or not (intensity_band or speed_band):
+            self.main_window.set_audio_modulation()
+            return
+        depth = self.modulation_depth_spinbox.value() / 100.0
+        intensity = 1.0 - depth + depth * analysis.band_level(intensity_band, time_s) if intensity_band else 1.0
+        speed = 1.0 + depth * (analysis.band_level(speed_band, time_s) - 0.5) if speed_band else 1.0
+        self.main_window.set_audio_modulation(intensity, speed)
+
+    def _waveform_loaded(self, file_path: str, peaks):
+        if file_path != self.current_audio_file or not self.timeline_widget:
+            return # A different file was loaded meanwhile
+        self.timeline_widget.set_waveform(peaks)
+        self.content_or_playhead_changed_for_embedded.emit()
+
     def load_audio_file(self, file_path_arg=None):
         file_path = file_path_arg
         if not file_path:
@@ -2335,10 +2612,12 @@ class TimelineTab(QWidget):
         if file_path:
             self.current_audio_file = file_path
             self.media_player.setSource(QUrl.fromLocalFile(file_path))
+            self._load_waveform(file_path)
+            self._analyze_audio(file_path)
             self.stop_playback() 
             if not file_path_arg:
                  QMessageBox.information(self, "Audio Loaded", f"Audio file '{file_path}' loaded.")
-            self.refresh_event_list_and_timeline(regenerate_waveform=True)
+            self._timeline_content_changed()
 
 
     def toggle_playback(self):
@@ -2350,6 +2629,9 @@ class TimelineTab(QWidget):
         if self.media_player.source().isEmpty() and not self.timeline_widget.events and not self.timeline_widget.cues: 
              QMessageBox.warning(self, "No Content", "Please load audio or add events/cues to the timeline.")
              return
+        if not self._has_audio():
+            self._toggle_clock_playback()
+            return
         if self.media_player.playbackState() == QMediaPlayer.PlaybackState.PlayingState:
             self.media_player.pause()
         else:
@@ -2360,8 +2642,29 @@ class TimelineTab(QWidget):
                 self.media_player.setPosition(0)
                 if self.timeline_widget: self.timeline_widget.set_playhead_position(0)
                 self.active_event_states.clear()
+                self.fade_engine.clear()
+                self.last_checked_time_s = None
             self.media_player.play()
 
+    def _toggle_clock_playback(self):
+        """Plays or pauses an events-only timeline on the playback clock alone."""
+        if self.playback_clock.running:
+            self.playback_clock.pause()
+            self._on_playback_state_changed(False)
+            return
+        if not self.pre_playback_states:
+            self.pre_playback_states = copy.deepcopy(self.main_window.live_fixture_states)
+        start_s = self.timeline_widget.current_playhead_position
+        if start_s >= self._get_effective_timeline_duration():
+            start_s = 0.0
+            self.timeline_widget.set_playhead_position(0)
+            self.active_event_states.clear()
+            self.fade_engine.clear()
+            self.last_checked_time_s = None
+        self.playback_clock.rate = 1.0
+        self.playback_clock.start(start_s)
+        self._on_playback_state_changed(True)
+
 
     def stop_playback(self):
         if not self.timeline_widget: return 
@@ -2369,7 +2672,14 @@ class TimelineTab(QWidget):
             self.record_button.setChecked(False) # This will trigger the _handle_record_toggled slot
         
         self.media_player.stop()
+        if self.playback_clock.running:
+            self.playback_clock.stop()
+            self._on_playback_state_changed(False)
+        self.playback_clock.seek(0.0)
         self.active_event_states.clear() 
+        self.fade_engine.clear()
+        self.last_checked_time_s = None
+        self.presend_event_ids.clear()
         
         # Restore pre-playback state if it exists
         if self.pre_playback_states:
@@ -2380,6 +2690,7 @@ class TimelineTab(QWidget):
         if self.timeline_widget.current_playhead_position != 0:
             self.timeline_widget.set_playhead_position(0, from_user_seek=False) # Important: Don't re-seek
             self.update_time_label(0, self.timeline_widget.audio_duration)
+        self.timeline_widget.update_changed_event_states()
 
 
     def handle_playhead_seek_by_user(self, new_time_s: float):
@@ -2399,47 +2710,6 @@ class TimelineTab(QWidget):
         # Calculate the final "stomped" state at the target time
         state_to_apply = self._calculate_tracked_state_at_time(new_time_s, base_states)
 
-        # Go through events again to handle active interpolations (like fades)
-        sorted_events = sorted(self.timeline_widget.events, key=self.timeline_widget._get_effective_event_start_time)
-
-        for event in sorted_events:
-            event_type = event['type']
-            if event_type != 'brightness':
-                continue
-
-            event_start_time = self.timeline_widget._get_effective_event_start_time(event)
-            fade_in = event['data'].get('fade_in', 0.0)
-            duration = event['duration']
-            fade_out = event['data'].get('fade_out', 0.0)
-            event_end_time = event_start_time + fade_in + duration + fade_out
-            
-            # Check if the event is currently active at the seek time
-            if event_start_time <= new_time_s < event_end_time:
-                state_before_event = self._calculate_tracked_state_at_time(event_start_time - 0.001, base_states)
-                target_fixtures = self._get_fixture_ids_for_target(event['target_type'], event['target_id'])
-
-                for fid in target_fixtures:
-                    if fid not in state_to_apply:
-                        continue
-                    
-                    initial_value = state_before_event[fid]['brightness']
-                    final_target_value = event['data']['value']
-                    time_into_event = new_time_s - event_start_time
-                    
-                    interpolated_value = initial_value
-                    if time_into_event < fade_in and fade_in > 0:
-                        progress = time_into_event / fade_in
-                        interpolated_value = initial_value + (final_target_value - initial_value) * progress
-                    elif time_into_event < fade_in + duration:
-                        interpolated_value = final_target_value
-                    elif time_into_event < fade_in + duration + fade_out and fade_out > 0:
-                        fade_out_target_value = self._determine_fade_out_target_value(event, sorted_events)
-                        time_into_fade_out = time_into_event - (fade_in + duration)
-                        progress = time_into_fade_out / fade_out
-                        interpolated_value = final_target_value + (fade_out_target_value - final_target_value) * progress
-
-                    state_to_apply[fid]['brightness'] = interpolated_value
-
         # Apply the final calculated state to live fixtures
         for fixture_id, params in state_to_apply.items():
             current_live_params = self.main_window.live_fixture_states.get(fixture_id, {})
@@ -2460,10 +2730,10 @@ class TimelineTab(QWidget):
         # Update media player and UI
         if abs(self.media_player.position() / 1000.0 - new_time_s) > 0.1:
             self.media_player.setPosition(int(new_time_s * 1000))
+        self.playback_clock.seek(new_time_s)
         
         self.timeline_widget.set_playhead_position(new_time_s)
-        self.active_event_states.clear()
-        self._check_and_trigger_events(new_time_s, is_seek=True)
+        self._check_and_trigger_events(new_time_s, is_seek=True, base_states=base_states)
 
     def _is_value_different(self, val1, val2, tolerance=1e-3):
         """Helper to compare values, especially floats."""
@@ -2475,11 +2745,7 @@ class TimelineTab(QWidget):
         """Queries the database for the default state of all fixtures."""
         base_states = {}
         try:
-            cursor = self.main_window.db_connection.cursor()
-            cursor.execute("SELECT * FROM fixtures")
-            db_cols = [desc[0] for desc in cursor.description]
-            for row in cursor.fetchall():
-                fixture_dict = dict(zip(db_cols, row))
+            for fixture_dict in self.main_window.repository.fixtures():
                 base_states[fixture_dict['id']] = fixture_dict
         except Exception as e:
             print(f"Error fetching base fixture states: {e}")
@@ -2491,9 +2757,7 @@ class TimelineTab(QWidget):
             return [target_id]
         if target_type == "group" and target_id is not None:
             try:
-                cursor = self.main_window.db_connection.cursor()
-                cursor.execute("SELECT fixture_id FROM fixture_group_mappings WHERE group_id = ?", (target_id,))
-                return [row[0] for row in cursor.fetchall()]
+                return list(self.main_window.repository.group_fixture_ids(target_id))
             except Exception as e:
                 print(f"Error getting fixtures for group {target_id}: {e}")
                 return []
@@ -2502,17 +2766,13 @@ class TimelineTab(QWidget):
             return list(self.main_window.live_fixture_states.keys())
         return []
 
-    def _get_preset_info(self, preset_number: str) -> tuple[dict | None, str | None]:
-        """Fetches and returns the data dictionary and type for a given preset number."""
+    def _get_preset_info(self, preset_number: str):
+        """Returns the cached DensePreset for a preset number, or None."""
         try:
-            cursor = self.main_window.db_connection.cursor()
-            cursor.execute("SELECT data, type FROM presets WHERE preset_number = ?", (preset_number,))
-            result = cursor.fetchone()
-            if result and result[0]:
-                return json.loads(result[0]), result[1]
+            return self.main_window.repository.preset(preset_number)
         except Exception as e:
             print(f"Error fetching data for preset {preset_number}: {e}")
-        return None, None
+        return None
 
     def _get_params_for_preset_type(self, preset_type: str) -> list[str]:
         """Resolves a preset type string to a list of fixture parameter keys."""
@@ -2534,298 +2794,366 @@ class TimelineTab(QWidget):
 
     def _calculate_tracked_state_at_time(self, target_time_s: float, base_states: dict) -> dict:
         """Calculates the 'stomped' state of all fixtures at a specific time."""
-        tracked_state = copy.deepcopy(base_states)
+        tracked_state = {fixture_id: dict(state) for fixture_id, state in base_states.items()}
         if not self.timeline_widget:
             return tracked_state
 
-        sorted_events = sorted(self.timeline_widget.events, key=self.timeline_widget._get_effective_event_start_time)
-        
-        for event in sorted_events:
-            event_start_time = self.timeline_widget._get_effective_event_start_time(event)
-            if event_start_time > target_time_s:
-                break
-            
-            event_type = event.get('type')
-            target_type = event.get('target_type')
-            target_id = event.get('target_id')
-            data = event.get('data', {})
-            fixture_ids_for_event = self._get_fixture_ids_for_target(target_type, target_id)
-
-            if not fixture_ids_for_event:
+        values = self._tracked_values_at(target_time_s)
+        row_of = self.state_checkpoints.row_of
+        for fixture_id, state in tracked_state.items():
+            row = row_of.get(fixture_id)
+            if row is None:
                 continue
-
-            if event_type == 'preset':
-                preset_data_map, preset_type = self._get_preset_info(data.get('preset_number'))
-                if not preset_data_map or not preset_type:
-                    continue
-                
-                params_to_track = self._get_params_for_preset_type(preset_type)
-
-                for fid in fixture_ids_for_event:
-                    if str(fid) in preset_data_map and fid in tracked_state:
-                        source_params = preset_data_map[str(fid)]
-                        for param_key in params_to_track:
-                            if param_key in source_params:
-                                tracked_state[fid][param_key] = source_params[param_key]
-
-            elif event_type in ['brightness', 'pan', 'tilt', 'zoom', 'focus', 'gobo', 'strobe']:
-                param_map = {'brightness': 'brightness', 'pan': 'rotation_y', 'tilt': 'rotation_x', 'zoom': 'zoom',
-                             'focus': 'focus', 'gobo': 'gobo_index', 'strobe': 'shutter_strobe_rate'}
-                param_key = param_map.get(event_type)
-                if param_key and 'value' in data:
-                    for fid in fixture_ids_for_event:
-                        if fid in tracked_state:
-                            tracked_state[fid][param_key] = data['value']
-            
-            elif event_type == 'color' and 'color_hex' in data:
-                color = QColor(data['color_hex'])
-                for fid in fixture_ids_for_event:
-                    if fid in tracked_state:
-                        tracked_state[fid]['red'] = color.red()
-                        tracked_state[fid]['green'] = color.green()
-                        tracked_state[fid]['blue'] = color.blue()
-        
+            for param, column in TRACKED_PARAM_COLUMN.items():
+                if not np.isnan(values[row, column]):
+                    state[param] = self._tracked_value(values, fixture_id, param, state)
         return tracked_state
 
-
-    def _process_single_active_brightness_event(self, event_id: int, current_time_s: float, is_seek: bool = False):
-        if not self.timeline_widget: return
-        if event_id not in self.active_event_states:
-            return 
-        
-        state = self.active_event_states[event_id]
-        event_data = next((ev for ev in self.timeline_widget.events if ev['id'] == event_id), None)
-
-        if not event_data or event_data['type'] != 'brightness':
-            if event_id in self.active_event_states: del self.active_event_states[event_id]
+    def _tracked_values_at(self, target_time_s: float) -> np.ndarray:
+        """The tracked fixture x parameter array at a time, replayed from the nearest checkpoint."""
+        self._watch_repository()
+        self.state_checkpoints.set_fixtures(sorted(self.main_window.live_fixture_states))
+        return self.state_checkpoints.state_at(self.timeline_widget.schedule, target_time_s)
+
+    def _tracked_value(self, values: np.ndarray, fixture_id: int, param: str, base_state: dict):
+        """A fixture's tracked value from a _tracked_values_at array, or its base value if no event set it."""
+        row = self.state_checkpoints.row_of.get(fixture_id)
+        value = values[row, TRACKED_PARAM_COLUMN[param]] if row is not None else np.nan
+        if np.isnan(value):
+            return base_state.get(param)
+        if param in ('red', 'green', 'blue'):
+            return int(round(float(value)))
+        return round(float(value), 4) # Arrays are float32
+
+    def _apply_event_to_tracked_values(self, values: np.ndarray, row_of: dict, event: dict):
+        """Writes the values an event leaves behind (not its fades) into a tracked-state array."""
+        event_type = event.get('type')
+        data = event.get('data', {})
+        if event_type != 'brightness' and data.get('fade_out', 0) > 0:
+            return # Fades back to what it started from
+        fixture_ids_for_event = [fid for fid in self._get_fixture_ids_for_target(event.get('target_type'), event.get('target_id'))
+                                 if fid in row_of]
+        if not fixture_ids_for_event:
             return
 
-        actual_event_start_s = self.timeline_widget._get_effective_event_start_time(event_data)
-
-        main_duration_s = event_data['duration']
-        fade_in_s = event_data['data'].get('fade_in', 0.0)
-        fade_out_s = event_data['data'].get('fade_out', 0.0)
-        event_target_value = float(event_data['data'].get('value', 0))
-
-        fade_in_start_s = actual_event_start_s
-        fade_in_end_s = actual_event_start_s + fade_in_s
-        full_value_start_s = fade_in_end_s
-        full_value_end_s = full_value_start_s + main_duration_s
-        fade_out_start_s = full_value_end_s
-        fade_out_end_s = fade_out_start_s + fade_out_s
-
-        if 'status' not in state or is_seek:
-            # For a seek or first-time process, we need the "from" value, which is the tracked state right before this event
-            state_before_event = self._calculate_tracked_state_at_time(actual_event_start_s - 0.001, self._get_base_fixture_states())
-            
-            # Since a brightness event can target multiple fixtures, we take the value from the first one as representative.
-            # This is a simplification; a more complex system might store a "from" value per fixture.
-            target_fixtures_ids = self._get_fixture_ids_for_target(event_data['target_type'], event_data['target_id'])
-            initial_brightness_for_fade_in = 100 # Default
-            if target_fixtures_ids and target_fixtures_ids[0] in state_before_event:
-                initial_brightness_for_fade_in = state_before_event[target_fixtures_ids[0]]['brightness']
-
-            state['initial_value_at_fade_in_start'] = initial_brightness_for_fade_in
-            state['event_target_value'] = event_target_value
-            state['calculated_fade_out_target_value'] = self._determine_fade_out_target_value(event_data, self.timeline_widget.events) 
-            
-            if current_time_s < fade_in_start_s: state['status'] = 'pending' 
-            elif current_time_s < fade_in_end_s: state['status'] = 'fade_in'
-            elif current_time_s < full_value_end_s: state['status'] = 'full'
-            elif current_time_s < fade_out_end_s: state['status'] = 'fade_out'
-            else: state['status'] = 'ended'
-
-        current_val_to_apply = None
-
-        if state['status'] == 'pending' and current_time_s >= fade_in_start_s:
-            state['status'] = 'fade_in' 
-
-        if state['status'] == 'fade_in':
-            if current_time_s < fade_in_end_s:
-                progress = (current_time_s - fade_in_start_s) / fade_in_s if fade_in_s > 1e-6 else 1.0
-                current_val_to_apply = state['initial_value_at_fade_in_start'] + \
-                                     (state['event_target_value'] - state['initial_value_at_fade_in_start']) * progress
-            else: 
-                current_val_to_apply = state['event_target_value']
-                if current_time_s < full_value_end_s: state['status'] = 'full'
-                elif current_time_s < fade_out_end_s: 
-                    state['status'] = 'fade_out'
-                    state['initial_value_at_fade_out_start'] = state['event_target_value'] 
-                else: state['status'] = 'ended'
-        
-        elif state['status'] == 'full':
-            if current_time_s < full_value_end_s:
-                current_val_to_apply = state['event_target_value']
-            else: 
-                if current_time_s < fade_out_end_s : 
-                    state['status'] = 'fade_out'
-                    state['initial_value_at_fade_out_start'] = state['event_target_value']
-                else: state['status'] = 'ended'
-        
-        if state['status'] == 'fade_out': 
-            if current_time_s < fade_out_end_s:
-                if 'initial_value_at_fade_out_start' not in state: 
-                    state['initial_value_at_fade_out_start'] = state['event_target_value']
-                
-                progress = (current_time_s - fade_out_start_s) / fade_out_s if fade_out_s > 1e-6 else 1.0
-                current_val_to_apply = state['initial_value_at_fade_out_start'] + \
-                                     (state['calculated_fade_out_target_value'] - state['initial_value_at_fade_out_start']) * progress
-            else: 
-                current_val_to_apply = state['calculated_fade_out_target_value']
-                state['status'] = 'ended'
-
-        if state['status'] == 'ended':
-            if current_val_to_apply is None: current_val_to_apply = state['calculated_fade_out_target_value']
-            self._apply_brightness_to_target(event_data['target_type'], event_data['target_id'], current_val_to_apply)
-            if event_id in self.active_event_states: del self.active_event_states[event_id]
+        if event_type == 'preset':
+            preset = self._get_preset_info(data.get('preset_number'))
+            if preset is None or not preset.preset_type:
+                return
+            params_to_track = self._get_params_for_preset_type(preset.preset_type)
+            for fid in fixture_ids_for_event:
+                if fid in preset:
+                    row = row_of[fid]
+                    for param, value in preset.params_for(fid, params_to_track).items():
+                        values[row, TRACKED_PARAM_COLUMN[param]] = value
+
+        elif event_type in ['brightness', 'pan', 'tilt', 'zoom', 'focus', 'gobo', 'strobe']:
+            param_map = {'brightness': 'brightness', 'pan': 'rotation_y', 'tilt': 'rotation_x', 'zoom': 'zoom',
+                         'focus': 'focus', 'gobo': 'gobo_index', 'strobe': 'shutter_strobe_rate'}
+            if 'value' in data:
+                try:
+                    value = float(data['value'])
+                except (TypeError, ValueError):
+                    return
+                values[[row_of[fid] for fid in fixture_ids_for_event], TRACKED_PARAM_COLUMN[param_map[event_type]]] = value
+
+        elif event_type == 'color' and 'color_hex' in data:
+            color = QColor(data['color_hex'])
+            rows = [row_of[fid] for fid in fixture_ids_for_event]
+            values[rows, TRACKED_PARAM_COLUMN['red']] = color.red()
+            values[rows, TRACKED_PARAM_COLUMN['green']] = color.green()
+            values[rows, TRACKED_PARAM_COLUMN['blue']] = color.blue()
+
+    def _watch_repository(self):
+        """Follows the current show's repository; group and preset edits change what events track."""
+        repository = self.main_window.repository
+        if repository is not self._watched_repository:
+            repository.invalidated.connect(self._on_show_data_invalidated)
+            self._watched_repository = repository
+            self.state_checkpoints.clear()
+
+    def _on_show_data_invalidated(self, kind: str, _key):
+        if kind in (self.main_window.repository.GROUPS, self.main_window.repository.PRESETS):
+            self.state_checkpoints.clear()
+
+
+    def _is_fading_event(self, event_data: dict) -> bool:
+        """Brightness events always run through the fade engine (they release at their end); other types only when they fade."""
+        if event_data['type'] not in FADABLE_EVENT_TYPES:
+            return False
+        data = event_data.get('data', {})
+        return event_data['type'] == 'brightness' or data.get('fade_in', 0) > 0 or data.get('fade_out', 0) > 0
+
+    def _event_fade_targets(self, event_data: dict) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(fixture IDs, parameter columns, target values) an event drives; master brightness drives the master fader."""
+        event_type = event_data['type']
+        data = event_data.get('data', {})
+        target_type, target_id = event_data.get('target_type'), event_data.get('target_id')
+        live_states = self.main_window.live_fixture_states
+        targets = [] # (fixture ID, column, value)
+
+        if event_type == 'brightness' and target_type == 'master':
+            targets.append((MASTER_FIXTURE_ID, TRACKED_PARAM_COLUMN['brightness'], float(data.get('value', 0))))
+        elif event_type == 'preset':
+            params_by_fixture = self.main_window._resolve_preset_application(str(data.get('preset_number')), target_type, target_id) or {}
+            for fid, params in params_by_fixture.items():
+                if fid in live_states:
+                    targets.extend((fid, TRACKED_PARAM_COLUMN[param], float(value)) for param, value in params.items()
+                                   if param in TRACKED_PARAM_COLUMN and isinstance(value, (int, float)))
+        else:
+            if event_type == 'color':
+                if 'color_hex' not in data:
+                    return np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0)
+                color = QColor(data['color_hex'])
+                param_values = {'red': color.red(), 'green': color.green(), 'blue': color.blue()}
+            else:
+                param = {'brightness': 'brightness', 'pan': 'rotation_y', 'tilt': 'rotation_x', 'zoom': 'zoom',
+                         'focus': 'focus', 'strobe': 'shutter_strobe_rate'}[event_type]
+                param_values = {param: float(data.get('value', 0))}
+            for fid in self._get_fixture_ids_for_target(target_type, target_id):
+                if fid in live_states:
+                    targets.extend((fid, TRACKED_PARAM_COLUMN[param], value) for param, value in param_values.items())
+
+        if not targets:
+            return np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0)
+        fixture_ids, columns, values = zip(*targets)
+        return np.array(fixture_ids, np.int64), np.array(columns, np.int64), np.array(values, np.float64)
+
+    def _fade_origins(self, fixture_ids: np.ndarray, columns: np.ndarray, start_s: float,
+                      base_states: dict | None = None) -> np.ndarray:
+        """
+        The value each (fixture, parameter) pair fades from, as one vector over every target. During
+        playback that is the live state as the fade starts, so each fixture fades from wherever it
+        actually is, part-way through another fade included. A seek has no meaningful live state, so
+        it reads the tracked state just before start_s, falling back to base_states for parameters no
+        earlier event set. The master fader stands in for master brightness either way.
+        """
+        origins = np.full(len(fixture_ids), np.nan)
+        if base_states is None:
+            state_table = self.main_window.live_fixture_states
+        else:
+            state_table = base_states
+            values_before_event = self._tracked_values_at(start_s - 0.001)
+            row_of = self.state_checkpoints.row_of
+            rows = np.fromiter((row_of.get(fid, -1) for fid in fixture_ids.tolist()), np.int64, len(fixture_ids))
+            tracked = rows >= 0
+            origins[tracked] = values_before_event[rows[tracked], columns[tracked]]
+
+        missing = np.isnan(origins)
+        master = fixture_ids == MASTER_FIXTURE_ID
+        origins[master] = self.main_window.master_fader.value()
+        for column in np.unique(columns[missing & ~master]).tolist():
+            param = TRACKED_PARAMS[column]
+            indices = np.flatnonzero(missing & ~master & (columns == column))
+            origins[indices] = [float(state_table.get(fid, {}).get(param) or 0.0) for fid in fixture_ids[indices].tolist()]
+        return origins
+
+    def _fade_releases(self, event_data: dict, fixture_ids: np.ndarray, columns: np.ndarray, targets: np.ndarray,
+                       origins: np.ndarray, fade_out_start_s: float, fade_out_end_s: float) -> np.ndarray:
+        """
+        What each pair fades out to: brightness to 0 and other parameters back to their origin, unless
+        the next event of the same type on the same target starts before the fade-out finishes, in which
+        case the fade-out lands on that event's values. Without a fade-out, non-brightness values stay.
+        """
+        if event_data['type'] == 'brightness':
+            releases = np.zeros(len(targets))
+        elif fade_out_end_s > fade_out_start_s:
+            releases = origins.copy()
+        else:
+            releases = targets.copy()
+
+        schedule = self.timeline_widget.schedule
+        next_event = next((e for e in schedule.starting_in(fade_out_start_s - 1e-9, fade_out_end_s)
+                           if e['id'] != event_data['id'] and e['type'] == event_data['type']
+                           and e['target_type'] == event_data['target_type'] and e['target_id'] == event_data['target_id']), None)
+        if next_event is not None:
+            next_fixture_ids, next_columns, next_targets = self._event_fade_targets(next_event)
+            next_value_of = dict(zip(zip(next_fixture_ids.tolist(), next_columns.tolist()), next_targets.tolist()))
+            for index, key in enumerate(zip(fixture_ids.tolist(), columns.tolist())):
+                if key in next_value_of:
+                    releases[index] = next_value_of[key]
+        return releases
+
+    def _start_event_fade(self, event_data: dict, base_states: dict | None = None):
+        """
+        Loads an event into the fade engine, one segment per fixture and parameter it drives.
+        base_states is given on a seek; see _fade_origins.
+        """
+        fixture_ids, columns, targets = self._event_fade_targets(event_data)
+        if len(fixture_ids) == 0:
             return
+        data = event_data.get('data', {})
+        start_s = self.timeline_widget.schedule.start_of(event_data['id'])
+        fade_in_s = float(data.get('fade_in', 0.0))
+        fade_out_s = float(data.get('fade_out', 0.0))
+        fade_out_start_s = start_s + fade_in_s + event_data['duration']
+
+        origins = self._fade_origins(fixture_ids, columns, start_s, base_states)
+        releases = self._fade_releases(event_data, fixture_ids, columns, targets, origins, fade_out_start_s, fade_out_start_s + fade_out_s)
+        snaps = columns == TRACKED_PARAM_COLUMN['gobo_index'] # Gobo slots cannot be cross-faded
+        origins[snaps] = targets[snaps]
+        releases[snaps] = targets[snaps]
+        self.fade_engine.add(event_data['id'], fixture_ids, columns, origins, targets, releases,
+                             start_s, fade_in_s, event_data['duration'], fade_out_s,
+                             data.get('fade_in_curve', 'linear'), data.get('fade_out_curve', 'linear'))
+
+    def _apply_fades(self, current_time_s: float):
+        """Evaluates every active fade in one pass and sends the values that changed, one update per fixture."""
+        fixture_ids, columns, values, finished_event_ids = self.fade_engine.evaluate(current_time_s)
+        params_by_fixture = {}
+        for fid, column, value in zip(fixture_ids.tolist(), columns.tolist(), values.tolist()):
+            if fid == MASTER_FIXTURE_ID:
+                self.main_window.master_fader.setValue(max(0, min(100, int(value))))
+                continue
+            param = TRACKED_PARAMS[column]
+            params_by_fixture.setdefault(fid, {})[param] = int(value) if column in FADE_INTEGER_COLUMNS else value
+        for fid, params in params_by_fixture.items():
+            self.main_window.update_fixture_data_and_notify(fid, params)
+
+        for event_id in finished_event_ids:
+            self.active_event_states.pop(event_id, None)
+        schedule = self.timeline_widget.schedule
+        for event_id in self.fade_engine.event_ids():
+            state = self.active_event_states.get(event_id)
+            event_data = schedule.event(event_id)
+            if state is None or event_data is None:
+                continue
+            time_into_event_s = current_time_s - schedule.start_of(event_id)
+            fade_in_s = event_data['data'].get('fade_in', 0.0)
+            if time_into_event_s < fade_in_s:
+                state['status'] = 'fade_in'
+            elif time_into_event_s < fade_in_s + event_data['duration']:
+                state['status'] = 'full'
+            else:
+                state['status'] = 'fade_out'
 
-        if current_val_to_apply is not None:
-            self._apply_brightness_to_target(event_data['target_type'], event_data['target_id'], current_val_to_apply)
-            state['last_applied_val'] = current_val_to_apply 
-
-    def _determine_fade_out_target_value(self, current_event: dict, all_timeline_events: list[dict]) -> float:
-        if not self.timeline_widget: return 0.0
-        target_type = current_event['target_type']
-        target_id = current_event['target_id']
-        
-        effective_current_event_start_s = self.timeline_widget._get_effective_event_start_time(current_event)
-
-        current_event_fade_in_time = current_event['data'].get('fade_in', 0.0)
-        current_event_main_duration = current_event['duration']
-        
-        current_event_full_value_end_time = effective_current_event_start_s + current_event_fade_in_time + current_event_main_duration
-        current_event_fade_out_finish_time = current_event_full_value_end_time + current_event['data'].get('fade_out', 0.0)
-
-
-        next_event_on_target = None
-        min_next_start_time = float('inf')
-
-        for e_next in all_timeline_events:
-            if e_next['id'] == current_event['id']: continue
-            if e_next['target_type'] == target_type and e_next['target_id'] == target_id:
-                effective_next_event_start_s = self.timeline_widget._get_effective_event_start_time(e_next)
-                if effective_next_event_start_s >= current_event_full_value_end_time:
-                    if effective_next_event_start_s < min_next_start_time:
-                        min_next_start_time = effective_next_event_start_s
-                        next_event_on_target = e_next
-        
-        if next_event_on_target and next_event_on_target['type'] == 'brightness':
-            if min_next_start_time <= current_event_fade_out_finish_time:
-                return float(next_event_on_target['data'].get('value', 0))
-        
-        return 0.0 
-    
-    def _apply_brightness_to_target(self, target_type: str, target_id: int | None, value: float):
-        clamped_value = max(0, min(100, int(round(value)))) 
-        if target_type == "master":
-            if abs(self.main_window.master_fader.value() - clamped_value) > 0:
-                 self.main_window.master_fader.setValue(clamped_value)
-        elif target_type == "fixture" and target_id is not None:
-            self.main_window.update_fixture_data_and_notify(target_id, {'brightness': clamped_value})
-        elif target_type == "group" and target_id is not None:
-            try:
-                cursor = self.main_window.db_connection.cursor()
-                cursor.execute("SELECT fixture_id FROM fixture_group_mappings WHERE group_id = ?", (target_id,))
-                for (fix_id,) in cursor.fetchall():
-                    self.main_window.update_fixture_data_and_notify(fix_id, {'brightness': clamped_value})
-            except Exception as e:
-                print(f"Error applying group brightness from timeline fade: {e}")
-
-
-    def _check_and_trigger_events(self, current_time_s, is_seek=False):
+    def _check_and_trigger_events(self, current_time_s, is_seek=False, base_states: dict | None = None):
         if not self.timeline_widget or not self.event_list_widget: return 
+        schedule = self.timeline_widget.schedule
 
         if is_seek:
-            # On a seek, the handle_playhead_seek_by_user function takes care of setting the correct state.
-            # We just need to manage the active_event_states dictionary here.
+            # On a seek, the handle_playhead_seek_by_user function takes care of setting the tracked state.
+            # Here events active at the new time are marked, and fading ones pick up part-way through.
             self.active_event_states.clear()
-            for event_data in self.timeline_widget.events:
-                event_start = self.timeline_widget._get_effective_event_start_time(event_data)
-                event_end = event_start + self.timeline_widget._get_event_visual_duration_s(event_data)
-                if event_start <= current_time_s < event_end:
-                    self.active_event_states[event_data['id']] = {} # Mark as active
-                    if event_data['type'] == 'brightness':
-                        self._process_single_active_brightness_event(event_data['id'], current_time_s, is_seek=True)
+            self.fade_engine.clear()
+            for event_data in sorted(schedule.active_at(current_time_s), key=lambda e: schedule.start_of(e['id'])):
+                self.active_event_states[event_data['id']] = {} # Mark as active
+                if self._is_fading_event(event_data):
+                    self._start_event_fade(event_data, base_states)
+            self._apply_fades(current_time_s)
+            self.presend_event_ids.clear()
+            self.last_checked_time_s = current_time_s
+            self._last_checked_schedule = schedule
             self._update_list_widget_styles(current_time_s)
+            self.timeline_widget.update_changed_event_states()
             return
 
         # ---- Normal Playback Logic ----
-        active_brightness_event_ids = [eid for eid, estate in self.active_event_states.items() if 'status' in estate and estate['status'] not in ['triggered_once', 'ended']]
-        for event_id in active_brightness_event_ids:
-            self._process_single_active_brightness_event(event_id, current_time_s, is_seek=False)
-
+        # Only events that started since the last check can need triggering. After a jump, a reset
+        # of the active states or an edit, every event active now is a candidate instead.
+        previous_time_s = self.last_checked_time_s
+        if previous_time_s is None or current_time_s < previous_time_s or schedule is not self._last_checked_schedule:
+            candidates = schedule.active_at(current_time_s)
+        else:
+            candidates = schedule.starting_in(previous_time_s, current_time_s)
+        self.last_checked_time_s = current_time_s
+        self._last_checked_schedule = schedule
 
-        for event_data in self.timeline_widget.events:
+        for event_data in candidates:
             event_id = event_data['id']
-            actual_event_start_s = self.timeline_widget._get_effective_event_start_time(event_data)
-            visual_event_end_s = actual_event_start_s + self.timeline_widget._get_event_visual_duration_s(event_data)
-
-
-            if event_id in self.active_event_states and self.active_event_states[event_id].get('status') == 'ended':
-                continue 
-
-            if current_time_s >= actual_event_start_s and current_time_s < visual_event_end_s:
-                if event_id not in self.active_event_states:
-                    if event_data['type'] == 'brightness':
-                        self.active_event_states[event_id] = {} 
-                        self._process_single_active_brightness_event(event_id, current_time_s, is_seek=False) 
-                    else: 
-                        self.event_triggered.emit(event_data)
-                        self.active_event_states[event_id] = {'status': 'triggered_once'}
-            
-            elif current_time_s >= visual_event_end_s: 
-                if event_id in self.active_event_states:
-                    if self.active_event_states[event_id].get('status') != 'ended':
-                        if event_data['type'] == 'brightness':
-                            self.active_event_states[event_id]['status'] = 'fade_out' 
-                            self._process_single_active_brightness_event(event_id, current_time_s, is_seek=False) 
-                    if event_id in self.active_event_states and self.active_event_states[event_id].get('status') == 'ended':
-                        del self.active_event_states[event_id] 
-                    elif event_data['type'] != 'brightness' and event_id in self.active_event_states: 
-                        del self.active_event_states[event_id]
+            if event_id in self.active_event_states:
+                continue
+            if self._is_fading_event(event_data):
+                self.active_event_states[event_id] = {'status': 'fade_in'}
+                self._start_event_fade(event_data)
+            else: 
+                self.event_triggered.emit(event_data)
+                if current_time_s < schedule.end_of(event_id): # Events shorter than a tick fire once and are done
+                    self.active_event_states[event_id] = {'status': 'triggered_once'}
+
+        # Every fade of every active event, new ones included, in one pass; finished fades release here
+        self._apply_fades(current_time_s)
+
+        for event_id in list(self.active_event_states):
+            visual_event_end_s = schedule.end_of(event_id)
+            if visual_event_end_s is None: # Deleted while playing
+                del self.active_event_states[event_id]
+                self.fade_engine.remove(event_id)
+                continue
+            if current_time_s < visual_event_end_s:
+                continue
+            self.active_event_states.pop(event_id, None)
         
+        self._presend_upcoming_events(current_time_s)
         self._update_list_widget_styles(current_time_s)
+        self.timeline_widget.update_changed_event_states()
+
+    def _presend_upcoming_events(self, current_time_s: float):
+        """
+        Sends events starting within the pre-send window to Roblox early, stamped with the
+        time they should be applied on the bridge clock. Clients hold them in a jitter buffer
+        so cues land on the beat regardless of when their poll arrives.
+        """
+        if not self.timeline_widget or not self.main_window.is_live_mode_active():
+            return
+        lookahead_s = self.main_window.settings.value('roblox/presend_lookahead_ms', 300, type=int) / 1000.0
+        if lookahead_s <= 0:
+            return
 
+        playback_rate = self.playback_clock.rate
+        window_end_s = current_time_s + lookahead_s * playback_rate
+        server_now_ms = self.main_window.http_manager.server_time_ms()
 
-    def _update_list_widget_styles(self, current_time_s):
-        """Helper to update list widget styles based on playhead position."""
-        if not self.timeline_widget or not self.event_list_widget: return
+        schedule = self.timeline_widget.schedule
+        for event_data in schedule.starting_in(current_time_s, window_end_s):
+            event_start_s = schedule.start_of(event_data['id'])
+            if event_data['id'] in self.presend_event_ids:
+                continue
+            if event_data['type'] == 'blackout' or self._is_fading_event(event_data):
+                continue # Fades are computed frame by frame, not sent as one state
+            apply_at_ms = server_now_ms + (event_start_s - current_time_s) * 1000.0 / playback_rate
+            self.main_window.presend_timeline_event(event_data, apply_at_ms)
+            self.presend_event_ids.add(event_data['id'])
 
-        next_upcoming_event_id_for_style: int | None = None
-        min_abs_diff_for_selection = float('inf')
-        current_active_event_ids_for_styling = []
 
-        for ev_data_list_scan in self.timeline_widget.events:
-            visual_event_start_time = self.timeline_widget._get_effective_event_start_time(ev_data_list_scan)
-            visual_event_end_time = visual_event_start_time + self.timeline_widget._get_event_visual_duration_s(ev_data_list_scan)
-            
-            is_active_for_style = visual_event_start_time <= current_time_s < visual_event_end_time
-            current_event_id_scan = ev_data_list_scan['id']
+    def _update_list_widget_styles(self, current_time_s):
+        """
+        Helper to update list widget styles based on playhead position. Only items whose style
+        changes are touched; every other item keeps the default style it was created with.
+        """
+        if not self.timeline_widget or not self.event_list_widget: return
 
-            if is_active_for_style:
-                current_active_event_ids_for_styling.append(current_event_id_scan)
-            
-            if visual_event_start_time > current_time_s:
-                time_diff = visual_event_start_time - current_time_s
-                if next_upcoming_event_id_for_style is None or time_diff < min_abs_diff_for_selection:
-                    min_abs_diff_for_selection = time_diff
-                    next_upcoming_event_id_for_style = current_event_id_scan
+        schedule = self.timeline_widget.schedule
+        current_active_event_ids_for_styling = {event_data['id'] for event_data in schedule.active_at(current_time_s)}
+        next_upcoming_event = schedule.next_start_after(current_time_s) if not current_active_event_ids_for_styling else None
+        next_upcoming_event_id_for_style = next_upcoming_event['id'] if next_upcoming_event else None
+        selected_event_ids = set(self.timeline_widget.selected_event_ids)
+
+        wanted_styles = {}
+        for event_id_in_list in set(self._list_item_styles) | current_active_event_ids_for_styling | selected_event_ids | {next_upcoming_event_id_for_style}:
+            style = (event_id_in_list in selected_event_ids, event_id_in_list in current_active_event_ids_for_styling,
+                     event_id_in_list == next_upcoming_event_id_for_style)
+            if any(style):
+                wanted_styles[event_id_in_list] = style
+        changed_ids = [event_id for event_id in set(wanted_styles) | set(self._list_item_styles)
+                       if wanted_styles.get(event_id) != self._list_item_styles.get(event_id)]
+        self._list_item_styles = wanted_styles
+        if not changed_ids:
+            return
 
         default_bg = self.event_list_widget.palette().base().color()
         active_color = QColor(self.main_window.settings.value("theme/activeListItemColor", "#4a5d23")) 
         next_color = QColor(self.main_window.settings.value("theme/nextListItemColor", "#604520"))   
         default_text_color = self.event_list_widget.palette().text().color()
 
-        for i in range(self.event_list_widget.count()):
-            item = self.event_list_widget.item(i)
-            event_id_in_list = item.data(Qt.ItemDataRole.UserRole)
+        for event_id_in_list in changed_ids:
+            item = self._event_list_section.items.get(event_id_in_list)
+            if item is None:
+                continue
             font = item.font(); font.setBold(False)
             item.setForeground(default_text_color)
 
-            is_timeline_selected = event_id_in_list in self.timeline_widget.selected_event_ids
-            is_playhead_active = event_id_in_list in current_active_event_ids_for_styling
-            is_playhead_next = event_id_in_list == next_upcoming_event_id_for_style and not current_active_event_ids_for_styling
+            is_timeline_selected, is_playhead_active, is_playhead_next = wanted_styles.get(event_id_in_list, (False, False, False))
 
             if is_timeline_selected:
                 item.setBackground(active_color); font.setBold(True)
@@ -2888,17 +3216,11 @@ class TimelineTab(QWidget):
             if dialog_result == QDialog.DialogCode.Accepted:
                 event_details = dialog.get_data()
                 if event_details: 
-                    cursor = self.main_window.db_connection.cursor()
-                    cursor.execute(
-                        "INSERT INTO timeline_events (name, start_time, duration, event_type, data, target_type, target_id, cue_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", 
-                        (event_details['name'], event_details['start_time'], event_details['duration'], 
-                         event_details['type'], json.dumps(event_details['data']),
-                         event_details['target_type'], event_details['target_id'],
-                         event_details['cue_id']) 
+                    self.main_window.repository.queue_add_events(
+                        "Add Event", [event_details],
+                        on_done=lambda event_ids, name=event_details['name']: self._on_event_written(event_ids, f"Event '{name}' added."),
+                        on_error=lambda e: self._on_queued_write_failed(f"Could not add event: {e}")
                     )
-                    self.main_window.db_connection.commit()
-                    self.refresh_event_list_and_timeline()
-                    QMessageBox.information(self, "Event Added", f"Event '{event_details['name']}' added.")
         except Exception as e:
             QMessageBox.critical(self, "DB Error", f"Could not add event: {e}")
             print(f"Error adding event: {e}")
@@ -2918,39 +3240,19 @@ class TimelineTab(QWidget):
 
         if event_id_to_edit is None: QMessageBox.warning(self, "Selection Error", "Please select an event to edit."); return
         try:
-            cursor = self.main_window.db_connection.cursor()
-            cursor.execute("SELECT id, name, start_time, duration, event_type, data, target_type, target_id, cue_id FROM timeline_events WHERE id = ?", (event_id_to_edit,)) 
-            ev_tuple = cursor.fetchone()
-            if not ev_tuple: QMessageBox.critical(self, "Error", "Event not found in database."); self.refresh_event_list_and_timeline(); return
-            event_data_for_dialog = {
-                'id': ev_tuple[0], 'name': ev_tuple[1], 'start_time': float(ev_tuple[2]),
-                'duration': float(ev_tuple[3]), 'type': ev_tuple[4],
-                'data': json.loads(ev_tuple[5]) if isinstance(ev_tuple[5], str) else ev_tuple[5],
-                'target_type': ev_tuple[6] if ev_tuple[6] else 'master',
-                'target_id': ev_tuple[7],
-                'cue_id': ev_tuple[8] 
-            }
+            event_data_for_dialog = self.main_window.repository.timeline_event(event_id_to_edit)
+            if not event_data_for_dialog: QMessageBox.critical(self, "Error", "Event not found in database."); self.timeline_model.refresh_events([event_id_to_edit]); return
         except Exception as e: QMessageBox.critical(self, "DB Error", f"Could not fetch event for editing: {e}"); return
         dialog = TimelineEventDialog(self.main_window, event_data=event_data_for_dialog, is_new_event=False, parent=self)
         if dialog.exec():
             try:
                 updated_details = dialog.get_data()
                 if not updated_details: return
-                cursor = self.main_window.db_connection.cursor()
-                cursor.execute(
-                    """UPDATE timeline_events SET 
-                       name = ?, start_time = ?, duration = ?, event_type = ?, data = ?,
-                       target_type = ?, target_id = ?, cue_id = ? 
-                       WHERE id = ?""", 
-                    (updated_details['name'], updated_details['start_time'], updated_details['duration'],
-                     updated_details['type'], json.dumps(updated_details['data']),
-                     updated_details['target_type'], updated_details['target_id'],
-                     updated_details['cue_id'], 
-                     event_id_to_edit)
+                self.main_window.repository.queue_event_updates(
+                    "Edit Event", [(event_id_to_edit, updated_details)],
+                    on_done=lambda _operation: self._on_event_written([event_id_to_edit], f"Event '{updated_details['name']}' updated."),
+                    on_error=lambda e: self._on_queued_write_failed(f"Could not update event: {e}")
                 )
-                self.main_window.db_connection.commit()
-                self.refresh_event_list_and_timeline()
-                QMessageBox.information(self, "Event Updated", f"Event '{updated_details['name']}' updated.")
             except Exception as e:
                 QMessageBox.critical(self, "DB Error", f"Could not update event: {e}")
 
@@ -2961,23 +3263,20 @@ class TimelineTab(QWidget):
                                      QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, 
                                      QMessageBox.StandardButton.No)
         if reply == QMessageBox.StandardButton.Yes:
-            deleted_count = 0
+            try:
+                switched_event_ids = self.main_window.repository.delete_events(event_ids)
+            except Exception as e:
+                QMessageBox.critical(self, "DB Error", f"Could not delete events: {e}")
+                return
             for event_id in event_ids:
-                try:
-                    self._handle_dependent_events_on_delete(event_id) 
-                    cursor = self.main_window.db_connection.cursor()
-                    cursor.execute("DELETE FROM timeline_events WHERE id = ?", (event_id,))
-                    self.main_window.db_connection.commit() 
-                    if event_id in self.active_event_states: 
-                        del self.active_event_states[event_id]
-                    deleted_count += 1
-                except Exception as e:
-                    QMessageBox.critical(self, "DB Error", f"Could not delete event ID {event_id}: {e}")
-            
-            if deleted_count > 0:
-                if self.timeline_widget: self.timeline_widget.selected_event_ids.clear()
-                self.refresh_event_list_and_timeline()
-                QMessageBox.information(self, "Events Deleted", f"{deleted_count} event(s) deleted successfully.")
+                self.active_event_states.pop(event_id, None)
+            if self.timeline_widget: self.timeline_widget.selected_event_ids.clear()
+            self.timeline_model.refresh_events(set(event_ids).union(switched_event_ids))
+            if switched_event_ids:
+                QMessageBox.information(self, "Dependent Events Updated", 
+                                        f"{len(switched_event_ids)} event(s) that were following a deleted event "
+                                        "have been updated to be relative to their respective cues.")
+            QMessageBox.information(self, "Events Deleted", f"{len(event_ids)} event(s) deleted successfully.")
 
 
     def delete_selected_event_from_list_widget(self): 
@@ -3003,195 +3302,167 @@ class TimelineTab(QWidget):
         self._handle_delete_multiple_events([event_id])
 
 
-    def _handle_dependent_events_on_delete(self, deleted_event_id: int):
-        events_modified_count = 0
-        try:
-            cursor = self.main_window.db_connection.cursor()
-            cursor.execute("SELECT id, data, cue_id FROM timeline_events WHERE data LIKE ?", (f'%\"followed_event_id\": {deleted_event_id}%',))
-            dependent_events = cursor.fetchall()
-
-            for dep_event_id, dep_data_json, dep_cue_id in dependent_events:
-                try:
-                    dep_data = json.loads(dep_data_json)
-                    if dep_data.get("trigger_mode") == "follow_event_in_cue" and dep_data.get("followed_event_id") == deleted_event_id:
-                        dep_data["trigger_mode"] = "relative_to_cue" 
-                        del dep_data["followed_event_id"] 
-                        
-                        cursor.execute("UPDATE timeline_events SET data = ? WHERE id = ?",
-                                       (json.dumps(dep_data), dep_event_id))
-                        events_modified_count += 1
-                        print(f"Event ID {dep_event_id} was following deleted event {deleted_event_id}. Switched to relative_to_cue.")
-                except json.JSONDecodeError:
-                    print(f"Error decoding JSON for event ID {dep_event_id} while handling dependent event deletion.")
-                except Exception as e_inner:
-                    print(f"Error updating dependent event {dep_event_id}: {e_inner}")
-
-            if events_modified_count > 0:
-                self.main_window.db_connection.commit()
-                QMessageBox.information(self, "Dependent Events Updated", 
-                                        f"{events_modified_count} event(s) that were following the deleted event "
-                                        "have been updated to be relative to their respective cues.")
-        except Exception as e:
-            print(f"Error handling dependent events on delete: {e}")
-            QMessageBox.critical(self, "DB Error", f"Error updating dependent events: {e}")
+    def refresh_event_list_and_timeline(self):
+        """Reloads every event and cue of the show. Edits refresh only the rows they wrote, through timeline_model."""
+        self.timeline_model.reload()
 
+    def refresh_tracks(self):
+        """Rebuilds the tracks after fixtures or groups changed; the events themselves are unchanged."""
+        if not self.timeline_widget: return
+        self.timeline_widget._build_track_list()
+        self._rebuild_event_list()
+        self._rebuild_track_table()
 
+    def _timeline_model_reset(self):
+        self.presend_event_ids.clear() # Timing may have changed; allow re-sending
+        self._rebuild_event_list()
+        self._rebuild_track_table()
+        self.cues_changed.emit()
 
-    def refresh_event_list_and_timeline(self, regenerate_waveform=True):
-        if self.timeline_widget:
-            self.cues_changed.emit()
-            
-        old_selected_event_ids = []
-        if self.timeline_widget and self.timeline_widget.selected_event_ids:
-            old_selected_event_ids = list(self.timeline_widget.selected_event_ids)
-        
-        old_selected_cue_id = None
-        if self.timeline_widget and self.timeline_widget.selected_cue_id is not None:
-            old_selected_cue_id = self.timeline_widget.selected_cue_id
+    def _timeline_content_changed(self):
+        effective_duration = self._get_effective_timeline_duration()
+        current_pos = self.timeline_widget.current_playhead_position if self.timeline_widget else 0.0
+        self.update_time_label(current_pos, effective_duration)
 
-        if self.timeline_widget:
-            self.timeline_widget.load_events_from_db(regenerate_waveform=regenerate_waveform) 
-            self.timeline_widget.load_cues_from_db() 
-            
-            self.timeline_widget.selected_event_ids = [
-                ev_id for ev_id in old_selected_event_ids 
-                if any(ev['id'] == ev_id for ev in self.timeline_widget.events)
-            ]
-            
-            if old_selected_cue_id and any(c['id'] == old_selected_cue_id for c in self.timeline_widget.cues):
-                self.timeline_widget.selected_cue_id = old_selected_cue_id
-            else:
-                self.timeline_widget.selected_cue_id = None
-        
+    def _cue_list_entry(self, cue_data: dict) -> tuple:
+        item_text = f"Cue {cue_data['cue_number']}"
+        if cue_data.get('name'): item_text += f": {cue_data['name']}"
+        item_text += f" @ {cue_data['trigger_time_s']:.3f}s"
+        return ((cue_data['trigger_time_s'], cue_data['cue_number'], cue_data['id']), cue_data['id'], item_text, f"cue_{cue_data['id']}")
+
+    def _set_cue_list_tooltip(self, list_item: QListWidgetItem, cue_data: dict):
+        action_id = f"cue.go.{cue_data['cue_number']}".replace('.','_')
+        keybind_str = self.main_window.keybind_map.get(action_id, '')
+        tooltip = f"Go to Cue {cue_data['cue_number']}"
+        if keybind_str:
+            tooltip += f" ({keybind_str})"
+        list_item.setToolTip(tooltip)
+
+    def _event_list_entry(self, event_data: dict) -> tuple:
+        """(sort key, event ID, text, item data) of an event's row: grouped by track, then by effective start."""
+        track_idx = self.timeline_widget._get_track_index_for_event(event_data)
+        track_name_display = self.timeline_widget.tracks[track_idx]['name']
+        event_specific_data_str = ""
+        if event_data['type'] == 'preset':
+            preset_num = event_data['data'].get('preset_number')
+            event_specific_data_str = f" (P {preset_num or 'N/A'})"
+        elif event_data['type'] == 'brightness':
+            event_specific_data_str = f" ({event_data['data'].get('value', 'N/A')}%)"
+        if event_data['type'] in FADABLE_EVENT_TYPES:
+            if event_data['data'].get('fade_in', 0) > 0:
+                event_specific_data_str += f" In:{event_data['data']['fade_in']:.1f}s"
+            if event_data['data'].get('fade_out', 0) > 0:
+                event_specific_data_str += f" Out:{event_data['data']['fade_out']:.1f}s"
+
+        cue_info_str = ""
+        effective_display_time_s = self.timeline_widget._get_effective_event_start_time(event_data)
+        if event_data.get('cue_id'):
+            cue = self.timeline_model.cue(event_data['cue_id'])
+            if cue: cue_info_str = f" (Cue {cue['cue_number']})"
+
+        item_text = (f"[{track_name_display}] {event_data['name']}{cue_info_str} @ {effective_display_time_s:.3f}s "
+                     f"({event_data['type']}{event_specific_data_str})")
+        return ((track_idx, effective_display_time_s, event_data['id']), event_data['id'], item_text, event_data['id'])
+
+    def _rebuild_event_list(self):
+        """Lists every cue and event from scratch; only for a reload or a change of tracks."""
+        if not self.timeline_widget: return
         self.event_list_widget.blockSignals(True)
         self.event_list_widget.clear()
-        
-        # Add Cues to the List Widget
-        if self.timeline_widget and self.timeline_widget.cues:
-            cue_header = QListWidgetItem("--- Cues ---")
-            font = cue_header.font(); font.setBold(True); cue_header.setFont(font)
-            cue_header.setFlags(cue_header.flags() & ~Qt.ItemFlag.ItemIsSelectable)
-            self.event_list_widget.addItem(cue_header)
-            
-            for cue_data in self.timeline_widget.cues:
-                item_text = f"Cue {cue_data['cue_number']}"
-                if cue_data.get('name'): item_text += f": {cue_data['name']}"
-                item_text += f" @ {cue_data['trigger_time_s']:.3f}s"
-                list_item = QListWidgetItem(item_text)
-                
-                action_id = f"cue.go.{cue_data['cue_number']}".replace('.','_')
-                keybind_str = self.main_window.keybind_map.get(action_id, '')
-                tooltip = f"Go to Cue {cue_data['cue_number']}"
-                if keybind_str:
-                    tooltip += f" ({keybind_str})"
-                list_item.setToolTip(tooltip)
-                
-                list_item.setData(Qt.ItemDataRole.UserRole, f"cue_{cue_data['id']}")
-                self.event_list_widget.addItem(list_item)
-
-
-        if self.timeline_widget and self.timeline_widget.events:
-            event_header = QListWidgetItem("--- Events ---")
-            font = event_header.font(); font.setBold(True); event_header.setFont(font)
-            event_header.setFlags(event_header.flags() & ~Qt.ItemFlag.ItemIsSelectable)
-            self.event_list_widget.addItem(event_header)
-
-            grouped_events = {}
-            for track_idx, track_info in enumerate(self.timeline_widget.tracks):
-                key = (track_idx, track_info['name']) 
-                grouped_events[key] = []
-            for event_data in self.timeline_widget.events:
-                track_idx = self.timeline_widget._get_track_index_for_event(event_data)
-                if 0 <= track_idx < len(self.timeline_widget.tracks):
-                    track_info_for_event = self.timeline_widget.tracks[track_idx]
-                    key = (track_idx, track_info_for_event['name'])
-                    grouped_events.setdefault(key, []).append(event_data)
-                else: 
-                    key_master = (0, self.timeline_widget.tracks[0]['name']) 
-                    grouped_events.setdefault(key_master, []).append(event_data)
-            
-            for (track_idx, track_name_display), events_on_track in sorted(grouped_events.items()):
-                events_on_track.sort(key=lambda x: self.timeline_widget._get_effective_event_start_time(x))
-                for event_data in events_on_track:
-                    event_specific_data_str = ""
-                    if event_data['type'] == 'preset':
-                        preset_num = event_data['data'].get('preset_number')
-                        event_specific_data_str = f" (P {preset_num or 'N/A'})"
-                    elif event_data['type'] == 'brightness':
-                        event_specific_data_str = f" ({event_data['data'].get('value', 'N/A')}%)"
-                        if event_data['data'].get('fade_in', 0) > 0:
-                            event_specific_data_str += f" In:{event_data['data']['fade_in']:.1f}s"
-                        if event_data['data'].get('fade_out', 0) > 0:
-                            event_specific_data_str += f" Out:{event_data['data']['fade_out']:.1f}s"
-                    
-                    cue_info_str = ""
-                    effective_display_time_s = self.timeline_widget._get_effective_event_start_time(event_data)
-
-                    if event_data.get('cue_id') and self.timeline_widget.cues:
-                        cue = next((c for c in self.timeline_widget.cues if c['id'] == event_data['cue_id']), None)
-                        if cue: cue_info_str = f" (Cue {cue['cue_number']})"
-
-                    item_text = (f"[{track_name_display}] {event_data['name']}{cue_info_str} @ {effective_display_time_s:.3f}s "
-                                 f"({event_data['type']}{event_specific_data_str})")
-                    list_item = QListWidgetItem(item_text)
-                    list_item.setData(Qt.ItemDataRole.UserRole, event_data['id']) 
-                    self.event_list_widget.addItem(list_item)
-            
-            first_item_to_scroll_to = None
-            self.event_list_widget.clearSelection() 
-            for i in range(self.event_list_widget.count()):
-                item = self.event_list_widget.item(i)
-                item_data = item.data(Qt.ItemDataRole.UserRole)
-                if isinstance(item_data, int) and item_data in self.timeline_widget.selected_event_ids:
-                    item.setSelected(True)
-                    if first_item_to_scroll_to is None and item_data == (self.timeline_widget.selected_event_ids[0] if self.timeline_widget.selected_event_ids else None):
-                        first_item_to_scroll_to = item 
-            if first_item_to_scroll_to:
-                 self.event_list_widget.setCurrentItem(first_item_to_scroll_to)
-                 self.event_list_widget.scrollToItem(first_item_to_scroll_to, QAbstractItemView.ScrollHint.PositionAtCenter)
-            elif not self.timeline_widget.selected_event_ids : 
-                 self.event_list_widget.setCurrentItem(None) 
+        self._list_item_styles.clear() # New items start with the default style
+        cues = self.timeline_model.cues()
+        self._cue_list_section.fill(self._cue_list_entry(cue_data) for cue_data in cues)
+        for cue_data in cues:
+            self._set_cue_list_tooltip(self._cue_list_section.items[cue_data['id']], cue_data)
+        self._event_list_section.fill(self._event_list_entry(event_data) for event_data in self.timeline_model.events())
+
+        first_item_to_scroll_to = None
+        selected_event_ids = self.timeline_widget.selected_event_ids
+        for event_id in selected_event_ids:
+            item = self._event_list_section.items.get(event_id)
+            if item is not None:
+                item.setSelected(True)
+                if event_id == selected_event_ids[0]:
+                    first_item_to_scroll_to = item 
+        if first_item_to_scroll_to:
+             self.event_list_widget.setCurrentItem(first_item_to_scroll_to)
+             self.event_list_widget.scrollToItem(first_item_to_scroll_to, QAbstractItemView.ScrollHint.PositionAtCenter)
+        elif not selected_event_ids: 
+             self.event_list_widget.setCurrentItem(None) 
+        self.event_list_widget.blockSignals(False)
 
+    def _event_list_events_inserted(self, event_ids: list):
+        self.event_list_widget.blockSignals(True)
+        selected_event_ids = set(self.timeline_widget.selected_event_ids)
+        for event_id in event_ids:
+            item = self._event_list_section.place(*self._event_list_entry(self.timeline_model.event(event_id)))
+            if event_id in selected_event_ids:
+                item.setSelected(True)
+        self.event_list_widget.blockSignals(False)
 
+    def _event_list_events_removed(self, event_ids: list):
+        self.event_list_widget.blockSignals(True)
+        for event_id in event_ids:
+            self._event_list_section.remove(event_id)
+            self._list_item_styles.pop(event_id, None)
+            self.presend_event_ids.discard(event_id)
         self.event_list_widget.blockSignals(False)
-        
-        if self.track_info_table_widget and self.timeline_widget: 
-            self.track_info_table_widget.setRowCount(0) 
-            current_row_idx_for_table = 0
-            
-            for track_display_order, track_info in enumerate(self.timeline_widget.tracks):
-                self.track_info_table_widget.insertRow(current_row_idx_for_table)
-                
-                num_item = QTableWidgetItem(str(track_display_order + 1)) 
-                num_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                self.track_info_table_widget.setItem(current_row_idx_for_table, 0, num_item)
-
-                self.track_info_table_widget.setItem(current_row_idx_for_table, 1, QTableWidgetItem(track_info['name']))
-                self.track_info_table_widget.setItem(current_row_idx_for_table, 2, QTableWidgetItem(track_info['type'].capitalize()))
-                id_text = str(track_info['id']) if track_info['id'] is not None else "N/A"
-                id_item = QTableWidgetItem(id_text)
-                id_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                self.track_info_table_widget.setItem(current_row_idx_for_table, 3, id_item)
-
-                track_item_row_total_height = TimelineWidget.EVENT_BASE_HEIGHT + \
-                                              (2 * TimelineWidget.TRACK_INTERNAL_PADDING) + \
-                                              TimelineWidget.TRACK_SPACING
-                self.track_info_table_widget.setRowHeight(current_row_idx_for_table, track_item_row_total_height)
-                current_row_idx_for_table += 1
-            
-            self.track_info_table_widget.resizeColumnsToContents() 
-            self.track_info_table_widget.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch) 
-            self.track_info_table_widget.setColumnWidth(0, 30) 
-            self.track_info_table_widget.setColumnWidth(2, 70) 
-            self.track_info_table_widget.setColumnWidth(3, 50) 
 
+    def _event_timing_changed(self, event_ids: list):
+        """Relabels and re-sorts the rows of events the timeline re-timed (edited, moved, or their cue changed)."""
+        self.event_list_widget.blockSignals(True)
+        for event_id in event_ids:
+            self.presend_event_ids.discard(event_id) # Timing may have changed; allow re-sending
+            event_data = self.timeline_model.event(event_id)
+            if event_data is not None and event_id in self._event_list_section.items:
+                self._event_list_section.place(*self._event_list_entry(event_data))
+        self.event_list_widget.blockSignals(False)
 
-        effective_duration = self._get_effective_timeline_duration()
-        current_pos = self.timeline_widget.current_playhead_position if self.timeline_widget else 0.0
-        self.update_time_label(current_pos, effective_duration)
-        if self.timeline_widget:
-            self.timeline_widget.update()
-            self.content_or_playhead_changed_for_embedded.emit()
+    def _event_list_cues_changed(self, cue_ids: list):
+        self.event_list_widget.blockSignals(True)
+        for cue_id in cue_ids:
+            cue_data = self.timeline_model.cue(cue_id)
+            self._set_cue_list_tooltip(self._cue_list_section.place(*self._cue_list_entry(cue_data)), cue_data)
+        self.event_list_widget.blockSignals(False)
+        self.cues_changed.emit()
+
+    def _event_list_cues_removed(self, cue_ids: list):
+        self.event_list_widget.blockSignals(True)
+        for cue_id in cue_ids:
+            self._cue_list_section.remove(cue_id)
+        self.event_list_widget.blockSignals(False)
+        self.cues_changed.emit()
+
+    def _rebuild_track_table(self):
+        if not (self.track_info_table_widget and self.timeline_widget): return
+        self.track_info_table_widget.setRowCount(0) 
+        current_row_idx_for_table = 0
+
+        for track_display_order, track_info in enumerate(self.timeline_widget.tracks):
+            self.track_info_table_widget.insertRow(current_row_idx_for_table)
+
+            num_item = QTableWidgetItem(str(track_display_order + 1)) 
+            num_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+            self.track_info_table_widget.setItem(current_row_idx_for_table, 0, num_item)
+
+            self.track_info_table_widget.setItem(current_row_idx_for_table, 1, QTableWidgetItem(track_info['name']))
+            self.track_info_table_widget.setItem(current_row_idx_for_table, 2, QTableWidgetItem(track_info['type'].capitalize()))
+            id_text = str(track_info['id']) if track_info['id'] is not None else "N/A"
+            id_item = QTableWidgetItem(id_text)
+            id_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+            self.track_info_table_widget.setItem(current_row_idx_for_table, 3, id_item)
+
+            track_item_row_total_height = TimelineWidget.EVENT_BASE_HEIGHT + \
+                                          (2 * TimelineWidget.TRACK_INTERNAL_PADDING) + \
+                                          TimelineWidget.TRACK_SPACING
+            self.track_info_table_widget.setRowHeight(current_row_idx_for_table, track_item_row_total_height)
+            current_row_idx_for_table += 1
+
+        self.track_info_table_widget.resizeColumnsToContents() 
+        self.track_info_table_widget.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch) 
+        self.track_info_table_widget.setColumnWidth(0, 30) 
+        self.track_info_table_widget.setColumnWidth(2, 70) 
+        self.track_info_table_widget.setColumnWidth(3, 50)
 
     def get_current_playhead_time(self):
         return self.timeline_widget.get_current_playhead_time() if self.timeline_widget else 0.0
@@ -3201,12 +3472,7 @@ class TimelineTab(QWidget):
         
         effective_duration = self.timeline_widget.audio_duration 
         if self.timeline_widget.events:
-            max_event_time = 0
-            for ev in self.timeline_widget.events: 
-                event_visual_start = self.timeline_widget._get_effective_event_start_time(ev)
-                event_total_visual_duration = self.timeline_widget._get_event_visual_duration_s(ev)
-                max_event_time = max(max_event_time, event_visual_start + event_total_visual_duration)
-            effective_duration = max(effective_duration, max_event_time)
+            effective_duration = max(effective_duration, self.timeline_widget.event_timing.end_time)
         
         if self.timeline_widget.cues:
             max_cue_time = max((c['trigger_time_s'] for c in self.timeline_widget.cues), default=0)
@@ -3305,17 +3571,12 @@ class TimelineTab(QWidget):
             if dialog.exec():
                 cue_details = dialog.get_data()
                 if cue_details:
-                    cursor = self.main_window.db_connection.cursor()
-                    cursor.execute("SELECT id FROM cues WHERE cue_number = ?", (cue_details['cue_number'],))
-                    if cursor.fetchone():
+                    repository = self.main_window.repository
+                    if repository.cue_number_taken(cue_details['cue_number']):
                         QMessageBox.warning(self, "Duplicate Cue Number", f"A cue with number '{cue_details['cue_number']}' already exists.")
                         return
-                    cursor.execute(
-                        "INSERT INTO cues (cue_number, name, trigger_time_s, comment) VALUES (?, ?, ?, ?)",
-                        (cue_details['cue_number'], cue_details['name'], cue_details['trigger_time_s'], cue_details['comment'])
-                    )
-                    self.main_window.db_connection.commit()
-                    self.refresh_event_list_and_timeline() 
+                    cue_id = repository.create_cue(cue_details['cue_number'], cue_details['name'], cue_details['trigger_time_s'], cue_details['comment'])
+                    self.timeline_model.refresh_cues([cue_id])
                     QMessageBox.information(self, "Cue Added", f"Cue '{cue_details['cue_number']}' added.")
         except Exception as e:
             QMessageBox.critical(self, "DB Error", f"Could not add cue: {e}")
@@ -3328,17 +3589,11 @@ class TimelineTab(QWidget):
             cue_id_to_edit = self.timeline_widget.selected_cue_id
 
         try:
-            cursor = self.main_window.db_connection.cursor()
-            cursor.execute("SELECT id, cue_number, name, trigger_time_s, comment FROM cues WHERE id = ?", (cue_id_to_edit,))
-            cue_tuple = cursor.fetchone()
-            if not cue_tuple:
+            cue_data_for_dialog = self.main_window.repository.cue(cue_id_to_edit)
+            if not cue_data_for_dialog:
                 QMessageBox.critical(self, "Error", "Cue not found in database.")
-                self.refresh_event_list_and_timeline()
+                self.timeline_model.refresh_cues([cue_id_to_edit])
                 return
-            cue_data_for_dialog = {
-                'id': cue_tuple[0], 'cue_number': cue_tuple[1], 'name': cue_tuple[2],
-                'trigger_time_s': float(cue_tuple[3]), 'comment': cue_tuple[4]
-            }
         except Exception as e:
             QMessageBox.critical(self, "DB Error", f"Could not fetch cue for editing: {e}")
             return
@@ -3349,18 +3604,13 @@ class TimelineTab(QWidget):
                 updated_details = dialog.get_data()
                 if not updated_details: return
 
-                cursor = self.main_window.db_connection.cursor()
-                cursor.execute("SELECT id FROM cues WHERE cue_number = ? AND id != ?", (updated_details['cue_number'], cue_id_to_edit))
-                if cursor.fetchone():
+                repository = self.main_window.repository
+                if repository.cue_number_taken(updated_details['cue_number'], cue_id_to_edit):
                     QMessageBox.warning(self, "Duplicate Cue Number", f"Another cue with number '{updated_details['cue_number']}' already exists.")
                     return
                 
-                cursor.execute(
-                    "UPDATE cues SET cue_number = ?, name = ?, trigger_time_s = ?, comment = ? WHERE id = ?",
-                    (updated_details['cue_number'], updated_details['name'], updated_details['trigger_time_s'], updated_details['comment'], cue_id_to_edit)
-                )
-                self.main_window.db_connection.commit()
-                self.refresh_event_list_and_timeline()
+                repository.update_cue(cue_id_to_edit, updated_details['cue_number'], updated_details['name'], updated_details['trigger_time_s'], updated_details['comment'])
+                self.timeline_model.refresh_cues([cue_id_to_edit])
                 QMessageBox.information(self, "Cue Updated", f"Cue '{updated_details['cue_number']}' updated.")
             except Exception as e:
                 QMessageBox.critical(self, "DB Error", f"Could not update cue: {e}")
@@ -3382,14 +3632,13 @@ class TimelineTab(QWidget):
                                      QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, QMessageBox.StandardButton.No)
         if reply == QMessageBox.StandardButton.Yes:
             try:
-                cursor = self.main_window.db_connection.cursor()
-                cursor.execute("DELETE FROM cues WHERE id = ?", (cue_id_to_delete,))
-                self.main_window.db_connection.commit()
+                linked_event_ids = self.timeline_model.event_ids_for_cue(cue_id_to_delete) # Unlinked by the delete
+                self.main_window.repository.delete_cue(cue_id_to_delete)
 
                 if self.timeline_widget and self.timeline_widget.selected_cue_id == cue_id_to_delete:
                     self.timeline_widget.selected_cue_id = None 
                 
-                self.refresh_event_list_and_timeline()
+                self.timeline_model.refresh(linked_event_ids, [cue_id_to_delete])
                 QMessageBox.information(self, "Cue Deleted", f"Cue '{cue_name_for_msg}' deleted.")
             except Exception as e:
                 QMessageBox.critical(self, "DB Error", f"Could not delete cue: {e}")
@@ -3457,22 +3706,10 @@ class TimelineTab(QWidget):
 
     def show_assign_event_to_cue_dialog(self, event_id: int):
         try:
-            cursor = self.main_window.db_connection.cursor()
-            cursor.execute("SELECT id, name, start_time, duration, event_type, data, target_type, target_id, cue_id FROM timeline_events WHERE id = ?", (event_id,))
-            event_tuple = cursor.fetchone()
-            if not event_tuple:
+            current_event_full_data = self.main_window.repository.timeline_event(event_id)
+            if not current_event_full_data:
                 QMessageBox.warning(self, "Error", f"Event ID {event_id} not found.")
                 return
-            
-            current_event_full_data = {
-                'id': event_tuple[0], 'name': event_tuple[1], 
-                'start_time': float(event_tuple[2]), 'duration': float(event_tuple[3]), 
-                'type': event_tuple[4],
-                'data': json.loads(event_tuple[5]) if isinstance(event_tuple[5], str) else event_tuple[5],
-                'target_type': event_tuple[6], 'target_id': event_tuple[7],
-                'cue_id': event_tuple[8]
-            }
-            if not isinstance(current_event_full_data['data'], dict): current_event_full_data['data'] = {}
 
             event_name_str = current_event_full_data['name']
             current_cue_id_for_event = current_event_full_data['cue_id']
@@ -3504,11 +3741,12 @@ class TimelineTab(QWidget):
                     if 'followed_event_id' in new_event_data_payload: 
                         del new_event_data_payload['followed_event_id']
                 
-                cursor.execute("UPDATE timeline_events SET cue_id = ?, start_time = ?, data = ? WHERE id = ?",
-                               (selected_new_cue_id, new_event_start_time_val, json.dumps(new_event_data_payload), event_id))
-                self.main_window.db_connection.commit()
-                self.refresh_event_list_and_timeline()
-                QMessageBox.information(self, "Cue Assignment Updated", f"Event '{event_name_str}' cue assignment has been updated.")
+                self.main_window.repository.queue_event_updates(
+                    "Assign Event to Cue",
+                    [(event_id, {'cue_id': selected_new_cue_id, 'start_time': new_event_start_time_val, 'data': new_event_data_payload})],
+                    on_done=lambda _operation: self._on_event_written([event_id], f"Event '{event_name_str}' cue assignment has been updated."),
+                    on_error=lambda e: self._on_queued_write_failed(f"Could not assign event to cue: {e}", event_ids=[event_id])
+                )
 
         except Exception as e:
             QMessageBox.critical(self, "Error Assigning Cue", f"Could not assign event to cue: {e}")
@@ -3518,13 +3756,24 @@ class TimelineTab(QWidget):
     def closeEvent(self, event): 
         if self.media_player:
             self.media_player.stop()
+        self.playback_clock.stop()
+        self.shutdown_background_work()
         super().closeEvent(event)
 
+    def shutdown_background_work(self):
+        """Waits for waveform decodes and stops the audio analysis worker process."""
+        for loader in list(self.waveform_loaders):
+            loader.wait()
+        self.audio_analyzer.shutdown()
+
     def setVisible(self, visible: bool): 
         super().setVisible(visible)
         if not visible and self.media_player:
             if self.media_player.playbackState() == QMediaPlayer.PlaybackState.PlayingState:
                 self.media_player.pause()
+            elif self.playback_clock.running:
+                self.playback_clock.pause()
+                self._on_playback_state_changed(False)
 
     def _handle_copy_request(self):
         if not self.timeline_widget or not self.timeline_widget.selected_event_ids:
@@ -3549,10 +3798,7 @@ class TimelineTab(QWidget):
 
         try:
             base_time = min(self.timeline_widget._get_effective_event_start_time(ev) for ev in self.event_clipboard)
-            newly_pasted_ids = []
-            
-            cursor = self.main_window.db_connection.cursor()
-            
+            pasted_events = []
             for event_to_copy in self.event_clipboard:
                 offset = self.timeline_widget._get_effective_event_start_time(event_to_copy) - base_time
                 new_start_time = paste_time_s + offset
@@ -3562,28 +3808,26 @@ class TimelineTab(QWidget):
                 if 'followed_event_id' in new_data_payload:
                     del new_data_payload['followed_event_id']
 
-                new_event_name = f"Copy of {event_to_copy['name']}"
-                
-                cursor.execute(
-                    """INSERT INTO timeline_events (name, start_time, duration, event_type, data, target_type, target_id, cue_id)
-                       VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-                    (new_event_name, new_start_time, event_to_copy['duration'], event_to_copy['type'],
-                     json.dumps(new_data_payload), event_to_copy['target_type'], event_to_copy['target_id'],
-                     None) # Set cue_id to None for pasted events
-                )
-                newly_pasted_ids.append(cursor.lastrowid)
+                pasted_events.append({
+                    'name': f"Copy of {event_to_copy['name']}", 'start_time': new_start_time,
+                    'duration': event_to_copy['duration'], 'type': event_to_copy['type'], 'data': new_data_payload,
+                    'target_type': event_to_copy['target_type'], 'target_id': event_to_copy['target_id'],
+                    'cue_id': None # Pasted events are not tied to a cue
+                })
 
-            self.main_window.db_connection.commit()
-            
-            self.refresh_event_list_and_timeline(regenerate_waveform=False)
-            
-            # Select the newly created events
-            if newly_pasted_ids:
-                self.timeline_widget.selected_event_ids = newly_pasted_ids
-                self.timeline_widget.event_selected_on_timeline.emit(newly_pasted_ids)
-                self.timeline_widget.update()
+            self.main_window.repository.queue_add_events(
+                "Paste Events", pasted_events,
+                on_done=self._on_events_pasted,
+                on_error=lambda e: QMessageBox.critical(self, "Paste Error", f"Failed to paste events: {e}")
+            )
 
         except Exception as e:
             QMessageBox.critical(self, "Paste Error", f"Failed to paste events: {e}")
-            if self.main_window.db_connection:
-                self.main_window.db_connection.rollback()
+
+    def _on_events_pasted(self, newly_pasted_ids: list):
+        self.timeline_model.refresh_events(newly_pasted_ids)
+        # Select the newly created events
+        if newly_pasted_ids and self.timeline_widget:
+            self.timeline_widget.selected_event_ids = newly_pasted_ids
+            self.timeline_widget.event_selected_on_timeline.emit(newly_pasted_ids)
+            self.timeline_widget.update()
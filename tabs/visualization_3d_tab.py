@@ -182,8 +182,7 @@ class OpenGLScene(QOpenGLWidget):
         self.camera_zoom_distance = max(1.0, min(150.0, self.camera_zoom_distance))
         self.update()
 
-    def _create_fixture3d_from_db_row(self, data_tuple, column_names):
-        data = dict(zip(column_names, data_tuple))
+    def _create_fixture3d_from_db_row(self, data: dict):
         return Fixture3D(
             data['id'], data['profile_id'], data.get('profile_name', 'Generic'), data['name'],
             data['x_pos'], data['y_pos'], data['z_pos'],
@@ -195,16 +194,8 @@ class OpenGLScene(QOpenGLWidget):
     def load_all_fixtures_from_db(self):
         try:
             self.fixtures_3d_objects.clear()
-            cursor = self.main_window.db_connection.cursor()
-            cursor.execute("""
-                SELECT f.*, p.name as profile_name 
-                FROM fixtures f 
-                JOIN fixture_profiles p ON f.profile_id = p.id
-            """)
-            all_fixtures_data = cursor.fetchall()
-            column_names = [desc[0] for desc in cursor.description]
-            for data_row in all_fixtures_data:
-                fixture_obj = self._create_fixture3d_from_db_row(data_row, column_names)
+            for fixture_data in self.main_window.repository.fixtures_with_profile_names():
+                fixture_obj = self._create_fixture3d_from_db_row(fixture_data)
                 self.fixtures_3d_objects[fixture_obj.id] = fixture_obj
             if self.isVisible(): self.update()
         except Exception as e:
@@ -237,11 +228,9 @@ class OpenGLScene(QOpenGLWidget):
             
             if 'profile_id' in data_dict_from_signal and data_dict_from_signal['profile_id'] != f_obj.profile_id:
                 try:
-                    cursor = self.main_window.db_connection.cursor()
-                    cursor.execute("SELECT name FROM fixture_profiles WHERE id = ?", (data_dict_from_signal['profile_id'],))
-                    result = cursor.fetchone()
-                    if result:
-                        f_obj.type = result[0].lower()
+                    profile_name = self.main_window.repository.profile_name(data_dict_from_signal['profile_id'])
+                    if profile_name:
+                        f_obj.type = profile_name.lower()
                         f_obj.profile_id = data_dict_from_signal['profile_id']
                 except Exception as e:
                     print(f"Error fetching new profile name for fixture {fixture_id}: {e}")
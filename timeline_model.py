@@ -0,0 +1,265 @@
+# timeline_model.py
+"""
+The show's timeline events and cues, held in memory and kept in step with the database row by row.
+
+reload() reads every event and cue once, when a show is opened. After that an edit names the
+rows it wrote and refresh() reads back only those, so an edit costs as much as the rows it
+touched rather than a reload of the whole show. Each refresh announces what it found as the ids
+inserted, updated and removed (events_* and cues_* signals), and as the usual item model row
+signals for views.
+
+The item model has two top-level rows, CUE_SECTION and EVENT_SECTION, with the cues (in trigger
+order) and the events (in id order) as their children. Event and cue dicts are updated in place,
+so lists of them held by the timeline widgets stay current without being rebuilt.
+"""
+import json
+from bisect import bisect_left
+
+from PyQt6.QtCore import QAbstractItemModel, QModelIndex, Qt, pyqtSignal
+
+SQL_EVENTS = "SELECT id, name, start_time, duration, event_type, data, target_type, target_id, cue_id FROM timeline_events"
+SQL_EVENTS_BY_IDS = SQL_EVENTS + " WHERE id IN (SELECT value FROM json_each(?))"
+
+CUE_SECTION, EVENT_SECTION = 0, 1
+CUE_COLUMNS = ("#", "Name", "Time", "Comment")
+COLUMN_COUNT = len(CUE_COLUMNS) # Event rows use the same columns for name, start, duration and type
+SORT_ROLE = Qt.ItemDataRole.UserRole + 1 # Raw column value, for sorting proxies
+
+
+def event_from_row(row) -> dict:
+    """An event dict from a SQL_EVENTS row; start times are clamped the way playback expects them."""
+    data = json.loads(row[5]) if isinstance(row[5], str) else row[5]
+    if not isinstance(data, dict):
+        data = {}
+    start_time_or_delay = float(row[2])
+    if data.get('trigger_mode', 'absolute') == 'absolute':
+        start_time_or_delay = max(0.0, start_time_or_delay)
+    else:
+        start_time_or_delay = max(-3600.0, start_time_or_delay)
+    return {
+        'id': row[0], 'name': row[1], 'start_time': start_time_or_delay,
+        'duration': float(row[3]), 'type': row[4], 'data': data,
+        'target_type': row[6] if row[6] else 'master', 'target_id': row[7],
+        'cue_id': row[8],
+    }
+
+
+def _cue_key(cue: dict) -> tuple:
+    return (cue['trigger_time_s'], cue['cue_number'], cue['id'])
+
+
+class TimelineModel(QAbstractItemModel):
+    """Every timeline event and cue of the open show; see the module docstring."""
+    events_inserted = pyqtSignal(list) # Event ids
+    events_updated = pyqtSignal(list)
+    events_removed = pyqtSignal(list)
+    cues_inserted = pyqtSignal(list) # Cue ids
+    cues_updated = pyqtSignal(list)
+    cues_removed = pyqtSignal(list)
+    changed = pyqtSignal() # Once after each reload or refresh that changed anything
+
+    def __init__(self, main_window, parent=None):
+        super().__init__(parent)
+        self.main_window = main_window
+        self._events = {} # {event_id: event dict}
+        self._event_ids = [] # Sorted; the event rows
+        self._cues = {} # {cue_id: cue dict}
+        self._cue_keys = [] # Sorted _cue_key of every cue; the cue rows
+        self._cue_key_of = {} # {cue_id: its key in _cue_keys}; the dicts may be changed in place while dragged
+        self._section_tags = (object(), object()) # Internal pointers of each section's child indexes
+
+    # --- Queries ---
+
+    def event(self, event_id: int) -> dict | None:
+        return self._events.get(event_id)
+
+    def cue(self, cue_id: int) -> dict | None:
+        return self._cues.get(cue_id)
+
+    def events(self) -> list[dict]:
+        """Every event, in id order."""
+        return [self._events[event_id] for event_id in self._event_ids]
+
+    def cues(self) -> list[dict]:
+        """Every cue, in trigger order."""
+        return [self._cues[key[2]] for key in self._cue_keys]
+
+    def event_ids_for_cue(self, cue_id: int) -> list[int]:
+        return [event_id for event_id, event in self._events.items() if event.get('cue_id') == cue_id]
+
+    def cue_ids_for_number(self, cue_number: str) -> list[int]:
+        return [cue_id for cue_id, cue in self._cues.items() if cue['cue_number'] == cue_number]
+
+    # --- Loading ---
+
+    def reload(self):
+        """Reads every event and cue; views and observers see a model reset."""
+        self.beginResetModel()
+        try:
+            rows = self.main_window.db_connection.execute(SQL_EVENTS).fetchall()
+            self._events = {row[0]: event_from_row(row) for row in rows}
+            self._cues = {cue['id']: cue for cue in self.main_window.repository.cues()}
+        except Exception as e:
+            print(f"Error loading timeline events and cues from DB: {e}")
+            self._events, self._cues = {}, {}
+        self._event_ids = sorted(self._events)
+        self._cue_key_of = {cue_id: _cue_key(cue) for cue_id, cue in self._cues.items()}
+        self._cue_keys = sorted(self._cue_key_of.values())
+        self.endResetModel()
+        self.changed.emit()
+
+    def refresh(self, event_ids=(), cue_ids=()):
+        """Re-reads the given events and cues, which were just written, inserted or deleted."""
+        changed = self._refresh_cues(set(cue_ids))
+        changed = self._refresh_events(set(event_ids)) or changed # Cues first; event rows name their cue
+        if changed:
+            self.changed.emit()
+
+    def refresh_events(self, event_ids):
+        self.refresh(event_ids=event_ids)
+
+    def refresh_cues(self, cue_ids):
+        self.refresh(cue_ids=cue_ids)
+
+    def _refresh_events(self, event_ids: set) -> bool:
+        if not event_ids:
+            return False
+        try:
+            rows = self.main_window.db_connection.execute(SQL_EVENTS_BY_IDS, (json.dumps(sorted(event_ids)),)).fetchall()
+        except Exception as e:
+            print(f"Error reading timeline events {sorted(event_ids)}: {e}")
+            return False
+        fresh = {row[0]: event_from_row(row) for row in rows}
+        section = self.index(EVENT_SECTION, 0)
+        inserted, updated, removed = [], [], []
+        for event_id in sorted(event_ids):
+            event, current = fresh.get(event_id), self._events.get(event_id)
+            row = bisect_left(self._event_ids, event_id)
+            if event is None:
+                if current is None:
+                    continue
+                self.beginRemoveRows(section, row, row)
+                del self._events[event_id], self._event_ids[row]
+                self.endRemoveRows()
+                removed.append(event_id)
+            elif current is None:
+                self.beginInsertRows(section, row, row)
+                self._events[event_id] = event
+                self._event_ids.insert(row, event_id)
+                self.endInsertRows()
+                inserted.append(event_id)
+            else:
+                current.clear()
+                current.update(event)
+                self.dataChanged.emit(self.index(row, 0, section), self.index(row, COLUMN_COUNT - 1, section))
+                updated.append(event_id)
+        self._announce(self.events_inserted, inserted, self.events_updated, updated, self.events_removed, removed)
+        return bool(inserted or updated or removed)
+
+    def _refresh_cues(self, cue_ids: set) -> bool:
+        if not cue_ids:
+            return False
+        try:
+            fresh = {cue['id']: cue for cue in self.main_window.repository.cues_by_ids(cue_ids)}
+        except Exception as e:
+            print(f"Error reading cues {sorted(cue_ids)}: {e}")
+            return False
+        section = self.index(CUE_SECTION, 0)
+        inserted, updated, removed = [], [], []
+        for cue_id in sorted(cue_ids):
+            cue, current = fresh.get(cue_id), self._cues.get(cue_id)
+            if current is None:
+                if cue is None:
+                    continue
+                key = self._cue_key_of[cue_id] = _cue_key(cue)
+                row = bisect_left(self._cue_keys, key)
+                self.beginInsertRows(section, row, row)
+                self._cues[cue_id] = cue
+                self._cue_keys.insert(row, key)
+                self.endInsertRows()
+                inserted.append(cue_id)
+                continue
+            row = bisect_left(self._cue_keys, self._cue_key_of[cue_id])
+            if cue is None:
+                self.beginRemoveRows(section, row, row)
+                del self._cues[cue_id], self._cue_key_of[cue_id], self._cue_keys[row]
+                self.endRemoveRows()
+                removed.append(cue_id)
+                continue
+            key = self._cue_key_of[cue_id] = _cue_key(cue)
+            destination = bisect_left(self._cue_keys, key) # Counted with the cue still in place, as Qt counts moves
+            moved = destination not in (row, row + 1)
+            if moved:
+                self.beginMoveRows(section, row, row, section, destination)
+            new_row = destination - 1 if destination > row else destination
+            del self._cue_keys[row]
+            self._cue_keys.insert(new_row, key)
+            current.clear()
+            current.update(cue)
+            if moved:
+                self.endMoveRows()
+            self.dataChanged.emit(self.index(new_row, 0, section), self.index(new_row, COLUMN_COUNT - 1, section))
+            updated.append(cue_id)
+        self._announce(self.cues_inserted, inserted, self.cues_updated, updated, self.cues_removed, removed)
+        return bool(inserted or updated or removed)
+
+    @staticmethod
+    def _announce(*signals_and_ids):
+        for signal, ids in zip(signals_and_ids[::2], signals_and_ids[1::2]):
+            if ids:
+                signal.emit(ids)
+
+    # --- QAbstractItemModel ---
+
+    def index(self, row: int, column: int, parent: QModelIndex = QModelIndex()) -> QModelIndex:
+        if not self.hasIndex(row, column, parent):
+            return QModelIndex()
+        if not parent.isValid():
+            return self.createIndex(row, column)
+        return self.createIndex(row, column, self._section_tags[parent.row()])
+
+    def parent(self, index: QModelIndex = QModelIndex()) -> QModelIndex:
+        if not index.isValid() or index.internalPointer() is None:
+            return QModelIndex()
+        return self.createIndex(self._section_tags.index(index.internalPointer()), 0)
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if not parent.isValid():
+            return 2
+        if parent.internalPointer() is not None or parent.column() != 0:
+            return 0
+        return len(self._cue_keys) if parent.row() == CUE_SECTION else len(self._event_ids)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return COLUMN_COUNT
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole and 0 <= section < COLUMN_COUNT:
+            return CUE_COLUMNS[section]
+        return None
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if index.internalPointer() is None:
+            if role == Qt.ItemDataRole.DisplayRole and index.column() == 0:
+                return "Cues" if index.row() == CUE_SECTION else "Events"
+            return None
+        column = index.column()
+        if self._section_tags.index(index.internalPointer()) == CUE_SECTION:
+            item = self._cues[self._cue_keys[index.row()][2]]
+            values = (item['cue_number'], item.get('name') or "", item['trigger_time_s'], item.get('comment') or "")
+            time_columns = (2,)
+        else:
+            item = self._events[self._event_ids[index.row()]]
+            values = (item['name'], item['start_time'], item['duration'], item['type'])
+            time_columns = (1, 2)
+        if role == Qt.ItemDataRole.UserRole:
+            return item
+        if role == SORT_ROLE:
+            return values[column]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return f"{values[column]:.3f}s" if column in time_columns else str(values[column])
+        if role == Qt.ItemDataRole.TextAlignmentRole and column in time_columns:
+            return Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+        return None
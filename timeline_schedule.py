@@ -0,0 +1,436 @@
+# timeline_schedule.py
+"""
+Resolved event timing and the compiled timeline schedule for playback queries.
+
+Event timing can be absolute, relative to a cue or follow another event, so resolving when an
+event starts is not free. TimelineSchedule resolves every event's [start, end) interval once,
+when the timeline is edited, and keeps them in a sorted start array plus a centered interval
+tree. A playback tick asks which events started since the last tick (two binary searches) and
+a seek asks which events are active at a time (one interval tree descent); both cost
+O(log n + k) for the k events returned instead of a scan of the whole show.
+
+EventTiming resolves the start times themselves. An event depends on its cue (relative and
+follow timing) and on the event it follows, so the events form a dependency graph; starts are
+computed in topological order into a cache keyed by event id, and moving an event or a cue
+recomputes only the events downstream of it. Edited, added and removed rows are applied with
+apply_changes, which relinks only them and the events asking to follow them. Follow cycles fall
+back to cue-relative timing and are reported once. The resolved ends are kept sorted as well, so
+the timeline's extent (end_time) is known after an edit without compiling a schedule.
+
+TrackIndex groups the compiled events by timeline track so painting and hit-testing only look
+at the events within the exposed part of the timeline.
+
+StateCheckpoints keeps the tracked ("stomped") fixture state every CHECKPOINT_INTERVAL_S
+seconds as fixture x parameter arrays, so a seek replays only the events since the nearest
+checkpoint. When the schedule is recompiled, checkpoints after the earliest changed event are
+dropped and the rest are kept.
+"""
+import math
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+
+import numpy as np
+
+# Fixture parameters that timeline events track, i.e. the columns of a StateCheckpoints array.
+TRACKED_PARAMS = (
+    "rotation_x", "rotation_y", "rotation_z", "red", "green", "blue",
+    "brightness", "gobo_index", "zoom", "focus", "shutter_strobe_rate",
+)
+TRACKED_PARAM_COLUMN = {param: column for column, param in enumerate(TRACKED_PARAMS)}
+CHECKPOINT_INTERVAL_S = 15.0
+
+
+class _IntervalNode:
+    """Intervals containing center, plus the subtrees entirely left and right of it."""
+    __slots__ = ('center', 'by_start', 'by_end', 'left', 'right')
+
+    def __init__(self, intervals: list[tuple]):
+        midpoints = sorted((start + end) / 2.0 for start, end, _index in intervals)
+        self.center = midpoints[len(midpoints) // 2]
+        left, right, here = [], [], []
+        for interval in intervals:
+            start, end, _index = interval
+            if end <= self.center:
+                left.append(interval)
+            elif start > self.center:
+                right.append(interval)
+            else:
+                here.append(interval)
+        self.by_start = sorted(here, key=lambda interval: interval[0])
+        self.by_end = sorted(here, key=lambda interval: interval[1], reverse=True)
+        self.left = _IntervalNode(left) if left else None
+        self.right = _IntervalNode(right) if right else None
+
+    def stab(self, time_s: float, found: list):
+        node = self
+        while node is not None:
+            if time_s < node.center: # Every interval here ends after center, so only its start matters
+                for start, _end, index in node.by_start:
+                    if start > time_s:
+                        break
+                    found.append(index)
+                node = node.left
+            else: # Every interval here starts at or before center, so only its end matters
+                for _start, end, index in node.by_end:
+                    if end <= time_s:
+                        break
+                    found.append(index)
+                node = node.right if time_s > node.center else None
+
+
+class EventTiming:
+    """Start times of timeline events, resolved through cue and follow dependencies and cached."""
+
+    def __init__(self, duration_of):
+        self.duration_of = duration_of # event dict -> visual duration in seconds
+        self._events = {} # {event_id: event dict}
+        self._cues = {} # {cue_id: cue dict}
+        self._followers = {} # {event_id: {ids of events following it}}
+        self._cue_events = {} # {cue_id: {ids of events timed from that cue}}
+        self._follow_requests = {} # {event_id: {ids of events asking to follow it, valid or not}}
+        self._links = {} # {event_id: (cue_id, followed event_id, requested event_id)} as linked
+        self._starts = {} # {event_id: resolved start}
+        self._end_of = {} # {event_id: resolved end}
+        self._ends = [] # [(end, event_id)], ascending
+        self._reported = set() # Cycles and cross-cue follows already warned about
+
+    def rebuild(self, events, cues):
+        """Rebuilds the graph and resolves every start; call after events or cues are reloaded."""
+        self._events, self._cues = {}, {}
+        self._followers, self._cue_events, self._follow_requests, self._links = {}, {}, {}, {}
+        self._starts, self._end_of, self._ends = {}, {}, []
+        self.apply_changes(events, cues=cues)
+
+    def apply_changes(self, events=(), removed_event_ids=(), cues=(), removed_cue_ids=()) -> set:
+        """
+        Adds or replaces events and cues, drops removed ones and re-resolves every start they
+        affect. Returns the ids of the events whose start was re-resolved.
+        """
+        retimed = set()
+        for cue in cues:
+            self._cues[cue['id']] = cue
+            retimed.update(self._cue_events.get(cue['id'], ()))
+        for cue_id in removed_cue_ids:
+            self._cues.pop(cue_id, None)
+            retimed.update(self._cue_events.get(cue_id, ()))
+        relink = set()
+        for event_id in removed_event_ids:
+            if self._events.pop(event_id, None) is not None:
+                self._unlink(event_id)
+                self._starts.pop(event_id, None)
+                self._drop_end(event_id)
+                relink.update(self._follow_requests.get(event_id, ())) # They now fall back to cue timing
+        for event in events:
+            self._events[event['id']] = event
+            relink.add(event['id'])
+            relink.update(self._follow_requests.get(event['id'], ())) # Its cue may have made their follow (in)valid
+        relink &= self._events.keys()
+        for event_id in relink: # Unlink all first; a link is only valid once the event it follows is current
+            self._unlink(event_id)
+        for event_id in relink:
+            self._link(event_id)
+        affected = self._downstream((retimed | relink) & self._events.keys())
+        self._resolve(affected)
+        return affected
+
+    def events_changed(self, event_ids):
+        """Re-resolves events whose own timing changed in place, and everything that follows them."""
+        self._resolve(self._downstream(event_id for event_id in event_ids if event_id in self._events))
+
+    def cues_changed(self, cue_ids):
+        """Re-resolves the events timed from cues that moved in place, and everything that follows them."""
+        self._resolve(self._downstream(event_id for cue_id in cue_ids for event_id in self._cue_events.get(cue_id, ())))
+
+    @property
+    def end_time(self) -> float:
+        """The latest resolved end of any event (start plus visual duration), 0.0 when there are none."""
+        return self._ends[-1][0] if self._ends else 0.0
+
+    def start_of(self, event: dict) -> float:
+        """
+        The event's effective start. Events in the graph come from the cache; any other dict (a
+        copy being dragged, say) is resolved on the spot from the cached starts it depends on.
+        """
+        event_id = event.get('id')
+        if self._events.get(event_id) is event and event_id in self._starts:
+            return self._starts[event_id]
+        return self._compute(event)
+
+    def _link(self, event_id: int):
+        event = self._events[event_id]
+        data = event.get('data', {})
+        requested_id = data.get('followed_event_id') if data.get('trigger_mode') == 'follow_event_in_cue' else None
+        followed_id = self._dependency(event)
+        cue_id = event.get('cue_id')
+        if cue_id is not None:
+            self._cue_events.setdefault(cue_id, set()).add(event_id)
+        if followed_id is not None:
+            self._followers.setdefault(followed_id, set()).add(event_id)
+        if requested_id is not None:
+            self._follow_requests.setdefault(requested_id, set()).add(event_id)
+        self._links[event_id] = (cue_id, followed_id, requested_id)
+
+    def _unlink(self, event_id: int):
+        cue_id, followed_id, requested_id = self._links.pop(event_id, (None, None, None))
+        for index, key in ((self._cue_events, cue_id), (self._followers, followed_id), (self._follow_requests, requested_id)):
+            members = index.get(key)
+            if members is not None:
+                members.discard(event_id)
+                if not members:
+                    del index[key]
+
+    def _dependency(self, event: dict) -> int | None:
+        """Id of the event this one follows, if it validly follows one in its own cue."""
+        data = event.get('data', {})
+        if data.get('trigger_mode') != 'follow_event_in_cue' or event.get('cue_id') is None:
+            return None
+        followed = self._events.get(data.get('followed_event_id'))
+        if followed is None:
+            return None
+        if followed.get('cue_id') != event['cue_id']:
+            if ('cross_cue', event['id']) not in self._reported:
+                self._reported.add(('cross_cue', event['id']))
+                print(f"Warning: Event ID {event['id']} follows event ID {followed['id']} which is not in the same cue ({event['cue_id']}). Fallback to relative to cue.")
+            return None
+        return followed['id']
+
+    def _cue_relative_start(self, event: dict) -> float:
+        offset = event.get('start_time', 0.0)
+        cue = self._cues.get(event.get('cue_id'))
+        return cue['trigger_time_s'] + offset if cue else offset
+
+    def _compute(self, event: dict) -> float:
+        trigger_mode = event.get('data', {}).get('trigger_mode', 'absolute')
+        if trigger_mode not in ('relative_to_cue', 'follow_event_in_cue') or event.get('cue_id') is None:
+            return event.get('start_time', 0.0)
+        if trigger_mode == 'follow_event_in_cue':
+            followed_id = self._dependency(event)
+            if followed_id is not None:
+                followed = self._events[followed_id]
+                followed_start = self._starts.get(followed_id)
+                if followed_start is None:
+                    followed_start = self._compute(followed)
+                return followed_start + self.duration_of(followed) + event.get('start_time', 0.0)
+        return self._cue_relative_start(event)
+
+    def _downstream(self, event_ids) -> set:
+        affected = set()
+        queue = deque(event_ids)
+        while queue:
+            event_id = queue.popleft()
+            if event_id not in affected:
+                affected.add(event_id)
+                queue.extend(self._followers.get(event_id, ()))
+        return affected
+
+    def _resolve(self, event_ids):
+        """Recomputes the starts and ends of event_ids, each after the event it follows."""
+        pending = {event_id: self._dependency(self._events[event_id]) for event_id in event_ids}
+        self._resolve_starts(pending)
+        for event_id in pending:
+            self._drop_end(event_id)
+            end = self._starts[event_id] + self.duration_of(self._events[event_id])
+            self._end_of[event_id] = end
+            insort(self._ends, (end, event_id))
+
+    def _drop_end(self, event_id):
+        end = self._end_of.pop(event_id, None)
+        if end is not None:
+            del self._ends[bisect_left(self._ends, (end, event_id))]
+
+    def _resolve_starts(self, pending: dict):
+        """Kahn's algorithm over pending ({event_id: id of the event it depends on})."""
+        waiting = {event_id for event_id, followed_id in pending.items() if followed_id in pending}
+        ready = deque(event_id for event_id in pending if event_id not in waiting)
+        on_cycle = set()
+        while True:
+            while ready:
+                event_id = ready.popleft()
+                if event_id not in on_cycle:
+                    self._starts[event_id] = self._compute(self._events[event_id])
+                for follower_id in self._followers.get(event_id, ()):
+                    if follower_id in waiting:
+                        waiting.discard(follower_id)
+                        ready.append(follower_id)
+            if not waiting:
+                return
+            # Every event still waiting is on a follow cycle or downstream of one. Each event
+            # follows at most one other, so walking the chain from any of them reaches a cycle.
+            chain = []
+            event_id = next(iter(waiting))
+            while event_id not in chain:
+                chain.append(event_id)
+                event_id = pending[event_id]
+            cycle = chain[chain.index(event_id):]
+            if frozenset(cycle) not in self._reported:
+                self._reported.add(frozenset(cycle))
+                print(f"Warning: Circular follow dependency between events {sorted(cycle)}. Defaulting to cue-relative timing.")
+            for event_id in cycle:
+                self._starts[event_id] = self._cue_relative_start(self._events[event_id])
+                on_cycle.add(event_id)
+                waiting.discard(event_id)
+            ready.extend(cycle)
+
+
+class TimelineSchedule:
+    """
+    The resolved [start, end) interval of every timeline event. Build it from
+    [(event, start_s, end_s)]; rebuild it whenever events or cues change.
+    """
+
+    def __init__(self, entries):
+        entries = sorted(entries, key=lambda entry: entry[1])
+        self.events = [event for event, _start, _end in entries] # Ordered by effective start
+        self.starts = [start for _event, start, _end in entries]
+        self.ends = [end for _event, _start, end in entries]
+        self._index_of = {event['id']: index for index, event in enumerate(self.events)}
+        # What an event does, besides when, for finding the earliest change between two compiles.
+        self._signatures = [(event['id'], event.get('type'), event.get('target_type'), event.get('target_id'),
+                             repr(event.get('data'))) for event in self.events]
+        intervals = [(start, end, index) for index, (start, end) in enumerate(zip(self.starts, self.ends)) if end > start]
+        self._tree = _IntervalNode(intervals) if intervals else None
+        self.end_time = max(self.ends, default=0.0)
+
+    def __len__(self):
+        return len(self.events)
+
+    def event(self, event_id: int) -> dict | None:
+        index = self._index_of.get(event_id)
+        return self.events[index] if index is not None else None
+
+    def start_of(self, event_id: int) -> float | None:
+        index = self._index_of.get(event_id)
+        return self.starts[index] if index is not None else None
+
+    def end_of(self, event_id: int) -> float | None:
+        index = self._index_of.get(event_id)
+        return self.ends[index] if index is not None else None
+
+    def active_at(self, time_s: float) -> list[dict]:
+        """Events with start <= time_s < end, ordered by start."""
+        if self._tree is None:
+            return []
+        found = []
+        self._tree.stab(time_s, found)
+        return [self.events[index] for index in sorted(found)]
+
+    def starting_in(self, after_s: float, until_s: float) -> list[dict]:
+        """Events with after_s < start <= until_s, ordered by start."""
+        return self.events[bisect_right(self.starts, after_s):bisect_right(self.starts, until_s)]
+
+    def next_start_after(self, time_s: float) -> dict | None:
+        """The first event starting strictly after time_s."""
+        index = bisect_right(self.starts, time_s)
+        return self.events[index] if index < len(self.events) else None
+
+    def first_difference(self, other: 'TimelineSchedule') -> float | None:
+        """Earliest start at which this schedule and other differ, or None if they are the same."""
+        for index in range(min(len(self.events), len(other.events))):
+            if (self.starts[index], self.ends[index], self._signatures[index]) != \
+               (other.starts[index], other.ends[index], other._signatures[index]):
+                return min(self.starts[index], other.starts[index])
+        if len(self.events) != len(other.events):
+            longer = self if len(self.events) > len(other.events) else other
+            return longer.starts[min(len(self.events), len(other.events))]
+        return None
+
+
+class TrackIndex:
+    """
+    A schedule's events split by timeline track, for drawing and hit-testing only what is on
+    screen. Each track keeps its schedule indices in start order next to a running maximum of
+    their ends, so the events overlapping a time window take two binary searches to find.
+    """
+
+    def __init__(self, schedule: TimelineSchedule, track_of):
+        """track_of(event) -> the index of the track the event is drawn on."""
+        starts = np.asarray(schedule.starts, dtype=np.float64)
+        ends = np.asarray(schedule.ends, dtype=np.float64)
+        tracks = np.fromiter((track_of(event) for event in schedule.events), np.int64, len(schedule.events))
+        order = np.argsort(tracks, kind='stable') # Stable, so each track stays in start order
+        track_ids, first = np.unique(tracks[order], return_index=True)
+        self._tracks = {}
+        for track, begin, stop in zip(track_ids.tolist(), first.tolist(), first[1:].tolist() + [len(order)]):
+            indices = order[begin:stop]
+            self._tracks[track] = (indices, starts[indices], ends[indices], np.maximum.accumulate(ends[indices]))
+
+    def overlapping(self, track: int, start_s: float, end_s: float) -> list[int]:
+        """Schedule indices of the track's events with start < end_s and end > start_s, by start."""
+        entry = self._tracks.get(track)
+        if entry is None:
+            return []
+        indices, starts, ends, running_max_ends = entry
+        # Every event before low ends by start_s; every event from high on starts at or after end_s
+        low = int(np.searchsorted(running_max_ends, start_s, side='right'))
+        high = int(np.searchsorted(starts, end_s, side='left'))
+        if high <= low:
+            return []
+        return indices[low:high][ends[low:high] > start_s].tolist()
+
+
+class StateCheckpoints:
+    """
+    Tracked fixture state every interval_s seconds of a schedule. Snapshot k holds, per fixture
+    row and TRACKED_PARAMS column, the value set by the last event starting at or before
+    k * interval_s, or NaN where no event has set one (the fixture's base value applies).
+    """
+
+    def __init__(self, apply_event, interval_s: float = CHECKPOINT_INTERVAL_S):
+        self.apply_event = apply_event # (values, row_of, event) -> None; writes the values the event tracks
+        self.interval_s = interval_s
+        self.fixture_ids = ()
+        self.row_of = {}
+        self._snapshots = [] # Consecutive intervals without events share one array
+        self._schedule = None
+
+    def clear(self):
+        self._snapshots.clear()
+
+    def invalidate_from(self, time_s: float):
+        """Drops the snapshots that include events starting at or after time_s."""
+        del self._snapshots[max(0, math.ceil(time_s / self.interval_s)):]
+
+    def set_fixtures(self, fixture_ids):
+        fixture_ids = tuple(fixture_ids)
+        if fixture_ids != self.fixture_ids:
+            self.fixture_ids = fixture_ids
+            self.row_of = {fixture_id: row for row, fixture_id in enumerate(fixture_ids)}
+            self.clear()
+
+    def state_at(self, schedule: TimelineSchedule, time_s: float) -> np.ndarray:
+        """A fresh array of the tracked state after every event starting at or before time_s."""
+        if schedule is not self._schedule:
+            if self._schedule is None:
+                self.clear()
+            else:
+                changed_s = schedule.first_difference(self._schedule)
+                if changed_s is not None:
+                    self.invalidate_from(changed_s)
+            self._schedule = schedule
+        if time_s < 0: # Before the first checkpoint, which already holds the events at 0
+            values = np.full((len(self.fixture_ids), len(TRACKED_PARAMS)), np.nan, dtype=np.float32)
+            for event in schedule.starting_in(-math.inf, time_s):
+                self.apply_event(values, self.row_of, event)
+            return values
+        index = int(time_s // self.interval_s)
+        self._extend(schedule, index)
+        values = self._snapshots[index].copy()
+        for event in schedule.starting_in(index * self.interval_s, time_s):
+            self.apply_event(values, self.row_of, event)
+        return values
+
+    def _extend(self, schedule: TimelineSchedule, index: int):
+        if not self._snapshots:
+            values = np.full((len(self.fixture_ids), len(TRACKED_PARAMS)), np.nan, dtype=np.float32)
+            for event in schedule.starting_in(-math.inf, 0.0):
+                self.apply_event(values, self.row_of, event)
+            self._snapshots.append(values)
+        while len(self._snapshots) <= index:
+            next_index = len(self._snapshots)
+            events = schedule.starting_in((next_index - 1) * self.interval_s, next_index * self.interval_s)
+            values = self._snapshots[-1]
+            if events:
+                values = values.copy()
+                for event in events:
+                    self.apply_event(values, self.row_of, event)
+            self._snapshots.append(values)
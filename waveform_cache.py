@@ -0,0 +1,243 @@
+# waveform_cache.py
+"""
+Audio waveform peaks for the timeline.
+
+Audio is decoded once, on a background thread, into a pyramid of min/max peaks: the finest level
+holds one (min, max) pair per BASE_BIN_SAMPLES decoded samples and each coarser level halves the
+one below. Drawing picks the coarsest level that still has a bin for every pixel and reduces only
+the visible slice of it to pixel columns, so a long file draws in the same time at any zoom.
+Decoding streams buffer by buffer into the finest level; the samples themselves are never held.
+
+Pyramids are cached in the user cache directory as .npz files named after a hash of the audio
+file's contents, so reopening a show, or the same song in another show, never decodes it again.
+"""
+import hashlib
+import math
+import os
+import wave
+from pathlib import Path
+
+import numpy as np
+from PyQt6.QtCore import QEventLoop, QPointF, QRectF, QStandardPaths, Qt, QThread, QUrl, pyqtSignal
+from PyQt6.QtGui import QColor, QPainter, QPolygonF
+from PyQt6.QtMultimedia import QAudioDecoder, QAudioFormat
+
+DECODE_SAMPLE_RATE = 22050
+BASE_BIN_SAMPLES = 32 # Finest level: about 690 bins per second of audio
+MIN_LEVEL_BINS = 512 # No coarser level is built once a level is this small
+CACHE_VERSION = 1 # Bump when the pyramid layout changes; old cache files are then ignored
+
+_WAV_DTYPES = {1: np.uint8, 2: np.int16, 4: np.int32}
+
+
+class _PeakAccumulator:
+    """Folds a stream of mono samples into (min, max) bins of BASE_BIN_SAMPLES."""
+
+    def __init__(self):
+        self._bins = []
+        self._carry = np.empty(0, np.float32)
+        self.sample_count = 0
+        self.sample_rate = DECODE_SAMPLE_RATE
+
+    def feed(self, samples: np.ndarray, sample_rate: int):
+        self.sample_count += len(samples)
+        self.sample_rate = sample_rate
+        samples = np.concatenate((self._carry, samples.astype(np.float32, copy=False)))
+        whole = len(samples) - len(samples) % BASE_BIN_SAMPLES
+        if whole:
+            blocks = samples[:whole].reshape(-1, BASE_BIN_SAMPLES)
+            self._bins.append(np.stack((blocks.min(axis=1), blocks.max(axis=1)), axis=1))
+        self._carry = samples[whole:]
+
+    def finish(self) -> np.ndarray:
+        if len(self._carry):
+            self._bins.append(np.array([[self._carry.min(), self._carry.max()]], np.float32))
+            self._carry = np.empty(0, np.float32)
+        return np.concatenate(self._bins) if self._bins else np.zeros((0, 2), np.float32)
+
+
+class WaveformPeaks:
+    """A min/max peak pyramid; levels are (N, 2) float32 arrays in -1..1, finest first."""
+
+    def __init__(self, duration_s: float, base_bins_per_second: float, levels: list):
+        self.duration_s = duration_s
+        self.levels = levels
+        self.bins_per_second = [base_bins_per_second / (2 ** index) for index in range(len(levels))]
+
+    @classmethod
+    def from_base_level(cls, base: np.ndarray, sample_rate: int, sample_count: int) -> 'WaveformPeaks':
+        levels = [base.astype(np.float32, copy=False)]
+        while len(levels[-1]) > MIN_LEVEL_BINS:
+            finer = levels[-1]
+            if len(finer) % 2:
+                finer = np.concatenate((finer, finer[-1:]))
+            pairs = finer.reshape(-1, 2, 2)
+            levels.append(np.stack((pairs[:, :, 0].min(axis=1), pairs[:, :, 1].max(axis=1)), axis=1))
+        return cls(sample_count / sample_rate, sample_rate / BASE_BIN_SAMPLES, levels)
+
+    def envelope(self, start_s: float, end_s: float, columns: int) -> tuple[np.ndarray, np.ndarray]:
+        """(mins, maxs) for `columns` equal slices of [start_s, end_s)."""
+        if columns <= 0 or end_s <= start_s or not self.levels:
+            return np.empty(0, np.float32), np.empty(0, np.float32)
+        columns_per_second = columns / (end_s - start_s)
+        level_index = 0
+        for index in range(len(self.levels) - 1, -1, -1): # The coarsest level with a bin per column
+            if self.bins_per_second[index] >= columns_per_second:
+                level_index = index
+                break
+        peaks, bins_per_second = self.levels[level_index], self.bins_per_second[level_index]
+        first = min(len(peaks) - 1, max(0, int(start_s * bins_per_second)))
+        last = min(len(peaks), max(first + 1, math.ceil(end_s * bins_per_second)))
+        window = peaks[first:last]
+        # reduceat reduces each column's slice, and repeats a bin when zoomed in past one bin per column
+        starts = (np.arange(columns) * (len(window) / columns)).astype(np.int64)
+        return np.minimum.reduceat(window[:, 0], starts), np.maximum.reduceat(window[:, 1], starts)
+
+    def save(self, path: Path):
+        arrays = {f"level_{index}": level for index, level in enumerate(self.levels)}
+        temp_path = path.with_suffix(".tmp")
+        with open(temp_path, 'wb') as handle:
+            np.savez(handle, duration_s=self.duration_s, base_bins_per_second=self.bins_per_second[0], **arrays)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> 'WaveformPeaks':
+        with np.load(path) as data:
+            levels = []
+            while f"level_{len(levels)}" in data:
+                levels.append(data[f"level_{len(levels)}"])
+            return cls(float(data['duration_s']), float(data['base_bins_per_second']), levels)
+
+
+def file_digest(audio_path: str) -> str:
+    """Hash of the file's contents; cache entries stay valid when the file is moved or renamed."""
+    digest = hashlib.sha1()
+    with open(audio_path, 'rb') as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_path_for(audio_path: str) -> Path:
+    cache_dir = Path(QStandardPaths.writableLocation(QStandardPaths.StandardLocation.CacheLocation)) / "waveforms"
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir / f"{file_digest(audio_path)}_v{CACHE_VERSION}.npz"
+
+
+def _wav_samples(frames: bytes, sample_width: int) -> np.ndarray:
+    """Little-endian PCM frames as float32 in -1..1."""
+    if sample_width == 3:
+        # numpy has no 24-bit type: each sample becomes the top three bytes of an int32.
+        widened = np.zeros((len(frames) // 3, 4), np.uint8)
+        widened[:, 1:] = np.frombuffer(frames, np.uint8).reshape(-1, 3)
+        samples = widened.view('<i4').ravel().astype(np.float32)
+        samples /= 2.0 ** 31
+        return samples
+    dtype = _WAV_DTYPES[sample_width]
+    samples = np.frombuffer(frames, dtype).astype(np.float32)
+    if dtype is np.uint8:
+        samples -= 128.0
+        samples /= 128.0
+    else:
+        samples /= float(np.iinfo(dtype).max) + 1
+    return samples
+
+
+def _decode_wav(audio_path: str, feed):
+    """PCM WAV files are read directly, without going through the media backend."""
+    with wave.open(audio_path, 'rb') as wav_file:
+        channels, sample_width, sample_rate = wav_file.getnchannels(), wav_file.getsampwidth(), wav_file.getframerate()
+        if sample_width != 3 and sample_width not in _WAV_DTYPES:
+            # Raised as a wave.Error so decode_audio hands the file to the media backend instead
+            raise wave.Error(f"Unsupported WAV sample width: {sample_width * 8} bits")
+        while frames := wav_file.readframes(sample_rate * 10):
+            feed(_wav_samples(frames, sample_width).reshape(-1, channels).mean(axis=1), sample_rate)
+
+
+def _decode_with_media_backend(audio_path: str, feed):
+    """Decodes any format the Qt media backend can play, as mono float at DECODE_SAMPLE_RATE."""
+    requested_format = QAudioFormat()
+    requested_format.setSampleFormat(QAudioFormat.SampleFormat.Float)
+    requested_format.setChannelCount(1)
+    requested_format.setSampleRate(DECODE_SAMPLE_RATE)
+
+    decoder = QAudioDecoder()
+    decoder.setAudioFormat(requested_format)
+    decoder.setSource(QUrl.fromLocalFile(audio_path))
+    decoded = [False]
+
+    def read_buffer():
+        audio_buffer = decoder.read()
+        buffer_format = audio_buffer.format()
+        if audio_buffer.byteCount() == 0 or buffer_format.sampleFormat() != QAudioFormat.SampleFormat.Float:
+            return
+        samples = np.frombuffer(audio_buffer.constData().asstring(audio_buffer.byteCount()), np.float32)
+        feed(samples.reshape(-1, max(1, buffer_format.channelCount())).mean(axis=1), buffer_format.sampleRate())
+        decoded[0] = True
+
+    loop = QEventLoop()
+    decoder.bufferReady.connect(read_buffer)
+    decoder.finished.connect(loop.quit)
+    decoder.isDecodingChanged.connect(lambda decoding: None if decoding else loop.quit()) # Also ends on errors
+    decoder.start()
+    loop.exec()
+    if not decoded[0]:
+        raise ValueError(decoder.errorString() or "No audio could be decoded")
+
+
+def decode_audio(audio_path: str, feed):
+    """
+    Streams audio_path as mono float32 chunks in -1..1 to feed(samples, sample_rate). WAV files
+    are read directly, anything else through the media backend.
+    """
+    try:
+        _decode_wav(audio_path, feed)
+    except (wave.Error, EOFError):
+        _decode_with_media_backend(audio_path, feed)
+
+
+class WaveformLoader(QThread):
+    """Loads one audio file's peaks from the cache, or decodes and caches them."""
+    loaded = pyqtSignal(str, object) # Audio path, WaveformPeaks or None if the audio could not be decoded
+
+    def __init__(self, audio_path: str, parent=None):
+        super().__init__(parent)
+        self.audio_path = audio_path
+
+    def run(self):
+        peaks = None
+        try:
+            cache_path = cache_path_for(self.audio_path)
+            if cache_path.exists():
+                try:
+                    peaks = WaveformPeaks.load(cache_path)
+                except (OSError, ValueError, KeyError) as e:
+                    print(f"Warning: Ignoring unreadable waveform cache {cache_path}: {e}")
+            if peaks is None:
+                accumulator = _PeakAccumulator()
+                decode_audio(self.audio_path, accumulator.feed)
+                peaks = WaveformPeaks.from_base_level(accumulator.finish(), accumulator.sample_rate, accumulator.sample_count)
+                peaks.save(cache_path)
+        except (OSError, ValueError) as e:
+            print(f"Could not build the waveform for {self.audio_path}: {e}")
+        self.loaded.emit(self.audio_path, peaks)
+
+
+def paint_waveform(painter: QPainter, peaks: WaveformPeaks, rect: QRectF, start_s: float, end_s: float, color: QColor):
+    """Fills the min/max envelope of [start_s, end_s) across rect, one column per pixel."""
+    columns = int(rect.width())
+    mins, maxs = peaks.envelope(start_s, min(end_s, peaks.duration_s), columns)
+    if not len(maxs):
+        return
+    xs = rect.left() + np.arange(len(maxs), dtype=np.float64) + 0.5
+    half_height = rect.height() / 2 * 0.9
+    y_center = rect.top() + rect.height() / 2
+    tops = y_center - np.maximum(maxs, 0.0) * half_height - 0.5 # Never thinner than a pixel
+    bottoms = y_center - np.minimum(mins, 0.0) * half_height + 0.5
+    outline = [QPointF(x, y) for x, y in zip(xs.tolist(), tops.tolist())]
+    outline += [QPointF(x, y) for x, y in zip(xs[::-1].tolist(), bottoms[::-1].tolist())]
+    painter.save()
+    painter.setPen(Qt.PenStyle.NoPen)
+    painter.setBrush(color)
+    painter.drawPolygon(QPolygonF(outline))
+    painter.restore()
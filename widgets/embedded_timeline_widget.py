@@ -7,6 +7,8 @@ from PyQt6.QtGui import QPainter, QColor, QPen, QBrush, QMouseEvent, QPaintEvent
 
 import math
 
+from waveform_cache import paint_waveform
+
 # Import for type hinting
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
@@ -77,21 +79,11 @@ class _EmbeddedTimelineView(QWidget):
                 painter.setPen(QColor(60, 60, 65))
                 painter.drawLine(QPointF(0, track_y_pos), QPointF(self.width(), track_y_pos))
 
-        # 1. Draw Audio Waveform (simplified)
-        if timeline_widget.audio_duration > 0 and len(timeline_widget.simulated_waveform_data) > 0:
-            waveform_pen_color = QColor(70, 90, 120)
-            painter.setPen(QPen(waveform_pen_color, 1))
-            y_center = audio_y_start + audio_track_height / 2
-            max_amplitude = (audio_track_height / 2) * 0.9
-            
-            points_per_sec_data = len(timeline_widget.simulated_waveform_data) / timeline_widget.audio_duration
-            for px in range(bar_width):
-                time_at_px = px / pixels_per_second
-                data_idx = int(time_at_px * points_per_sec_data)
-                if 0 <= data_idx < len(timeline_widget.simulated_waveform_data):
-                    amplitude = timeline_widget.simulated_waveform_data[data_idx]
-                    line_height = amplitude * max_amplitude
-                    painter.drawLine(QPointF(timeline_area_x_start + px, y_center - line_height), QPointF(timeline_area_x_start + px, y_center + line_height))
+        # 1. Draw Audio Waveform
+        if timeline_widget.audio_duration > 0 and timeline_widget.waveform and pixels_per_second > 0:
+            audio_width_px = min(bar_width, int(timeline_widget.audio_duration * pixels_per_second))
+            paint_waveform(painter, timeline_widget.waveform, QRectF(timeline_area_x_start, audio_y_start, audio_width_px, audio_track_height),
+                           0.0, audio_width_px / pixels_per_second, QColor(70, 90, 120))
 
         # 2. Draw Event Blocks
         event_font = QFont(); event_font.setPointSize(6)